@@ -0,0 +1,226 @@
+"""Access journal: last-use records for the object and executable CAS pools.
+
+Without it, recency in a shared pool is an mtime. Builds ``utime`` every
+published entry (``cas_publish.freshen_cas_entry``), and ``ct-trim-cache``
+``stat``s every entry to rebuild the age picture. On a multi-TB pool on
+GPFS/NFS/Lustre both sides pay one metadata round-trip per entry on every run.
+
+With ``--access-journal`` a build instead writes ONE segment per pool per
+build into ``<pool>/.ct-access/``. The segment lists every entry the build
+used, as ``<timestamp>\\t<kind>\\t<bucket>/<name>`` lines. The entry name
+carries its content hash, so the line is the (hash, kind, timestamp) record.
+Segments are named ``<host>.<pid>.<ns>.jnl`` and written whole through
+``atomic_output_file``. A visible segment is therefore complete and never
+written again. Concurrent builders never share a file, which matters on NFS,
+where ``O_APPEND`` is not atomic.
+
+``ct-trim-cache`` folds the segments into ``index.json``, a persistent
+``{bucket/name: [last_used, size]}`` map, then deletes the segments it
+folded. An entry is ``stat``-ed once, the first time trim sees it. After
+that its size comes from the index (CAS entries are immutable once named)
+and its recency is the newer of that first mtime and its last journal
+record. Steady-state trim is a directory listing plus a read of the index.
+
+Everything here is best-effort, like the other pool sidecars. An unreadable
+segment or index means the entry falls back to its mtime, which is never
+fresher than the truth. Two trims racing on one pool can drop each other's
+folded records in the same way, and the cost is a few spurious ``stat``s.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import socket
+import time
+
+import compiletools.filesystem_utils
+
+DIRNAME = ".ct-access"
+INDEX_FILENAME = "index.json"
+SEGMENT_SUFFIX = ".jnl"
+_VERSION = 1
+
+
+def journal_dir(pool_root: str) -> str:
+    return os.path.join(pool_root, DIRNAME)
+
+
+def is_journaled(pool_root: str) -> bool:
+    """True once a build has journaled into *pool_root*."""
+    return os.path.isdir(journal_dir(pool_root))  # NOT wrappedos: created by peers mid-run
+
+
+def _rel_name(pool_root: str, path: str) -> str | None:
+    """``bucket/name`` of *path* inside *pool_root*, or ``None`` if it lies elsewhere."""
+    prefix = pool_root.rstrip(os.sep) + os.sep
+    if not path.startswith(prefix):
+        return None
+    rel = path[len(prefix) :]
+    return rel if rel.count(os.sep) == 1 else None
+
+
+def record_uses(pool_root: str, kind: str, paths, *, now: float | None = None) -> int:
+    """Write one journal segment marking *paths* used at *now*.
+
+    Paths outside *pool_root* (or not at ``<pool>/<bucket>/<name>`` depth)
+    are ignored. Returns the number of records written. A failed write
+    returns 0 and is otherwise ignored.
+    """
+    if not pool_root:
+        return 0
+    stamp = int(now if now is not None else time.time())
+    lines = [f"{stamp}\t{kind}\t{rel}\n" for rel in {_rel_name(pool_root, p) for p in paths} if rel]
+    if not lines:
+        return 0
+    name = f"{socket.gethostname()}.{os.getpid()}.{time.monotonic_ns()}{SEGMENT_SUFFIX}"
+    try:
+        with compiletools.filesystem_utils.atomic_output_file(
+            os.path.join(journal_dir(pool_root), name), mode="w", encoding="utf-8", force_mode=0o666
+        ) as f:
+            f.writelines(sorted(lines))
+    except OSError:
+        return 0
+    return len(lines)
+
+
+class AccessIndex:
+    """The folded last-use picture of one journaled pool."""
+
+    def __init__(self, pool_root: str, kind: str):
+        self.pool_root = pool_root
+        self.kind = kind
+        self.path = os.path.join(journal_dir(pool_root), INDEX_FILENAME)
+        # bucket/name -> [last_used, size]; size is None until trim stats it.
+        self._entries: dict[str, list] = {}
+        self._seen: set[str] = set()
+        self._folded: list[str] = []
+        self.records_folded = 0
+        self.stats_taken = 0
+        self._load()
+
+    def _load(self) -> None:
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") != _VERSION or data.get("kind") != self.kind:
+                return
+            self._entries = {
+                str(k): [float(v[0]), int(v[1]) if v[1] is not None else None] for k, v in data["entries"].items()
+            }
+        except (OSError, ValueError, KeyError, TypeError, IndexError, AttributeError):
+            self._entries = {}
+
+    def fold(self) -> int:
+        """Merge every visible segment into the index; returns the segment count.
+
+        The segments are only deleted by ``save``, after the merged index is
+        safely on disk.
+        """
+        try:
+            names = [n for n in os.listdir(journal_dir(self.pool_root)) if n.endswith(SEGMENT_SUFFIX)]
+        except OSError:
+            return 0
+        for name in names:
+            seg = os.path.join(journal_dir(self.pool_root), name)
+            try:
+                with open(seg, encoding="utf-8") as f:
+                    lines = f.read().splitlines()
+            except (OSError, ValueError):
+                continue
+            for line in lines:
+                parts = line.split("\t")
+                if len(parts) != 3 or parts[1] != self.kind:
+                    continue
+                try:
+                    stamp = float(parts[0])
+                except ValueError:
+                    continue
+                record = self._entries.get(parts[2])
+                if record is None:
+                    self._entries[parts[2]] = [stamp, None]
+                elif stamp > record[0]:
+                    record[0] = stamp
+                self.records_folded += 1
+            self._folded.append(seg)
+        return len(self._folded)
+
+    def mtime_size(self, entry) -> tuple[float, int] | None:
+        """``(recency, size)`` for a pool ``DirEntry``, in place of a ``stat``.
+
+        Known entries cost nothing. An entry seen for the first time is
+        ``stat``-ed once; its size is remembered and its recency is the newer
+        of its mtime and any journal record. Returns ``None`` if it vanished.
+        """
+        rel = _rel_name(self.pool_root, entry.path)
+        if rel is None:
+            return None
+        self._seen.add(rel)
+        record = self._entries.get(rel)
+        if record is not None and record[1] is not None:
+            return record[0], record[1]
+        try:
+            st = entry.stat()
+        except OSError:
+            return None
+        self.stats_taken += 1
+        recency = max(st.st_mtime, record[0]) if record is not None else st.st_mtime
+        self._entries[rel] = [recency, st.st_size]
+        return recency, st.st_size
+
+    def recency(self, path: str, mtime: float, size: int) -> float:
+        """The newer of *mtime* and the last journal record for *path*, for a
+        caller that had to ``stat`` the entry anyway. Remembers *size*."""
+        rel = _rel_name(self.pool_root, path)
+        if rel is None:
+            return mtime
+        self._seen.add(rel)
+        record = self._entries.get(rel)
+        recency = max(mtime, record[0]) if record is not None else mtime
+        self._entries[rel] = [recency, size]
+        return recency
+
+    def saw(self, path: str) -> None:
+        """Keep *path*'s record although this run did not need its recency."""
+        rel = _rel_name(self.pool_root, path)
+        if rel is not None:
+            self._seen.add(rel)
+
+    def forget(self, path: str) -> None:
+        """Drop *path*'s record after trim removed it.
+
+        A later rebuild under the same name must start from its own mtime.
+        """
+        rel = _rel_name(self.pool_root, path)
+        if rel is not None:
+            self._entries.pop(rel, None)
+            self._seen.discard(rel)
+
+    def save(self) -> None:
+        """Write the index, then delete the segments folded into it.
+
+        Only entries seen this run are kept, so entries that have left the
+        pool by any route drop out. A record for an entry that is not on disk
+        yet is kept until its segment's time has aged a day, which covers a
+        build that journals before its entries are listed. Best-effort:
+        swallows OSError/ValueError.
+        """
+        horizon = time.time() - 86400
+        entries = {
+            rel: record
+            for rel, record in self._entries.items()
+            if rel in self._seen or (record[1] is None and record[0] >= horizon)
+        }
+        try:
+            with compiletools.filesystem_utils.atomic_output_file(
+                self.path, mode="w", encoding="utf-8", force_mode=0o666
+            ) as f:
+                json.dump({"version": _VERSION, "kind": self.kind, "entries": entries}, f)
+        except (OSError, ValueError):
+            return
+        for seg in self._folded:
+            try:
+                os.unlink(seg)
+            except OSError:
+                pass
+        self._folded = []
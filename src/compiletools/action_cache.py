@@ -0,0 +1,253 @@
+"""Pluggable action cache for compiled objects shared across hosts.
+
+The cas-objdir already names every object after the inputs that produced it
+(``<basename>_<file_h>_<dep_h>_<macro_h>.o`` under the per-variant pool), so
+two builders that agree on the name agree on the bytes. Sharing that pool,
+however, needs every builder to mount the same filesystem. An action cache is
+the second tier behind the local pool: a compile whose object is missing
+locally first asks the cache for it, and a compile that actually ran uploads
+its object so a builder on another host can skip the compiler.
+
+Two stores are supported, selected by the ``--action-cache`` spec:
+
+* a directory path (or ``file://`` URL) -- ``<root>/<key[:2]>/<key>``, for a
+  cache on a different filesystem than the pool (a local SSD tier in front of
+  NFS, a per-runner volume that survives workspace wipes);
+* an ``http://`` / ``https://`` URL -- plain ``GET`` / ``PUT`` of
+  ``<url>/ac/<key>``. Any server that stores PUT bodies and serves them back
+  works (nginx WebDAV, a bucket behind a signing proxy, bazel-remote with
+  ``--disable_http_ac_validation``).
+
+Everything here is best-effort in the same sense as the pool itself: a cache
+that is unreachable, corrupt or read-only degrades to "miss" (the compiler
+runs) and never fails a build.
+"""
+
+from __future__ import annotations
+
+import abc
+import contextlib
+import functools
+import hashlib
+import logging
+import os
+import urllib.error
+import urllib.request
+
+import compiletools.filesystem_utils
+
+logger = logging.getLogger(__name__)
+
+# Environment channel for the out-of-process compile path: make/ninja recipes
+# run ``ct-lock-helper compile``, which has no parsed args, so the backend
+# bakes the spec into the recipe's env prefix (see
+# ``backend_locking.wrap_compile_with_lock``).
+ACTION_CACHE_ENV = "CT_ACTION_CACHE"
+ACTION_CACHE_UPLOAD_ENV = "CT_ACTION_CACHE_UPLOAD"
+
+# Bumped whenever the key derivation changes so old and new builders never
+# exchange objects under a key that means something different to each.
+_KEY_VERSION = "ct-ac-1"
+
+_HTTP_TIMEOUT_SECONDS = 30.0
+
+
+class ActionCache(abc.ABC):
+    """A key -> object-bytes store consulted before, and fed after, a compile."""
+
+    @abc.abstractmethod
+    def fetch(self, key: str, dest: str) -> bool:
+        """Materialise the entry for *key* at *dest* atomically.
+
+        Returns True on a hit. A miss, or any error reaching the store,
+        returns False with *dest* untouched.
+        """
+
+    @abc.abstractmethod
+    def store(self, key: str, src: str) -> None:
+        """Upload *src* under *key*. Errors are logged and swallowed."""
+
+
+class LocalDirActionCache(ActionCache):
+    """Action cache backed by a directory, sharded on the first key byte."""
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def __repr__(self) -> str:
+        return f"LocalDirActionCache({self.root!r})"
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], key)
+
+    def fetch(self, key: str, dest: str) -> bool:
+        entry = self._entry_path(key)
+        # NOT wrappedos: other builders publish into the store concurrently.
+        if not os.path.isfile(entry):
+            return False
+        try:
+            compiletools.filesystem_utils.atomic_copy(entry, dest)
+        except OSError as e:
+            logger.warning("action cache %s: fetch of %s failed (%s); compiling instead", self.root, key, e)
+            return False
+        return True
+
+    def store(self, key: str, src: str) -> None:
+        entry = self._entry_path(key)
+        if os.path.exists(entry):
+            return  # keys are content-derived: an existing entry is already correct
+        try:
+            os.makedirs(os.path.dirname(entry), exist_ok=True)
+            compiletools.filesystem_utils.atomic_copy(src, entry)
+        except OSError as e:
+            logger.warning("action cache %s: store of %s failed (%s)", self.root, key, e)
+
+
+class HttpActionCache(ActionCache):
+    """Action cache speaking plain HTTP ``GET`` / ``PUT`` on ``<url>/ac/<key>``.
+
+    The first transport error disables the cache for the rest of the process:
+    a dead cache server must cost one timeout per build, not one per TU.
+    """
+
+    def __init__(self, base_url: str, timeout: float = _HTTP_TIMEOUT_SECONDS):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self._disabled = False
+
+    def __repr__(self) -> str:
+        return f"HttpActionCache({self.base_url!r})"
+
+    def _url(self, key: str) -> str:
+        return f"{self.base_url}/ac/{key}"
+
+    def _disable(self, what: str, key: str, err: Exception) -> None:
+        self._disabled = True
+        logger.warning("action cache %s: %s of %s failed (%s); disabling for this build", self.base_url, what, key, err)
+
+    def fetch(self, key: str, dest: str) -> bool:
+        if self._disabled:
+            return False
+        try:
+            with urllib.request.urlopen(self._url(key), timeout=self.timeout) as resp:  # noqa: S310 -- user-configured URL
+                with compiletools.filesystem_utils.atomic_output_file(dest, mode="wb") as f:
+                    while chunk := resp.read(1 << 20):
+                        f.write(chunk)
+        except urllib.error.HTTPError as e:
+            if e.code != 404:
+                logger.warning("action cache %s: GET %s returned HTTP %d", self.base_url, key, e.code)
+            return False
+        except (urllib.error.URLError, OSError) as e:
+            self._disable("fetch", key, e)
+            return False
+        return True
+
+    def store(self, key: str, src: str) -> None:
+        if self._disabled:
+            return
+        try:
+            with open(src, "rb") as f:
+                body = f.read()
+            req = urllib.request.Request(  # noqa: S310 -- user-configured URL
+                self._url(key),
+                data=body,
+                method="PUT",
+                headers={"Content-Type": "application/octet-stream"},
+            )
+            with urllib.request.urlopen(req, timeout=self.timeout):  # noqa: S310
+                pass
+        except urllib.error.HTTPError as e:
+            logger.warning("action cache %s: PUT %s returned HTTP %d", self.base_url, key, e.code)
+        except (urllib.error.URLError, OSError) as e:
+            self._disable("store", key, e)
+
+
+def normalize_spec(spec: str) -> str:
+    """Return *spec* with a directory store made absolute.
+
+    Recipes run ``ct-lock-helper`` from the build tool's cwd, which need not
+    be ct-cake's, so a relative directory must be pinned before it is baked
+    into a recipe.
+    """
+    if spec.startswith(("http://", "https://")):
+        return spec
+    spec = spec.removeprefix("file://")
+    return os.path.abspath(os.path.expanduser(spec))
+
+
+@functools.cache
+def open_action_cache(spec: str | None) -> ActionCache | None:
+    """Return the action cache for *spec*, or None when *spec* is empty.
+
+    Memoised per spec so the HTTP "disable after first transport error"
+    state is shared by every compile in the process.
+    """
+    if not spec:
+        return None
+    spec = normalize_spec(spec)
+    if spec.startswith(("http://", "https://")):
+        return HttpActionCache(spec)
+    return LocalDirActionCache(spec)
+
+
+def configured_spec(args) -> str | None:
+    """The ``--action-cache`` spec on *args*, falling back to ``CT_ACTION_CACHE``.
+
+    Only a non-empty string counts, so stub namespaces (and MagicMock args in
+    tests) read as "no cache" rather than as a spec.
+    """
+    spec = getattr(args, "action_cache", None)
+    if isinstance(spec, str) and spec:
+        return spec
+    return os.environ.get(ACTION_CACHE_ENV) or None
+
+
+def from_args(args) -> ActionCache | None:
+    """The action cache configured by ``--action-cache`` (or ``CT_ACTION_CACHE``)."""
+    return open_action_cache(configured_spec(args))
+
+
+def upload_enabled(args=None) -> bool:
+    """Whether successful compiles upload to the action cache.
+
+    ``--no-action-cache-upload`` makes a builder a pure consumer (developer
+    machines reading what CI produced). The env var carries the same choice
+    into ``ct-lock-helper``.
+    """
+    if args is not None and hasattr(args, "action_cache_upload"):
+        return bool(args.action_cache_upload)
+    return os.environ.get(ACTION_CACHE_UPLOAD_ENV, "1") not in ("0", "false", "False")
+
+
+def action_key(target: str) -> str:
+    """Cache key for the cas-objdir object at *target*.
+
+    The object basename already encodes source content, transitive header
+    content and the TU's macro state (compiler identity included); the
+    variant directory -- the pool's ``<cas-objdir>/<variant>/<shard>/``
+    parent -- separates the flag sets the macro state does not see (``-g``,
+    ``-O`` levels that define no macro). Keying on exactly those two
+    components gives the action cache the same "name implies bytes"
+    contract a shared NFS pool already relies on, and nothing
+    workspace-specific leaks into the key.
+    """
+    variant = os.path.basename(os.path.dirname(os.path.dirname(target)))
+    payload = f"{_KEY_VERSION}\0{variant}\0{os.path.basename(target)}"
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def fetch_object(cache: ActionCache | None, target: str) -> bool:
+    """Try to satisfy *target* from *cache*. True when the object is now present."""
+    if cache is None or os.path.exists(target):
+        return False
+    with contextlib.suppress(OSError):
+        os.makedirs(os.path.dirname(target) or ".", exist_ok=True)
+    return cache.fetch(action_key(target), target)
+
+
+def store_object(cache: ActionCache | None, target: str, *, upload: bool = True) -> None:
+    """Upload the freshly compiled *target* to *cache* (best effort)."""
+    # NOT cached: *target* was produced by the compile that just ran.
+    if cache is None or not upload or not os.path.isfile(target):
+        return
+    cache.store(action_key(target), target)
@@ -1672,16 +1672,17 @@ def parseargs(cap, argv, verbose=None, *, context):
     ``gather_inputs`` (the impure boundary) -> ``compute_build_state``
     (pure) -> ``apply_effects`` / ``populate_args`` -> compiler checks.
 
+    With ``CT_CONFIG_MEMO`` set, a still-valid resolution stored by an
+    earlier identical invocation is reused instead (see ``config_memo``);
+    only the effects are re-applied.
+
     Args:
         context: BuildContext for per-build state. Stored as args._context;
             owns the PKG_CONFIG_PATH restore sentinel and the pkg-config
             query memo.
     """
-    # Deferred imports: build_inputs/build_state/build_apply import from
-    # apptools (sentinels, helpers), so top-level imports here would cycle.
-    from compiletools.build_apply import apply_effects, configure_pkg_config_errors, populate_args
-    from compiletools.build_inputs import gather_inputs
-    from compiletools.build_state import compute_build_state
+    # Deferred import: config_memo reads apptools' conf-path helpers.
+    from compiletools.config_memo import ConfigMemo
 
     # Console entry points pass argv=None meaning "use sys.argv". Normalize
     # here so everything downstream (target-anchored conf discovery, the
@@ -1689,6 +1690,44 @@ def parseargs(cap, argv, verbose=None, *, context):
     # only resolves None internally, which left _argv=None and disabled the
     # re-anchor on the real CLI.
     argv = list(sys.argv[1:]) if argv is None else list(argv)
+
+    memo = ConfigMemo.for_invocation(cap, argv, verbose)
+    if memo is None:
+        return _resolve_args(cap, argv, verbose, context)[0]
+    args = memo.load(cap)
+    if args is not None:
+        return _reuse_memoized_args(args, cap, context, argv)
+    with memo.recording():
+        args, inputs = _resolve_args(cap, argv, verbose, context)
+    memo.store(cap, args, inputs, argv)
+    return args
+
+
+def _reuse_memoized_args(args, cap, context, argv):
+    """Finish a namespace restored from the config memo.
+
+    The stored resolution already holds everything parseargs computes; what
+    it cannot hold are the process-level effects, so those are replayed in
+    the order the full path applies them.
+    """
+    from compiletools.build_apply import apply_effects, configure_pkg_config_errors, get_build_state
+
+    _stash_private_attrs(args, cap, context, argv)
+    compiletools.git_utils.set_allow_fake_git(getattr(args, "allow_fake_git", False))
+    configure_pkg_config_errors(args)
+    apply_effects(get_build_state(args), context)
+    return args
+
+
+def _resolve_args(cap, argv, verbose, context):
+    """The full parseargs resolution. Returns ``(args, inputs)``; the
+    gathered inputs are what the config memo fingerprints."""
+    # Deferred imports: build_inputs/build_state/build_apply import from
+    # apptools (sentinels, helpers), so top-level imports here would cycle.
+    from compiletools.build_apply import apply_effects, configure_pkg_config_errors, populate_args
+    from compiletools.build_inputs import gather_inputs
+    from compiletools.build_state import compute_build_state
+
     # command-line values override environment variables which override config file values which override defaults.
     args = cap.parse_args(args=argv)
     _stash_private_attrs(args, cap, context, argv)
@@ -1897,7 +1936,7 @@ def parseargs(cap, argv, verbose=None, *, context):
 
     if verbose > 8:
         print("parseargs has completed.  Returning args")
-    return args
+    return args, inputs
 
 
 def terminalcolumns():
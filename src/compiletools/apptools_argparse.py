@@ -430,6 +430,48 @@ def add_cas_arguments(cap):
             "them is a hard error rather than a silent no-op."
         ),
     )
+    compiletools.utils.add_boolean_argument(
+        parser=cap,
+        name="access-journal",
+        dest="access_journal",
+        default=False,
+        help=(
+            "Record which cas-objdir and cas-exedir entries each build uses in "
+            "a per-pool journal (<pool>/.ct-access/) instead of bumping the "
+            "mtime of every published entry. ct-trim-cache folds the journal "
+            "into a last-use index, ranks and ages entries by their last "
+            "recorded use, and no longer stats every entry it already knows. "
+            "Worth enabling on a large shared pool on a high-latency "
+            "filesystem, for every build that uses the pool."
+        ),
+    )
+    cap.add_argument(
+        "--action-cache",
+        dest="action_cache",
+        default=None,
+        metavar="DIR|URL",
+        help=(
+            "Second-tier cache for compiled objects, consulted when an object "
+            "is missing from --cas-objdir and fed after every compile that "
+            "actually ran. A directory path (or file:// URL) stores entries "
+            "under <DIR>/<key[:2]>/<key>; an http:// or https:// URL is "
+            "spoken to with plain GET/PUT of <URL>/ac/<key>, so CI builders "
+            "on separate hosts reuse each other's objects without a shared "
+            "filesystem. Unreachable caches degrade to a miss. The make and "
+            "ninja backends consult it through ct-lock-helper, so it needs "
+            "--file-locking (the default) there."
+        ),
+    )
+    compiletools.utils.add_boolean_argument(
+        parser=cap,
+        name="action-cache-upload",
+        dest="action_cache_upload",
+        default=True,
+        help=(
+            "Upload freshly compiled objects to --action-cache. Turn off on "
+            "builders that should only consume what CI produced."
+        ),
+    )
 
 
 def add_link_arguments(cap):
@@ -857,6 +899,30 @@ def add_otel_export_arguments(cap):
             "ct.cas.* gauges and ct-cake's ct.ccache.* counters/gauges."
         ),
     )
+    compiletools.utils.add_flag_argument(
+        parser=cap,
+        name="otel-stream",
+        dest="otel_stream",
+        default=False,
+        help=(
+            "With --otel-export, ship each rule's span while the build "
+            "runs (batched, from a background thread) instead of the "
+            "whole span tree at the end. The root and phase spans and the "
+            "ct.build.* aggregates still arrive at the end of the build. "
+            "Shake backend only; other backends export at the end."
+        ),
+    )
+    cap.add_argument(
+        "--otel-stream-queue-size",
+        type=int,
+        default=2048,
+        help=(
+            "Rule spans --otel-stream buffers for its exporter thread. "
+            "Rules recorded while the buffer is full are shipped at the "
+            "end of the build instead and counted in the root span's "
+            "ct.otel.stream.dropped attribute (default: %(default)s)."
+        ),
+    )
 
 
 def add_fetch_arguments(cap):
@@ -901,6 +967,25 @@ def add_fetch_arguments(cap):
             "parent dir of the git root, i.e. siblings ../<name>)."
         ),
     )
+    cap.add_argument(
+        "--git-mirror-dir",
+        dest="git_mirror_dir",
+        default=None,
+        env_var="CT_GIT_MIRROR_DIR",
+        help=(
+            "Keep a bare mirror of each //#GIT external's URL here and clone "
+            "missing externals from it with --shared, so workspaces share one "
+            "object store (default: clone straight from the URL)."
+        ),
+    )
+    cap.add_argument(
+        "--git-mirror-ttl",
+        dest="git_mirror_ttl",
+        type=int,
+        default=3600,
+        metavar="SECONDS",
+        help="Refresh a --git-mirror-dir mirror from its URL at most once per SECONDS (--update always refreshes).",
+    )
     cap.add_argument(
         "--git-path",
         dest="git_paths",
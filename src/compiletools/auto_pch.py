@@ -0,0 +1,89 @@
+"""Precompiled-header candidate selection for ``--suggest-pch`` / ``--auto-pch``.
+
+A precompiled header only pays off when many TUs parse the same header
+closure, and it is only *safe* to inject it (``-include <cache>/<h>``) into a
+TU when doing so cannot change what the TU means. Both are decided here from
+data the hunter already has:
+
+* **Safety.** A TU is a candidate for header ``H`` only when its very first
+  preprocessor directive is an unconditional ``#include`` that resolves to
+  ``H`` and ``H`` is include-guarded (or ``#pragma once``). Force-including
+  ``H`` first is then exactly what the TU already does, and its own
+  ``#include`` becomes a no-op.
+* **Payoff.** Every consumer of ``H`` after the first skips parsing ``H``'s
+  transitive closure, so the estimated saving is
+  ``(consumers - 1) * closure_bytes``. Bytes preprocessed is the cost proxy
+  (the same size-scaled estimate ``rule_cost`` uses on a cold cache).
+
+Each TU has at most one leading include, so the chosen headers never compete
+for a TU and ranking is a plain sort. The build backend resolves spellings
+and sizes (``BuildBackend._plan_auto_pch``); this module holds the pure parts.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+# A PCH with a single consumer saves nothing: that TU still pays to parse the
+# header once, just inside the precompile rule instead of its own compile.
+MIN_CONSUMERS = 2
+
+
+@dataclass(frozen=True)
+class PchSuggestion:
+    """One header worth precompiling and the TUs that would use it."""
+
+    header: str
+    consumers: tuple[str, ...]
+    closure_bytes: int
+
+    @property
+    def saved_bytes(self) -> int:
+        return (len(self.consumers) - 1) * self.closure_bytes
+
+
+def leading_include(file_result) -> tuple[str, bool] | None:
+    """``(spelling, is_system)`` of *file_result*'s first directive when that
+    directive is an uncommented ``#include``; ``None`` otherwise (a leading
+    ``#define``, ``#if`` or ``#pragma`` could change what the header means)."""
+    if file_result is None or not file_result.directives:
+        return None
+    first = min(file_result.directives, key=lambda d: d.line_num)
+    if first.directive_type != "include":
+        return None
+    for inc in file_result.includes:
+        if inc["line_num"] == first.line_num and not inc["is_commented"]:
+            return str(inc["filename"]), bool(inc["is_system"])
+    return None
+
+
+def rank(
+    consumers_by_header: dict[str, list[str]],
+    closure_bytes: dict[str, int],
+    *,
+    min_consumers: int = MIN_CONSUMERS,
+) -> list[PchSuggestion]:
+    """Suggestions with at least *min_consumers* TUs, largest saving first
+    (ties by header path, so the order is stable across runs)."""
+    suggestions = [
+        PchSuggestion(header, tuple(sorted(tus)), closure_bytes[header])
+        for header, tus in consumers_by_header.items()
+        if len(tus) >= min_consumers and header in closure_bytes
+    ]
+    suggestions.sort(key=lambda s: (-s.saved_bytes, s.header))
+    return suggestions
+
+
+def format_report(suggestions: list[PchSuggestion]) -> str:
+    """Human-readable table for ``ct-cake --suggest-pch``."""
+    if not suggestions:
+        return "No precompiled-header candidates: no header leads two or more compatible TUs.\n"
+    lines = [f"{'saved KiB':>10}  {'TUs':>5}  {'closure KiB':>11}  header"]
+    lines.extend(
+        f"{s.saved_bytes / 1024:>10.0f}  {len(s.consumers):>5}  {s.closure_bytes / 1024:>11.0f}  {s.header}"
+        for s in suggestions
+    )
+    total = sum(s.saved_bytes for s in suggestions)
+    lines.append(f"Estimated preprocessing saved: {total / 1024:.0f} KiB across {len(suggestions)} header(s).")
+    lines.append("Apply with --auto-pch, or add //#PCH=<header> to the listed TUs.")
+    return "\n".join(lines) + "\n"
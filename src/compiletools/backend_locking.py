@@ -18,6 +18,8 @@ import functools
 import shlex
 import shutil
 
+import compiletools.action_cache
+import compiletools.cold_tier
 import compiletools.filesystem_utils
 
 
@@ -27,6 +29,24 @@ def _native_flock_available() -> bool:
     return shutil.which("flock") is not None
 
 
+def _divert_cold_to_helper(fast_cmd: str, helper_cmd: str, target: str) -> str:
+    """Run *helper_cmd* instead of the native-flock *fast_cmd* when *target*
+    has a cold-tier sibling at recipe time.
+
+    ``ct-trim-cache --compress-cold`` replaces a cold ``.o`` / ``.a`` with a
+    compressed sibling, and only ct-lock-helper restores it
+    (``locking.rehydrate_cold_entry``). The bare flock recipe would recompile
+    instead and leave the sibling beside the new raw entry. The check is two
+    ``test -e`` builtins, so the fast path stays free of Python startup for
+    every entry that was never demoted. Entries the trim never demotes keep
+    the plain fast path.
+    """
+    if not compiletools.cold_tier.is_demotable(target):
+        return fast_cmd
+    siblings = " || ".join(f"[ -e {shlex.quote(target + s)} ]" for s in compiletools.cold_tier.readable_suffixes())
+    return f"if {siblings}; then {helper_cmd}; else {fast_cmd}; fi"
+
+
 def _build_lock_env_prefix(strategy: str, args, filesystem_type: str) -> str:
     """Build the CT_LOCK_* environment variable prefix for ct-lock-helper.
 
@@ -85,8 +105,11 @@ def wrap_compile_with_lock(compile_cmd: str, target: str, args, filesystem_type:
         return compile_cmd + " -o " + target
 
     strategy = compiletools.filesystem_utils.get_lock_strategy(filesystem_type)
+    action_cache = compiletools.action_cache.configured_spec(args)
 
     # Fast path: use native flock binary for flock strategy (avoids Python startup).
+    # Skipped when an action cache is configured: the fetch-before/upload-after
+    # round trip lives in ct-lock-helper, which the bare flock recipe bypasses.
     # Two invariants must hold under concurrent peer makes on an object CAS:
     #   1. Lock on a SIDECAR ``<target>.lock`` file, NOT on ``<target>``. flock
     #      opens its lock argument with O_RDWR|O_CREAT, so locking the target
@@ -102,16 +125,31 @@ def wrap_compile_with_lock(compile_cmd: str, target: str, args, filesystem_type:
     # DO NOT 'optimize' back to ``flock <target> gcc -o <target>``: that form
     # violates BOTH invariants. See locking.atomic_compile() for the rationale
     # the helper-mode path below relies on.
-    if strategy == "flock" and _native_flock_available():
+    # A demoted (cold-tier) object diverts to ct-lock-helper, which restores
+    # it instead of recompiling; see _divert_cold_to_helper.
+    env_prefix = _build_lock_env_prefix(strategy, args, filesystem_type)
+    if action_cache:
+        env_prefix += f"{_action_cache_env_prefix(action_cache, args)} "
+    helper_cmd = f"{env_prefix}ct-lock-helper compile --target={target} --strategy={strategy} -- {compile_cmd}"
+
+    if strategy == "flock" and _native_flock_available() and not action_cache:
         target_q = shlex.quote(target)
         lock_q = shlex.quote(f"{target}.lock")
         temp_q = shlex.quote(f"{target}.compiletools.tmp")
         # $$ escapes to $ at Make-recipe expansion so the shell sees $? / $ec.
         inner = f"{compile_cmd} -o {temp_q} && mv -f {temp_q} {target_q}; ec=$$?; rm -f {temp_q}; exit $$ec"
-        return f"flock {lock_q} sh -c {shlex.quote(inner)}"
+        return _divert_cold_to_helper(f"flock {lock_q} sh -c {shlex.quote(inner)}", helper_cmd, target)
 
-    env_prefix = _build_lock_env_prefix(strategy, args, filesystem_type)
-    return f"{env_prefix}ct-lock-helper compile --target={target} --strategy={strategy} -- {compile_cmd}"
+    return helper_cmd
+
+
+def _action_cache_env_prefix(spec: str, args) -> str:
+    """Env assignments carrying ``--action-cache`` into ct-lock-helper."""
+    upload = "1" if getattr(args, "action_cache_upload", True) else "0"
+    return (
+        f"{compiletools.action_cache.ACTION_CACHE_ENV}={shlex.quote(compiletools.action_cache.normalize_spec(spec))} "
+        f"{compiletools.action_cache.ACTION_CACHE_UPLOAD_ENV}={upload}"
+    )
 
 
 def wrap_link_with_lock(link_cmd: str, target: str, args, filesystem_type: str) -> str:
@@ -144,12 +182,14 @@ def wrap_link_with_lock(link_cmd: str, target: str, args, filesystem_type: str)
     # with mtime=now and trick a peer make process into treating the target
     # as up-to-date (mtime newer than its prerequisites). See
     # wrap_compile_with_lock for the full rationale.
+    # A demoted static archive diverts to ct-lock-helper, which restores it.
+    env_prefix = _build_lock_env_prefix(strategy, args, filesystem_type)
+    helper_cmd = f"{env_prefix}ct-lock-helper link --target={target} --strategy={strategy} -- {link_cmd}"
     if strategy == "flock" and _native_flock_available():
         lock_q = shlex.quote(f"{target}.lock")
-        return f"flock {lock_q} {link_cmd}"
+        return _divert_cold_to_helper(f"flock {lock_q} {link_cmd}", helper_cmd, target)
 
-    env_prefix = _build_lock_env_prefix(strategy, args, filesystem_type)
-    return f"{env_prefix}ct-lock-helper link --target={target} --strategy={strategy} -- {link_cmd}"
+    return helper_cmd
 
 
 def check_lock_helper_available() -> bool:
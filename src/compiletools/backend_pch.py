@@ -5,12 +5,12 @@ concrete BuildBackend subclasses need for GCC/clang precompiled headers
 (``.gch``): the cas-pchdir command hash and its per-PCH scope-macro hash,
 the sidecar manifest + scope diagnostics writers, the ``-include``-path
 gch resolver, the cross-user-safety warning, and the source-header
-staging hardlink (with EXDEV copy fallback) that lets gcc fall back to
+staging hardlink (with EXDEV reflink-or-copy fallback) that lets gcc fall back to
 the bare ``.h`` when a cached ``.gch`` is invalidated at consume time.
 
 This module is a deliberately thin lower layer: it imports only stdlib
 plus genuinely-leaf compiletools modules (``apptools``, ``wrappedos``,
-``global_hash_registry``, ``diagnostics`` -- all already below
+``global_hash_registry``, ``diagnostics``, ``filesystem_utils`` -- all already below
 ``build_backend``) so that ``build_backend`` can re-export these names
 without creating an import cycle. ``build_backend`` binds them back into
 its own namespace, preserving object identity for both call sites inside
@@ -22,11 +22,11 @@ from __future__ import annotations
 import hashlib
 import json
 import os
-import shutil
 import sys
 
 import compiletools.apptools
 import compiletools.diagnostics
+import compiletools.filesystem_utils
 import compiletools.global_hash_registry
 import compiletools.wrappedos
 
@@ -57,8 +57,10 @@ def _stage_pch_header_alongside_gch(source_header: str, staged_path: str) -> Non
 
     Mechanism. Try ``os.link`` first — atomic, zero disk cost (one
     inode shared with the original), survives concurrent stagings.
-    Fall back to ``shutil.copy2`` on ``EXDEV`` (cross-filesystem
-    cache) or any other ``OSError``. Idempotent: a successful
+    Fall back to ``filesystem_utils.copy_file`` on ``EXDEV``
+    (cross-filesystem cache) or any other ``OSError`` — a reflink, still
+    zero data cost, where the cache filesystem supports one, else a full
+    copy. Idempotent: a successful
     staging from a peer ct-cake invocation is treated as success.
 
     Cleanup. ``ct-trim-cache`` already evicts entries by hash-dir,
@@ -90,7 +92,7 @@ def _stage_pch_header_alongside_gch(source_header: str, staged_path: str) -> Non
     # never sees a partial file.
     tmp_path = f"{staged_path}.staging.{os.getpid()}"
     try:
-        shutil.copy2(source_header, tmp_path)
+        compiletools.filesystem_utils.copy_file(source_header, tmp_path)
         os.replace(tmp_path, staged_path)
     except FileExistsError:
         # Lost a race during rename; clean up the temp.
@@ -775,8 +775,8 @@ class BazelBackend(BuildBackend):
 
     @staticmethod
     def _stage_into_bazel_workspace(src: str, dst: str) -> None:
-        """Hardlink (with EXDEV-tolerant copy fallback) ``src`` to
-        ``dst``. Idempotent: if ``dst`` already exists from a peer
+        """Hardlink (with EXDEV-tolerant reflink-or-copy fallback) ``src``
+        to ``dst``. Idempotent: if ``dst`` already exists from a peer
         invocation we silently treat it as success. Missing source is
         also a silent no-op (in production headerdeps would have
         already raised; we don't want to crash unit tests with mocked
@@ -798,7 +798,7 @@ class BazelBackend(BuildBackend):
             pass
         tmp = f"{dst}.staging.{os.getpid()}"
         try:
-            shutil.copy2(src, tmp)
+            compiletools.filesystem_utils.copy_file(src, tmp)
             os.replace(tmp, dst)
         except FileExistsError:
             try:
@@ -901,7 +901,7 @@ class BazelBackend(BuildBackend):
                     ext_made = True
                 dest = os.path.join(ext_dir, os.path.basename(source))
                 if not os.path.exists(dest):
-                    shutil.copy2(source, dest)
+                    compiletools.filesystem_utils.copy_file(source, dest)
 
     def _write_bazel_module_mapper(self, base_dir: str) -> None:
         """Materialise a bazel-specific gcc module mapper file.
@@ -1437,7 +1437,7 @@ class BazelBackend(BuildBackend):
                 bazel_lib = os.path.join(bazel_bin, f"lib{target_name}{ext}")
                 if os.path.exists(bazel_lib):
                     os.makedirs(os.path.dirname(rule.output), exist_ok=True)
-                    compiletools.filesystem_utils.atomic_copy(bazel_lib, rule.output)
+                    compiletools.filesystem_utils.atomic_copy(bazel_lib, rule.output, prefer_reflink=True)
 
     def _bazel_clean(self, *extra: str) -> None:
         """Best-effort ``bazel clean [extra…]``; ignored if bazel is absent."""
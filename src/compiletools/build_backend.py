@@ -26,16 +26,23 @@ import time
 from collections.abc import Mapping
 from types import MappingProxyType
 
+import compiletools.access_journal
 import compiletools.apptools
+import compiletools.auto_pch
 import compiletools.build_apply
+import compiletools.cas_archive
 import compiletools.cas_publish
 import compiletools.diagnostics
 import compiletools.file_analyzer
 import compiletools.filesystem_utils
 import compiletools.git_utils
 import compiletools.global_hash_registry
+import compiletools.header_unit_cache
 import compiletools.namer
+import compiletools.rule_cost
+import compiletools.shard_tests
 import compiletools.test_framework
+import compiletools.unity
 import compiletools.utils
 import compiletools.wrappedos
 
@@ -217,6 +224,11 @@ _WILD_B_DIR_SUFFIX = "/.ct-wild-ld"
 # every build is not free under ninja.
 _FRESHEN_MIN_AGE_SECONDS = 3600
 
+# ``--test-impact`` sidecar under cas_objdir: test source realpath -> the
+# fingerprint (``BuildBackend._test_impact_fingerprint``) of its last pass.
+TEST_IMPACT_FILE = ".ct-test-impact.json"
+_TEST_IMPACT_MTIME_SLACK_SECONDS = 2.0
+
 
 def _extract_wild_b_argv(tokens: list[str]) -> tuple[list[str], list[str]]:
     """Split *tokens* into (everything else, wild-B ``-B<dir>`` tokens).
@@ -322,8 +334,28 @@ class BuildBackend(abc.ABC):
         self._header_unit_artefact: dict[str, str] = {}
         self._gcc_module_mapper_path: str | None = None
         self._gcc_header_unit_resolved: dict[str, list[str]] = {}
+        # Persistent header-unit resolution sidecar; opened on first use
+        # by _resolve_header_unit_paths.
+        self._header_unit_resolutions: compiletools.header_unit_cache.HeaderUnitResolutionCache | None = None
         self._build_imports_std_cached: bool | None = None
         self._compile_used_libcxx = False
+        # --unity: member source -> the batch object that replaces its own
+        # .o on every link / archive line. Filled by _plan_unity_rules.
+        self._unity_object_for: dict[str, str] = {}
+        # --auto-pch: TU -> header injected as its precompiled header, and
+        # the ranked analysis behind it (also filled for --suggest-pch).
+        self._auto_pch_for: dict[str, str] = {}
+        self.pch_suggestions: list[compiletools.auto_pch.PchSuggestion] = []
+        # JUnit XML reports each framework test source writes (one per shard),
+        # read back after the build to learn per-suite durations.
+        self._test_xml_by_source: dict[str, list[str]] = {}
+        # Learned per-suite durations (shard_tests.DURATIONS_FILE), loaded
+        # on first use by _test_durations.
+        self._test_durations_cache: dict[str, dict[str, float]] | None = None
+        # --test-impact: source -> (fingerprint, success markers) for every
+        # test planned to run; recorded as passed after the build.
+        self._test_impact_pending: dict[str, tuple[str, list[str]]] = {}
+        self._test_impact_planned_at = 0.0
 
         # Hard-fail if the user explicitly opted into legacy mtime semantics
         # but this backend can't deliver them. ``--use-mtime`` is a
@@ -399,11 +431,18 @@ class BuildBackend(abc.ABC):
             # Every backend runs its test rules during the build phase; a
             # standalone ``runtests`` request routes through those same native
             # test rules via _execute_build.
-            self._execute_build("runtests")
+            try:
+                self._execute_build("runtests")
+            finally:
+                self._record_test_history()
             return
         if self._graph is not None and self._all_outputs_current(self._graph):
             return
-        self._execute_build(target)
+        try:
+            self._execute_build(target)
+        finally:
+            # Failed tests still wrote their reports; learn from them too.
+            self._record_test_history()
         if self._graph is not None:
             self._record_link_signatures(self._graph)
 
@@ -422,7 +461,9 @@ class BuildBackend(abc.ABC):
         """
         return "all" if target == "build" else target
 
-    def _test_command_for(self, source: str, exe_path: str) -> tuple[list[str], TestFramework | None]:
+    def _test_command_for(
+        self, source: str, exe_path: str, xml_path: str | None = None
+    ) -> tuple[list[str], TestFramework | None]:
         """Return ``(argv, framework)`` for invoking a test executable.
 
         ``argv`` includes TESTPREFIX parts and, when ``--test-xml-dir`` is set
@@ -430,6 +471,7 @@ class BuildBackend(abc.ABC):
         header set, the framework-specific JUnit-XML emit argv appended after
         ``exe_path`` (so prefix tools forward the trailing argv to the child).
         ``framework`` is the detected ``TestFramework`` or ``None``.
+        ``xml_path`` overrides the report path (a shard writes its own).
         """
         cmd: list[str] = []
         testprefix = getattr(self.args, "TESTPREFIX", "")
@@ -450,7 +492,7 @@ class BuildBackend(abc.ABC):
                 )
             return cmd, None
 
-        cmd.extend(framework.xml_argv(self._xml_path_for(exe_path)))
+        cmd.extend(framework.xml_argv(xml_path or self._xml_path_for(exe_path)))
         return cmd, framework
 
     def _touch_result_marker(self, result_path: str) -> None:
@@ -785,6 +827,8 @@ class BuildBackend(abc.ABC):
         them by name (original or mangled) back to source files.
         Backends that produce outputs in a non-standard location (e.g.
         bazel-bin/, cmake-build/) call this after a successful build.
+        Each copy is a reflink where the destination filesystem supports
+        one, else a hardlink (``atomic_copy(prefer_reflink=True)``).
         """
         all_sources = list(self.args.filename or []) + list(self.args.tests or [])
         source_by_name: dict[str, str] = {}
@@ -820,7 +864,9 @@ class BuildBackend(abc.ABC):
                     source_by_name.pop(alias, None)
                 dest_path = self.namer.executable_pathname(compiletools.wrappedos.realpath(source))
                 os.makedirs(os.path.dirname(dest_path), exist_ok=True)
-                compiletools.filesystem_utils.atomic_copy(full, dest_path)
+                # A clone, where the filesystem can, keeps dest_path off the
+                # inode the native tool may rewrite in place on its next link.
+                compiletools.filesystem_utils.atomic_copy(full, dest_path, prefer_reflink=True)
 
     def build_graph(self) -> BuildGraph:
         """Populate a BuildGraph from hunter/namer data.
@@ -856,6 +902,8 @@ class BuildBackend(abc.ABC):
 
         self._plan_directories(graph)
 
+        self._plan_auto_pch(all_compile_sources)
+
         self._plan_pch_rules(graph, all_compile_sources)
 
         compiler_kind = self._init_module_state()
@@ -924,9 +972,10 @@ class BuildBackend(abc.ABC):
             self._dynamic_sources = set()
 
     def _plan_pch_rules(self, graph: BuildGraph, all_compile_sources: set[str]) -> None:
-        """Phases C+D: discover PCH headers from magic flags, emit one compile
-        rule per header (CAS-keyed .gch when cas-pchdir is active), and the
-        per-hash pchdir mkdir rules.
+        """Phases C+D: discover PCH headers from magic flags (plus any
+        ``--auto-pch`` assignments), emit one compile rule per header
+        (CAS-keyed .gch when cas-pchdir is active), and the per-hash pchdir
+        mkdir rules.
 
         Sets ``self._pch_gch_paths`` and ``self._pch_include_dirs`` (read by
         the compile phase). Mutates *graph* in place.
@@ -936,7 +985,7 @@ class BuildBackend(abc.ABC):
         # content-addressable cache: <pchdir>/<command_hash>/<header>.gch
         import stringzilla as sz
 
-        pchdir = getattr(self.args, "cas_pchdir", None)
+        pchdir = self._build_state.names.cas_pchdir
         self._pch_gch_paths: dict[str, str] = {}  # header_abs -> gch_output
         self._pch_include_dirs: dict[str, str] = {}  # header_abs -> -I dir
 
@@ -948,6 +997,7 @@ class BuildBackend(abc.ABC):
             magicflags = self.hunter.magicflags(filename)
             for pch_header in magicflags.get(sz.Str("PCH"), []):
                 pch_headers.add(str(pch_header))
+        pch_headers.update(self._auto_pch_for.values())
 
         pch_mkdir_dirs: set[str] = set()
         for pch_header in sorted(pch_headers):
@@ -1061,6 +1111,94 @@ class BuildBackend(abc.ABC):
                 )
             )
 
+    def _plan_auto_pch(self, all_compile_sources: set[str]) -> None:
+        """``--auto-pch`` / ``--suggest-pch``: rank headers worth
+        precompiling from the TUs' leading includes and header-closure sizes
+        (see ``auto_pch``), and under ``--auto-pch`` assign each winner to its
+        consumers so ``_plan_pch_rules`` emits the usual cas-pchdir-keyed
+        rule for it.
+
+        Besides the ``auto_pch`` safety rule, a TU is only considered when a
+        PCH built from the header would actually be accepted by its compile:
+        C++ (the precompile is ``-x c++-header``), no ``-fPIC``, no explicit
+        ``//#PCH=``, and per-file CPPFLAGS/CXXFLAGS identical to the
+        header's own. ``--auto-pch`` also needs a cas-pchdir; without one a
+        ``.gch`` would be written next to the header in the source tree.
+        """
+        auto = getattr(self.args, "auto_pch", False) is True
+        if not auto and getattr(self.args, "suggest_pch", False) is not True:
+            return
+        import stringzilla as sz
+
+        def flag_signature(path: str) -> tuple[str, ...]:
+            flags = self.hunter.magicflags(path)
+            return tuple(str(f) for key in ("CPPFLAGS", "CXXFLAGS") for f in flags.get(sz.Str(key), []))
+
+        consumers: dict[str, list[str]] = {}
+        closure_bytes: dict[str, int] = {}
+        rejected: set[str] = set()
+        for filename in sorted(all_compile_sources):
+            if compiletools.utils.is_c_source(filename) or filename in self._dynamic_sources:
+                continue
+            if self.hunter.magicflags(filename).get(sz.Str("PCH")):
+                continue
+            header = self._leading_include_path(filename)
+            if header is None or header in rejected:
+                continue
+            if header not in closure_bytes:
+                size = self._pch_closure_bytes(header)
+                if size is None:
+                    rejected.add(header)
+                    continue
+                closure_bytes[header] = size
+            if flag_signature(filename) != flag_signature(header):
+                continue
+            consumers.setdefault(header, []).append(filename)
+
+        self.pch_suggestions = compiletools.auto_pch.rank(consumers, closure_bytes)
+        if not auto:
+            return
+        if not self._build_state.names.cas_pchdir:
+            if getattr(self.args, "verbose", 0) >= 1:
+                print("--auto-pch: no --cas-pchdir configured; not precompiling any header", file=sys.stderr)
+            return
+        for suggestion in self.pch_suggestions:
+            for tu in suggestion.consumers:
+                self._auto_pch_for[tu] = suggestion.header
+
+    def _leading_include_path(self, filename: str) -> str | None:
+        """Resolved path of *filename*'s leading ``#include`` (see
+        ``auto_pch.leading_include``), matched against the headers the hunter
+        resolved for it. ``None`` when there is no such include, it resolved
+        outside the dependency set (system headers), or the match is
+        ambiguous."""
+        leading = compiletools.auto_pch.leading_include(self.hunter._file_analysis_result(filename))
+        if leading is None:
+            return None
+        spelling, is_system = leading
+        deps = [str(d) for d in self.hunter.header_dependencies(filename)]
+        if not is_system:
+            local = compiletools.wrappedos.realpath(os.path.join(os.path.dirname(filename), spelling))
+            if local in deps:
+                return local
+        matches = [d for d in deps if d.endswith(os.sep + spelling)]
+        return matches[0] if len(matches) == 1 else None
+
+    def _pch_closure_bytes(self, header: str) -> int | None:
+        """Bytes a TU parses for *header* and everything it includes, or
+        ``None`` when *header* is not include-guarded (a second inclusion
+        would not be a no-op) or part of its closure cannot be sized."""
+        result = self.hunter._file_analysis_result(header)
+        if result is None or result.include_guard is None:
+            return None
+        try:
+            return sum(
+                compiletools.wrappedos.getsize(path)
+                for path in [header, *(str(d) for d in self.hunter.header_dependencies(header))]
+            )
+        except OSError:
+            return None
+
     def _init_module_state(self) -> str:
         """Phase E: initialise C++20-module backend state and return the
         compiler kind ("gcc"/"clang"/other).
@@ -1342,14 +1480,10 @@ class BuildBackend(abc.ABC):
                         _extract_system_include_path_flags(self._build_state.flags.cxx)
                         + self._header_unit_extra_system_includes
                     )
-                    abs_paths = _resolve_system_header_abs_paths(
-                        self.args.CXX,
-                        token,
-                        std_flag=str(std_flag),
-                        include_flags=include_flags,
-                    )
+                    abs_paths = self._resolve_header_unit_paths(token, str(std_flag), include_flags)
                     if abs_paths:
                         self._gcc_header_unit_resolved[token] = abs_paths
+            self._save_header_unit_resolutions()
             for d in sorted(hu_mkdirs):
                 graph.add_rule(
                     BuildRule(
@@ -1366,15 +1500,55 @@ class BuildBackend(abc.ABC):
                 # cache path for gcc+cache, the stamp for gcc no-cache,
                 # the .pcm for clang.
 
+    def _resolve_header_unit_paths(self, token: str, std_flag: str, include_flags: tuple[str, ...]) -> list[str]:
+        """``_resolve_system_header_abs_paths`` behind the persistent
+        ``.ct-header-unit-resolution.json`` sidecar in cas-objdir, so a
+        warm build forks no compiler probes for header units it has
+        already resolved. See ``compiletools/header_unit_cache.py``."""
+        store = self._header_unit_resolutions
+        if store is None:
+            path = os.path.join(self._build_state.names.cas_objdir, compiletools.header_unit_cache.FILENAME)
+            store = self._header_unit_resolutions = compiletools.header_unit_cache.HeaderUnitResolutionCache(path)
+        entry_key = compiletools.header_unit_cache.key(
+            _compiler_identity(self.args.CXX, anchor_root=self._anchor_root), std_flag, include_flags, token
+        )
+        abs_paths = store.lookup(entry_key)
+        if abs_paths is None:
+            abs_paths = _resolve_system_header_abs_paths(
+                self.args.CXX, token, std_flag=std_flag, include_flags=include_flags
+            )
+            store.record(entry_key, abs_paths)
+        return abs_paths
+
+    def _save_header_unit_resolutions(self) -> None:
+        """Persist this build's header-unit resolutions and surface the
+        sidecar's hit/miss counts in the timing report."""
+        store = self._header_unit_resolutions
+        if store is None:
+            return
+        store.save()
+        timer = self._timer
+        if timer is not None:
+            timer.set_root_metadata(
+                {"header_unit_resolution.hits": store.hits, "header_unit_resolution.misses": store.misses}
+            )
+
     def _plan_compile_rules(self, graph: BuildGraph, all_compile_sources: set[str]) -> None:
         """Phase I: emit per-source compile rules (clang module interface
         two-rule split, or the plain compile rule) plus the per-used-bucket
         objdir mkdir rules. Mutates *graph* in place.
 
         Reads ``self._module_pcm_dir`` (set by the module-state init phase).
+        Under ``--unity`` the batchable sources are planned first by
+        ``_plan_unity_rules`` and skipped here.
         """
         compile_bucket_dirs: set[str] = set()
+        unity_members: set[str] = set()
+        if getattr(self.args, "unity", False) is True and not self._self_manages_exe_placement():
+            unity_members = self._plan_unity_rules(graph, all_compile_sources, compile_bucket_dirs)
         for filename in all_compile_sources:
+            if filename in unity_members:
+                continue
             file_result = self.hunter._file_analysis_result(filename)
             module_exports = file_result.module_exports if file_result is not None else ()
 
@@ -1429,6 +1603,136 @@ class BuildBackend(abc.ABC):
                 )
             )
 
+    def _plan_unity_rules(
+        self, graph: BuildGraph, all_compile_sources: set[str], compile_bucket_dirs: set[str]
+    ) -> set[str]:
+        """``--unity``: batch compatible TUs into generated unity sources and
+        emit one compile rule per batch. Returns the sources now covered by a
+        batch; everything else keeps its per-file rule.
+
+        Two TUs may share a batch only when ``_unity_candidate_key`` gives
+        them the same key. Within a key, sources are taken in path order and
+        cut into batches whose estimated cost (learned ``rule_cost`` history,
+        else the cold-start heuristic) stays within ``--unity-batch-cost``
+        seconds, so one batch never becomes the build's long pole. A batch
+        of one is left to the per-file path.
+
+        Self-placing backends (cmake, bazel) are not routed here: they map
+        compile rules back onto their own per-source targets.
+        """
+        consumers = self._unity_consumer_sets()
+        cost_path = os.path.join(self._build_state.names.cas_objdir, compiletools.rule_cost.COST_FILE)
+        history = compiletools.rule_cost.load_cost_history(cost_path)
+        cap = float(getattr(self.args, "unity_batch_cost", 30.0))
+
+        groups: dict[tuple, list[BuildRule]] = {}
+        for filename in sorted(all_compile_sources):
+            file_result = self.hunter._file_analysis_result(filename)
+            if not self._unity_eligible(filename, file_result):
+                continue
+            rule = self._create_compile_rule(filename)
+            key = self._unity_candidate_key(rule, consumers.get(filename, frozenset()))
+            groups.setdefault(key, []).append(rule)
+
+        members: set[str] = set()
+        for (_consumers, flags), rules in groups.items():
+            by_source = {rule.inputs[0]: rule for rule in rules}
+            costed = [
+                (rule.inputs[0], compiletools.unity.quantize_cost(compiletools.rule_cost.estimate_cost(rule, history)))
+                for rule in rules
+            ]
+            for batch in compiletools.unity.batch_by_cost(costed, cap):
+                if len(batch) < 2:
+                    continue
+                unity_rule = self._create_unity_compile_rule(batch, [by_source[s] for s in batch], list(flags))
+                graph.add_rule(unity_rule)
+                compile_bucket_dirs.add(unity_rule.order_only_deps[0])
+                for source in batch:
+                    self._unity_object_for[source] = unity_rule.output
+                members.update(batch)
+        return members
+
+    def _unity_consumer_sets(self) -> dict[str, frozenset[str]]:
+        """source -> the targets (executables, tests, the static and dynamic
+        library) that link it. Only sources with the same consumer set can
+        share an object: otherwise a batch would drag one target's TUs (and
+        its ``main``) into another target's link."""
+        consumers: dict[str, set[str]] = {}
+        for target in [*(self.args.filename or []), *(self.args.tests or [])]:
+            for source in self.hunter.required_source_files(target):
+                consumers.setdefault(source, set()).add(target)
+        for label, library_sources in (("--static", self.args.static), ("--dynamic", self.args.dynamic)):
+            for library_source in library_sources or []:
+                for source in self.hunter.required_source_files(library_source):
+                    consumers.setdefault(source, set()).add(label)
+        return {source: frozenset(targets) for source, targets in consumers.items()}
+
+    @staticmethod
+    def _unity_eligible(filename: str, file_result) -> bool:
+        """Whether *filename* may be concatenated with other TUs at all.
+
+        Excluded: C++20 module participants (a module unit must be its own
+        TU), ``.cppm`` sources, TUs that ``#define`` or ``#undef`` a
+        macro themselves -- in a unity source that macro would leak into
+        every later member, changing their meaning without changing their
+        macro-state hash -- and TUs with file-local names at namespace
+        scope (``static``, anonymous namespaces, constants, aliases,
+        using-declarations, type definitions; see
+        ``unity.internal_linkage``), which would clash with a neighbour's
+        same-named helper and fail the whole batch.
+        """
+        if file_result is None or filename.endswith(".cppm"):
+            return False
+        if (
+            file_result.module_exports
+            or file_result.module_implements
+            or file_result.module_imports
+            or file_result.module_header_imports
+        ):
+            return False
+        if any(d.directive_type in ("define", "undef") for d in file_result.directives):
+            return False
+        try:
+            with open(filename, "rb") as f:
+                text = f.read()
+        except OSError:
+            return True  # nothing to scan; the per-file compile would fail alike
+        return compiletools.unity.internal_linkage(text) is None
+
+    @staticmethod
+    def _unity_candidate_key(rule: BuildRule, consumers: frozenset[str]) -> tuple:
+        """Batch compatibility key: the consumer set plus the full compile
+        command minus its ``-c <source> -o <object>`` tail. The command
+        carries the compiler, the build-context flags that feed
+        ``Hunter.macro_state_hash`` and the per-file magic flags, so two
+        TUs share a key only if one invocation can compile both as-is."""
+        return consumers, tuple(rule.command[:-4])
+
+    def _create_unity_compile_rule(
+        self, batch: list[str], member_rules: list[BuildRule], flags: list[str]
+    ) -> BuildRule:
+        """One compile rule for *batch*: writes the content-addressed unity
+        source now and compiles it to a CAS object keyed on the members'
+        own object names (see ``unity.unity_object_pathname``)."""
+        cas_objdir = self._build_state.names.cas_objdir
+        text = compiletools.unity.unity_source_text(batch)
+        ext = ".c" if compiletools.utils.is_c_source(batch[0]) else ".cpp"
+        unity_src = compiletools.unity.unity_source_pathname(cas_objdir, text, ext)
+        compiletools.unity.write_unity_source(unity_src, text)
+        obj_name = compiletools.unity.unity_object_pathname(
+            cas_objdir,
+            [rule.output for rule in member_rules],
+            compiletools.apptools.canonicalize_for_cache_key(flags, self._anchor_root),
+        )
+        inputs = compiletools.utils.ordered_unique([unity_src, *(inp for rule in member_rules for inp in rule.inputs)])
+        return BuildRule(
+            output=obj_name,
+            inputs=inputs,
+            command=[*flags, "-c", unity_src, "-o", obj_name],
+            rule_type="compile",
+            order_only_deps=[os.path.dirname(obj_name)],
+        )
+
     def _check_executable_collisions(self) -> None:
         """Raise when two distinct targets map to one output path.
 
@@ -1626,6 +1930,11 @@ class BuildBackend(abc.ABC):
                 )
             test_result_paths = []
             test_rules: list[tuple[str, BuildRule]] = []
+            impact = None
+            if getattr(self.args, "test_impact", False):
+                self._test_impact_planned_at = time.time()
+                impact = self._load_test_impact()
+            impact_skipped: list[str] = []
             for source, exe_path in zip(self.args.tests, test_exe_paths):
                 # In CAS-only mode, place .result next to the CAS exe entry
                 # so success markers are content-addressed: two builds that
@@ -1651,6 +1960,12 @@ class BuildBackend(abc.ABC):
                     # but its mtime must not retrigger the test.
                     rule_order_only = rule_order_only + [xml_bucket_dir]
                 test_cmd, framework = self._test_command_for(source, exe_path)
+                fingerprint = None
+                if impact is not None:
+                    fingerprint = self._test_impact_fingerprint(source, exe_path, test_cmd)
+                    if impact.get(compiletools.wrappedos.realpath(source)) == fingerprint:
+                        impact_skipped.append(source)
+                        continue
                 # When a framework is detected and --test-xml-dir is set the
                 # test recipe emits a JUnit XML file as a side effect. Make
                 # the XML path the rule's *output* (rather than the .result
@@ -1660,17 +1975,35 @@ class BuildBackend(abc.ABC):
                 rule_output = result_path
                 if xml_bucket_dir and framework is not None:
                     rule_output = self._xml_path_for(exe_path)
-                test_rule = BuildRule(
-                    output=rule_output,
-                    inputs=rule_inputs,
-                    command=test_cmd,
-                    rule_type="test",
-                    order_only_deps=rule_order_only,
-                    success_marker=result_path,
-                )
-                graph.add_rule(test_rule)
-                test_result_paths.append(rule_output)
-                test_rules.append((source, test_rule))
+                shards = self._test_shards_for(source, framework) if xml_bucket_dir else None
+                if shards:
+                    new_rules = self._create_test_shard_rules(
+                        source, exe_path, rule_inputs, rule_order_only, rule_output, result_path, shards
+                    )
+                else:
+                    new_rules = [
+                        BuildRule(
+                            output=rule_output,
+                            inputs=rule_inputs,
+                            command=test_cmd,
+                            rule_type="test",
+                            order_only_deps=rule_order_only,
+                            success_marker=result_path,
+                        )
+                    ]
+                for test_rule in new_rules:
+                    graph.add_rule(test_rule)
+                    test_result_paths.append(test_rule.output)
+                    test_rules.append((source, test_rule))
+                if framework is not None and xml_bucket_dir:
+                    self._test_xml_by_source[compiletools.wrappedos.realpath(source)] = [r.output for r in new_rules]
+                if fingerprint is not None:
+                    self._test_impact_pending[compiletools.wrappedos.realpath(source)] = (
+                        fingerprint,
+                        [r.success_marker or r.output for r in new_rules],
+                    )
+            if impact is not None:
+                self._report_test_impact(len(test_exe_paths) - len(impact_skipped), impact_skipped)
 
             # --serialise-tests: chain the test rules so only one runs at a
             # time — but still during the build, not after. Each rule (in
@@ -1695,6 +2028,199 @@ class BuildBackend(abc.ABC):
 
         graph.add_rule(BuildRule(output="all", inputs=all_deps, command=None, rule_type="phony"))
 
+    def _test_shards_for(self, source: str, framework: TestFramework | None) -> list[list[str]] | None:
+        """Per-shard extra argv for *source*'s test executable under
+        ``--shard-tests``, or ``None`` to run it as one rule. See
+        ``shard_tests`` for the policy; history comes from earlier builds."""
+        if framework is None or not getattr(self.args, "shard_tests", False):
+            return None
+        if self._self_manages_exe_placement():
+            return None
+        durations = self._test_durations().get(compiletools.wrappedos.realpath(source))
+        if not durations:
+            return None
+        return compiletools.shard_tests.plan(
+            framework.id,
+            [str(h) for h in self.hunter.header_dependencies(source)],
+            durations,
+            max_shards=getattr(self.args, "parallel", 1) or 1,
+            shard_seconds=getattr(self.args, "test_shard_seconds", 10.0),
+        )
+
+    def _create_test_shard_rules(
+        self,
+        source: str,
+        exe_path: str,
+        inputs: list[str],
+        order_only: list[str],
+        xml_path: str,
+        result_path: str,
+        shards: list[list[str]],
+    ) -> list[BuildRule]:
+        """One TEST rule per shard of a framework test executable.
+
+        Each shard writes its own report (``<name>.shard<i>of<n>.xml``) and
+        success marker. The marker name also carries the plan's digest: a
+        shard that passed under an older partition says nothing about the
+        cases it holds now.
+        """
+        count = len(shards)
+        key = compiletools.shard_tests.plan_key(shards)
+        xml_stem = xml_path.removesuffix(".xml")
+        marker_stem = result_path.removesuffix(".result")
+        rules = []
+        for i, extra in enumerate(shards):
+            shard_xml = f"{xml_stem}.shard{i}of{count}.xml"
+            cmd, _ = self._test_command_for(source, exe_path, xml_path=shard_xml)
+            # The shard selectors must reach the test exe, so they go right
+            # after it and before the XML argv, behind any TESTPREFIX.
+            exe_at = cmd.index(exe_path)
+            rules.append(
+                BuildRule(
+                    output=shard_xml,
+                    inputs=list(inputs),
+                    command=[*cmd[: exe_at + 1], *extra, *cmd[exe_at + 1 :]],
+                    rule_type="test",
+                    order_only_deps=list(order_only),
+                    success_marker=f"{marker_stem}.shard{i}of{count}_{key}.result",
+                )
+            )
+        return rules
+
+    def _test_impact_fingerprint(self, source: str, exe_path: str, test_cmd: list[str]) -> str:
+        """Digest of everything a test executable's behaviour depends on,
+        independent of how the build chose to produce it.
+
+        Covers every source the test links (through each one's per-file object
+        name, which already encodes its content, header closure and macro
+        state), the link flags, and the test command line. Unity batching,
+        auto-PCH or a relink that changes none of those therefore leave it
+        unchanged, unlike the exe's own link key.
+        """
+        sources = sorted(self.hunter.required_source_files(source))
+        objects = []
+        for s in sources:
+            dep_hash = self.namer.compute_dep_hash(self.hunter.header_dependencies(s))
+            macro_state_hash = self.hunter.macro_state_hash(s, dep_hash=dep_hash)
+            objects.append(os.path.basename(self.namer.object_pathname(s, macro_state_hash, dep_hash)))
+        payload = {
+            "objects": objects,
+            "ldflags": list(self._merge_ldflags_for_sources(sources)) + list(self._build_state.flags.ld or []),
+            "command": ["<exe>" if token == exe_path else token for token in test_cmd],
+            "variant": getattr(self.args, "variant", "") or "",
+        }
+        return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+    def _test_impact_path(self) -> str:
+        return os.path.join(self._build_state.names.cas_objdir, TEST_IMPACT_FILE)
+
+    def _load_test_impact(self) -> dict[str, str]:
+        """``{test source realpath: fingerprint of its last passing run}``.
+        Missing or corrupt -> empty, so every test runs."""
+        try:
+            with open(self._test_impact_path(), encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(data, dict):
+            return {}
+        return {str(k): v for k, v in data.items() if isinstance(v, str)}
+
+    def _report_test_impact(self, ran: int, skipped: list[str]) -> None:
+        """Surface the --test-impact decision on stdout (verbose) and in the
+        timing report's root metadata."""
+        if skipped and getattr(self.args, "verbose", 0) >= 1:
+            for source in skipped:
+                print(f"{source}: inputs unchanged since its last pass; test skipped (--test-impact)")
+        timer = self._timer
+        if timer is not None:
+            timer.set_root_metadata(
+                {"test_impact.run": ran, "test_impact.skipped": len(skipped), "test_impact.skipped_tests": skipped}
+            )
+
+    def _record_test_impact(self) -> None:
+        """Remember the fingerprint of every test that passed this build.
+
+        A test passed when all its success markers exist. Under CAS-only
+        results a marker is keyed on the exe's content, so presence is
+        proof; under ``--use-mtime`` a stale marker from an older pass
+        survives a failure, so it must also postdate this build's planning.
+        """
+        pending = self._test_impact_pending
+        if not pending:
+            return
+        cas_only = not getattr(self.args, "use_mtime", False) and not self._self_manages_exe_placement()
+        # Slack for filesystems with coarse (1-2 s) mtime granularity.
+        fresh_after = self._test_impact_planned_at - _TEST_IMPACT_MTIME_SLACK_SECONDS
+
+        def marker_passed(marker: str) -> bool:
+            try:
+                # NOT cached: markers are touched during this build.
+                mtime = os.path.getmtime(marker)
+            except OSError:
+                return False
+            return cas_only or mtime >= fresh_after
+
+        impact = self._load_test_impact()
+        changed = False
+        for source, (fingerprint, markers) in pending.items():
+            if impact.get(source) != fingerprint and all(marker_passed(m) for m in markers):
+                impact[source] = fingerprint
+                changed = True
+        if not changed:
+            return
+        try:
+            from compiletools.filesystem_utils import atomic_output_file
+
+            with atomic_output_file(self._test_impact_path(), mode="w", encoding="utf-8", force_mode=0o666) as f:
+                json.dump(impact, f, sort_keys=True)
+        except (OSError, ValueError):
+            pass
+
+    def _record_test_history(self) -> None:
+        """Post-build learning from the tests that ran: durations for
+        ``--shard-tests`` and passing fingerprints for ``--test-impact``."""
+        self._record_test_durations()
+        self._record_test_impact()
+
+    def _test_durations_path(self) -> str:
+        return os.path.join(self._build_state.names.cas_objdir, compiletools.shard_tests.DURATIONS_FILE)
+
+    def _test_durations(self) -> dict[str, dict[str, float]]:
+        """The learned per-suite test durations, loaded once per backend."""
+        cached = self._test_durations_cache
+        if cached is None:
+            cached = compiletools.shard_tests.load_durations(self._test_durations_path())
+            self._test_durations_cache = cached
+        return cached
+
+    def _record_test_durations(self) -> None:
+        """Fold this build's JUnit reports into the learned test durations.
+
+        Only sources whose every report exists are recorded -- a shard that
+        crashed before writing its XML would otherwise make the executable
+        look shorter than it is. Best-effort, like the rule-cost history.
+        """
+        xml_by_source = self._test_xml_by_source
+        if not xml_by_source or not getattr(self.args, "shard_tests", False):
+            return
+        durations = dict(self._test_durations())
+        changed = False
+        for source, xml_paths in xml_by_source.items():
+            # NOT wrappedos: the reports were written during this build.
+            if not all(os.path.isfile(p) for p in xml_paths):
+                continue
+            suites: dict[str, float] = {}
+            for xml_path in xml_paths:
+                for suite, seconds in compiletools.shard_tests.parse_junit_durations(xml_path).items():
+                    suites[suite] = suites.get(suite, 0.0) + seconds
+            if suites and durations.get(source) != suites:
+                durations[source] = suites
+                changed = True
+        if changed:
+            compiletools.shard_tests.save_durations(self._test_durations_path(), durations)
+            self._test_durations_cache = durations
+
     def _result_marker_path(self, exe_path: str) -> str:
         """Return the success-marker path for ``exe_path``.
 
@@ -1998,6 +2524,62 @@ class BuildBackend(abc.ABC):
         inputs.extend(m for m in framework_test_success_markers if m not in inputs)
         return inputs
 
+    @staticmethod
+    def _publish_batches(graph: BuildGraph) -> dict[str, list[BuildRule]]:
+        """Group the ``ct-cas-publish`` rules of *graph* by output directory.
+
+        Maps the output of every publish rule that shares its directory with
+        another to that directory's whole batch, ordered by output. The
+        writers render a batch as one ``ct-cas-publish --batch`` recipe whose
+        outputs are all of the batch's user paths (make's grouped target,
+        ninja's multi-output edge) and skip the members' own rules, so a
+        directory of N artefacts starts one interpreter instead of N.
+        Directories with a single artefact keep the per-artefact recipe.
+
+        Only *leaf* publishes batch: ones whose user path no rule other than
+        a test or phony aggregate consumes. A published library that a link
+        reads must stay on its own rule, or a batch holding both it and the
+        artefact linked against it would depend on itself.
+
+        A stale member republishes its whole batch. Publishing is idempotent
+        and a few syscalls per entry, so that is cheap, but it does mean a
+        publish waits for every link in its directory before running.
+        """
+        consumed = {
+            dep
+            for rule in graph.rules
+            if rule.rule_type not in (RuleType.TEST, RuleType.PHONY)
+            for dep in (*rule.inputs, *rule.order_only_deps)
+        }
+        by_dir: dict[str, list[BuildRule]] = {}
+        for rule in graph.rules_by_type(RuleType.SYMLINK):
+            if rule.output in consumed:
+                continue
+            if rule.command and compiletools.cas_publish.parse_publish_command(rule.command) is not None:
+                by_dir.setdefault(os.path.dirname(rule.output), []).append(rule)
+        batches: dict[str, list[BuildRule]] = {}
+        for rules in by_dir.values():
+            if len(rules) < 2:
+                continue
+            rules.sort(key=lambda r: r.output)
+            for rule in rules:
+                batches[rule.output] = rules
+        return batches
+
+    @staticmethod
+    def _batched_publish_rule(batch: list[BuildRule]) -> BuildRule:
+        """One publish rule standing in for every rule in *batch*. Its
+        ``output`` is the first member's; writers list the rest themselves."""
+        parse = compiletools.cas_publish.parse_publish_command
+        entries = [e for rule in batch for e in parse(rule.command or []) or []]
+        return BuildRule(
+            output=batch[0].output,
+            inputs=[i for rule in batch for i in rule.inputs],
+            command=compiletools.cas_publish.batch_argv(entries),
+            rule_type=RuleType.SYMLINK,
+            order_only_deps=sorted({d for rule in batch for d in rule.order_only_deps}),
+        )
+
     def _cas_demotes_inputs(self, rule: BuildRule) -> bool:
         """True when CAS-only mode demotes this rule's inputs to order-only.
 
@@ -2095,6 +2677,30 @@ class BuildBackend(abc.ABC):
                     return False
         return has_build_rules
 
+    def _journal_cas_uses(self, graph: BuildGraph) -> None:
+        """Record every cas-objdir object and published cas-exedir entry in
+        *graph* as used now, one journal segment per pool.
+
+        Under ``--access-journal`` every pool is journaled (the first segment
+        switches it over). Without the flag only pools that some other build
+        already switched are: trim takes a known entry's recency in a
+        journaled pool from the index alone and never re-reads its mtime, so
+        a use this build only freshens would go unseen there and the
+        entry would age out while still in use.
+
+        Unlike freshening this needs no age floor: nothing's mtime moves, so
+        ninja never sees a dirty publish rule, and ``--use-mtime`` builds can
+        journal too. Best-effort, like every other pool sidecar.
+        """
+        always = getattr(self.args, "access_journal", False) is True
+        objdir = getattr(self.args, "cas_objdir", "")
+        if objdir and (always or compiletools.access_journal.is_journaled(objdir)):
+            objects = [rule.output for rule in graph.rules_by_type(RuleType.COMPILE)]
+            compiletools.access_journal.record_uses(objdir, "obj", objects)
+        exedir = getattr(self.args, "cas_exedir", "")
+        if exedir and (always or compiletools.access_journal.is_journaled(exedir)):
+            compiletools.access_journal.record_uses(exedir, "exe", self._published_cas_entries(graph))
+
     @staticmethod
     def _published_cas_entries(graph: BuildGraph) -> list[str]:
         """Return the CAS entry path behind every publish rule in *graph*.
@@ -2150,19 +2756,23 @@ class BuildBackend(abc.ABC):
         use within an hour of current, far inside any ``--max-age`` a sweep
         expresses in days. Make is unaffected either way: it compares the
         published path against the entry live, and they share an inode.
+
+        Under ``--access-journal`` no entry is touched at all: the build's
+        objects and published entries are recorded in the pools' access
+        journals instead (``_journal_cas_uses``). Builds without the flag
+        still journal into any pool that is already journaled, on top of the
+        usual freshening.
         """
+        self._journal_cas_uses(graph)
+        if getattr(self.args, "access_journal", False) is True:
+            return
         if getattr(self.args, "use_mtime", False):
             return
-        cutoff = time.time() - _FRESHEN_MIN_AGE_SECONDS
-        for entry in self._published_cas_entries(graph):
-            try:
-                # NOT cached: this pass and any peer publish both move the
-                # mtime being read, and rule inputs can be workspace-relative.
-                if os.path.getmtime(entry) > cutoff:
-                    continue
-            except OSError:
-                continue
-            compiletools.cas_publish.freshen_cas_entry(entry)
+        # Stat and utime are metadata round-trips on a shared pool, so the
+        # entries are checked concurrently rather than one after another.
+        compiletools.cas_publish.freshen_cas_entries(
+            self._published_cas_entries(graph), older_than=time.time() - _FRESHEN_MIN_AGE_SECONDS
+        )
 
     def _record_link_signatures(self, graph: BuildGraph) -> None:
         """Persist a content-addressable signature for every link/library
@@ -3125,8 +3735,11 @@ class BuildBackend(abc.ABC):
         # Add PCH .gch dependency if this source uses a precompiled header.
         # Wire the cached .gch into the consumer compile via `-include`.
         pch_include_flags: list[str] = []
-        for pch_header in magicflags.get(sz.Str("PCH"), []):
-            pch_header_str = str(pch_header)
+        pch_header_strs = [str(pch_header) for pch_header in magicflags.get(sz.Str("PCH"), [])]
+        auto_pch_header = self._auto_pch_for.get(filename)
+        if auto_pch_header is not None:
+            pch_header_strs.append(auto_pch_header)
+        for pch_header_str in pch_header_strs:
             gch_path = self._pch_gch_paths.get(pch_header_str, _gch_path(pch_header_str))
             if gch_path not in prerequisites:
                 prerequisites.append(gch_path)
@@ -3295,7 +3908,12 @@ class BuildBackend(abc.ABC):
         without it the cmdline ``-D`` scope filter is skipped and the
         hash falls back to including every cmdline ``-D`` macro (the
         pre-fix pollution behaviour).
+
+        Under ``--unity`` a batched source maps to its batch's object.
         """
+        unity_obj = self._unity_object_for.get(source)
+        if unity_obj is not None:
+            return unity_obj
         dep_hash = self.namer.compute_dep_hash(self.hunter.header_dependencies(source))
         macro_state_hash = self.hunter.macro_state_hash(source, dep_hash=dep_hash)
         return self.namer.object_pathname(source, macro_state_hash, dep_hash)
@@ -3644,7 +4262,9 @@ class BuildBackend(abc.ABC):
               ``<cas-exedir>/<shard>/lib<name>_<libkey>.a``. ``libkey``
               hashes the canonicalized object set + ar argv, so two
               ``ar`` invocations with identical content-relevant
-              inputs share the cache entry across workspaces.
+              inputs share the cache entry across workspaces. Under
+              ``--incremental-archive`` the recipe is ``ct-cas-archive``
+              instead, which updates a copy of the published archive.
           [1] A ``symlink`` rule publishing the user-facing
               ``bin/<variant>/lib<name>.a`` as a hard link (with
               symlink fallback) to the cas-static-library entry.
@@ -3689,7 +4309,13 @@ class BuildBackend(abc.ABC):
         cas_lib_path = self.namer.cas_staticlibrary_pathname(sourcefilename, lib_key_hash)
         cas_lib_bucket = os.path.dirname(cas_lib_path)
 
-        lib_cmd = ar_argv_prefix + [cas_lib_path] + list(object_names)
+        if getattr(self.args, "incremental_archive", False):
+            # Same key, same output: only how the archive is produced
+            # changes. The published lib_path still links the previous
+            # entry when this rule runs (its publish depends on us).
+            lib_cmd = compiletools.cas_archive.archive_argv(ar_binary, cas_lib_path, list(object_names), lib_path)
+        else:
+            lib_cmd = ar_argv_prefix + [cas_lib_path] + list(object_names)
         lib_rule = BuildRule(
             output=cas_lib_path,
             inputs=list(object_names),
@@ -22,6 +22,7 @@ if TYPE_CHECKING:
     from compiletools.build_inputs import PkgConfigResult
     from compiletools.build_timer import BuildTimer
     from compiletools.file_analyzer import FileAnalysisResult
+    from compiletools.include_cache import IncludeResolutionCache
     from compiletools.preprocessing_cache import FileEffects, MacroCacheKey, ProcessingResult
 
 # Type alias for headerdeps cache values: (include_list, FileEffects).
@@ -167,6 +168,13 @@ class BuildContext:
         # -- headerdeps module-level caches --
         self.include_list_cache: dict[tuple[str, MacroCacheKey], IncludeCacheValue] = {}
         self.invariant_include_cache: dict[str, IncludeCacheValue] = {}
+        # Persistent #include resolution sidecars, keyed by sidecar path so
+        # every DirectHeaderDeps instance with the same search list shares
+        # one (see headerdeps.save_include_caches).
+        self.include_resolution_caches: dict[str, IncludeResolutionCache] = {}
+        # CppHeaderDeps results: (file, content hash, cpp command) ->
+        # (deps, dep content hashes); hits are revalidated against the hashes.
+        self.cpp_deps_cache: dict[tuple[str, str, str], tuple[tuple[str, ...], tuple[str, ...]]] = {}
 
         # -- file_analyzer state --
         self.analyzer_args: argparse.Namespace | None = None
@@ -191,6 +199,38 @@ class BuildContext:
         # str means we saved that prior value. None means no override active.
         self._original_pkg_config_path: str | bool | None = None
 
+    def fork_variant(self) -> BuildContext:
+        """A fresh context for another variant of the same build session
+        (``ct-cake --variants``) that shares this one's variant-independent
+        layer.
+
+        Shared by reference: the content-hash registry, the macro-invariant
+        preprocessing and include-list tiers (keyed by content hash alone),
+        the ``#include`` resolution sidecars and ``cpp -MM`` results (keyed
+        by their search list / command), and the pkg-config memo (keyed by
+        spec and search path). Everything keyed by macro state, the
+        diagnostic verdict stores, the timer and the PKG_CONFIG_PATH restore
+        sentinel start empty, so the fork behaves exactly like a context of
+        its own for anything a variant's flags can change.
+
+        ``analyze_file`` results are shared too, but also depend on the
+        analyzer args (read limit and target markers): a caller whose fork
+        parses to different ones gives it a fresh ``analyze_file_cache``.
+        """
+        fork = BuildContext()
+        fork.file_hashes = self.file_hashes
+        fork.reverse_hashes = self.reverse_hashes
+        fork.hash_ops = self.hash_ops
+        fork.invariant_preprocessing_cache = self.invariant_preprocessing_cache
+        fork.invariant_include_cache = self.invariant_include_cache
+        fork.include_resolution_caches = self.include_resolution_caches
+        fork.cpp_deps_cache = self.cpp_deps_cache
+        fork.pkg_config_query_cache = self.pkg_config_query_cache
+        fork.repo_has_symlinks = self.repo_has_symlinks
+        fork.warned_low_ulimit = self.warned_low_ulimit
+        fork.analyze_file_cache = self.analyze_file_cache
+        return fork
+
     @contextlib.contextmanager
     def pkg_config_path_restored(self) -> Iterator[None]:
         """Scope within which any PKG_CONFIG_PATH mutation recorded on this
@@ -0,0 +1,364 @@
+"""Append-only local build analytics store (``build-history.sqlite``).
+
+``timing.json`` answers "where did *this* build spend its time?"; it lives
+under a per-invocation diagnostics directory and says nothing about the
+builds before it. ``ct-cake --build-history`` appends one row per build
+and one row per recorded rule to a SQLite database so that
+``ct-timing-report --trend`` can answer "what got slower?" across
+invocations without keeping every timing file around.
+
+What is recorded
+----------------
+
+* ``builds`` -- invocation id, wall-clock time, variant, backend, total
+  build time, rule count, the ``ct.build.*`` cache aggregates from
+  ``otel.aggregates.derive_build_aggregates`` and the ``ct.ccache.*``
+  statslog summary (as JSON, absent when ``--ccache-statslog`` is off).
+  Both are read back from the timer's root metadata, so the store sees
+  exactly what ``timing.json`` and the OTel root span see.
+* ``rules`` -- rule type, a content-hash-free key, target, elapsed time
+  and cache layer (``ct.rule.cache_layer``, falling back to
+  ``otel.aggregates.derive_rule_cache_layer``).
+
+The key is the rule's source when it has one and otherwise its target
+with the CAS object hashes stripped (``rule_cost._strip_cas_obj_hashes``),
+so a link rule keeps its identity when a TU's content changes.
+
+Regressions compare like with like: a rule is only measured against
+earlier samples with the same key, rule type *and* cache layer, so a
+cold build after a string of CAS hits is not reported as every rule
+regressing at once.
+
+Rows are never updated or deleted. Each build is one transaction, and
+SQLite's own locking serialises concurrent ct-cake invocations sharing a
+diagnostics dir; ``_CONNECT_TIMEOUT_S`` bounds how long a writer waits.
+Pruning is the operator's call (``DELETE FROM builds WHERE ...`` plus
+the matching ``rules`` rows).
+"""
+
+from __future__ import annotations
+
+import datetime
+import json
+import os
+import sqlite3
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from compiletools.build_timer import BuildTimer, TimingEvent
+
+HISTORY_FILENAME = "build-history.sqlite"
+
+_SCHEMA_VERSION = 1
+
+# Generous: a peer ct-cake holds the write lock for one executemany.
+_CONNECT_TIMEOUT_S = 30.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS builds (
+    id INTEGER PRIMARY KEY,
+    invocation_id TEXT NOT NULL,
+    recorded_at TEXT NOT NULL,
+    variant TEXT NOT NULL,
+    backend TEXT NOT NULL,
+    total_s REAL NOT NULL,
+    rule_count INTEGER NOT NULL,
+    cas_avoided INTEGER,
+    ccache_avoided INTEGER,
+    recompiled INTEGER,
+    compile_avoided_rate REAL,
+    ccache_json TEXT
+);
+CREATE TABLE IF NOT EXISTS rules (
+    build_id INTEGER NOT NULL REFERENCES builds(id),
+    rule_type TEXT NOT NULL,
+    key TEXT NOT NULL,
+    target TEXT NOT NULL,
+    elapsed_s REAL NOT NULL,
+    cache_layer TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS rules_build ON rules(build_id);
+CREATE INDEX IF NOT EXISTS rules_key ON rules(key, rule_type, cache_layer);
+"""
+
+
+def default_history_path(args) -> str:
+    """Return ``<diagnostics root>/build-history.sqlite`` for *args*.
+
+    The root is ``args.diagnostics_dir`` when set and
+    ``<args.bindir>/diagnostics`` otherwise -- the parent of the
+    per-invocation directories, so one store spans every invocation.
+    Raises RuntimeError when neither is set.
+    """
+    parent = getattr(args, "diagnostics_dir", None)
+    if not parent:
+        bindir = getattr(args, "bindir", None)
+        if not bindir:
+            raise RuntimeError("build history requires either args.diagnostics_dir or args.bindir to be set")
+        parent = os.path.join(bindir, "diagnostics")
+    return os.path.join(parent, HISTORY_FILENAME)
+
+
+def resolve_history_path(value: str | None, args) -> str | None:
+    """Resolve a ``--build-history`` value (``PATH`` or ``auto``) to a path.
+
+    Returns None when *value* is falsy (the flag was not given).
+    """
+    if not value:
+        return None
+    if value == "auto":
+        return default_history_path(args)
+    return os.path.abspath(os.path.expanduser(value))
+
+
+def connect(path: str) -> sqlite3.Connection:
+    """Open (creating if needed) the history database at *path*.
+
+    Raises ValueError when the file was written by a newer schema.
+    """
+    parent = os.path.dirname(path)
+    if parent:
+        os.makedirs(parent, exist_ok=True)
+    conn = sqlite3.connect(path, timeout=_CONNECT_TIMEOUT_S)
+    try:
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        if version == 0:
+            # IF NOT EXISTS throughout, so two first-time writers racing
+            # here both succeed.
+            conn.executescript(f"{_SCHEMA}PRAGMA user_version = {_SCHEMA_VERSION};")
+        elif version != _SCHEMA_VERSION:
+            raise ValueError(f"{path}: unsupported build history version {version} (expected {_SCHEMA_VERSION})")
+    except BaseException:
+        conn.close()
+        raise
+    return conn
+
+
+# ------------------------------------------------------------------ writing
+
+
+def rule_key(event: TimingEvent) -> str:
+    """Stable cross-build identity for one rule event (see module docstring)."""
+    from compiletools.rule_cost import _strip_cas_obj_hashes
+
+    if event.source:
+        return event.source
+    if event.target:
+        return _strip_cas_obj_hashes(event.target)
+    return event.name
+
+
+def _rule_cache_layer(event: TimingEvent) -> str:
+    layer = event.metadata.get("ct.rule.cache_layer")
+    if layer:
+        return str(layer)
+    from compiletools.otel.aggregates import derive_rule_cache_layer
+
+    return derive_rule_cache_layer(event)
+
+
+def _optional_int(value: Any) -> int | None:
+    return None if value is None else int(value)
+
+
+def _optional_float(value: Any) -> float | None:
+    return None if value is None else float(value)
+
+
+def record_build(path: str, timer: BuildTimer, *, invocation_id: str = "") -> int:
+    """Append *timer*'s build and rules to the store at *path*.
+
+    Call after the post-build aggregates have been written into the
+    timer's root metadata. Returns the new build's row id.
+    """
+    timer.finish()
+    root = timer._root.metadata
+    ccache = {k: v for k, v in root.items() if k.startswith("ct.ccache.")}
+    rules = [
+        (rule.category, rule_key(rule), rule.target, rule.elapsed_s, _rule_cache_layer(rule))
+        for rule in timer._collect_rules()
+    ]
+    conn = connect(path)
+    try:
+        with conn:
+            cursor = conn.execute(
+                "INSERT INTO builds (invocation_id, recorded_at, variant, backend, total_s, rule_count,"
+                " cas_avoided, ccache_avoided, recompiled, compile_avoided_rate, ccache_json)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    invocation_id,
+                    datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+                    timer.variant,
+                    timer.backend,
+                    timer.total_elapsed_s,
+                    len(rules),
+                    _optional_int(root.get("ct.build.cas_avoided_count")),
+                    _optional_int(root.get("ct.build.ccache_avoided_count")),
+                    _optional_int(root.get("ct.build.recompiled_count")),
+                    _optional_float(root.get("ct.build.compile_avoided_rate")),
+                    json.dumps(ccache, sort_keys=True) if ccache else None,
+                ),
+            )
+            build_id = cursor.lastrowid
+            assert build_id is not None
+            conn.executemany(
+                "INSERT INTO rules (build_id, rule_type, key, target, elapsed_s, cache_layer)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                [(build_id, *row) for row in rules],
+            )
+    finally:
+        conn.close()
+    return build_id
+
+
+# ------------------------------------------------------------------ querying
+
+
+@dataclass
+class BuildRecord:
+    """One row of ``builds``."""
+
+    id: int
+    invocation_id: str
+    recorded_at: str
+    variant: str
+    backend: str
+    total_s: float
+    rule_count: int
+    cas_avoided: int | None = None
+    ccache_avoided: int | None = None
+    recompiled: int | None = None
+    compile_avoided_rate: float | None = None
+    ccache_hit_rate: float | None = None
+
+
+@dataclass
+class RuleTypeTrend:
+    """Summed rule time for one rule type: newest build vs the mean of the rest."""
+
+    rule_type: str
+    count: int
+    latest_s: float
+    baseline_s: float | None
+
+    @property
+    def delta_s(self) -> float:
+        return self.latest_s - (self.baseline_s or 0.0)
+
+
+@dataclass
+class RuleRegression:
+    """One rule of the newest build vs its earlier like-for-like samples."""
+
+    key: str
+    target: str
+    rule_type: str
+    cache_layer: str
+    latest_s: float
+    baseline_s: float
+    samples: int
+
+    @property
+    def delta_s(self) -> float:
+        return self.latest_s - self.baseline_s
+
+
+def recent_builds(
+    conn: sqlite3.Connection,
+    *,
+    limit: int = 20,
+    variant: str | None = None,
+    backend: str | None = None,
+) -> list[BuildRecord]:
+    """Return up to *limit* most recent builds, oldest first.
+
+    With *variant* / *backend* given, only builds that match them.
+    """
+    where = []
+    params: list[Any] = []
+    if variant is not None:
+        where.append("variant = ?")
+        params.append(variant)
+    if backend is not None:
+        where.append("backend = ?")
+        params.append(backend)
+    clause = f" WHERE {' AND '.join(where)}" if where else ""
+    rows = conn.execute(
+        "SELECT id, invocation_id, recorded_at, variant, backend, total_s, rule_count, cas_avoided,"  # noqa: S608 -- only fixed clauses / ? placeholders
+        f" ccache_avoided, recompiled, compile_avoided_rate, ccache_json FROM builds{clause}"
+        " ORDER BY id DESC LIMIT ?",
+        (*params, limit),
+    ).fetchall()
+    builds = []
+    for *fields, ccache_json in reversed(rows):
+        ccache = json.loads(ccache_json) if ccache_json else {}
+        builds.append(BuildRecord(*fields, ccache_hit_rate=_optional_float(ccache.get("ct.ccache.hit_rate"))))
+    return builds
+
+
+def _placeholders(ids: list[int]) -> str:
+    return ", ".join("?" * len(ids))
+
+
+def rule_type_trends(conn: sqlite3.Connection, builds: list[BuildRecord]) -> list[RuleTypeTrend]:
+    """Per rule type, the newest build's summed time vs the earlier builds' mean.
+
+    *builds* is a ``recent_builds`` window (oldest first). Rule types
+    absent from the newest build are omitted; ``baseline_s`` is None for
+    a type no earlier build in the window recorded.
+    """
+    if not builds:
+        return []
+    ids = [b.id for b in builds]
+    latest_id = ids[-1]
+    totals: dict[str, dict[int, tuple[int, float]]] = {}
+    for build_id, rule_type, count, total in conn.execute(
+        "SELECT build_id, rule_type, COUNT(*), SUM(elapsed_s) FROM rules"  # noqa: S608 -- only fixed clauses / ? placeholders
+        f" WHERE build_id IN ({_placeholders(ids)}) GROUP BY build_id, rule_type",
+        ids,
+    ):
+        totals.setdefault(rule_type, {})[build_id] = (count, total)
+
+    trends = []
+    for rule_type, per_build in totals.items():
+        if latest_id not in per_build:
+            continue
+        count, latest = per_build[latest_id]
+        earlier = [total for build_id, (_count, total) in per_build.items() if build_id != latest_id]
+        baseline = sum(earlier) / len(earlier) if earlier else None
+        trends.append(RuleTypeTrend(rule_type, count, latest, baseline))
+    trends.sort(key=lambda t: t.delta_s, reverse=True)
+    return trends
+
+
+def rule_regressions(
+    conn: sqlite3.Connection,
+    builds: list[BuildRecord],
+    *,
+    min_delta_s: float = 0.05,
+    limit: int = 10,
+) -> list[RuleRegression]:
+    """Rules of the newest build that got slower than their own baseline.
+
+    The baseline is the mean elapsed time of the same key, rule type and
+    cache layer across the earlier builds in *builds*. Rules slower by
+    at least *min_delta_s* are returned, largest slowdown first.
+    """
+    if len(builds) < 2:
+        return []
+    earlier = [b.id for b in builds[:-1]]
+    rows = conn.execute(
+        "SELECT latest.key, latest.target, latest.rule_type, latest.cache_layer, latest.elapsed_s,"  # noqa: S608 -- only fixed clauses / ? placeholders
+        " AVG(prev.elapsed_s), COUNT(prev.elapsed_s)"
+        " FROM rules AS latest JOIN rules AS prev"
+        " ON prev.key = latest.key AND prev.rule_type = latest.rule_type"
+        " AND prev.cache_layer = latest.cache_layer"
+        f" WHERE latest.build_id = ? AND prev.build_id IN ({_placeholders(earlier)})"
+        " GROUP BY latest.rowid",
+        (builds[-1].id, *earlier),
+    ).fetchall()
+    regressions = [RuleRegression(*row) for row in rows]
+    regressions = [r for r in regressions if r.delta_s >= min_delta_s]
+    regressions.sort(key=lambda r: r.delta_s, reverse=True)
+    return regressions[:limit]
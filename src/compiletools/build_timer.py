@@ -18,6 +18,8 @@ from dataclasses import dataclass, field
 from typing import TYPE_CHECKING, Any, ClassVar
 
 if TYPE_CHECKING:
+    from collections.abc import Callable
+
     from compiletools.build_graph import BuildGraph
 
 
@@ -292,6 +294,9 @@ class BuildTimer:
         # Root event spans the entire build
         self._root = TimingEvent(name="total", category="phase", start_s=time.monotonic())
         self._phase_stack: list[TimingEvent] = [self._root]
+        # Called as listener(event, parents) after each record_rule; see
+        # add_rule_listener.
+        self._rule_listeners: list[Callable[[TimingEvent, tuple[TimingEvent, ...]], None]] = []
 
     # ---------------------------------------------------------------- public API
 
@@ -370,8 +375,31 @@ class BuildTimer:
             metadata=dict(metadata) if metadata else {},
         )
         with self._lock:
-            if self._phase_stack:
-                self._phase_stack[-1].children.append(event)
+            if not self._phase_stack:
+                return
+            self._phase_stack[-1].children.append(event)
+            parents = tuple(self._phase_stack)
+            listeners = tuple(self._rule_listeners)
+        for listener in listeners:
+            listener(event, parents)
+
+    def add_rule_listener(self, listener: Callable[[TimingEvent, tuple[TimingEvent, ...]], None]) -> None:
+        """Call *listener* with every rule event as ``record_rule`` records it.
+
+        The second argument is the phase chain the rule landed under, root
+        first.  Listeners run on the recording thread (a Shake worker, for
+        the trace backend), outside the timer's lock, so they must be cheap
+        and thread-safe -- hand the event off rather than doing I/O.  Used
+        by ``otel/streaming.py`` to export rule spans while the build runs.
+        """
+        with self._lock:
+            self._rule_listeners.append(listener)
+
+    def remove_rule_listener(self, listener: Callable[[TimingEvent, tuple[TimingEvent, ...]], None]) -> None:
+        """Stop calling *listener*; a no-op when it was never added."""
+        with self._lock:
+            if listener in self._rule_listeners:
+                self._rule_listeners.remove(listener)
 
     # ------------------------------------------------- ninja log parsing
 
@@ -571,6 +599,7 @@ class BuildTimer:
             # time), so the chrome trace just subtracts this origin.
             "start_s": round(self._root.start_s, 6),
             "phases": [child.to_dict() for child in self._root.children],
+            **({"metadata": self._root.metadata} if self._root.metadata else {}),
         }
 
     def to_json(self, path: str) -> None:
@@ -599,6 +628,7 @@ class BuildTimer:
             start_s=root_start_s,
             end_s=root_start_s + data.get("total_elapsed_s", 0.0),
             children=[TimingEvent.from_dict(p) for p in data.get("phases", [])],
+            metadata=dict(data.get("metadata") or {}),
         )
         timer._phase_stack = [timer._root]
         timer._loaded = True
@@ -611,6 +641,28 @@ class BuildTimer:
             data = json.load(f)
         return cls.from_dict(data)
 
+    def to_binary(self, path: str) -> None:
+        """Write timing data as a compact binary timing log (see ``timing_log``)."""
+        from compiletools import timing_log
+
+        timing_log.write(self, path)
+
+    @classmethod
+    def from_binary(cls, path: str) -> BuildTimer:
+        """Load a binary timing log; events are decoded lazily on access."""
+        from compiletools import timing_log
+
+        return timing_log.load(path)
+
+    @classmethod
+    def load(cls, path: str) -> BuildTimer:
+        """Load *path* as a binary timing log or JSON, whichever it is."""
+        from compiletools import timing_log
+
+        if timing_log.is_timing_log(path):
+            return timing_log.load(path)
+        return cls.from_json(path)
+
     # ------------------------------------------------- chrome trace export
 
     def to_chrome_trace(self) -> list[dict[str, Any]]:
@@ -829,6 +881,21 @@ class BuildTimer:
                 for rule in tests[:10]:
                     label = rule.target or rule.source
                     console.print(f"  {rule.elapsed_s:6.1f}s  {label}")
+
+            impact = self._root.metadata
+            if "test_impact.run" in impact:
+                skipped = impact.get("test_impact.skipped_tests") or []
+                console.print(
+                    f"\n[bold]Test impact:[/bold] {impact['test_impact.run']} run, "
+                    f"{impact.get('test_impact.skipped', len(skipped))} skipped (inputs unchanged)"
+                )
+                for source in skipped[:10]:
+                    console.print(f"  skipped  {source}")
+            if "header_unit_resolution.hits" in impact:
+                console.print(
+                    f"\n[bold]Header-unit resolutions:[/bold] {impact['header_unit_resolution.hits']} cached, "
+                    f"{impact.get('header_unit_resolution.misses', 0)} probed"
+                )
         except ImportError:
             pass
 
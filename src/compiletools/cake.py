@@ -7,6 +7,7 @@ import sys
 from typing import Optional
 
 import compiletools.apptools
+import compiletools.auto_pch
 import compiletools.build_apply
 import compiletools.compilation_database
 import compiletools.configutils
@@ -16,6 +17,7 @@ import compiletools.filelist
 import compiletools.filesystem_utils
 import compiletools.findtargets
 import compiletools.git_utils
+import compiletools.global_hash_registry
 import compiletools.headerdeps
 import compiletools.hunter
 import compiletools.jobs
@@ -40,7 +42,8 @@ class Cake:
 
         from compiletools.build_timer import BuildTimer
 
-        timing_enabled = getattr(args, "timing", False)
+        # --build-history records from the timer, so it implies --timing.
+        timing_enabled = getattr(args, "timing", False) or bool(getattr(args, "build_history", None))
         self.context.timer = BuildTimer(
             enabled=timing_enabled,
             variant=getattr(args, "variant", ""),
@@ -51,6 +54,8 @@ class Cake:
         self.headerdeps: Optional[compiletools.headerdeps.HeaderDepsBase] = None
         self.magicparser: Optional[compiletools.magicflags.MagicFlagsBase] = None
         self.hunter: Optional[compiletools.hunter.Hunter] = None
+        # The --otel-stream exporter while a build runs (see _start_otel_stream).
+        self._otel_stream = None
 
     @staticmethod
     def _hide_makefilename(args):
@@ -354,6 +359,7 @@ class Cake:
             action="store_true",
             help="Use relative paths instead of absolute paths in compilation database",
         )
+        compiletools.compilation_database.CompilationDatabaseCreator.add_incremental_arguments(cap)
 
         compiletools.utils.add_boolean_argument(
             parser=cap,
@@ -369,6 +375,116 @@ class Cake:
             help="Deprecated. Synonym for preprocess",
         )
 
+        cap.add_argument(
+            "--variants",
+            dest="variants",
+            default=None,
+            metavar="V1,V2,...",
+            help=(
+                "Build several variants (comma-separated, composite variants in "
+                "dotted form, e.g. debug,release,gcc.debug.asan) in one invocation. "
+                "Source analysis is shared between them; each variant still reads "
+                "its own configuration."
+            ),
+        )
+
+        compiletools.utils.add_boolean_argument(
+            parser=cap,
+            name="unity",
+            dest="unity",
+            default=False,
+            help=(
+                "Unity (jumbo) build: compile batches of compatible translation "
+                "units through generated sources that #include each member, so "
+                "shared headers are parsed once per batch. TUs with different "
+                "flags, different consuming targets, their own #define/#undef, "
+                "or C++20 module declarations keep per-file compiles. Honored "
+                "by the make, ninja and shake backends."
+            ),
+        )
+
+        cap.add_argument(
+            "--unity-batch-cost",
+            dest="unity_batch_cost",
+            type=float,
+            default=30.0,
+            metavar="SECONDS",
+            help=(
+                "Upper bound on the estimated compile time of one --unity batch, "
+                "from the learned per-rule cost history (default: 30)."
+            ),
+        )
+
+        compiletools.utils.add_flag_argument(
+            parser=cap,
+            name="suggest-pch",
+            dest="suggest_pch",
+            default=False,
+            help=(
+                "Analyse the targets' include structure, print the headers whose "
+                "precompilation would save the most preprocessing, and exit "
+                "without building."
+            ),
+        )
+
+        compiletools.utils.add_boolean_argument(
+            parser=cap,
+            name="auto-pch",
+            dest="auto_pch",
+            default=False,
+            help=(
+                "Precompile the headers --suggest-pch would report and inject each "
+                "into the TUs that already include it first. Uses the same "
+                "cas-pchdir cache as //#PCH= headers."
+            ),
+        )
+
+        compiletools.utils.add_boolean_argument(
+            parser=cap,
+            name="shard-tests",
+            dest="shard_tests",
+            default=False,
+            help=(
+                "Split long-running gtest and Catch2 v3 test executables into "
+                "parallel shards, bin-packed by the per-suite durations learned "
+                "from earlier --test-xml-dir reports. Requires --test-xml-dir."
+            ),
+        )
+
+        cap.add_argument(
+            "--test-shard-seconds",
+            dest="test_shard_seconds",
+            type=float,
+            default=10.0,
+            metavar="SECONDS",
+            help=(
+                "Target learned run time of one --shard-tests shard. A test "
+                "executable is split into at most --parallel shards of about "
+                "this length (default: 10)."
+            ),
+        )
+        compiletools.utils.add_boolean_argument(
+            parser=cap,
+            name="test-impact",
+            dest="test_impact",
+            default=False,
+            help=(
+                "Skip a test whose inputs (linked sources, their headers and "
+                "macro state, link flags and test command) are unchanged since "
+                "it last passed. Decisions appear in the --timing summary."
+            ),
+        )
+        compiletools.utils.add_boolean_argument(
+            parser=cap,
+            name="incremental-archive",
+            dest="incremental_archive",
+            default=False,
+            help=(
+                "Build a large static library by updating a copy of its previous "
+                "archive (ct-cas-archive) instead of rewriting every member."
+            ),
+        )
+
         cap.add_argument("--clean", action="store_true", help="Aggressively cleanup.")
         cap.add_argument(
             "--realclean",
@@ -397,8 +513,35 @@ class Cake:
             dest="timing",
             default=False,
             help="Collect and report build timing information. Writes timing.json "
-            "into the per-invocation diagnostics directory (see --diagnostics-dir) "
-            "and prints a summary table after the build.",
+            "(or timing.bin, see --timing-format) into the per-invocation "
+            "diagnostics directory (see --diagnostics-dir) and prints a summary "
+            "table after the build.",
+        )
+        cap.add_argument(
+            "--timing-format",
+            choices=["json", "binary"],
+            default="json",
+            help="File format --timing writes: indented JSON (timing.json) or the "
+            "compact, mmap-loadable binary timing log (timing.bin) that "
+            "ct-timing-report loads in constant time. ct-timing-report --convert "
+            "turns either into the other.",
+        )
+        cap.add_argument(
+            "--build-history",
+            default=None,
+            nargs="?",
+            const="auto",
+            metavar="PATH|auto",
+            help=(
+                "Append this build's rule timings, cache layers and ccache "
+                "stats to a local SQLite analytics store that accumulates "
+                "across invocations; ct-timing-report --trend reads it back. "
+                "With value 'auto' (or no value), the store is "
+                "build-history.sqlite in the diagnostics root (the parent of "
+                "the per-invocation directories, see --diagnostics-dir). "
+                "Implies --timing. Recording is best-effort: a failure is "
+                "reported on stderr and never fails the build."
+            ),
         )
 
         compiletools.apptools.add_otel_export_arguments(cap)
@@ -725,6 +868,10 @@ class Cake:
         with timer.phase("build_graph"):
             graph = backend.build_graph()
 
+        if getattr(self.args, "suggest_pch", False):
+            print(compiletools.auto_pch.format_report(backend.pch_suggestions), end="")
+            return
+
         # Every target's magicflags convergence has settled by now, so the
         # verdict partitions are complete — and nothing has been compiled or
         # linked yet, so a conflict (one target resolving a shared #if TRUE
@@ -892,6 +1039,7 @@ class Cake:
         # post-build telemetry pipeline raising.
         with _env_var_restored("CCACHE_STATSLOG"), _env_var_restored("CT_RULE_OUTCOMES_LOG"):
             statslog_path = self._setup_ccache_statslog_env()
+            self._otel_stream = self._start_otel_stream(timer)
             try:
                 # If the user specified only a single file to be turned into a library, guess that
                 # they mean for ct-cake to chase down all the implied files.
@@ -928,8 +1076,34 @@ class Cake:
                 # and hard-exits on the explicit --otel-export --no-timing combo.
                 # By the time we get here, "otel_export set and timing not set"
                 # is unreachable via the front door, so no warning is needed.
+                compiletools.headerdeps.save_include_caches(self.context)
                 self._run_postbuild_telemetry(timer, statslog_path)
 
+    def _start_otel_stream(self, timer):
+        """Start the live rule-span exporter when ``--otel-stream`` is set.
+
+        Returns None when streaming is off or cannot start; the post-build
+        pipeline then falls back to the end-of-build ``export_buildtimer``.
+        Only the shake backend records rules while it builds: the others
+        recover them from their logs after the build, so a stream would
+        ship nothing live and lose the ``cas.*`` / ``ct.rule.cache_layer``
+        attributes the end-of-build export carries.
+        """
+        if not (getattr(self.args, "otel_export", False) and getattr(self.args, "otel_stream", False)):
+            return None
+        backend = getattr(self.args, "backend", "shake")
+        if backend != "shake":
+            if self.args.verbose >= 1:
+                print(f"--otel-stream has no effect with --backend={backend}; exporting at end of build")
+            return None
+        try:
+            from compiletools.otel import start_live_export
+
+            return start_live_export(timer, self.args)
+        except Exception as exc:
+            print(f"Warning: OTLP live export unavailable, exporting at end of build: {exc}", file=sys.stderr)
+            return None
+
     def _run_postbuild_telemetry(self, timer, statslog_path: Optional[str]) -> None:
         """Post-build telemetry pipeline: ccache parse, outcomes merge,
         aggregate derivation, timing.json, OTel export, metric publish.
@@ -1007,14 +1181,25 @@ class Cake:
                     f"Warning: cache-aggregate derivation failed: {exc}",
                     file=sys.stderr,
                 )
-            timer.to_json(os.path.join(diag_dir, "timing.json"))
+            if getattr(self.args, "timing_format", "json") == "binary":
+                from compiletools.timing_log import BINARY_TIMING_FILENAME
+
+                timer.to_binary(os.path.join(diag_dir, BINARY_TIMING_FILENAME))
+            else:
+                timer.to_json(os.path.join(diag_dir, "timing.json"))
             timer.print_summary()
+            self._record_build_history(timer)
             if getattr(self.args, "otel_export", False):
                 from compiletools.otel import export_buildtimer
 
                 # README.ct-otel.rst: "a failed export does not fail the build".
+                # With --otel-stream the rule spans are already out; close()
+                # ships the root/phase spans carrying the aggregates above.
                 try:
-                    root_trace_id = export_buildtimer(timer, self.args)
+                    if self._otel_stream is not None:
+                        root_trace_id = self._otel_stream.close()
+                    else:
+                        root_trace_id = export_buildtimer(timer, self.args)
                 except Exception as exc:
                     print(f"Warning: OTLP export failed: {exc}", file=sys.stderr)
             # Best-effort cleanup of the outcomes log.  Leaving it in
@@ -1033,6 +1218,26 @@ class Cake:
         if statslog_path:
             self._publish_ccache_stats(statslog_path, ccache_counts, root_trace_id)
 
+    def _record_build_history(self, timer) -> None:
+        """Append the finished build to the ``--build-history`` store.
+
+        Runs after the aggregates and cache layers are in the timer, so
+        the store records what timing.json records. Best-effort.
+        """
+        value = getattr(self.args, "build_history", None)
+        if not value:
+            return
+        try:
+            from compiletools import build_history
+
+            path = build_history.resolve_history_path(value, self.args)
+            assert path is not None
+            build_history.record_build(path, timer, invocation_id=compiletools.diagnostics.invocation_id())
+            if getattr(self.args, "verbose", 0) >= 1:
+                print(f"Build history recorded in {path}")
+        except Exception as exc:
+            print(f"Warning: build history not recorded: {exc}", file=sys.stderr)
+
     def clear_cache(self):
         """Only useful in test scenarios where you need to reset to a pristine state"""
         assert self.namer is not None
@@ -1223,19 +1428,92 @@ def main(argv=None):
             print("Nothing for cake to do.  Did you mean cake --auto? Use cake --help for help.")
             return 0
 
-        with compiletools.apptools.graceful_shutdown(signal_handler, signal.SIGINT, signal.SIGPIPE):
-            try:
-                cake = Cake(args, context=context)
-                cake.process()
-                # For testing purposes, clear out the memcaches for the times when main is called more than once.
+        if getattr(args, "variants", None):
+            return _process_variants(args, context)
+
+        return _run_cake(args, context)
+
+
+def _run_cake(args, context, *, clear_cache=True) -> int:
+    """Build one variant: ``Cake(args).process()`` with the fatal-error
+    rendering ``main`` promises."""
+    with compiletools.apptools.graceful_shutdown(signal_handler, signal.SIGINT, signal.SIGPIPE):
+        try:
+            cake = Cake(args, context=context)
+            cake.process()
+            # For testing purposes, clear out the memcaches for the times when main is called more than once.
+            if clear_cache:
                 cake.clear_cache()
-            except Exception as err:
-                # At verbose >= 2 the full traceback is the diagnostic.
-                if args.verbose >= 2:
-                    raise
-                for exc_type, renderer in _FATAL_ERROR_RENDERERS:
-                    if isinstance(err, exc_type):
-                        renderer(err)
-                        return 1
+        except Exception as err:
+            # At verbose >= 2 the full traceback is the diagnostic.
+            if args.verbose >= 2:
                 raise
+            for exc_type, renderer in _FATAL_ERROR_RENDERERS:
+                if isinstance(err, exc_type):
+                    renderer(err)
+                    return 1
+            raise
+    return 0
+
+
+def _variant_argv(argv: list[str], variant: str) -> list[str]:
+    """*argv* with every ``--variant`` / ``--variants`` dropped and
+    ``--variant=<variant>`` appended."""
+    out: list[str] = []
+    skip = False
+    for arg in argv:
+        if skip:
+            skip = False
+            continue
+        if arg in ("--variant", "--variants"):
+            skip = True
+            continue
+        if arg.startswith(("--variant=", "--variants=")):
+            continue
+        out.append(arg)
+    out.append(f"--variant={variant}")
+    return out
+
+
+def _analysis_key(args) -> tuple:
+    """The args ``file_analyzer.analyze_file`` results depend on."""
+    return tuple(
+        str(getattr(args, name, None)) for name in ("max_read_size", "exemarkers", "testmarkers", "librarymarkers")
+    )
+
+
+def _process_variants(args, context) -> int:
+    """``ct-cake --variants=a,b,c``: build each variant in turn in this process.
+
+    Every variant is parsed from scratch (its own ct.conf layers, flags and
+    compiler checks) but runs against a fork of *context* (see
+    ``BuildContext.fork_variant``), so the content-hash registry, file
+    analysis and macro-invariant preprocessing are done once for the whole
+    set, and only the macro-state-dependent layers are rebuilt per variant.
+    Stops at the first variant that fails.
+    """
+    variants = [v.strip() for v in args.variants.split(",") if v.strip()]
+    if compiletools.configutils.impliedvariant(args._argv):
+        print("Error: --variants cannot be combined with --config, which implies a single variant.", file=sys.stderr)
+        return 1
+    compiletools.global_hash_registry.load_hashes(verbose=args.verbose, context=context)
+    base_key = _analysis_key(args)
+    for i, variant in enumerate(variants):
+        argv = _variant_argv(args._argv, variant)
+        fork = context.fork_variant()
+        with fork.pkg_config_path_restored():
+            cap = compiletools.apptools.create_parser(
+                "A convenience tool to aid migration from cake to the ct-* tools", argv=argv
+            )
+            Cake.add_arguments(cap)
+            variant_args = compiletools.apptools.parseargs(cap, argv, context=fork)
+            if _analysis_key(variant_args) != base_key:
+                fork.analyze_file_cache = {}
+            Cake._hide_makefilename(variant_args)
+            compiletools.apptools.validate_otel_timing_pair(variant_args)
+            if args.verbose >= 1:
+                print(f"Building variant {variant_args.variant} ({i + 1} of {len(variants)})")
+            rc = _run_cake(variant_args, fork, clear_cache=i == len(variants) - 1)
+        if rc != 0:
+            return rc
     return 0
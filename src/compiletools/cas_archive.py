@@ -0,0 +1,178 @@
+"""Incremental static-library archiving for ``ct-cake --incremental-archive``.
+
+A static library's CAS key covers its whole object set, so changing one
+member re-keys the library and the ``ar`` rule rebuilds it from scratch --
+rewriting every member, which for a library of thousands of objects is
+gigabytes of I/O for a one-file change. With ``--incremental-archive`` the
+rule runs this helper instead of ``ar`` directly. It still produces the same
+content-addressed output path; only how the bytes are produced changes:
+
+1. The previous archive is the library's published user path
+   (``bin/<variant>/lib<name>.a``), which still links the last CAS entry
+   when the rule runs -- publish depends on the archive, so it cannot have
+   moved yet.
+2. Members are matched by basename. CAS object basenames encode the
+   source, dependency and macro-state hashes, so an equal name is an equal
+   object; a changed source arrives as a new name and its stale member is
+   deleted.
+3. The previous archive is copied, ``ar -d`` removes the dropped members,
+   ``ar -r -b`` inserts each new one in front of the kept member that
+   follows it in the new member list (or appends it) and the symbol index
+   is rebuilt. The result is renamed onto the output, so readers never see
+   a partial archive.
+
+The output lives under a content-addressed name that peers share, so it
+must be byte-for-byte what a full ``ar`` writes: same members, same order.
+Anything that makes the shortcut doubtful therefore falls back to a full
+``ar``: no previous archive, a library below ``MIN_MEMBERS``, fewer than
+half the members reusable, duplicate basenames, kept members out of order,
+new members scattered over more than ``MAX_INSERTIONS`` places, or any
+``ar`` failure on the copy.
+
+Thin archives (``ar -T``) were considered and rejected: they reference the
+member objects by path, and ``ct-trim-cache`` may evict those objects while
+the archive is still published.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import subprocess
+import sys
+
+import compiletools.filesystem_utils
+
+# Below this many members a full ``ar`` is cheap enough that the extra
+# ``ar t`` / copy / delete steps are not worth it.
+MIN_MEMBERS = 64
+
+# The incremental path must reuse at least this share of the new member set.
+MIN_REUSE = 0.5
+
+# Each separate place new members go costs one ``ar`` run over the archive.
+MAX_INSERTIONS = 4
+
+
+def archive_members(ar: str, archive: str) -> list[str] | None:
+    """Member names of *archive* in archive order, or ``None`` when it is
+    missing or ``ar`` cannot read it."""
+    try:
+        out = subprocess.run([ar, "t", archive], capture_output=True, text=True, check=True).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.splitlines()
+
+
+def plan_update(
+    members: list[str], objects: list[str], *, min_members: int = MIN_MEMBERS
+) -> tuple[list[str], list[tuple[str | None, list[str]]]] | None:
+    """``(members_to_delete, insertions)`` turning an archive holding
+    *members* into one holding *objects* in *objects* order, or ``None``
+    when a full rebuild is the safer (or cheaper) choice.
+
+    Each insertion is ``(before, paths)``: *paths* go in front of the kept
+    member *before*, or at the end when it is ``None``. Kept members must
+    already be in *objects* order, and the new ones may land in at most
+    ``MAX_INSERTIONS`` places; otherwise a rebuild is cheaper than the
+    ``ar`` runs it takes to reorder.
+    """
+    names = [os.path.basename(o) for o in objects]
+    if len(objects) < min_members or len(set(names)) != len(names) or len(set(members)) != len(members):
+        return None
+    wanted = set(names)
+    present = set(members)
+    if len(wanted & present) < MIN_REUSE * len(objects):
+        return None
+    drop = [m for m in members if m not in wanted]
+    if [m for m in members if m in wanted] != [n for n in names if n in present]:
+        return None
+    insertions: list[tuple[str | None, list[str]]] = []
+    pending: list[str] = []
+    for obj, name in zip(objects, names, strict=True):
+        if name not in present:
+            pending.append(obj)
+        elif pending:
+            insertions.append((name, pending))
+            pending = []
+    if pending:
+        insertions.append((None, pending))
+    if len(insertions) > MAX_INSERTIONS:
+        return None
+    return drop, insertions
+
+
+def archive(ar: str, output: str, objects: list[str], *, base: str | None = None) -> bool:
+    """Write the static library *output* holding *objects*. Returns True
+    when it was derived from *base* rather than built from scratch."""
+    incremental = False
+
+    def _update_copy(tmp_path: str) -> bool:
+        # Plan against the private copy, not *base* itself: a concurrent
+        # publish may swap the user path between listing and copying.
+        try:
+            compiletools.filesystem_utils.copy_file(base, tmp_path)
+        except OSError:
+            return False
+        members = archive_members(ar, tmp_path)
+        plan = plan_update(members, objects, min_members=MIN_MEMBERS) if members is not None else None
+        if plan is None:
+            return False
+        drop, insertions = plan
+        try:
+            if drop:
+                subprocess.run([ar, "-ds", tmp_path, *drop], check=True)
+            for before, paths in insertions:
+                position = ["-rbs", before] if before is not None else ["-rs"]
+                subprocess.run([ar, *position, tmp_path, *paths], check=True)
+        except (OSError, subprocess.CalledProcessError):
+            return False
+        return True
+
+    def _populate(tmp_path: str) -> None:
+        nonlocal incremental
+        if base and len(objects) >= MIN_MEMBERS:
+            incremental = _update_copy(tmp_path)
+            if incremental:
+                return
+            if os.path.exists(tmp_path):  # NOT wrappedos: scratch file of this call
+                os.unlink(tmp_path)
+        subprocess.run([ar, "-src", tmp_path, *objects], check=True)
+
+    compiletools.filesystem_utils.atomic_replace(output, _populate)
+    return incremental
+
+
+def archive_argv(ar: str, output: str, objects: list[str], base: str) -> list[str]:
+    """The generated recipe for one library. ``-o`` names the output so the
+    locking layer's temp-file rewrite applies as it does to a link."""
+    return ["ct-cas-archive", "--ar", ar, "--base", base, "-o", output, *objects]
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    from compiletools.version import __version__
+
+    parser = argparse.ArgumentParser(
+        prog="ct-cas-archive",
+        description="Build a static library, updating the previous archive in place of a full rewrite.",
+    )
+    parser.add_argument("--version", action="version", version=__version__)
+    parser.add_argument("--ar", default="ar", help="Archiver to run. Default: %(default)s")
+    parser.add_argument("--base", default=None, help="Previous archive to start from (missing is fine).")
+    parser.add_argument("-o", "--output", required=True, help="Archive to write.")
+    parser.add_argument("objects", nargs="+", help="Member objects, in archive order.")
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = _build_parser().parse_args(argv)
+    try:
+        archive(args.ar, args.output, args.objects, base=args.base)
+    except (OSError, subprocess.CalledProcessError) as e:
+        print(f"ct-cas-archive: {args.output}: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -15,18 +15,24 @@ The new contract:
 1. ``link(cas_path, tmp)`` then ``rename(tmp, user_path)`` — POSIX-atomic
    replacement, the kernel guarantees ``user_path`` is always present (either
    the old inode or the new one) for any concurrent reader.
-2. On ``EXDEV`` from step 1: fall back to ``symlink(cas_path, tmp)`` then
-   ``rename(tmp, user_path)``. Same atomic-replacement pattern; just a symlink
-   inode instead of a hardlink.
-3. Any other ``OSError`` from step 1: re-raise visibly. Operators get a clear
-   diagnostic instead of a silent symlink degradation.
+2. On ``EXDEV`` from step 1: reflink ``cas_path`` to ``tmp`` where the user
+   path's filesystem supports it (btrfs subvolumes refuse cross-subvolume
+   hardlinks but clone across them), else fall back to
+   ``symlink(cas_path, tmp)``; then ``rename(tmp, user_path)``. Same
+   atomic-replacement pattern; just a cloned or symlink inode instead of a
+   hardlink.
+3. On ``EPERM`` from step 1 (``fs.protected_hardlinks`` refusing to link a
+   peer's entry in a shared pool): reflink where supported, as in step 2.
+4. Any other ``OSError`` from step 1, or an ``EPERM`` that cannot be cloned
+   around: re-raise visibly. Operators get a clear diagnostic instead of a
+   silent symlink degradation.
 
 Sidecar manifest at ``<cas_path>.manifest`` (C4): JSON of ``{"source_realpath": ...}``,
 written best-effort after a successful link/rename. ``trim_cache`` reads it to
 bucket entries by source identity instead of by basename — disambiguates
 distinct executables that happen to share a basename like ``main``.
 
-Steps 1-3 run while holding the ``<cas_path>.lock`` sidecar — the same lock
+Steps 1-4 run while holding the ``<cas_path>.lock`` sidecar — the same lock
 ``trim_cache._safe_locked_unlink`` takes before evicting an entry, so publish
 and trim are totally ordered on any given CAS entry. Trim going first leaves
 nothing to publish, which surfaces as ``ConcurrentTrimError`` and exit code
@@ -41,17 +47,26 @@ not cover — see the "Hard-link safety" rule in ``trim_exedir``. That publish
 reports success and is still ordered against a concurrent trim, but a *later*
 trim can evict the entry and leave the published path a dangling symlink. The
 lock buys ordering for both paths; only the hardlink buys protection after the
-fact. Recovery is the same rebuild.
+fact. Recovery is the same rebuild. A reflinked publish also leaves the entry
+at ``st_nlink == 1``, but the user path is an independent copy: a later trim
+costs the cache entry, never the published file.
 
 This module is invoked from generated build recipes via the ``ct-cas-publish``
 entry point. Keep flags minimal and the contract terse — every recipe gets
 this command in its tail and a complex CLI surface would balloon the
 generated build files.
+
+Batching: the Makefile and Ninja backends fold every publish into one output
+directory into a single ``ct-cas-publish --batch`` recipe (see
+``BuildBackend._publish_batches``), so a build publishing N artefacts pays
+for one interpreter start-up per directory instead of N. Shake skips the
+process entirely and calls ``publish`` on a worker thread.
 """
 
 from __future__ import annotations
 
 import argparse
+import concurrent.futures
 import contextlib
 import errno
 import json
@@ -195,8 +210,10 @@ def publish(cas_path: str, user_path: str, source_realpath: str | None = None) -
 
     Hardlink first (preserves the cas-exedir trim hard-link-protection
     invariant by giving the cas entry ``nlink >= 2``); on ``EXDEV`` fall
-    back to a symlink so cross-filesystem publishes still work. Any other
-    OSError surfaces visibly instead of silently degrading.
+    back to a reflink where the filesystem supports one, else a symlink, so
+    cross-filesystem publishes still work. An ``EPERM`` is retried as a
+    reflink. Any other OSError surfaces visibly instead of silently
+    degrading.
 
     Sidecar errors are non-fatal: a missing/corrupt manifest just falls back
     to legacy basename bucketing in trim_exedir. The publish itself failing
@@ -223,6 +240,14 @@ def publish(cas_path: str, user_path: str, source_realpath: str | None = None) -
                 raise
             raise ConcurrentTrimError(cas_path) from None
         except OSError as e:
+            if e.errno not in (errno.EXDEV, errno.EPERM):
+                raise
+            if compiletools.filesystem_utils.reflink_supported(os.path.dirname(tmp_path) or "."):
+                try:
+                    compiletools.filesystem_utils.reflink(cas_path, tmp_path)
+                    return
+                except OSError:
+                    pass
             if e.errno != errno.EXDEV:
                 raise
             os.symlink(cas_path, tmp_path)
@@ -252,7 +277,71 @@ def publish(cas_path: str, user_path: str, source_realpath: str | None = None) -
                 pass
 
 
-def main(argv: list[str] | None = None) -> int:
+# Worker cap for the batched paths below. Each publish is a handful of
+# metadata syscalls (lock, link, rename, utime); on NFS/GPFS/Lustre those are
+# round-trips, so overlap, not CPU, is what the threads buy.
+_MAX_WORKERS = 16
+
+
+def _map_entries(fn, items, max_workers: int | None) -> list:
+    """``[fn(item) for item in items]``, on a thread pool when there is more
+    than one item. Results come back in input order."""
+    items = list(items)
+    workers = min(max_workers or _MAX_WORKERS, len(items))
+    if workers <= 1:
+        return [fn(item) for item in items]
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(fn, items))
+
+
+def freshen_cas_entries(cas_paths, *, older_than: float | None = None, max_workers: int | None = None) -> None:
+    """``freshen_cas_entry`` for every path whose mtime is at or before
+    *older_than* (every path when ``None``), with the stat and ``utime``
+    round-trips overlapped on a thread pool. Unreadable entries are skipped."""
+
+    def one(cas_path):
+        if older_than is not None:
+            try:
+                # NOT cached: a peer publish moves the mtime being read.
+                if os.path.getmtime(cas_path) > older_than:
+                    return
+            except OSError:
+                return
+        freshen_cas_entry(cas_path)
+
+    _map_entries(one, cas_paths, max_workers)
+
+
+def publish_batch(entries, max_workers: int | None = None) -> list[tuple[str, Exception]]:
+    """``publish`` every ``(cas_path, user_path, source_realpath)`` entry.
+
+    Entries are independent -- each takes only its own entry lock -- so they
+    run concurrently, and every entry is attempted even when a sibling fails:
+    a trimmed entry must not leave the rest of a directory unpublished.
+    Returns ``(user_path, error)`` for each failure, in input order.
+    """
+
+    def one(entry):
+        try:
+            publish(*entry)
+        except (ConcurrentTrimError, OSError) as e:
+            return entry[1], e
+        return None
+
+    return [failure for failure in _map_entries(one, entries, max_workers) if failure is not None]
+
+
+def batch_argv(entries) -> list[str]:
+    """The ``ct-cas-publish --batch`` argv publishing every entry in one
+    process. An absent ``source_realpath`` is spelled as the empty string so
+    the ``CAS USER SRC`` triples stay aligned."""
+    argv = ["ct-cas-publish", "--batch"]
+    for cas_path, user_path, source_realpath in entries:
+        argv += [cas_path, user_path, source_realpath or ""]
+    return argv
+
+
+def _build_parser() -> argparse.ArgumentParser:
     from compiletools.version import __version__
 
     parser = argparse.ArgumentParser(
@@ -260,20 +349,67 @@ def main(argv: list[str] | None = None) -> int:
         description="Atomically publish a CAS artefact at a stable user-facing path.",
     )
     parser.add_argument("--version", action="version", version=__version__)
-    parser.add_argument("--cas-path", required=True, help="Source path inside the CAS.")
-    parser.add_argument("--user-path", required=True, help="Destination user-facing path.")
+    parser.add_argument("--cas-path", help="Source path inside the CAS.")
+    parser.add_argument("--user-path", help="Destination user-facing path.")
     parser.add_argument(
         "--source-realpath",
         default=None,
         help="Source file realpath; written into <cas-path>.manifest sidecar for trim bucketing.",
     )
+    parser.add_argument(
+        "--batch",
+        nargs="+",
+        metavar="CAS USER SRC",
+        default=None,
+        help="Publish several entries in one process, given as CAS-path / user-path / source-realpath "
+        "triples (an empty SRC writes no manifest). Replaces --cas-path / --user-path.",
+    )
+    return parser
+
+
+def _parse(argv: list[str] | None) -> list[tuple[str, str, str | None]]:
+    parser = _build_parser()
     args = parser.parse_args(argv)
-    try:
-        publish(args.cas_path, args.user_path, args.source_realpath)
-    except ConcurrentTrimError as e:
-        print(f"ct-cas-publish: {e}", file=sys.stderr)
+    if args.batch is not None:
+        if args.cas_path or args.user_path or args.source_realpath:
+            parser.error("--batch cannot be combined with --cas-path / --user-path / --source-realpath")
+        if len(args.batch) % 3:
+            parser.error("--batch takes CAS USER SRC triples")
+        triples = zip(args.batch[0::3], args.batch[1::3], args.batch[2::3])
+        return [(cas, user, src or None) for cas, user, src in triples]
+    if not args.cas_path or not args.user_path:
+        parser.error("--cas-path and --user-path are required (or use --batch)")
+    return [(args.cas_path, args.user_path, args.source_realpath)]
+
+
+def parse_publish_command(cmd: list[str]) -> list[tuple[str, str, str | None]] | None:
+    """The ``(cas_path, user_path, source_realpath)`` entries a generated
+    ``ct-cas-publish`` recipe would publish, or ``None`` when *cmd* is some
+    other command. Lets an in-process backend call ``publish`` directly
+    instead of spawning the entry point."""
+    if not cmd or os.path.basename(cmd[0]) != "ct-cas-publish":
+        return None
+    return _parse(cmd[1:])
+
+
+def main(argv: list[str] | None = None) -> int:
+    entries = _parse(argv)
+    if len(entries) == 1:
+        try:
+            publish(*entries[0])
+        except ConcurrentTrimError as e:
+            print(f"ct-cas-publish: {e}", file=sys.stderr)
+            return EXIT_CONCURRENT_TRIM
+        return 0
+
+    failures = publish_batch(entries)
+    for user_path, e in failures:
+        print(f"ct-cas-publish: {user_path}: {e}", file=sys.stderr)
+    if not failures:
+        return 0
+    if all(isinstance(e, ConcurrentTrimError) for _, e in failures):
         return EXIT_CONCURRENT_TRIM
-    return 0
+    return 1
 
 
 if __name__ == "__main__":
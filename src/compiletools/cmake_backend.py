@@ -581,4 +581,4 @@ class CMakeBackend(BuildBackend):
                     src = os.path.join(dirpath, fname)
                     dest = mangled_to_dest[fname]
                     os.makedirs(os.path.dirname(dest), exist_ok=True)
-                    compiletools.filesystem_utils.atomic_copy(src, dest)
+                    compiletools.filesystem_utils.atomic_copy(src, dest, prefer_reflink=True)
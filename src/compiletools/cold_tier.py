@@ -0,0 +1,151 @@
+"""Compressed cold tier for cas-objdir objects and cas-exedir archives.
+
+Debug-info-heavy objects compress several-fold, but the pools store them
+raw, so a size budget holds far fewer distinct entries than it could.
+``ct-trim-cache --compress-cold DAYS`` demotes a cold entry (non-current,
+unused for DAYS) to a compressed sibling beside it: ``<entry>.zst`` when a
+zstd binding is importable (``compression.zstd`` on Python 3.14+, else the
+``zstandard`` package), ``<entry>.gz`` otherwise. The raw entry is then
+removed, so the entry's name is free and a build sees a plain miss.
+
+The miss path rehydrates before it compiles or links:
+``locking.rehydrate_cold_entry`` decompresses the sibling to a temp file
+under the entry's ``FileLock`` and renames it into place, exactly as a
+compile would publish its output. Readers therefore never see a partial
+entry. A sibling whose codec this host cannot read (a ``.zst`` written by
+a peer with zstd, read on a host without it) is just a miss, and the
+compiler runs.
+
+This module only names and transcodes files; the lock protocol lives with
+its callers (``trim_cache`` for demotion, ``locking`` for rehydration).
+"""
+
+from __future__ import annotations
+
+import functools
+import gzip
+import os
+import shutil
+
+import compiletools.filesystem_utils
+
+ZSTD_SUFFIX = ".zst"
+GZIP_SUFFIX = ".gz"
+# Every suffix a cold sibling may carry, whether or not this host can read it:
+# the trim must see (and may evict) a peer's sibling it cannot decode.
+COLD_SUFFIXES = (ZSTD_SUFFIX, GZIP_SUFFIX)
+
+# Entry kinds worth demoting. Objects are the bulk of a pool and compress
+# best; static archives are objects in a wrapper. Executables and shared
+# libraries are left raw: they are usually published (hard-linked) anyway,
+# and a symlink-published one must never lose its target.
+DEMOTABLE_SUFFIXES = (".o", ".a")
+
+_ZSTD_LEVEL = 10
+_GZIP_LEVEL = 6
+_COPY_CHUNK = 1 << 20
+
+
+@functools.cache
+def _zstd_module():
+    try:
+        from compression import zstd  # Python 3.14+
+
+        return zstd
+    except ImportError:
+        pass
+    try:
+        import zstandard
+
+        return zstandard
+    except ImportError:
+        return None
+
+
+def _open_zstd(fileobj, mode):
+    zstd = _zstd_module()
+    if "r" in mode:
+        return zstd.open(fileobj, mode)
+    if zstd.__name__ == "zstandard":  # its open() takes a compressor, not a level
+        return zstd.open(fileobj, mode, cctx=zstd.ZstdCompressor(level=_ZSTD_LEVEL))
+    return zstd.open(fileobj, mode, level=_ZSTD_LEVEL)
+
+
+def _open_gzip(fileobj, mode):
+    if "w" in mode:
+        # mtime=0 keeps the sibling's bytes a function of the entry's alone.
+        return gzip.GzipFile(fileobj=fileobj, mode=mode, compresslevel=_GZIP_LEVEL, mtime=0)
+    return gzip.GzipFile(fileobj=fileobj, mode=mode)
+
+
+def readable_suffixes() -> tuple[str, ...]:
+    """The cold suffixes this host can decode, preferred first."""
+    return (ZSTD_SUFFIX, GZIP_SUFFIX) if _zstd_module() is not None else (GZIP_SUFFIX,)
+
+
+def _opener(suffix: str):
+    return _open_zstd if suffix == ZSTD_SUFFIX else _open_gzip
+
+
+def raw_path(path: str) -> str:
+    """*path* with any cold suffix stripped (unchanged for a raw entry)."""
+    for suffix in COLD_SUFFIXES:
+        if path.endswith(suffix):
+            return path[: -len(suffix)]
+    return path
+
+
+def is_cold(path: str) -> bool:
+    return path.endswith(COLD_SUFFIXES)
+
+
+def is_demotable(path: str) -> bool:
+    return path.endswith(DEMOTABLE_SUFFIXES)
+
+
+def find_cold(raw: str) -> str | None:
+    """The readable cold sibling of *raw*, or ``None``."""
+    for suffix in readable_suffixes():
+        candidate = raw + suffix
+        if os.path.isfile(candidate):  # NOT wrappedos: trim and peers change the pool mid-build
+            return candidate
+    return None
+
+
+def compress(raw: str, st: os.stat_result) -> str | None:
+    """Write the cold sibling of *raw* (whose ``stat`` is *st*).
+
+    The sibling inherits the entry's permission bits and mtime, so age-based
+    trimming sees the same age before and after demotion. Returns the
+    sibling's path, or ``None`` (and writes nothing) when compression would
+    not save space. The caller holds the entry lock and removes *raw*.
+    """
+    suffix = readable_suffixes()[0]
+    sibling = raw + suffix
+    with (
+        open(raw, "rb") as src,
+        compiletools.filesystem_utils.atomic_output_file(sibling, mode="wb", force_mode=st.st_mode & 0o777) as out,
+    ):
+        with _opener(suffix)(out, "wb") as packed:
+            shutil.copyfileobj(src, packed, _COPY_CHUNK)
+    try:
+        if os.path.getsize(sibling) >= st.st_size:  # NOT wrappedos: just written
+            os.unlink(sibling)
+            return None
+        os.utime(sibling, (st.st_atime, st.st_mtime))
+    except OSError:
+        return None
+    return sibling
+
+
+def decompress(sibling: str, dest: str) -> None:
+    """Decode *sibling* into *dest* (a temp path the caller renames).
+
+    *dest* gets the sibling's permission bits. Raises ``OSError`` or the
+    codec's error type on an unreadable or corrupt sibling.
+    """
+    mode = os.stat(sibling).st_mode & 0o777
+    opener = _opener(sibling[len(raw_path(sibling)) :])
+    with open(sibling, "rb") as f, opener(f, "rb") as packed, open(dest, "wb") as out:
+        shutil.copyfileobj(packed, out, _COPY_CHUNK)
+    os.chmod(dest, mode)
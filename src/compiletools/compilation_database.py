@@ -1,3 +1,4 @@
+import hashlib
 import json
 import os
 import sys
@@ -10,6 +11,8 @@ import compiletools.apptools_pkgconfig
 import compiletools.build_apply
 import compiletools.filesystem_utils
 import compiletools.findtargets
+import compiletools.git_utils
+import compiletools.global_hash_registry
 import compiletools.headerdeps
 import compiletools.hunter
 import compiletools.magicflags
@@ -19,6 +22,49 @@ import compiletools.utils
 import compiletools.wrappedos
 from compiletools.locking import FileLock
 
+# Bumped when the sidecar index layout changes; an index with another version
+# is ignored and the database regenerated in full.
+_INDEX_VERSION = 1
+
+# Fragment name inside each --compilation-database-fragments directory: the
+# name clangd looks for when a .clangd points CompilationDatabase at it.
+FRAGMENT_BASENAME = "compile_commands.json"
+
+
+def index_pathname(output_file: str) -> str:
+    """Hidden ``--compilation-database-incremental`` index beside *output_file*."""
+    head, tail = os.path.split(output_file)
+    return os.path.join(head, f".{tail}.index")
+
+
+def _render_entry(entry: dict[str, Any]) -> str:
+    """One command object exactly as ``json.dumps(entries, indent=2)`` lays
+    it out inside the top-level list. JSON strings never hold a raw newline,
+    so indenting line by line is safe."""
+    return "\n".join("  " + line for line in json.dumps(entry, indent=2, ensure_ascii=False).split("\n"))
+
+
+def _write_streamed(path: str, chunks) -> int:
+    """Atomically write a JSON list from pre-rendered entry *chunks* without
+    ever holding the whole document in memory. Byte-identical to
+    ``json.dumps(entries, indent=2)``. Returns the entry count."""
+    count = 0
+    with compiletools.filesystem_utils.atomic_output_file(path, mode="w", encoding="utf-8") as f:
+        for chunk in chunks:
+            f.write("[\n" if count == 0 else ",\n")
+            f.write(chunk)
+            count += 1
+        f.write("\n]" if count else "[]")
+    return count
+
+
+def _stat_signature(path: str) -> list[int] | None:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [st.st_size, st.st_mtime_ns]
+
 
 class CompilationDatabaseCreator:
     """Creates compile_commands.json files for clang tooling integration"""
@@ -43,6 +89,16 @@ class CompilationDatabaseCreator:
             else compiletools.hunter.Hunter(args, self.headerdeps, self.magicparser, context=context)
         )
 
+        # --compilation-database-incremental state, filled by
+        # create_compilation_database: realpath -> (key, digest, entry) of
+        # the entries it produced, and the rendered text of the ones it had
+        # to rebuild (so the write does not render them twice).
+        self._index_entries: dict[str, dict[str, Any]] = {}
+        self._fresh: dict[str, tuple[str, str, dict[str, Any]]] = {}
+        self._rendered: dict[str, str] = {}
+        # Shared configuration part of every entry key; see _config_key.
+        self._config_key_cache: list[Any] | None = None
+
     @staticmethod
     def add_arguments(cap):
         """Add command-line arguments for standalone ct-compilation-database.
@@ -68,8 +124,36 @@ class CompilationDatabaseCreator:
             help="Use relative paths instead of absolute paths",
         )
 
+        CompilationDatabaseCreator.add_incremental_arguments(cap)
         compiletools.apptools.add_locking_arguments(cap)
 
+    @staticmethod
+    def add_incremental_arguments(cap):
+        """``--compilation-database-incremental`` / ``-fragments``, shared
+        with ct-cake."""
+        compiletools.utils.add_boolean_argument(
+            parser=cap,
+            name="compilation-database-incremental",
+            dest="compilation_database_incremental",
+            default=False,
+            help=(
+                "Keep a sidecar index of every entry's inputs and rebuild only the "
+                "entries whose source, headers, macro state or flags changed. The "
+                "database is streamed to disk and left untouched when nothing changed."
+            ),
+        )
+        cap.add_argument(
+            "--compilation-database-fragments",
+            dest="compilation_database_fragments",
+            default=None,
+            metavar="DIR",
+            help=(
+                "Also write one compile_commands.json per source directory under DIR, "
+                "mirroring the tree below the git root, for clangd configurations that "
+                "load a database per subtree. Only changed fragments are rewritten."
+            ),
+        )
+
     def _get_compiler_command(self, source_file: str) -> list[str]:
         """Generate compiler command arguments for a source file with StringZilla optimization"""
 
@@ -241,9 +325,13 @@ class CompilationDatabaseCreator:
             source_files = []
 
         # Process each source file
+        incremental = self._incremental()
         for source_file in source_files:
             if os.path.exists(source_file):
-                command_obj = self._create_command_object(source_file)
+                if incremental:
+                    command_obj = self._incremental_command_object(source_file)
+                else:
+                    command_obj = self._create_command_object(source_file)
                 if command_obj is not None:
                     commands.append(command_obj)
                 elif self.args.verbose >= 2:
@@ -253,12 +341,202 @@ class CompilationDatabaseCreator:
 
         return commands
 
+    # ------------------------------------------------------------ incremental
+
+    def _incremental(self) -> bool:
+        """Fragments are maintained from the index, so they imply it."""
+        return bool(
+            getattr(self.args, "compilation_database_incremental", False)
+            or getattr(self.args, "compilation_database_fragments", None)
+        )
+
+    def _config_key(self) -> list[Any]:
+        """Inputs shared by every entry: a change here rebuilds them all."""
+        cached = self._config_key_cache
+        if cached is None:
+            state_flags = compiletools.build_apply.get_build_state(self.args).flags
+            cached = [
+                self.args.CC,
+                self.args.CXX,
+                list(state_flags.cpp),
+                list(state_flags.c),
+                list(state_flags.cxx),
+                bool(self.args.compilation_database_relative),
+                compiletools.wrappedos.realpath(os.getcwd()),
+                # pkg-config answers feed magic flags without touching any
+                # source, header or macro.
+                os.environ.get("PKG_CONFIG_PATH", ""),
+            ]
+            self._config_key_cache = cached
+        return cached
+
+    def _entry_key(self, source_file: str) -> str | None:
+        """Digest of everything one entry is built from: the source's
+        content, its header closure, its converged macro state and the
+        shared configuration. ``None`` when any of those is unavailable, so
+        the entry is always rebuilt."""
+        try:
+            file_hash = compiletools.global_hash_registry.get_file_hash(source_file, self.context)
+            dep_hash = self.namer.compute_dep_hash(self.hunter.header_dependencies(source_file))
+            macro_hash = self.hunter.macro_state_hash(source_file, dep_hash=dep_hash)
+        except (compiletools.apptools_pkgconfig.PkgConfigError, compiletools.magicflags.MacroConvergenceError):
+            # Same enforcement carve-outs as _get_compiler_command's.
+            raise
+        except Exception:
+            return None
+        payload = [*self._config_key(), file_hash, dep_hash, macro_hash]
+        return hashlib.sha256(json.dumps(payload).encode()).hexdigest()[:32]
+
+    def _incremental_command_object(self, source_file: str) -> dict[str, Any] | None:
+        """``_create_command_object`` that reuses the indexed entry when the
+        source's key is unchanged."""
+        realpath = compiletools.wrappedos.realpath(source_file)
+        key = self._entry_key(source_file)
+        cached = self._index_entries.get(realpath)
+        if key is not None and cached and cached.get("key") == key and isinstance(cached.get("entry"), dict):
+            entry, digest = cached["entry"], cached["digest"]
+        else:
+            entry = self._create_command_object(source_file)
+            if entry is None:
+                return None
+            chunk = _render_entry(entry)
+            self._rendered[realpath] = chunk
+            digest = hashlib.sha256(chunk.encode()).hexdigest()[:16]
+        self._fresh[realpath] = (key, digest, entry)
+        return entry
+
+    def _load_index(self, output_file: str) -> dict[str, Any]:
+        """The sidecar index; missing, corrupt or another version -> ``{}``."""
+        try:
+            with open(index_pathname(output_file), encoding="utf-8") as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(index, dict) or index.get("version") != _INDEX_VERSION:
+            return {}
+        if not isinstance(index.get("entries"), dict):
+            return {}
+        return index
+
+    def _write_incremental_impl(self, output_file: str):
+        """Merge this run's entries into the indexed database and stream it
+        to disk, skipping the write when nothing changed.
+
+        The index stands in for the existing database only while the
+        database still has the size and mtime recorded when it was written;
+        otherwise (first run, or someone else rewrote it) the database is
+        read and merged exactly like the non-incremental path.
+        """
+        index = self._load_index(output_file)
+        signature = _stat_signature(output_file)
+        if index and signature is not None and index.get("database") == signature:
+            previous: dict[str, dict[str, Any]] = index["entries"]
+        else:
+            previous = {
+                self._entry_realpath(cmd): {"key": None, "digest": None, "entry": cmd}
+                for cmd in self._read_existing_commands(output_file)
+            }
+            index = {}
+
+        merged = {rp: record for rp, record in previous.items() if rp not in self._fresh}
+        for rp, (key, digest, entry) in self._fresh.items():
+            merged[rp] = {"key": key, "digest": digest, "entry": entry}
+        for rp, record in merged.items():
+            if not record.get("digest"):
+                chunk = _render_entry(record["entry"])
+                self._rendered[rp] = chunk
+                record["digest"] = hashlib.sha256(chunk.encode()).hexdigest()[:16]
+        digest = hashlib.sha256("\n".join(r["digest"] for r in merged.values()).encode()).hexdigest()
+
+        def chunks(realpaths):
+            for rp in realpaths:
+                yield self._rendered.get(rp) or _render_entry(merged[rp]["entry"])
+
+        rebuilt = len(self._rendered)
+        if index.get("digest") == digest:
+            if self.args.verbose:
+                print(f"Compilation database unchanged ({len(merged)} entries); skipping write of {output_file}")
+        else:
+            output_dir = compiletools.wrappedos.dirname(output_file)
+            if output_dir and not compiletools.wrappedos.isdir(output_dir):
+                os.makedirs(output_dir, exist_ok=True)
+            _write_streamed(output_file, chunks(merged))
+            if self.args.verbose:
+                print(f"Written compilation database with {len(merged)} entries to {output_file}")
+                print(f"  Rebuilt: {rebuilt} entries")
+                print(f"  Reused: {len(merged) - rebuilt} entries")
+
+        fragments = index.get("fragments") or {}
+        fragment_root = getattr(self.args, "compilation_database_fragments", None)
+        if fragment_root:
+            previous_digests = fragments.get("digests", {}) if fragments.get("root") == fragment_root else {}
+            fragments = {
+                "root": fragment_root,
+                "digests": self._write_fragments(fragment_root, merged, previous_digests, chunks),
+            }
+
+        new_index = {
+            "version": _INDEX_VERSION,
+            "database": _stat_signature(output_file),
+            "digest": digest,
+            "fragments": fragments,
+            "entries": merged,
+        }
+        if new_index != index:
+            try:
+                with compiletools.filesystem_utils.atomic_output_file(
+                    index_pathname(output_file), mode="w", encoding="utf-8"
+                ) as f:
+                    json.dump(new_index, f, ensure_ascii=False)
+            except (OSError, ValueError) as e:
+                # The index only saves work; the database itself is written.
+                if self.args.verbose:
+                    print(f"Warning: could not write compilation database index: {e}")
+
+    def _write_fragments(self, fragment_root, merged, previous_digests, chunks) -> dict[str, str]:
+        """One ``compile_commands.json`` per source directory under
+        *fragment_root*, mirroring the tree below the git root (sources
+        outside it go under ``_external/<absolute dir>``). Returns the new
+        ``{relative dir: digest}``; unchanged fragments are not rewritten and
+        fragments for directories that lost their last source are removed."""
+        gitroot = compiletools.git_utils.find_git_root()
+        groups: dict[str, list[str]] = {}
+        for rp in merged:
+            source_dir = os.path.dirname(rp)
+            reldir = os.path.relpath(source_dir, gitroot)
+            if reldir == os.pardir or reldir.startswith(os.pardir + os.sep):
+                reldir = os.path.join("_external", source_dir.lstrip(os.sep))
+            groups.setdefault(reldir, []).append(rp)
+
+        digests: dict[str, str] = {}
+        for reldir, members in groups.items():
+            digest = hashlib.sha256("\n".join(merged[rp]["digest"] for rp in members).encode()).hexdigest()[:16]
+            digests[reldir] = digest
+            path = os.path.join(fragment_root, reldir, FRAGMENT_BASENAME)
+            # NOT wrappedos: fragments are (re)written by this very loop.
+            if previous_digests.get(reldir) == digest and os.path.exists(path):
+                continue
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            _write_streamed(path, chunks(members))
+        for reldir in previous_digests.keys() - digests.keys():
+            try:
+                os.unlink(os.path.join(fragment_root, reldir, FRAGMENT_BASENAME))
+            except OSError:
+                pass
+        return digests
+
+    # ------------------------------------------------------------------ write
+
     def write_compilation_database(self, output_file: Optional[str] = None):
         """Write the compilation database to file with incremental update support"""
 
         if output_file is None:
             output_file = self.namer.compilation_database_pathname()
 
+        incremental = self._incremental()
+        if incremental:
+            self._index_entries = self._load_index(output_file).get("entries", {})
+
         # Create new commands OUTSIDE lock - this is expensive (source hunting, parsing)
         # Only need lock for the actual read-merge-write operation
         new_commands = self.create_compilation_database()
@@ -267,7 +545,10 @@ class CompilationDatabaseCreator:
         # FileLock is no-op if args.file_locking is False
         # Lock held only for quick read-merge-write to minimize blocking
         with FileLock(output_file, self.args):
-            self._write_database_impl(output_file, new_commands)
+            if incremental:
+                self._write_incremental_impl(output_file)
+            else:
+                self._write_database_impl(output_file, new_commands)
 
         # After a successful per-variant write, retarget the bare
         # compile_commands.json symlink that clangd / clang-tidy / IDEs open.
@@ -338,14 +619,8 @@ class CompilationDatabaseCreator:
             except FileNotFoundError:
                 pass
 
-    def _write_database_impl(self, output_file: str, new_commands: list[dict[str, Any]]):
-        """Implementation of database write (extracted for locking)
-
-        Args:
-            output_file: Path to compile_commands.json
-            new_commands: Pre-computed command objects (created outside lock)
-        """
-        # For incremental updates: read existing database and merge
+    def _read_existing_commands(self, output_file: str) -> list[dict[str, Any]]:
+        """The entries of the database already at *output_file*, or ``[]``."""
         existing_commands = []
         if os.path.exists(output_file):
             try:
@@ -362,6 +637,26 @@ class CompilationDatabaseCreator:
                 if self.args.verbose:
                     print(f"Warning: Could not read existing compilation database: {e}")
                 existing_commands = []
+        return existing_commands
+
+    @staticmethod
+    def _entry_realpath(cmd: dict[str, Any]) -> str:
+        """Realpath of an entry's ``file``, resolving a relative one against
+        the entry's own ``directory`` context, not cwd."""
+        existing_file = cmd["file"]
+        if not os.path.isabs(existing_file):
+            base_dir = cmd.get("directory", os.getcwd())
+            existing_file = os.path.join(base_dir, existing_file)
+        return compiletools.wrappedos.realpath(existing_file)
+
+    def _write_database_impl(self, output_file: str, new_commands: list[dict[str, Any]]):
+        """Implementation of database write (extracted for locking)
+
+        Args:
+            output_file: Path to compile_commands.json
+            new_commands: Pre-computed command objects (created outside lock)
+        """
+        existing_commands = self._read_existing_commands(output_file)
 
         # Merge: keep existing entries for files we're not updating. CDB merges
         # are infrequent and I/O-bound on the JSON write below, so a plain str
@@ -369,15 +664,7 @@ class CompilationDatabaseCreator:
         # / unwrap roundtrip.
         new_files_normalized = {compiletools.wrappedos.realpath(cmd["file"]) for cmd in new_commands}
 
-        merged_commands = []
-        for existing_cmd in existing_commands:
-            existing_file = existing_cmd["file"]
-            # Resolve relative paths against their "directory" context, not cwd.
-            if not os.path.isabs(existing_file):
-                base_dir = existing_cmd.get("directory", os.getcwd())
-                existing_file = os.path.join(base_dir, existing_file)
-            if compiletools.wrappedos.realpath(existing_file) not in new_files_normalized:
-                merged_commands.append(existing_cmd)
+        merged_commands = [cmd for cmd in existing_commands if self._entry_realpath(cmd) not in new_files_normalized]
 
         # Add all new/updated entries
         merged_commands.extend(new_commands)
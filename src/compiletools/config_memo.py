@@ -0,0 +1,311 @@
+"""Memoized configuration resolution across ct-* invocations.
+
+``apptools.parseargs`` re-resolves the whole configuration on every ct-*
+invocation: the conf hierarchy, target-anchored layers, pkg-config
+subprocesses and the compiler probes. In an edit-build loop every one of
+those answers is the same as last time. With ``CT_CONFIG_MEMO`` set, the
+resolved namespace (``args._build_state`` included) is stored on disk and
+the next invocation that would resolve identically reuses it.
+
+An entry is found by an exact key and then validated before reuse:
+
+* the **key** (the file name) hashes everything known before parsing --
+  argv, the cwd, the tool's registered options, the conf files the tier
+  discovery found (so a newly created ``ct.conf`` is a new key), every
+  environment variable the parser or the pkg-config/compiler lookups read,
+  and the compiletools and Python versions;
+* the **validation** re-stats what the resolution consulted -- every conf
+  file that was loaded, each target's ancestor conf layers, the compiler
+  binaries ``CC``/``CXX``/``CPP``/``LD`` resolve to on ``PATH``, and the
+  ``.pc`` files (plus their search directories) behind each pkg-config
+  query. ``(mtime_ns, size)`` must match exactly; anything else is a miss
+  and the entry is overwritten by the fresh resolution.
+
+Resolutions that ran a user command (``--project-version-cmd``,
+``--project-name-cmd``) are never stored: their output can change without
+any file changing. Neither are ``-vv`` and louder runs, whose diagnostics
+are the point of the run. Text the resolution printed through
+``sys.stdout`` / ``sys.stderr`` is stored and replayed on reuse, so notes
+and warnings do not disappear on the fast path.
+
+Entries are pickles, so they are only read from a directory the current
+user owns and that nobody else can write to; anything else is a miss.
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import hashlib
+import os
+import pickle
+import shutil
+import stat
+import sys
+
+import appdirs
+
+import compiletools
+import compiletools.apptools
+import compiletools.apptools_pkgconfig
+import compiletools.configutils
+import compiletools.filesystem_utils
+import compiletools.wrappedos
+
+# Directory for memo entries, or a boolean: "1"/"true"/"yes"/"on" selects
+# the per-user cache directory, "0"/"false"/"no"/"off" (or unset) disables.
+CONFIG_MEMO_ENV = "CT_CONFIG_MEMO"
+
+# Bumped whenever the entry layout or the key derivation changes.
+_MEMO_FORMAT = "ct-config-memo-1"
+
+_TRUTHY = ("1", "true", "yes", "on")
+_FALSY = ("0", "false", "no", "off")
+
+# Environment read by the resolution outside the parser's own env_var
+# mapping: which(), the conf tier discovery and pkg-config.
+_KEY_ENV_NAMES = frozenset(
+    {
+        "PATH",
+        "HOME",
+        "XDG_CONFIG_HOME",
+        "XDG_CONFIG_DIRS",
+        "PKG_CONFIG_PATH",
+        "PKG_CONFIG_LIBDIR",
+        "PKG_CONFIG_SYSROOT_DIR",
+    }
+)
+_KEY_ENV_PREFIXES = ("CT_", "APPEND_", "PREPEND_")
+
+# Options whose value is a command run during the resolution
+# (--project-version-cmd / --project-name-cmd).
+_UNCACHEABLE_ATTRS = ("projectversioncmd", "projectnamecmd")
+
+# Private attributes re-attached by parseargs on reuse rather than stored.
+_UNSTORED_ATTRS = frozenset({"_parser", "_context", "_argv"})
+
+_COMPILER_ATTRS = ("CC", "CXX", "CPP", "LD")
+
+
+def memo_dir() -> str | None:
+    """The memo directory selected by ``CT_CONFIG_MEMO``, or None when off."""
+    value = os.environ.get(CONFIG_MEMO_ENV, "").strip()
+    if not value or value.lower() in _FALSY:
+        return None
+    if value.lower() in _TRUTHY:
+        return os.path.join(appdirs.user_cache_dir(appname="ct"), "config-memo")
+    return os.path.abspath(os.path.expanduser(value))
+
+
+def _signature(path):
+    """``(mtime_ns, size)`` of *path*, or None when it cannot be stat'd."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def _env_key(cap):
+    names = {action.env_var for action in cap._actions if getattr(action, "env_var", None)}
+    return sorted(
+        (name, value)
+        for name, value in os.environ.items()
+        if name in names or name in _KEY_ENV_NAMES or name.startswith(_KEY_ENV_PREFIXES)
+    )
+
+
+def memo_key(cap, argv, verbose=None) -> str:
+    """Hash of everything that decides the resolution and is known before parsing."""
+    payload = (
+        _MEMO_FORMAT,
+        compiletools.__version__,
+        sys.version,
+        os.path.basename(sys.argv[0]) if sys.argv else "",
+        cap.prog,
+        sorted((action.dest, tuple(action.option_strings)) for action in cap._actions),
+        list(argv),
+        verbose,
+        os.getcwd(),
+        list(getattr(cap, "_default_config_files", None) or []),
+        _env_key(cap),
+    )
+    return hashlib.sha256(repr(payload).encode("utf-8")).hexdigest()
+
+
+def _compiler_fingerprint(args):
+    """``(token, resolved binary, signature)`` for every word of CC/CXX/CPP/LD,
+    so a wrapper like ``ccache g++`` tracks both executables."""
+    seen = {}
+    for attr in _COMPILER_ATTRS:
+        value = getattr(args, attr, None)
+        if not isinstance(value, str):
+            continue
+        for token in value.split():
+            if token in seen:
+                continue
+            resolved = shutil.which(token)
+            if resolved is not None:
+                resolved = compiletools.wrappedos.realpath(resolved)
+            seen[token] = (resolved, _signature(resolved) if resolved else None)
+    return sorted((token, resolved, sig) for token, (resolved, sig) in seen.items())
+
+
+def _pkg_config_paths(inputs):
+    """The ``.pc`` files behind each query (Requires closure included) and the
+    directories they are searched in -- a new ``.pc`` that would shadow one
+    changes its directory's mtime."""
+    if not inputs.pkg_config_results:
+        return []
+    paths = list(compiletools.apptools_pkgconfig._pkg_config_search_dirs())
+    for spec, _result in inputs.pkg_config_results:
+        package = compiletools.apptools_pkgconfig._bare_package_name(spec)
+        paths.extend(pc for _name, pc in compiletools.apptools_pkgconfig._pc_requires_closure(package))
+    return list(dict.fromkeys(paths))
+
+
+def _target_layer_paths(targets, conf_filenames, git_bounded):
+    layers = compiletools.configutils.walk_target_conf_layers(targets, conf_filenames, git_bounded=git_bounded)
+    return sorted(path for layer in layers for path in layer.conf_paths)
+
+
+def _target_walk(args, argv):
+    """What the target-anchored conf discovery would find now, or None when
+    the invocation names no explicit target."""
+    targets = compiletools.apptools._collect_explicit_target_files(args)
+    if not targets:
+        return None
+    conf_filenames = compiletools.apptools._target_conf_filenames(args.variant, argv)
+    git_bounded = getattr(args, "git_root", True)
+    return (tuple(targets), conf_filenames, git_bounded, _target_layer_paths(targets, conf_filenames, git_bounded))
+
+
+def _fingerprint(cap, args, inputs, argv):
+    files = compiletools.apptools._standard_conf_paths(cap, args) + _pkg_config_paths(inputs)
+    return {
+        "files": [(path, _signature(path)) for path in dict.fromkeys(files)],
+        "compilers": _compiler_fingerprint(args),
+        "target_walk": _target_walk(args, argv),
+    }
+
+
+def _still_valid(fingerprint, namespace) -> bool:
+    for path, signature in fingerprint["files"]:
+        if _signature(path) != signature:
+            return False
+    if _compiler_fingerprint(namespace) != fingerprint["compilers"]:
+        return False
+    walk = fingerprint["target_walk"]
+    if walk is not None:
+        targets, conf_filenames, git_bounded, paths = walk
+        if _target_layer_paths(targets, conf_filenames, git_bounded) != paths:
+            return False
+    return True
+
+
+def _private_directory(directory) -> bool:
+    """Only trust pickles from a directory this user owns and alone can write."""
+    try:
+        st = os.stat(directory)
+    except OSError:
+        return False
+    return stat.S_ISDIR(st.st_mode) and st.st_uid == os.getuid() and not st.st_mode & 0o022
+
+
+class _Tee:
+    """Write-through stream wrapper that also records what was written."""
+
+    def __init__(self, stream, name, chunks):
+        self._stream = stream
+        self._name = name
+        self._chunks = chunks
+
+    def write(self, text):
+        self._chunks.append((self._name, text))
+        return self._stream.write(text)
+
+    def __getattr__(self, attr):
+        return getattr(self._stream, attr)
+
+
+class ConfigMemo:
+    """One memo slot: the entry for a single key in the memo directory."""
+
+    def __init__(self, directory: str, key: str):
+        self.directory = directory
+        self.key = key
+        self._output: list[tuple[str, str]] = []
+
+    @property
+    def path(self) -> str:
+        return os.path.join(self.directory, f"{self.key}.pickle")
+
+    @classmethod
+    def for_invocation(cls, cap, argv, verbose=None) -> ConfigMemo | None:
+        """The slot for this invocation, or None when ``CT_CONFIG_MEMO`` is off."""
+        directory = memo_dir()
+        if directory is None:
+            return None
+        return cls(directory, memo_key(cap, argv, verbose))
+
+    def load(self, cap) -> argparse.Namespace | None:
+        """The stored namespace when the entry exists and is still valid.
+
+        On a hit the parser gets back the conf file list and target layers
+        the original resolution left on it (re-entrant ``parseargs`` callers
+        read both), and the recorded output is replayed. The namespace lacks
+        ``_parser``/``_context``/``_argv``; the caller re-attaches them.
+        """
+        if not _private_directory(self.directory):
+            return None
+        try:
+            with open(self.path, "rb") as f:
+                # The directory is private to this user (checked above), so
+                # the pickle is one this user wrote.
+                entry = pickle.load(f)  # noqa: S301
+        except Exception:
+            return None
+        if not isinstance(entry, dict) or entry.get("format") != _MEMO_FORMAT:
+            return None
+        namespace = argparse.Namespace(**entry["namespace"])
+        if not _still_valid(entry["fingerprint"], namespace):
+            return None
+        cap._default_config_files = list(entry["default_config_files"])
+        cap._ct_loaded_target_layers = list(entry["target_layers"])
+        streams = {"stdout": sys.stdout, "stderr": sys.stderr}
+        for name, text in entry["output"]:
+            streams[name].write(text)
+        return namespace
+
+    @contextlib.contextmanager
+    def recording(self):
+        """Record what the resolution prints, for replay on a later hit."""
+        stdout, stderr = sys.stdout, sys.stderr
+        sys.stdout = _Tee(stdout, "stdout", self._output)
+        sys.stderr = _Tee(stderr, "stderr", self._output)
+        try:
+            yield
+        finally:
+            sys.stdout, sys.stderr = stdout, stderr
+
+    def store(self, cap, args, inputs, argv) -> None:
+        """Persist a fresh resolution. Best-effort: a memo that cannot be
+        written costs the next invocation a full resolution, nothing more."""
+        if args.verbose >= 2 or any(getattr(args, attr, None) for attr in _UNCACHEABLE_ATTRS):
+            return
+        entry = {
+            "format": _MEMO_FORMAT,
+            "namespace": {name: value for name, value in vars(args).items() if name not in _UNSTORED_ATTRS},
+            "fingerprint": _fingerprint(cap, args, inputs, argv),
+            "default_config_files": list(getattr(cap, "_default_config_files", None) or []),
+            "target_layers": list(getattr(cap, "_ct_loaded_target_layers", None) or []),
+            "output": list(self._output),
+        }
+        try:
+            os.makedirs(self.directory, mode=0o700, exist_ok=True)
+            if not _private_directory(self.directory):
+                return
+            with compiletools.filesystem_utils.atomic_output_file(self.path, mode="wb", force_mode=0o600) as f:
+                pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+        except (OSError, pickle.PicklingError, TypeError, AttributeError):
+            return
@@ -152,7 +152,25 @@ def cmd_compile(args):
     # CAS hit semantics.  For now ct-lock-helper records every invocation as
     # a miss — the build_system-level CAS short-circuit happens before the
     # recipe is even dispatched.
+    #
+    # The action cache (``CT_ACTION_CACHE``, baked into the recipe by
+    # ``wrap_compile_with_lock``) is consulted first: a fetched object is a
+    # hit exactly like a peer-produced one, and a compile that ran uploads.
+    # Before either, an object ``ct-trim-cache --compress-cold`` demoted is
+    # rehydrated from its compressed sibling under the same lock.
+    import compiletools.action_cache
+    from compiletools.locking import rehydrate_cold_entry
+
+    if rehydrate_cold_entry(lock, args.target):
+        _record_rule_outcome(args.target, "obj", True)
+        return
+    cache = compiletools.action_cache.open_action_cache(os.environ.get(compiletools.action_cache.ACTION_CACHE_ENV))
+    if compiletools.action_cache.fetch_object(cache, args.target):
+        _record_rule_outcome(args.target, "obj", True)
+        return
     result = atomic_compile(lock, args.target, args.compile_cmd)
+    if result is not None:
+        compiletools.action_cache.store_object(cache, args.target, upload=compiletools.action_cache.upload_enabled())
     _record_rule_outcome(args.target, "obj", result is None)
 
 
@@ -162,11 +180,17 @@ def cmd_link(args):
     Args:
         args: Parsed arguments
     """
-    from compiletools.locking import atomic_link
+    from compiletools.locking import atomic_link, rehydrate_cold_entry
 
     lock_args = create_args_from_env()
     lock = create_lock(args.strategy, args.target, lock_args)
 
+    # A static archive ``ct-trim-cache --compress-cold`` demoted comes back
+    # from its compressed sibling instead of being re-archived.
+    if rehydrate_cold_entry(lock, args.target):
+        _record_rule_outcome(args.target, "exe", True)
+        return
+
     # See cmd_compile for the result-is-None semantics.  cas_kind="exe" is
     # the closest fit — ninja/make backends route static/shared libraries
     # through their own archive/link recipes that also call into this helper;
@@ -31,12 +31,14 @@ from __future__ import annotations
 import concurrent.futures
 import contextvars
 import functools
+import hashlib
 import os
 import shutil
 import signal
 import subprocess
 import sys
 import threading
+import time
 from dataclasses import dataclass
 from typing import Literal
 
@@ -59,6 +61,7 @@ __all__ = [
     "parse_git_value",
     "resolve_external",
     "resolve_externals_dir",
+    "resolve_git_mirror_dir",
 ]
 
 # Prefix of the per-external location-override environment variable. The
@@ -73,6 +76,14 @@ _ENV_OVERRIDE_PREFIX = "CT_GIT_PATH_"
 # exported GIT_ALLOW_PROTOCOL in their environment keeps their value.
 _DEFAULT_GIT_ALLOW_PROTOCOL = "file:git:ssh:http:https"
 
+# Default --git-mirror-ttl: a mirror is refreshed from its URL at most once per
+# this many seconds (``--update`` refreshes regardless).
+_DEFAULT_GIT_MIRROR_TTL = 3600
+
+# Stamp file inside a bare mirror whose mtime records the last successful
+# clone/refresh from the URL.
+_MIRROR_STAMP = "ct-mirror-fetched"
+
 
 class FetchError(Exception):
     """A named failure while resolving a //#GIT= external.
@@ -344,6 +355,13 @@ def resolve_externals_dir(explicit: str | None, gitroot: str) -> str:
     return compiletools.wrappedos.dirname(os.path.abspath(gitroot))
 
 
+def resolve_git_mirror_dir(explicit: str | None) -> str | None:
+    """Return the absolute ``--git-mirror-dir``, or None when mirroring is off."""
+    if not explicit:
+        return None
+    return os.path.abspath(os.path.expanduser(explicit))
+
+
 # ===========================================================================
 # Resolver layer
 # ===========================================================================
@@ -791,8 +809,99 @@ def _resolve_override(ext: GitExternal, override_path: str) -> ResolvedExternal:
     )
 
 
-def _clone_missing(ext: GitExternal, target: str, *, no_fetch: bool, verbose: int) -> ResolvedExternal:
-    """Clone *ext* into *target* (which does not yet exist)."""
+def _mirror_path(mirror_dir: str, ext: GitExternal) -> str:
+    """The bare mirror of *ext* under *mirror_dir*.
+
+    Keyed on the exact URL, not :func:`_normalize_remote_url`: the mirror
+    refreshes from the URL it was cloned from, so two spellings that merely
+    *look* equivalent must not share one.
+    """
+    digest = hashlib.sha256(ext.url.encode("utf-8")).hexdigest()[:16]
+    return compiletools.wrappedos.join(mirror_dir, f"{ext.name}-{digest}.git")
+
+
+def _mirror_is_fresh(mirror: str, ttl: float) -> bool:
+    # NOT wrappedos: the stamp is touched by concurrent peers' refreshes.
+    try:
+        fetched = os.stat(os.path.join(mirror, _MIRROR_STAMP)).st_mtime
+    except OSError:
+        return False
+    return time.time() - fetched < ttl
+
+
+def _touch_mirror_stamp(mirror: str) -> None:
+    stamp = os.path.join(mirror, _MIRROR_STAMP)
+    with open(stamp, "a"):
+        pass
+    os.utime(stamp)
+
+
+def _ensure_mirror(ext: GitExternal, mirror_dir: str, args, *, ttl: float, refresh: bool, verbose: int) -> str | None:
+    """Bring the bare mirror of *ext* up to date and return its path.
+
+    A missing mirror is created with ``git clone --mirror``; a present one is
+    refreshed (``git fetch --prune``) only when its stamp is older than
+    *ttl*, when *refresh* is set (``--update``), or when the declared ref is
+    not in it yet. Runs under a ``<mirror>.lock`` sidecar so concurrent
+    workspaces cloning the same URL share one network fetch.
+
+    The mirror is an optimization: any failure warns and returns None (clone
+    straight from the URL), except that a mirror which exists but could not
+    be refreshed is still returned -- its objects are valid, and a ref it
+    lacks is fetched from the URL by the caller.
+
+    Workspace clones borrow the mirror's objects (``--shared``), so the
+    mirror is configured never to prune an object a workspace may need.
+    """
+    import compiletools.locking
+
+    mirror = _mirror_path(mirror_dir, ext)
+    try:
+        os.makedirs(mirror_dir, exist_ok=True)
+        with compiletools.locking.FileLock(mirror + ".lock", args):
+            # NOT wrappedos.isdir: a peer may have created it while we waited
+            # for the lock.
+            if not os.path.isdir(mirror):
+                if verbose:
+                    print(f"ct-fetch: creating mirror of '{ext.name}' from {ext.url} at {mirror}")
+                tmp = f"{mirror}.ct-fetch.tmp.{os.getpid()}"
+                if os.path.lexists(tmp):
+                    shutil.rmtree(tmp, ignore_errors=True)
+                try:
+                    _run_git(["clone", "--mirror", "--end-of-options", ext.url, tmp], cwd=None, ext=ext)
+                    _run_git(["config", "gc.auto", "0"], cwd=tmp, ext=ext)
+                    _run_git(["config", "gc.pruneExpire", "never"], cwd=tmp, ext=ext)
+                    _touch_mirror_stamp(tmp)
+                    os.rename(tmp, mirror)
+                except BaseException:
+                    shutil.rmtree(tmp, ignore_errors=True)
+                    raise
+                return mirror
+            missing_ref = ext.ref is not None and _rev_parse_verify(mirror, ext.ref) is None
+            if refresh or missing_ref or not _mirror_is_fresh(mirror, ttl):
+                if verbose:
+                    print(f"ct-fetch: refreshing mirror of '{ext.name}' from {ext.url}")
+                try:
+                    _run_git(["fetch", "--prune", "origin"], cwd=mirror, ext=ext)
+                    _touch_mirror_stamp(mirror)
+                except (FetchError, OSError) as err:
+                    _warn(f"could not refresh the mirror at '{mirror}'; cloning from it as-is: {err}")
+            return mirror
+    except (FetchError, OSError) as err:
+        _warn(f"external '{ext.name}' ({ext.url}): git mirror unavailable, cloning directly: {err}")
+        return None
+
+
+def _clone_missing(
+    ext: GitExternal, target: str, *, no_fetch: bool, verbose: int, mirror: str | None = None
+) -> ResolvedExternal:
+    """Clone *ext* into *target* (which does not yet exist).
+
+    With *mirror* (a local bare mirror of ``ext.url``), the clone is made
+    from the mirror with ``--shared`` -- no network, no copied objects --
+    and ``origin`` is then pointed back at ``ext.url`` so later fetches,
+    ``--update`` and the origin-mismatch check see the declared remote.
+    """
     if no_fetch:
         raise FetchError(
             f"external '{ext.name}' ({ext.url}): not present at '{target}' and "
@@ -818,11 +927,20 @@ def _clone_missing(ext: GitExternal, target: str, *, no_fetch: bool, verbose: in
         # '--end-of-options' guards the untrusted url positional against option
         # injection (git >= 2.24). parse_git_value already rejects a leading-dash
         # url/ref; this is defense-in-depth.
-        _run_git(["clone", "--end-of-options", ext.url, tmp], cwd=None, ext=ext)
+        if mirror is not None:
+            _run_git(["clone", "--shared", "--end-of-options", mirror, tmp], cwd=None, ext=ext)
+            _run_git(["remote", "set-url", "origin", ext.url], cwd=tmp, ext=ext)
+        else:
+            _run_git(["clone", "--end-of-options", ext.url, tmp], cwd=None, ext=ext)
         if ext.ref is not None:
             # The ref may live on the remote but not be checked out by a plain
             # clone (e.g. a non-default branch or a bare SHA on another branch).
-            if _rev_parse_verify(tmp, ext.ref) is None:
+            # From a mirror, a non-default branch is already a remote-tracking
+            # ref that checkout picks up, so it needs no network.
+            available = _rev_parse_verify(tmp, ext.ref) is not None or (
+                mirror is not None and _rev_parse_verify(tmp, f"refs/remotes/origin/{ext.ref}") is not None
+            )
+            if not available:
                 _run_git(["fetch", "origin", "--end-of-options", ext.ref], cwd=tmp, ext=ext)
             _run_git(_checkout_argv(ext.ref), cwd=tmp, ext=ext)
         os.rename(tmp, target)
@@ -1057,6 +1175,7 @@ def resolve_external(
     update: bool = False,
     override_path: str | None = None,
     verbose: int = 0,
+    mirror: str | None = None,
 ) -> ResolvedExternal:
     """Ensure *ext* is present on disk at the correct ref; describe where.
 
@@ -1074,6 +1193,9 @@ def resolve_external(
                        never clone/fetch/checkout into it. The managed
                        location is left untouched.
         verbose:       Verbosity level; ``>= 1`` prints progress to stdout.
+        mirror:        Local bare mirror of ``ext.url`` to clone a missing
+                       external from (see :func:`_ensure_mirror`). Ignored
+                       when the external is already present.
 
     Returns:
         A :class:`ResolvedExternal` describing the on-disk checkout.
@@ -1110,7 +1232,7 @@ def resolve_external(
             f"at a real checkout) and retry."
         )
     if not os.path.exists(target):
-        return _clone_missing(ext, target, no_fetch=no_fetch, verbose=verbose)
+        return _clone_missing(ext, target, no_fetch=no_fetch, verbose=verbose, mirror=mirror)
     return _handle_present(ext, target, no_fetch=no_fetch, update=update, verbose=verbose)
 
 
@@ -1698,6 +1820,9 @@ def fetch_externals(
     """
     assert compiletools.wrappedos.isabs(externals_dir), f"externals_dir must be absolute, got '{externals_dir}'"
     overrides = overrides or {}
+    # --git-mirror-dir: clone missing externals from a shared bare mirror.
+    mirror_dir = resolve_git_mirror_dir(getattr(args, "git_mirror_dir", None))
+    mirror_ttl = getattr(args, "git_mirror_ttl", _DEFAULT_GIT_MIRROR_TTL)
 
     resolved: dict[str, ResolvedExternal] = {}
     declared: dict[str, GitExternal] = {}
@@ -1848,6 +1973,10 @@ def fetch_externals(
                 existed_before = os.path.isdir(target)
                 if force_reclone and existed_before:
                     shutil.rmtree(target)
+                # Only a clone consults the mirror; --no-fetch never clones.
+                mirror = None
+                if mirror_dir is not None and not no_fetch and not os.path.lexists(target):
+                    mirror = _ensure_mirror(ext, mirror_dir, args, ttl=mirror_ttl, refresh=update, verbose=verbose)
                 result = resolve_external(
                     ext,
                     externals_dir=externals_dir,
@@ -1855,6 +1984,7 @@ def fetch_externals(
                     no_fetch=no_fetch,
                     update=update or force_update,
                     verbose=verbose,
+                    mirror=mirror,
                 )
             if not existed_before:
                 fresh_clones.add(ext.name)
@@ -7,6 +7,7 @@ a required dependency (imported unconditionally below).
 import bisect
 import builtins
 import mmap
+import os
 import resource
 import sys
 from dataclasses import dataclass, field
@@ -1657,6 +1658,119 @@ def analyze_file(content_hash: str, context: "BuildContext") -> "FileAnalysisRes
     return result
 
 
+# Below this many uncached files a process pool costs more to start than the
+# analysis it would spread.
+_PARALLEL_ANALYSIS_MIN_FILES = 64
+_MIN_FILES_PER_WORKER = 16
+
+# The analyzer args a worker needs, copied off the build's args so the pool
+# pickles a handful of lists rather than the whole configargparse namespace.
+_WORKER_ARG_NAMES = ("max_read_size", "exemarkers", "testmarkers", "librarymarkers")
+
+
+def _reduce_str(value: Str):
+    return Str, (bytes(value),)
+
+
+def _init_analysis_worker() -> None:
+    """Pool initializer: let the worker pickle its Str-bearing results as
+    plain bytes. Only the worker pickles a ``Str``, so the reducer is
+    registered there and never in the building process."""
+    from multiprocessing.reduction import ForkingPickler
+
+    ForkingPickler.register(Str, _reduce_str)
+
+
+def _analyze_chunk(
+    files: list[tuple[str, str]], worker_args, file_reading_strategy: str
+) -> list[tuple[str, "FileAnalysisResult"]]:
+    """Pool worker: analyze each ``(content_hash, filepath)`` in *files* in a
+    fresh context holding only what ``analyze_file`` reads. A file that fails,
+    however it fails, is left out; the serial ``analyze_file`` the walk makes
+    later raises in context."""
+    from compiletools.build_context import BuildContext
+
+    context = BuildContext()
+    context.analyzer_args = worker_args
+    context.file_reading_strategy = file_reading_strategy
+    context.reverse_hashes = {content_hash: [filepath] for content_hash, filepath in files}
+    out = []
+    for content_hash, _filepath in files:
+        try:
+            out.append((content_hash, analyze_file(content_hash, context)))
+        except Exception:
+            continue
+    return out
+
+
+def _analysis_mp_context():
+    """A start method that is safe with threads already running in this
+    process (the OTLP stream exporter, the build's thread pools): never
+    ``fork``. ``forkserver`` preloads this module once for every worker."""
+    import multiprocessing
+
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        mp_context = multiprocessing.get_context("forkserver")
+        mp_context.set_forkserver_preload([__name__])
+        return mp_context
+    return multiprocessing.get_context("spawn")
+
+
+def analyze_files(content_hashes, context: "BuildContext", max_workers: int | None = None) -> None:
+    """Warm ``context.analyze_file_cache`` for many files at once.
+
+    Results are keyed by content hash alone, so each file can be analyzed in
+    any process and merged back: with enough uncached files they are split
+    across a process pool (``forkserver``, else ``spawn``) whose workers are
+    handed each file's path, the analyzer args and the file-reading strategy
+    explicitly and return only their results. Merging follows input order and
+    never replaces an entry, so the cache ends up identical to a serial pass.
+    Otherwise, and for every file the pool did not deliver (whatever went
+    wrong), the files are analyzed in-process.
+    """
+    from compiletools.global_hash_registry import get_filepath_by_hash
+
+    todo = list(dict.fromkeys(h for h in content_hashes if h not in context.analyze_file_cache))
+    workers = min(max_workers or os.cpu_count() or 1, len(todo) // _MIN_FILES_PER_WORKER or 1)
+    if len(todo) >= _PARALLEL_ANALYSIS_MIN_FILES and workers > 1 and context.analyzer_args is not None:
+        import concurrent.futures
+        import types
+
+        files = []
+        for content_hash in todo:
+            try:
+                files.append((content_hash, get_filepath_by_hash(content_hash, context)))
+            except (OSError, RuntimeError):
+                continue  # raised in context by the serial pass below
+        args = context.analyzer_args
+        worker_args = types.SimpleNamespace(**{n: getattr(args, n) for n in _WORKER_ARG_NAMES if hasattr(args, n)})
+        strategy = _determine_file_reading_strategy(context)
+        chunk = max(1, len(files) // (workers * 4))
+        chunks = [files[i : i + chunk] for i in range(0, len(files), chunk)]
+        # This is only a cache warm-up: any failure of the pool, a worker or
+        # a pickle leaves the affected files to the serial pass below.
+        try:
+            with concurrent.futures.ProcessPoolExecutor(
+                max_workers=workers, mp_context=_analysis_mp_context(), initializer=_init_analysis_worker
+            ) as pool:
+                futures = [pool.submit(_analyze_chunk, part, worker_args, strategy) for part in chunks]
+                for future in futures:
+                    try:
+                        results = future.result()
+                    except Exception:
+                        continue
+                    for content_hash, result in results:
+                        context.analyze_file_cache.setdefault(content_hash, result)
+        except Exception:
+            pass
+    for content_hash in todo:
+        if content_hash not in context.analyze_file_cache:
+            try:
+                analyze_file(content_hash, context)
+            except OSError:
+                continue
+
+
 def read_file_mmap(filepath, max_size=0):
     """Use memory-mapped I/O for large files with fallback to traditional reading.
 
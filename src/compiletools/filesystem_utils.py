@@ -4,6 +4,7 @@ This module provides filesystem type detection and policy decisions for:
 1. File locking strategies (makefile.py)
 2. Memory mapping safety (file_analyzer.py)
 3. Filesystem-specific performance tuning
+4. Copy strategies: reflink (FICLONE) on copy-on-write filesystems
 """
 
 import contextlib
@@ -12,10 +13,16 @@ import os
 import re
 import shutil
 import subprocess
+import sys
 import tempfile
 from collections.abc import Callable
 from functools import lru_cache
 
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
 
 def _umask_default_file_mode() -> int:
     """Return the file mode a normal ``open(path, 'w')`` would create now.
@@ -91,14 +98,22 @@ def atomic_replace(
         raise
 
 
-def atomic_copy(src: str, dst: str) -> None:
+def atomic_copy(src: str, dst: str, *, prefer_reflink: bool = False) -> None:
     """Copy ``src`` to ``dst`` atomically; hardlink fast path.
 
     Tries ``os.link`` first (O(1) inode share on the same filesystem)
-    and falls back to ``shutil.copy2`` on ``EXDEV``. Inode sharing on
-    the fast path means a subsequent ``os.path.samefile(src, dst)``
-    returns True, so idempotent callers can skip re-publishing on no-op
-    reruns.
+    and falls back to ``copy_file`` on ``EXDEV`` -- a reflink where the
+    destination filesystem supports one (btrfs subvolumes refuse
+    hardlinks between each other but clone across them), else
+    ``shutil.copy2``. Inode sharing on the fast path means a subsequent
+    ``os.path.samefile(src, dst)`` returns True, so idempotent callers
+    can skip re-publishing on no-op reruns.
+
+    ``prefer_reflink`` puts the reflink ahead of the hardlink when
+    ``dst``'s filesystem supports it: ``dst`` gets its own inode at no
+    data cost, so the warning below does not apply to it. For callers
+    whose ``src`` belongs to a tool that may rewrite it in place (a
+    native build tree's link outputs).
 
     .. warning::
        On the hardlink fast path, ``src`` and ``dst`` share an inode.
@@ -109,22 +124,145 @@ def atomic_copy(src: str, dst: str) -> None:
        safe. New callers that ``open(dst, 'r+')`` or ``truncate(dst)``
        must use a different helper.
     """
+    clone_first = prefer_reflink and reflink_supported(os.path.dirname(dst) or ".")
 
     def populate(tmp_path: str) -> None:
+        if clone_first:
+            with contextlib.suppress(OSError):
+                reflink(src, tmp_path)
+                return
         try:
             os.link(src, tmp_path)
         except AttributeError:
             # Platform lacks hardlink support entirely (e.g. Termux/Android
             # bionic doesn't expose os.link). Fall back to copy as for EXDEV.
-            shutil.copy2(src, tmp_path)
+            copy_file(src, tmp_path)
         except OSError as e:
             if e.errno != errno.EXDEV:
                 raise
-            shutil.copy2(src, tmp_path)
+            copy_file(src, tmp_path)
 
     atomic_replace(dst, populate)
 
 
+# Filesystems that implement FICLONE: a reflink shares the source's data
+# extents copy-on-write, so the clone costs no data I/O or space yet is an
+# independent inode (own mode/owner, safe to rewrite in place). XFS only
+# clones when formatted with reflink=1 and ZFS only with block cloning
+# enabled, hence the per-filesystem probe in reflink_supported on top of
+# this name gate.
+_REFLINK_FILESYSTEMS: tuple[str, ...] = ("btrfs", "xfs", "bcachefs", "ocfs2", "zfs")
+
+# ioctl(dest_fd, FICLONE, src_fd) -- _IOW(0x94, 9, int) in linux/fs.h.
+_FICLONE = 0x40049409
+
+# st_dev -> probe verdict. st_dev names the mounted filesystem, so every
+# mountpoint (bind mounts included) of one filesystem shares a verdict.
+_reflink_probes: dict[int, bool] = {}
+
+
+def get_copy_strategy(fstype: str) -> str:
+    """Determine how a file copy should be made on filesystem type *fstype*.
+
+    Returns:
+        'reflink' - FICLONE copy-on-write clone (btrfs, XFS, bcachefs, OCFS2, ZFS)
+        'copy' - Full data copy (every other filesystem)
+    """
+    fstype_lower = fstype.lower()
+    if any(fs in fstype_lower for fs in _REFLINK_FILESYSTEMS):
+        return "reflink"
+    return "copy"
+
+
+def reflink(src: str, dst: str) -> None:
+    """Create ``dst`` (which must not exist) as a reflink of ``src``.
+
+    Metadata follows ``shutil.copy2``: the clone gets ``src``'s mode and
+    timestamps. Raises ``OSError`` (``EXDEV`` across filesystems,
+    ``EOPNOTSUPP``/``EINVAL``/``ENOTTY`` where cloning is unsupported)
+    and leaves no ``dst`` behind.
+    """
+    if fcntl is None or not sys.platform.startswith("linux"):
+        raise OSError(errno.EOPNOTSUPP, "reflink is not supported on this platform", dst)
+    with open(src, "rb") as src_f:
+        dst_fd = os.open(dst, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        try:
+            fcntl.ioctl(dst_fd, _FICLONE, src_f.fileno())
+        except BaseException:
+            os.close(dst_fd)
+            with contextlib.suppress(OSError):
+                os.unlink(dst)
+            raise
+        os.close(dst_fd)
+    shutil.copystat(src, dst)
+
+
+def _probe_reflink(directory: str) -> bool | None:
+    """Clone a one-byte scratch file inside *directory*; True if that works.
+
+    None when no scratch file can be created there (a read-only directory
+    says nothing about the rest of its filesystem).
+    """
+    try:
+        fd, probe = tempfile.mkstemp(dir=directory, prefix=".ct-reflink-probe.")
+    except OSError:
+        return None
+    clone = probe + ".clone"
+    try:
+        os.write(fd, b"\0")
+        reflink(probe, clone)
+        return True
+    except OSError:
+        return False
+    finally:
+        os.close(fd)
+        for path in (clone, probe):
+            with contextlib.suppress(OSError):
+                os.unlink(path)
+
+
+def reflink_supported(directory: str) -> bool:
+    """Whether files can be reflinked into *directory*.
+
+    Gated by ``get_copy_strategy`` on the directory's filesystem type, then
+    confirmed by a real clone of a scratch file in *directory*. The verdict
+    is cached per mounted filesystem, so the probe runs once per
+    filesystem per process and every later call is one ``stat``. A
+    directory that cannot be statted or written to reports False without
+    caching anything.
+    """
+    try:
+        dev = os.stat(directory).st_dev
+    except OSError:
+        return False
+    verdict = _reflink_probes.get(dev)
+    if verdict is None:
+        if get_copy_strategy(get_filesystem_type(directory)) != "reflink":
+            verdict = False
+        else:
+            verdict = _probe_reflink(directory)
+            if verdict is None:
+                return False
+        _reflink_probes[dev] = verdict
+    return verdict
+
+
+def copy_file(src: str, dst: str) -> None:
+    """Copy ``src`` to the not-yet-existing ``dst`` like ``shutil.copy2``,
+    as a zero-data-cost reflink when ``dst``'s filesystem supports one.
+
+    A failed clone (``src`` on another filesystem, for one) falls back to
+    the full copy, so this never fails where ``shutil.copy2`` would not.
+    """
+    if reflink_supported(os.path.dirname(dst) or "."):
+        try:
+            reflink(src, dst)
+            return
+        except OSError:
+            pass
+    shutil.copy2(src, dst)
+
+
 _OCTAL_ESCAPE_RE = re.compile(r"\\([0-7]{3})")
 
 
@@ -416,6 +416,15 @@ class FindTargets:
 
             source_files = _walk_source_files()
 
+        # Classifying a file needs only its analysis, which is keyed by
+        # content hash, so the whole candidate set is analyzed up front
+        # (across worker processes when it is large) and the loop below
+        # reads the warmed cache in path order.
+        source_files = list(source_files)
+        compiletools.file_analyzer.analyze_files(
+            [h for _fp, h in source_files], self.context, max_workers=getattr(self._args, "parallel", None)
+        )
+
         for filepath, content_hash in source_files:
             try:
                 result = compiletools.file_analyzer.analyze_file(content_hash, self.context)
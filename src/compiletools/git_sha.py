@@ -7,7 +7,10 @@ so core library code can depend on the hashing helpers without importing a
 command-line tool (keeping the entry point a leaf in the import graph).
 """
 
+import concurrent.futures
+import hashlib
 import logging
+import mmap
 import os
 import shlex
 import subprocess
@@ -143,9 +146,89 @@ def get_untracked_files(context) -> list[Path]:
     return [Path(p) for p in _resolve_paths(git_root, rel_paths, context)]
 
 
+# Files at least this large are hashed through an mmap rather than read into
+# a bytes object, so a big generated header never costs a heap copy.
+_MMAP_THRESHOLD = 1 << 20
+
+# Attributes under which ``git hash-object`` hashes something other than the
+# bytes on disk: clean filters, eol normalisation, $Id$ collapse, re-encoding.
+_CONVERSION_ATTRS = ("filter", "text", "eol", "crlf", "ident", "working-tree-encoding")
+
+
+def blob_sha(path) -> str:
+    """Git blob SHA-1 of the bytes of *path* as they are on disk.
+
+    Identical to ``git hash-object`` for any file no conversion attribute
+    applies to. hashlib releases the GIL while digesting, so callers can run
+    this on a thread pool.
+    """
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size >= _MMAP_THRESHOLD:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                h = hashlib.sha1(f"blob {len(data)}\0".encode())
+                h.update(data)
+                return h.hexdigest()
+        content = f.read()
+    return hashlib.sha1(f"blob {len(content)}\0".encode() + content).hexdigest()
+
+
+def _blob_sha_or_none(path) -> Optional[str]:
+    try:
+        return blob_sha(path)
+    except (OSError, ValueError):
+        return None
+
+
+def hash_blobs(paths, max_workers: Optional[int] = None) -> dict:
+    """Bulk :func:`blob_sha`: ``{path: sha}`` for every readable path.
+
+    Hashed on a thread pool (one worker per CPU by default). Unreadable paths
+    are left out of the result.
+    """
+    paths = list(paths)
+    if max_workers is None:
+        max_workers = min(32, os.cpu_count() or 1)
+    if len(paths) < 2 or max_workers <= 1:
+        shas = [_blob_sha_or_none(p) for p in paths]
+    else:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=min(max_workers, len(paths))) as pool:
+            shas = list(pool.map(_blob_sha_or_none, paths))
+    return {p: sha for p, sha in zip(paths, shas) if sha is not None}
+
+
+def _paths_needing_git_conversion(relative_paths: list[str]) -> set[str]:
+    """The subset of *relative_paths* whose git blob is not their raw bytes.
+
+    ``core.autocrlf`` converts every text file, so it sends everything back
+    to git; otherwise one ``git check-attr`` call (no file is opened) names the
+    paths a conversion attribute is set on.
+    """
+    try:
+        autocrlf = run_git("git config --get core.autocrlf")
+    except RuntimeError:
+        autocrlf = ""  # unset: git config exits 1
+    if autocrlf.lower() in ("true", "input"):
+        return set(relative_paths)
+
+    cmd = "git check-attr --stdin " + " ".join(_CONVERSION_ATTRS)
+    output = run_git(cmd, input_data="\n".join(relative_paths) + "\n")
+    converted = set()
+    for line in output.splitlines():
+        parts = line.rsplit(": ", 2)
+        if len(parts) == 3 and parts[2] not in ("unspecified", "unset"):
+            converted.add(parts[0])
+    return converted
+
+
 def batch_hash_objects(paths) -> dict[Path, str]:
     """
-    Given a list of paths, return { path: blob_sha } using batched git calls.
+    Given a list of paths, return { path: blob_sha }.
+
+    Files no git conversion attribute applies to (nearly all of them) are
+    hashed in-process by :func:`hash_blobs`; the rest, and anything that
+    could not be read, go through batched ``git hash-object`` calls so
+    their SHA is still the one git would record.
     Converts absolute paths to relative paths (relative to git root) for git compatibility.
     Batches calls to avoid "Too many open files" errors from git hash-object.
     """
@@ -176,6 +259,17 @@ def batch_hash_objects(paths) -> dict[Path, str]:
     if not relative_paths:
         return {}
 
+    try:
+        converted = _paths_needing_git_conversion(relative_paths)
+    except RuntimeError:
+        converted = set(relative_paths)
+    result = hash_blobs([p for p, rel in zip(path_mapping, relative_paths) if rel not in converted])
+    leftover = [(rel, p) for rel, p in zip(relative_paths, path_mapping) if p not in result]
+    relative_paths = [rel for rel, _ in leftover]
+    path_mapping = [p for _, p in leftover]
+    if not relative_paths:
+        return result
+
     # Dynamically determine batch size based on system fd limit
     # git hash-object opens all files simultaneously, so we need to stay under the limit
     import resource
@@ -188,8 +282,6 @@ def batch_hash_objects(paths) -> dict[Path, str]:
         # Fallback if we can't get the limit (non-Unix systems)
         batch_size = 1000
 
-    result = {}
-
     for i in range(0, len(relative_paths), batch_size):
         batch_rel_paths = relative_paths[i : i + batch_size]
         batch_path_mapping = path_mapping[i : i + batch_size]
@@ -30,7 +30,6 @@ This makes each file's purpose explicit and ensures each has a unique hash.
 
 from __future__ import annotations
 
-import hashlib
 import os
 import sys
 from typing import TYPE_CHECKING
@@ -46,13 +45,12 @@ if TYPE_CHECKING:
 
 def _compute_external_file_hash(filepath: str, hash_ops: dict[str, int]) -> str | None:
     """Compute git blob hash for a file using git's algorithm."""
+    from compiletools.git_sha import blob_sha
+
     hash_ops["computed_hashes"] += 1
     try:
-        with open(filepath, "rb") as f:
-            content = f.read()
-        blob_data = f"blob {len(content)}\0".encode() + content
-        return hashlib.sha1(blob_data).hexdigest()
-    except OSError:
+        return blob_sha(filepath)
+    except (OSError, ValueError):
         return None
 
 
@@ -0,0 +1,103 @@
+"""Persistent gcc header-unit resolution cache.
+
+With a gcc module cache, every ``import <vector>;``-style header unit is
+resolved to the path(s) gcc keys it by, which costs two compiler forks
+(``backend_cxx_modules._resolve_system_header_abs_paths``). The in-process
+``lru_cache`` only helps within one invocation, so a module-heavy project
+paid those forks for every standard header on every ``ct-cake`` run. This
+module remembers the answers across invocations.
+
+An answer is keyed by everything the probe's output depends on: the
+compiler identity (binary realpath, size and mtime, so an upgraded
+compiler misses), the ``-std=`` flag, the ordered system-include flags and
+the header token. It is trusted only while every resolved path is still a
+regular file. Header units may only come from system-include paths, which
+are immutable by contract (see ``_extract_system_include_path_flags``), so
+no content check is needed. Failed probes are never stored; they are retried
+next time.
+
+Best-effort like ``include_cache``: a missing, corrupt or unwritable sidecar
+yields an empty cache and must never fail a build.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+
+import compiletools.wrappedos
+
+_VERSION = 1
+FILENAME = ".ct-header-unit-resolution.json"
+
+# Cap on persisted entries, so retired compilers and flag sets cannot grow
+# the sidecar without bound. On overflow, this run's entries are kept first.
+_MAX_ENTRIES = 20_000
+
+
+def key(compiler_identity: str, std_flag: str, include_flags, token: str) -> str:
+    payload = "\0".join([f"v{_VERSION}", compiler_identity, std_flag, *include_flags, "\x1f", token])
+    return hashlib.sha256(payload.encode()).hexdigest()[:32]
+
+
+class HeaderUnitResolutionCache:
+    """``key -> [resolved path, ...]`` persisted at *path*, loaded lazily."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._loaded = False
+        self._entries: dict[str, list[str]] = {}
+        self._touched: set[str] = set()
+        self._dirty = False
+        self.hits = 0
+        self.misses = 0
+
+    def _load(self) -> None:
+        self._loaded = True
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") != _VERSION:
+                return
+            self._entries = {
+                str(k): [str(p) for p in v] for k, v in data["entries"].items() if isinstance(v, list) and v
+            }
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            self._entries = {}
+
+    def lookup(self, entry_key: str) -> list[str] | None:
+        """The cached paths for *entry_key* while they all still exist, else ``None``."""
+        if not self._loaded:
+            self._load()
+        paths = self._entries.get(entry_key)
+        if paths and all(compiletools.wrappedos.isfile(p) for p in paths):
+            self._touched.add(entry_key)
+            self.hits += 1
+            return list(paths)
+        self.misses += 1
+        return None
+
+    def record(self, entry_key: str, paths: list[str]) -> None:
+        if not paths:
+            return
+        if not self._loaded:
+            self._load()
+        self._entries[entry_key] = list(paths)
+        self._touched.add(entry_key)
+        self._dirty = True
+
+    def save(self) -> None:
+        """Atomically rewrite the sidecar. Best-effort: swallows OSError/ValueError."""
+        if not self._dirty:
+            return
+        entries = sorted(self._entries.items(), key=lambda kv: kv[0] not in self._touched)[:_MAX_ENTRIES]
+        try:
+            from compiletools.filesystem_utils import atomic_output_file
+
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with atomic_output_file(self.path, mode="w", encoding="utf-8", force_mode=0o666) as f:
+                json.dump({"version": _VERSION, "entries": dict(entries)}, f)
+            self._dirty = False
+        except (OSError, ValueError):
+            pass
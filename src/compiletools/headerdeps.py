@@ -1,4 +1,7 @@
+import concurrent.futures
 import os
+import re
+import subprocess
 from pathlib import Path
 
 # At deep verbose levels pprint is used
@@ -10,6 +13,7 @@ import compiletools.apptools
 import compiletools.build_apply
 import compiletools.file_analyzer
 import compiletools.git_utils
+import compiletools.include_cache
 import compiletools.preprocessor
 import compiletools.tree as tree
 import compiletools.utils
@@ -28,6 +32,9 @@ from compiletools.preprocessing_cache import (
 )
 from compiletools.utils import instance_cache, tokenize_flags_or_raise
 
+# Whitespace not preceded by make's ``\`` escape.
+_MM_TOKEN_SPLIT_RE = re.compile(r"(?<!\\)\s+")
+
 
 def _include_dirs_from_env() -> list[str]:
     """Include search dirs from the CPATH-family env vars, in gcc's order.
@@ -74,6 +81,16 @@ def clear_include_list_cache(context):
     context.include_list_cache.clear()
 
 
+def save_include_caches(context):
+    """Write back every persistent include-resolution sidecar the build touched.
+
+    Called once at the end of an invocation (``Cake.process``,
+    ``ct-headertree``). Best-effort: never raises.
+    """
+    for store in getattr(context, "include_resolution_caches", {}).values():
+        store.save()
+
+
 def create(args, context, *, extra_include_dirs=None):
     """HeaderDeps Factory.
 
@@ -113,6 +130,16 @@ def add_arguments(cap):
             help="Maximum bytes to read from files (0 = entire file)",
         )
 
+    compiletools.utils.add_boolean_argument(
+        parser=cap,
+        name="include-cache",
+        dest="include_cache",
+        default=True,
+        help="Persist DirectHeaderDeps #include resolutions in the cas-objdir "
+        "between invocations, invalidated by search-directory mtime, so a warm "
+        "build does not re-probe every include directory.",
+    )
+
     # Add file-analyzer arguments for file reading strategy control
     compiletools.file_analyzer.add_arguments(cap)
 
@@ -257,6 +284,8 @@ class DirectHeaderDeps(HeaderDepsBase):
         # Initialize includes and macros
         self._initialize_includes_and_macros({})
 
+        self._include_store = self._open_include_store()
+
     def _initialize_includes_and_macros(
         self, variable_macros: MacroDict, function_params: FunctionParamsDict | None = None
     ):
@@ -334,12 +363,46 @@ class DirectHeaderDeps(HeaderDepsBase):
             function_params=function_params or {},
         )
 
+    def _open_include_store(self):
+        """The persistent resolution sidecar for this search list, or None.
+
+        Lives in the variant's cas-objdir next to the rule-cost sidecar and is
+        keyed by a fingerprint of the ordered search list, so builds whose
+        ``-I`` lists differ never share answers. Disabled by
+        ``--no-include-cache`` or an empty cas-objdir.
+        """
+        if getattr(self.args, "include_cache", False) is not True:
+            return None
+        stores = getattr(self.context, "include_resolution_caches", None)
+        if stores is None:
+            return None
+        cache_dir = compiletools.build_apply.get_build_state(self.args).names.cas_objdir
+        if not cache_dir:
+            return None
+        path = compiletools.include_cache.sidecar_path(cache_dir, self._includes)
+        store = stores.get(path)
+        if store is None:
+            store = stores[path] = compiletools.include_cache.IncludeResolutionCache(path)
+        return store
+
+    def _include_watch_dirs(self, include: sz.Str, cwd: str) -> list[str]:
+        """Directories the cwd-then-``-I`` probe of *include* looked in, up to
+        and including the one that hit. The isfile probes are cached, so this
+        re-walk costs no extra stats."""
+        watched: list[str] = []
+        for d in (cwd, *self.includes):
+            trialpath_sz = compiletools.wrappedos.join_sz(sz.Str(d), include)
+            watched.extend(compiletools.include_cache.watch_dirs(str(trialpath_sz)))
+            if compiletools.wrappedos.isfile_listed_sz(trialpath_sz):
+                break
+        return watched
+
     @instance_cache
     def _search_project_includes(self, include: sz.Str):
         """Internal use.  Find the given include file in the project include paths"""
         for inc_dir in self.includes:
             trialpath_sz = compiletools.wrappedos.join_sz(sz.Str(inc_dir), include)
-            if compiletools.wrappedos.isfile_sz(trialpath_sz):
+            if compiletools.wrappedos.isfile_listed_sz(trialpath_sz):
                 return str(compiletools.wrappedos.realpath_sz(trialpath_sz))
 
         return None
@@ -349,12 +412,35 @@ class DirectHeaderDeps(HeaderDepsBase):
         """Internal use.  Find the given include file.
         Start at the current working directory then try the project includes
         """
+        store = self._include_store
+        if store is not None:
+            hit, resolved = store.lookup(cwd, str(include))
+            if hit:
+                return resolved
+
+        resolved = self._probe_include(include, cwd)
+        if store is not None:
+            store.record(cwd, str(include), resolved, self._include_watch_dirs(include, cwd))
+        return resolved
+
+    def _peek_include(self, include: sz.Str, cwd: str):
+        """``_find_include`` for speculative callers (the hunter's prewarm,
+        which ignores conditionals): reads the persistent resolution store
+        but neither adds to it nor fills ``_find_include``'s memo, so the
+        real walk still records what it actually resolves."""
+        store = self._include_store
+        if store is not None:
+            hit, resolved = store.lookup(cwd, str(include))
+            if hit:
+                return resolved
+        return self._probe_include(include, cwd)
+
+    def _probe_include(self, include: sz.Str, cwd: str):
         # Check if the file is referable from the current working directory
         # if that guess doesn't exist then try all the include paths
         trialpath_sz = compiletools.wrappedos.join_sz(sz.Str(cwd), include)
-        if compiletools.wrappedos.isfile_sz(trialpath_sz):
+        if compiletools.wrappedos.isfile_listed_sz(trialpath_sz):
             return str(compiletools.wrappedos.realpath_sz(trialpath_sz))
-
         return self._search_project_includes(include)
 
     @instance_cache
@@ -604,8 +690,35 @@ class DirectHeaderDeps(HeaderDepsBase):
         pass  # Instance caches are per-instance; nothing class-level to clear
 
 
+def parse_mm_output(output: str) -> list[str]:
+    """The prerequisite paths of a ``cpp -MM`` make rule, in order.
+
+    One pass over the text instead of ``split(":")`` plus per-token strips:
+    the target is everything up to the first ``": "`` (so a ``:`` inside a
+    path survives), line continuations fold to spaces, and make's
+    ``\\ `` escape keeps a space-containing path as one token.
+    """
+    sep = output.find(": ")
+    if sep < 0:
+        sep = output.find(":")
+        if sep < 0:
+            return []
+    body = output[sep + 1 :].replace("\\\n", " ")
+    if "\\ " not in body:
+        return body.split()
+    return [tok.replace("\\ ", " ") for tok in _MM_TOKEN_SPLIT_RE.split(body.strip()) if tok]
+
+
 class CppHeaderDeps(HeaderDepsBase):
-    """Using the C Pre Processor, create the list of headers that the given file depends upon."""
+    """Using the C Pre Processor, create the list of headers that the given file depends upon.
+
+    Results are shared through the BuildContext, keyed by the file, its
+    content hash and the preprocessor command, and revalidated against the
+    content hashes of the headers they list. :meth:`prefetch` fills that
+    cache for many files at once on a bounded thread pool, so a dependency
+    walk that knows its next frontier pays for one round of concurrent
+    ``cpp -MM`` forks instead of one sequential fork per file.
+    """
 
     def __init__(self, args, context, *, extra_include_dirs=None):
         HeaderDepsBase.__init__(self, args, context=context, extra_include_dirs=extra_include_dirs)
@@ -614,6 +727,15 @@ class CppHeaderDeps(HeaderDepsBase):
         # pre-split tokens, so a space in an include path survives as one
         # -I token. (DirectHeaderDeps keeps raw strings; see CLAUDE.md.)
         self._extra_include_args = [f"-I{d}" for d in self._extra_include_dirs]
+        self._mm_args = ["-MM", *self._extra_include_args]
+        # Exclude system paths. Use proper shell parsing instead of regex to
+        # handle quoted paths with spaces.
+        isystem_paths = self._extract_isystem_paths_from_flags(self._cpp_flag_string())
+        self._system_paths = tuple(
+            item for pth in isystem_paths for item in (pth, compiletools.wrappedos.realpath(pth))
+        )
+        self._flag_key: str | None = None
+        self._offered: set[str] = set()
 
     def process(self, filename: str, macro_cache_key: MacroCacheKey) -> list[str]:
         """Process using cpp -MM (raises error if macro_cache_key non-empty).
@@ -634,44 +756,113 @@ class CppHeaderDeps(HeaderDepsBase):
         realpath = compiletools.wrappedos.realpath(filename)
         return self._process_impl(realpath, macro_cache_key)
 
+    def _is_system(self, path: str) -> bool:
+        return any(Path(path).is_relative_to(syspath) for syspath in self._system_paths)
+
+    def _cache_key(self, realpath: str) -> tuple[str, str, str]:
+        """(file, content hash, preprocessor command minus the file). The path
+        is part of it: quote includes resolve relative to the file's directory,
+        so equal content elsewhere can have different dependencies."""
+        if self._flag_key is None:
+            self._flag_key = "\x1f".join(self.preprocessor.command("", self._mm_args))
+        return realpath, get_file_hash(realpath, self.context), self._flag_key
+
+    def _cached_deps(self, key) -> list[str] | None:
+        hit = self.context.cpp_deps_cache.get(key)
+        if hit is None:
+            return None
+        deps, dep_hashes = hit
+        try:
+            if any(get_file_hash(d, self.context) != h for d, h in zip(deps, dep_hashes)):
+                return None
+        except OSError:
+            return None
+        return list(deps)
+
+    def _store(self, realpath: str, key, output: str) -> list[str]:
+        # Use realpath to get rid of  // and ../../ etc in paths (similar to normpath) and
+        # to get the full path even to files in the current working directory.
+        # Also remove the initially given realpath and /dev/null from the list.
+        deps = compiletools.utils.ordered_unique(
+            [
+                compiletools.wrappedos.realpath(x)
+                for x in parse_mm_output(output)
+                if x not in (realpath, "/dev/null") and not self._is_system(x)
+            ]
+        )
+        try:
+            dep_hashes = tuple(get_file_hash(d, self.context) for d in deps)
+        except OSError:
+            return deps  # a dependency vanished mid-walk: answer, but do not cache
+        self.context.cpp_deps_cache[key] = (tuple(deps), dep_hashes)
+        return deps
+
     def _process_impl(self, realpath: str, macro_cache_key: MacroCacheKey) -> list[str]:
         """Use the -MM option to the compiler to generate the list of dependencies
         If you supply a header file rather than a source file then
         a dummy, blank, source file will be transparently provided
         and the supplied header file will be included into the dummy source file.
         """
-        # Exclude system paths. Use proper shell parsing instead of regex to
-        # handle quoted paths with spaces.
-        isystem_paths = self._extract_isystem_paths_from_flags(self._cpp_flag_string())
-        system_paths = tuple(item for pth in isystem_paths for item in (pth, compiletools.wrappedos.realpath(pth)))
-        realpath_obj = Path(realpath)
-        if any(realpath_obj.is_relative_to(syspath) for syspath in system_paths):
+        if self._is_system(realpath):
             return []
-
-        extraargs = ["-MM", *self._extra_include_args]
-        output = self.preprocessor.process(realpath, extraargs=extraargs)
+        key = self._cache_key(realpath)
+        cached = self._cached_deps(key)
+        if cached is not None:
+            return cached
 
         # output will be something like
         # test_direct_include.o: tests/test_direct_include.cpp
         # tests/get_numbers.hpp tests/get_double.hpp tests/get_int.hpp
         # We need to throw away the object file and only keep the dependency
         # list
-        deplist = output.split(":")[1]
+        output = self.preprocessor.process(realpath, extraargs=self._mm_args)
+        return self._store(realpath, key, output)
 
-        # Strip non-space whitespace, remove any backslashes, and remove any empty strings
-        # Also remove the initially given realpath and /dev/null from the list
-        # Use a set to inherently remove any redundancies
-        # Use realpath to get rid of  // and ../../ etc in paths (similar to normpath) and
-        # to get the full path even to files in the current working directory
-        return compiletools.utils.ordered_unique(
-            [
-                compiletools.wrappedos.realpath(x)
-                for x in deplist.split()
-                if x.strip("\\\t\n\r")
-                and x not in [realpath, "/dev/null"]
-                and not any(Path(x).is_relative_to(syspath) for syspath in system_paths)
-            ]
-        )
+    def _run_mm_quiet(self, realpath: str) -> str | None:
+        """One prefetch job. Failures return None and are left for the
+        sequential :meth:`process` call to re-run and report in context."""
+        try:
+            proc = subprocess.run(
+                self.preprocessor.command(realpath, self._mm_args),
+                capture_output=True,
+                text=True,
+                check=False,
+            )
+        except OSError:
+            return None
+        return proc.stdout if proc.returncode == 0 else None
+
+    def prefetch(self, filenames) -> None:
+        """Compute the dependencies of *filenames* concurrently, ahead of
+        :meth:`process`. Bounded by ``--jobs``; a no-op for fewer than two
+        uncached files."""
+        todo = []
+        for filename in filenames:
+            realpath = compiletools.wrappedos.realpath(filename)
+            # A walk re-offers the same frontier from every file it reaches;
+            # each path is considered once per instance, without revalidation
+            # (process() revalidates on use).
+            if realpath in self._offered:
+                continue
+            self._offered.add(realpath)
+            if self._is_system(realpath):
+                continue
+            try:
+                key = self._cache_key(realpath)
+            except OSError:
+                continue
+            if key not in self.context.cpp_deps_cache:
+                todo.append((realpath, key))
+        if len(todo) < 2:
+            return
+        workers = min(len(todo), max(1, getattr(self.args, "parallel", None) or os.cpu_count() or 1))
+        if self.args.verbose >= 4:
+            print(f"CppHeaderDeps::prefetch: {len(todo)} files on {workers} workers")
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as pool:
+            outputs = list(pool.map(self._run_mm_quiet, [realpath for realpath, _ in todo]))
+        for (realpath, key), output in zip(todo, outputs):
+            if output is not None:
+                self._store(realpath, key, output)
 
     @staticmethod
     def clear_cache():
@@ -221,6 +221,7 @@ def main(argv=None):
     magicparser.parse(args.filename[0])
     macro_state_key = magicparser.get_final_macro_state_key(compiletools.wrappedos.realpath(args.filename[0]))
     inctree = ht.generatetree(args.filename[0], macro_cache_key=macro_state_key)
+    compiletools.headerdeps.save_include_caches(context)
     styleclass = globals()[args.style.title() + "Style"]
 
     # Construct an instance of the style class which will print the header
@@ -3,6 +3,8 @@ import os
 import sys
 from collections.abc import Callable
 
+import stringzilla
+
 import compiletools.apptools
 import compiletools.apptools_pkgconfig
 import compiletools.diagnostics
@@ -128,6 +130,10 @@ class Hunter:
 
         # Pass macro_state_key to preserve file-level macro context when analyzing headers
         headers = tuple(self.headerdeps.process(realpath, macro_state_key))
+        # Every header and implied source listed here is walked next.
+        self._prefetch_deps(
+            dep for h in headers for dep in (h, compiletools.utils.implied_source(h)) if dep != realpath
+        )
 
         sources = ()
         if self.args.allow_magic_source_in_header or compiletools.utils.is_source(realpath):
@@ -153,6 +159,78 @@ class Hunter:
 
         return (headers, sources)
 
+    def _prefetch_deps(self, filenames) -> None:
+        """Hand the walk's next frontier to a headerdeps that can batch it.
+
+        Only CppHeaderDeps has ``prefetch`` (one concurrent round of
+        ``cpp -MM`` instead of a sequential fork per file); for the direct
+        walker this is a no-op.
+        """
+        prefetch = getattr(self.headerdeps, "prefetch", None)
+        if prefetch is None:
+            return
+        todo = [f for f in filenames if f]
+        if todo:
+            prefetch(todo)
+
+    def _prewarm_analysis(self, filenames) -> None:
+        """Analyze everything the targets can reach before walking them.
+
+        The per-target walk (magic flags, macro state, conditional includes)
+        stays serial: its state is shared by identity with the build graph
+        and does not cross a process boundary. What it mostly waits on,
+        though, is ``analyze_file``, and that is keyed by content hash alone.
+        So the reachable set is found level by level -- every include
+        resolved through the headerdeps' own ``_peek_include``, conditionals
+        ignored, plus implied sources -- and each level is handed to
+        ``file_analyzer.analyze_files``, which spreads a large one across
+        worker processes. The walk then reads a warm cache. A headerdeps
+        without ``_peek_include`` (``cpp -MM``) only warms the targets.
+
+        Only worth it while a level is big enough for the pool: below
+        ``_PARALLEL_ANALYSIS_MIN_FILES`` the prewarm stops and the walk
+        analyzes the rest itself, rather than paying a second serial pass.
+        Resolutions made here are not persisted to the include cache --
+        with conditionals ignored they include headers the walk never
+        reaches.
+        """
+        min_files = compiletools.file_analyzer._PARALLEL_ANALYSIS_MIN_FILES
+        if self.context.analyzer_args is None:
+            compiletools.file_analyzer.set_analyzer_args(self.args, self.context)
+        peek_include = getattr(self.headerdeps, "_peek_include", None)
+        max_workers = getattr(self.args, "parallel", None)
+        seen = set()
+        frontier = []
+        for filename in filenames:
+            realpath = compiletools.wrappedos.realpath(filename)
+            if realpath not in seen:
+                seen.add(realpath)
+                frontier.append(realpath)
+        while len(frontier) >= min_files:
+            hashed = []
+            for realpath in frontier:
+                try:
+                    hashed.append((realpath, get_file_hash(realpath, self.context)))
+                except FileNotFoundError:
+                    continue
+            compiletools.file_analyzer.analyze_files([h for _r, h in hashed], self.context, max_workers=max_workers)
+            if peek_include is None:
+                return
+            frontier = []
+            for realpath, content_hash in hashed:
+                result = self.context.analyze_file_cache.get(content_hash)
+                if result is None:
+                    continue
+                cwd = compiletools.wrappedos.dirname(realpath)
+                for inc in result.includes:
+                    if inc.get("is_commented", False):
+                        continue
+                    header = peek_include(stringzilla.Str(inc["filename"]), cwd)
+                    for dep in (header, compiletools.utils.implied_source(header) if header else None):
+                        if dep and dep not in seen:
+                            seen.add(dep)
+                            frontier.append(dep)
+
     def _module_interface_sources_for(self, realpath: str) -> tuple[str, ...]:
         """Return module-related source paths for every module this TU imports.
 
@@ -761,6 +839,8 @@ class Hunter:
             print(f"Hunter::huntsource - Initial sources: {initial_sources}")
 
         # Expand each source to include its dependencies
+        self._prefetch_deps(s for s in initial_sources if os.path.exists(s))
+        self._prewarm_analysis(s for s in initial_sources if os.path.exists(s))
         all_sources = set()
         for source in initial_sources:
             try:
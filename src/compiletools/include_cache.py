@@ -0,0 +1,203 @@
+"""Persistent ``#include`` resolution cache for DirectHeaderDeps.
+
+Resolving ``#include "x.h"`` means probing the including file's directory and
+then every ``-I`` directory in order until a regular file turns up. A system
+header spelling (``<vector>``) misses in every project directory, so a warm
+``ct-cake`` / ``ct-headertree`` re-stats thousands of candidate paths whose
+answers have not changed since the last run. This module remembers, per
+include-path fingerprint, ``(cwd, spelling) -> resolved realpath | None``
+across invocations.
+
+Invalidation is by directory mtime. The answer to a probe sequence can only
+change when an entry is created, removed or renamed in a directory a probe
+looked in -- exactly what bumps that directory's mtime -- so each cached
+answer records the directories its probes touched. A directory that did not
+exist is recorded as missing and watched through its nearest existing
+ancestor, whose mtime changes when the missing one is created. Each directory
+is stat'ed at most once per ``wrappedos`` cache generation however many
+entries share it.
+
+Directories modified within ``_RACY_WINDOW_NS`` of the process start are
+never trusted for persistence (git's "racily clean" rule): a file created in
+the same mtime tick as the snapshot would otherwise go unnoticed forever.
+
+Best-effort like ``rule_cost``: a missing, corrupt or unwritable sidecar
+yields an empty cache and must never fail a build.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import time
+
+import compiletools.wrappedos
+
+_VERSION = 1
+_FILE_PREFIX = ".ct-include-cache."
+_KEY_SEP = "\x1f"
+_RACY_WINDOW_NS = 2_000_000_000
+
+# Cap on persisted entries so renamed sources and retired spellings cannot grow
+# the sidecar without bound; on overflow, the entries this process looked up or
+# recorded are kept first.
+_MAX_ENTRIES = 200_000
+
+
+def fingerprint(search_dirs) -> str:
+    """Identity of an ordered include search list. Order is part of it: the
+    same directories in a different order resolve shadowed headers differently."""
+    payload = "\0".join([f"v{_VERSION}", *search_dirs])
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+
+def sidecar_path(cache_dir: str, search_dirs) -> str:
+    return os.path.join(cache_dir, f"{_FILE_PREFIX}{fingerprint(search_dirs)}.json")
+
+
+def watch_dirs(trialpath: str) -> list[str]:
+    """Directories whose mtime covers the answer to probing *trialpath*.
+
+    The containing directory, plus -- while it does not exist -- each missing
+    ancestor and finally the nearest existing one, since creating the missing
+    directory is what would change the answer.
+    """
+    watched = []
+    d = os.path.dirname(os.path.normpath(trialpath))
+    while True:
+        watched.append(d)
+        if compiletools.wrappedos.isdir(d):
+            return watched
+        parent = os.path.dirname(d)
+        if parent == d:
+            return watched
+        d = parent
+
+
+class IncludeResolutionCache:
+    """One include-path fingerprint's persistent resolutions.
+
+    Entries are ``key -> (resolved | None, dir_indices)``, indices into a
+    shared ``dirs`` table that holds each watched directory's mtime at the
+    time it was recorded. Loaded lazily on the first lookup.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._loaded = False
+        self._dirs: list[str] = []
+        self._dir_mtimes: list[int] = []
+        self._dir_index: dict[str, int] = {}
+        self._entries: dict[str, tuple[str | None, tuple[int, ...]]] = {}
+        self._touched: set[str] = set()
+        self._dirty = False
+        self._racy_floor = time.time_ns() - _RACY_WINDOW_NS
+        self.hits = 0
+        self.misses = 0
+
+    def _load(self) -> None:
+        self._loaded = True
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") != _VERSION:
+                return
+            dirs = [str(d) for d in data["dirs"]]
+            mtimes = [int(m) for m in data["mtimes"]]
+            entries = {
+                str(k): (None if v[0] is None else str(v[0]), tuple(int(i) for i in v[1]))
+                for k, v in data["entries"].items()
+            }
+        except (OSError, ValueError, KeyError, TypeError, IndexError, AttributeError):
+            return
+        if len(dirs) != len(mtimes) or any(i >= len(dirs) for _, idx in entries.values() for i in idx):
+            return
+        self._dirs, self._dir_mtimes, self._entries = dirs, mtimes, entries
+        self._dir_index = {d: i for i, d in enumerate(dirs)}
+
+    @staticmethod
+    def _mtime(d: str) -> int:
+        # Through wrappedos so the memo is dropped with the rest of the stat
+        # cache whenever the filesystem is known to have moved under the build
+        # (prebuild scripts, //#GIT= fetch rounds).
+        return compiletools.wrappedos.mtime_ns(d)
+
+    def _index(self, d: str) -> int:
+        i = self._dir_index.get(d)
+        mtime = self._mtime(d)
+        if i is None or self._dir_mtimes[i] != mtime:
+            # A stale slot is left in place, not updated: the entries still
+            # pointing at the old mtime must keep failing validation (they are
+            # dropped at save), so the fresh snapshot gets a slot of its own.
+            i = self._dir_index[d] = len(self._dirs)
+            self._dirs.append(d)
+            self._dir_mtimes.append(mtime)
+        return i
+
+    def _valid(self, entry: tuple[str | None, tuple[int, ...]]) -> bool:
+        resolved, idx = entry
+        if any(self._mtime(self._dirs[i]) != self._dir_mtimes[i] for i in idx):
+            return False
+        return resolved is None or compiletools.wrappedos.isfile(resolved)
+
+    def lookup(self, cwd: str, include: str) -> tuple[bool, str | None]:
+        """``(True, resolved)`` when a still-valid answer is cached, else ``(False, None)``."""
+        if not self._loaded:
+            self._load()
+        key = f"{cwd}{_KEY_SEP}{include}"
+        entry = self._entries.get(key)
+        if entry is not None and self._valid(entry):
+            self._touched.add(key)
+            self.hits += 1
+            return True, entry[0]
+        self.misses += 1
+        return False, None
+
+    def record(self, cwd: str, include: str, resolved: str | None, watched) -> None:
+        """Remember *resolved* for ``(cwd, include)``, valid while every
+        directory in *watched* keeps its current mtime."""
+        if not self._loaded:
+            self._load()
+        if any(self._mtime(d) >= self._racy_floor for d in watched):
+            return  # racily modified: cannot prove a later change would bump it
+        key = f"{cwd}{_KEY_SEP}{include}"
+        self._entries[key] = (resolved, tuple(sorted({self._index(d) for d in watched})))
+        self._touched.add(key)
+        self._dirty = True
+
+    def save(self) -> None:
+        """Atomically rewrite the sidecar with the still-valid entries.
+        Best-effort: swallows OSError/ValueError."""
+        if not self._dirty:
+            return
+        live = [(k, v) for k, v in self._entries.items() if self._valid(v)]
+        if len(live) > _MAX_ENTRIES:
+            live.sort(key=lambda kv: kv[0] not in self._touched)
+            live = live[:_MAX_ENTRIES]
+        # Re-number the directories the surviving entries still reference.
+        remap: dict[int, int] = {}
+        dirs: list[str] = []
+        mtimes: list[int] = []
+        entries: dict[str, list] = {}
+        for key, (resolved, idx) in live:
+            new_idx = []
+            for i in idx:
+                j = remap.get(i)
+                if j is None:
+                    j = remap[i] = len(dirs)
+                    dirs.append(self._dirs[i])
+                    mtimes.append(self._dir_mtimes[i])
+                new_idx.append(j)
+            entries[key] = [resolved, new_idx]
+        try:
+            from compiletools.filesystem_utils import atomic_output_file
+
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            # force_mode=0o666: the sidecar lives in a shared CAS pool cell
+            # (same rationale as rule_cost.save_cost_history).
+            with atomic_output_file(self.path, mode="w", encoding="utf-8", force_mode=0o666) as f:
+                json.dump({"version": _VERSION, "dirs": dirs, "mtimes": mtimes, "entries": entries}, f)
+        except (OSError, ValueError):
+            return
+        self._dirty = False
@@ -26,7 +26,9 @@ import types
 from collections.abc import Callable
 from typing import Optional
 
+import compiletools.action_cache
 import compiletools.apptools
+import compiletools.cold_tier
 import compiletools.filesystem_utils
 import compiletools.lock_utils
 import compiletools.wrappedos
@@ -970,6 +972,45 @@ def _temp_under_lock(lock, tempfile_path: str):
         lock.release()
 
 
+def rehydrate_cold_entry(lock, target: str) -> bool:
+    """Restore *target* from its compressed cold-tier sibling, if it has one.
+
+    ``ct-trim-cache --compress-cold`` replaces a cold CAS entry with a
+    compressed sibling (see ``cold_tier``). A build that needs the entry again
+    finds it missing and lands here, on its miss path, before it would compile
+    or link. The sibling is decoded into ``{target}.{pid}.{rand}.tmp`` and
+    renamed onto *target* under *lock*, the same temp+rename publication
+    ``atomic_compile`` uses, so an unlocked reader sees the whole entry or
+    none of it. The sibling is removed afterwards: the raw entry is the
+    live copy again.
+
+    Returns True when *target* exists afterwards (rehydrated here, or by a
+    peer that held the lock first). An absent, unreadable or corrupt sibling
+    returns False and the caller builds *target* as usual.
+    """
+    cold = compiletools.cold_tier.find_cold(target)
+    if cold is None:
+        return False
+    if lock is None:
+        lock = _NullLock()
+    tempfile_path = f"{target}.{os.getpid()}.{os.urandom(2).hex()}.tmp"
+    with _temp_under_lock(lock, tempfile_path):
+        if os.path.exists(target):
+            return True
+        try:
+            compiletools.cold_tier.decompress(cold, tempfile_path)
+        except (OSError, EOFError, ValueError) as e:
+            # A truncated or corrupt sibling (gzip.BadGzipFile is an OSError,
+            # zstd errors are ValueError subclasses) must cost a rebuild, not
+            # the build.
+            print(f"Warning: cannot rehydrate {target} from {cold} ({e}); rebuilding", file=sys.stderr)
+            return False
+        os.replace(tempfile_path, target)
+        with contextlib.suppress(OSError):
+            os.unlink(cold)
+    return True
+
+
 def atomic_compile(
     lock,
     target: str,
@@ -1178,19 +1219,33 @@ def execute_compile_rule(
     (a peer / prior build already produced the artefact — i.e. a CAS
     hit), ``False`` when the compiler was actually invoked.  Callers
     use this to populate ``cas.hit`` metadata on per-rule TimingEvents.
+
+    With ``--action-cache`` configured, a missing object is first fetched
+    from the cache (also reported as a hit) and a compile that actually
+    ran uploads its object. Only CAS-addressed compiles (``skip_if_exists``)
+    take part: a non-CA output is not named after its inputs, so its path
+    cannot be a cache key.
     """
     try:
         o_idx = cmd.index("-o")
     except ValueError as e:
         raise AssertionError(f"compile rule for {target!r} missing -o flag: {cmd}") from e
     cmd_without_output = cmd[:o_idx] + cmd[o_idx + 2 :]
+    lock = FileLock(target, args).lock
+    if skip_if_exists and rehydrate_cold_entry(lock, target):
+        return True
+    cache = compiletools.action_cache.from_args(args) if skip_if_exists else None
+    if compiletools.action_cache.fetch_object(cache, target):
+        return True
     result = atomic_compile(
-        FileLock(target, args).lock,
+        lock,
         target,
         cmd_without_output,
         skip_if_exists=skip_if_exists,
         cwd=cwd,
     )
+    if result is not None:
+        compiletools.action_cache.store_object(cache, target, upload=compiletools.action_cache.upload_enabled(args))
     return result is None
 
 
@@ -1211,7 +1266,10 @@ def execute_link_rule(
     Returns ``True`` on a CAS short-circuit (target already present),
     ``False`` when the linker actually ran.
     """
-    result = atomic_link(FileLock(target, args).lock, target, cmd, skip_if_exists=skip_if_exists)
+    lock = FileLock(target, args).lock
+    if skip_if_exists and rehydrate_cold_entry(lock, target):
+        return True
+    result = atomic_link(lock, target, cmd, skip_if_exists=skip_if_exists)
     return result is None
 
 
@@ -1460,14 +1518,28 @@ async def execute_compile_rule_async(
     on_reap: Callable[[int], None] | None = None,
 ) -> bool:
     """Async twin of ``execute_compile_rule``. Strips ``-o target`` and runs
-    under a target-keyed FileLock. Returns True on a CAS short-circuit."""
+    under a target-keyed FileLock. Returns True on a CAS short-circuit
+    (including an action-cache fetch). The action-cache round trips run on
+    a worker thread so a slow cache never stalls the event loop."""
     try:
         o_idx = cmd.index("-o")
     except ValueError as e:
         raise AssertionError(f"compile rule for {target!r} missing -o flag: {cmd}") from e
     cmd_without_output = cmd[:o_idx] + cmd[o_idx + 2 :]
+    lock = FileLock(target, args).lock
+    # The sibling probe is one stat; only an actual rehydration (lock wait
+    # plus decode) is worth the thread hop.
+    if (
+        skip_if_exists
+        and compiletools.cold_tier.find_cold(target) is not None
+        and await asyncio.to_thread(rehydrate_cold_entry, lock, target)
+    ):
+        return True
+    cache = compiletools.action_cache.from_args(args) if skip_if_exists else None
+    if cache is not None and await asyncio.to_thread(compiletools.action_cache.fetch_object, cache, target):
+        return True
     result = await atomic_compile_async(
-        FileLock(target, args).lock,
+        lock,
         target,
         cmd_without_output,
         skip_if_exists=skip_if_exists,
@@ -1475,6 +1547,13 @@ async def execute_compile_rule_async(
         on_spawn=on_spawn,
         on_reap=on_reap,
     )
+    if cache is not None and result is not None:
+        await asyncio.to_thread(
+            compiletools.action_cache.store_object,
+            cache,
+            target,
+            upload=compiletools.action_cache.upload_enabled(args),
+        )
     return result is None
 
 
@@ -1488,8 +1567,15 @@ async def execute_link_rule_async(
     on_reap: Callable[[int], None] | None = None,
 ) -> bool:
     """Async twin of ``execute_link_rule``. Returns True on a CAS short-circuit."""
+    lock = FileLock(target, args).lock
+    if (
+        skip_if_exists
+        and compiletools.cold_tier.find_cold(target) is not None
+        and await asyncio.to_thread(rehydrate_cold_entry, lock, target)
+    ):
+        return True
     result = await atomic_link_async(
-        FileLock(target, args).lock,
+        lock,
         target,
         cmd,
         skip_if_exists=skip_if_exists,
@@ -155,7 +155,10 @@ class MakefileBackend(BuildBackend):
         Empty string when there is nothing to emit (no publish rules, or
         ``--use-mtime``, where a published exe's timestamp is a rebuild input
         rather than cache bookkeeping — same exclusion
-        ``BuildBackend._freshen_published_cas_entries`` applies).
+        ``BuildBackend._freshen_published_cas_entries`` applies). Also empty
+        under ``--access-journal``, whose point is that no build touches entry
+        mtimes; the execute-side pass journals instead, so a Makefile run
+        without ``ct-cake`` records no use.
 
         Why a directive and not a rule. ``ct-create-makefile`` writes the
         Makefile and returns; nothing calls ``execute()``, so the execute-side
@@ -200,7 +203,7 @@ class MakefileBackend(BuildBackend):
         creates empty files by design and is already documented as
         inappropriate against a CAS-only build.
         """
-        if getattr(self.args, "use_mtime", False):
+        if getattr(self.args, "use_mtime", False) or getattr(self.args, "access_journal", False) is True:
             return ""
         entries = self._published_cas_entries(graph)
         if not entries:
@@ -272,13 +275,25 @@ class MakefileBackend(BuildBackend):
         # Ensure "all" comes first among phony rules
         phony_rules.sort(key=lambda r: (0 if r.output == "all" else 1, r.output))
 
+        # Publishes sharing a directory run as one ``ct-cas-publish --batch``
+        # recipe. That needs the grouped-target form: the plain multi-target
+        # fallback would run the whole batch once per member.
+        publish_batches = self._publish_batches(graph) if grouped_target_supported else {}
+
         for rule in phony_rules + non_phony_rules:
             if rule.rule_type == RuleType.PHONY:
                 f.write(f".PHONY: {rule.output}\n")
 
             outputs = rule.output
             target_separator = ":"
-            if self._is_framework_test(rule):
+            batch = publish_batches.get(rule.output)
+            if batch is not None:
+                if rule is not batch[0]:
+                    continue
+                rule = self._batched_publish_rule(batch)
+                outputs = " ".join(member.output for member in batch)
+                target_separator = " &:"
+            elif self._is_framework_test(rule):
                 # Framework tests with --test-xml-dir produce two observable
                 # files on success: the JUnit XML report and the .result stamp.
                 # The XML is .PRECIOUS so failed reports survive, but a later
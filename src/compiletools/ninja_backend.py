@@ -114,7 +114,16 @@ class NinjaBackend(BuildBackend):
         # ``ninja runtests`` invocations, silently skipping the re-run.
         framework_test_success_markers = self._framework_test_markers(graph)
 
+        # Publishes sharing a directory become one multi-output edge running
+        # a single ``ct-cas-publish --batch``.
+        publish_batches = self._publish_batches(graph)
+
         for rule in graph.rules:
+            batch = publish_batches.get(rule.output)
+            if batch is not None:
+                if rule is not batch[0]:
+                    continue
+                rule = self._batched_publish_rule(batch)
             if rule.rule_type == RuleType.PHONY:
                 inputs = list(rule.inputs)
                 if rule.output == "runtests":
@@ -127,7 +136,9 @@ class NinjaBackend(BuildBackend):
                 is_module_iface = rule.rule_type == RuleType.COMPILE and rule.output in module_iface_outputs
                 ninja_rule = "compile_module_iface_cmd" if is_module_iface else f"{rule.rule_type}_cmd"
                 outputs = rule.output
-                if self._is_framework_test(rule):
+                if batch is not None:
+                    outputs = " ".join(member.output for member in batch)
+                elif self._is_framework_test(rule):
                     outputs = f"{rule.output} {rule.success_marker}"
                 if self._cas_demotes_inputs(rule):
                     # CAS-only: producer's cached path encodes the cache
@@ -4,6 +4,9 @@ Public symbols are re-exported from submodules:
 
 - ``export_buildtimer`` (from ``traces``) -- ships the in-memory
   BuildTimer span tree as OTLP spans at the end of a build.
+- ``start_live_export`` / ``LiveSpanExporter`` (from ``streaming``) --
+  ships each rule's span while the build runs (``--otel-stream``);
+  ``LiveSpanExporter.close`` ships the root and phase spans at the end.
 - ``export_cache_metrics`` (from ``metrics``) -- ships CAS-health gauges
   for ``ct-cache-report --otel-export``.
 - ``export_ccache_metrics`` (from ``metrics``) -- ships parsed ccache
@@ -24,13 +27,16 @@ from compiletools.otel.aggregates import (
     derive_rule_cache_layer,
 )
 from compiletools.otel.metrics import export_cache_metrics, export_ccache_metrics
+from compiletools.otel.streaming import LiveSpanExporter, start_live_export
 from compiletools.otel.traces import export_buildtimer
 
 __all__ = [
+    "LiveSpanExporter",
     "annotate_rule_cache_layers",
     "derive_build_aggregates",
     "derive_rule_cache_layer",
     "export_buildtimer",
     "export_cache_metrics",
     "export_ccache_metrics",
+    "start_live_export",
 ]
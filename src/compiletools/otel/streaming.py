@@ -0,0 +1,318 @@
+"""Live OpenTelemetry (OTLP) export of rule spans while the build runs.
+
+``export_buildtimer`` ships the whole span tree once the build has
+finished, so a long build is invisible in the tracing backend until it
+ends and the export of a very large tree happens all at once.
+:class:`LiveSpanExporter` instead subscribes to
+``BuildTimer.add_rule_listener`` and ships each rule's span shortly after
+``record_rule`` records it:
+
+* the recording thread only hands the event to a bounded queue -- it
+  never blocks and never touches the SDK;
+* a background thread drains the queue in batches, turns each batch into
+  spans and flushes them to the collector before taking the next one, so
+  the SDK's own span queue never overflows behind our back;
+* when the queue is full the rule is counted as dropped from the live
+  stream and shipped by :meth:`LiveSpanExporter.close` instead, so the
+  trace is still complete -- the count lands on the root span as
+  ``ct.otel.stream.dropped``.
+
+The root ``compiletools.build`` span and the phase spans stay open for the
+whole build (their end times are not known earlier); ``close`` ends them
+after lifting the root metadata -- the ccache headline numbers and the
+``otel.aggregates`` cross-layer cache aggregates -- exactly as the
+end-of-build exporter does.
+
+Lazy SDK import; install the optional ``otel`` extra
+(``pip install 'compiletools[otel]'``) to enable.
+"""
+
+from __future__ import annotations
+
+import queue
+import sys
+import threading
+import time
+from typing import TYPE_CHECKING
+
+from compiletools.otel._connection import (
+    MISSING_EXTRA_HINT,
+    _build_processor,
+    build_resource,
+)
+from compiletools.otel.traces import (
+    _event_end_s,
+    _event_span_name,
+    _flush_and_shutdown,
+    _set_event_attributes,
+    _set_root_attributes,
+    _to_wall_ns,
+)
+
+if TYPE_CHECKING:
+    from compiletools.build_timer import BuildTimer, TimingEvent
+
+# Matches the SDK BatchSpanProcessor's own queue and batch defaults.
+DEFAULT_QUEUE_SIZE = 2048
+DEFAULT_BATCH_SIZE = 512
+# How long the exporter thread waits for a batch to fill before shipping
+# what it has; bounds the lag between a rule finishing and its span
+# reaching the collector.
+DEFAULT_BATCH_DELAY_S = 1.0
+# Upper bound on waiting for the exporter thread at close(); the flush it
+# may be inside is itself bounded by the per-request OTLP timeout.
+_JOIN_TIMEOUT_S = 30.0
+
+_STOP = object()
+
+
+class LiveSpanExporter:
+    """Stream a BuildTimer's rule spans to OTLP as they are recorded.
+
+    Construct through :func:`start_live_export`; call :meth:`close` once
+    the build (and the root-metadata producers) are done.
+    """
+
+    def __init__(
+        self,
+        timer: BuildTimer,
+        args,
+        *,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        batch_delay_s: float = DEFAULT_BATCH_DELAY_S,
+        _processor=None,
+    ) -> None:
+        try:
+            from opentelemetry import context as otel_context
+            from opentelemetry import trace
+            from opentelemetry.sdk.trace import TracerProvider
+        except ImportError as exc:
+            raise RuntimeError(MISSING_EXTRA_HINT) from exc
+
+        self._timer = timer
+        self._args = args
+        self._batch_size = max(1, batch_size)
+        self._batch_delay_s = batch_delay_s
+        self._offset = timer._wall_to_monotonic_offset
+        self._queue: queue.Queue = queue.Queue(maxsize=max(1, queue_size))
+        self._lock = threading.Lock()
+        self._overflow: list[tuple[TimingEvent, tuple[TimingEvent, ...]]] = []
+        self._closed = False
+        self.emitted = 0
+
+        self._provider = TracerProvider(resource=build_resource(args))
+        self._provider.add_span_processor(_processor if _processor is not None else _build_processor(args))
+        self._tracer = self._provider.get_tracer("compiletools")
+
+        # Force a fresh root, as export_buildtimer does: an empty Context()
+        # keeps an ambient span (CI wrapper, profiler) from parenting it.
+        self._root_span = self._tracer.start_span(
+            "compiletools.build",
+            context=otel_context.Context(),
+            start_time=_to_wall_ns(timer._root.start_s, self._offset),
+        )
+        self._root_ctx = trace.set_span_in_context(self._root_span, otel_context.Context())
+        # id(phase TimingEvent) -> (span, context); touched by the exporter
+        # thread while it runs and by close() after it has been joined.
+        self._phase_spans: dict[int, tuple] = {}
+
+        self._thread = threading.Thread(target=self._run, name="ct-otel-stream", daemon=True)
+        self._thread.start()
+        timer.add_rule_listener(self._on_rule)
+
+    @property
+    def dropped(self) -> int:
+        """Rule spans that overflowed the live queue so far."""
+        with self._lock:
+            return len(self._overflow)
+
+    @property
+    def trace_id(self) -> str | None:
+        """Hex trace_id of the root build span."""
+        try:
+            return format(self._root_span.get_span_context().trace_id, "032x")
+        except Exception:
+            return None
+
+    # ------------------------------------------------------------ producer
+
+    def _on_rule(self, event: TimingEvent, parents: tuple[TimingEvent, ...]) -> None:
+        """``BuildTimer`` rule listener: enqueue without blocking."""
+        try:
+            self._queue.put_nowait((event, parents))
+        except queue.Full:
+            with self._lock:
+                self._overflow.append((event, parents))
+
+    # ------------------------------------------------------------ consumer
+
+    def _run(self) -> None:
+        while True:
+            batch = []
+            stop = False
+            item = self._queue.get()
+            deadline = None
+            while True:
+                if item is _STOP:
+                    stop = True
+                    break
+                batch.append(item)
+                if len(batch) >= self._batch_size:
+                    break
+                if deadline is None:
+                    deadline = time.monotonic() + self._batch_delay_s
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+            self._emit_batch(batch)
+            if stop:
+                return
+
+    def _emit_batch(self, batch) -> None:
+        """Turn *batch* into ended spans and push them to the collector.
+
+        Errors are reported and swallowed: the exporter thread must keep
+        draining the queue, and a failed export never fails the build.
+        """
+        if not batch:
+            return
+        for event, parents in batch:
+            try:
+                self._emit_rule(event, parents)
+            except Exception as exc:
+                print(f"Warning: OTLP live export failed to emit a span: {exc}", file=sys.stderr)
+        try:
+            self._provider.force_flush(timeout_millis=5000)
+        except Exception as exc:
+            print(f"Warning: OTLP live export flush raised: {exc}", file=sys.stderr)
+
+    def _emit_rule(self, event: TimingEvent, parents: tuple[TimingEvent, ...]) -> None:
+        # Same start_s == 0.0 sentinel skip as traces._emit_event.
+        if event.start_s == 0.0:
+            return
+        span = self._tracer.start_span(
+            _event_span_name(event),
+            context=self._phase_context(parents),
+            start_time=_to_wall_ns(event.start_s, self._offset),
+        )
+        try:
+            _set_event_attributes(span, event, args=self._args)
+        finally:
+            span.end(end_time=_to_wall_ns(_event_end_s(event), self._offset))
+        self.emitted += 1
+
+    def _phase_context(self, parents: tuple[TimingEvent, ...]):
+        """Context of the innermost phase in *parents*, opening phase spans
+        on first use.  ``parents[0]`` is the root event."""
+        ctx = self._root_ctx
+        for phase in parents[1:]:
+            ctx = self._open_phase(phase, ctx)[1]
+        return ctx
+
+    def _open_phase(self, phase: TimingEvent, parent_ctx):
+        from opentelemetry import trace
+
+        entry = self._phase_spans.get(id(phase))
+        if entry is None:
+            span = self._tracer.start_span(
+                _event_span_name(phase),
+                context=parent_ctx,
+                start_time=_to_wall_ns(phase.start_s, self._offset),
+            )
+            _set_event_attributes(span, phase, args=self._args)
+            entry = (span, trace.set_span_in_context(span, parent_ctx))
+            self._phase_spans[id(phase)] = entry
+        return entry
+
+    def _end_phases(self, event: TimingEvent, parent_ctx) -> None:
+        """End every phase span under *event*, emitting phases that
+        recorded no rules (and so were never opened) on the way."""
+        for child in event.children:
+            if child.category != "phase":
+                continue
+            span, ctx = self._open_phase(child, parent_ctx)
+            try:
+                self._end_phases(child, ctx)
+            finally:
+                span.end(end_time=_to_wall_ns(_event_end_s(child), self._offset))
+
+    # ------------------------------------------------------------- closing
+
+    def close(self) -> str | None:
+        """Finish the stream and return the root span's hex trace_id.
+
+        Stops listening, drains the queue, ships the rules that overflowed
+        it, then ends the phase spans and the root span -- carrying the
+        root metadata set by then, including the ``otel.aggregates``
+        cross-layer cache aggregates -- and flushes.  If the exporter
+        thread is still busy after the join timeout, the overflow and
+        phase spans are abandoned and only the root span is ended.
+        Idempotent.
+        """
+        if self._closed:
+            return self.trace_id
+        self._closed = True
+        timer = self._timer
+        timer.remove_rule_listener(self._on_rule)
+        # The sentinel put blocks on a full queue, so it shares the join's
+        # deadline rather than waiting on the exporter thread forever.
+        deadline = time.monotonic() + _JOIN_TIMEOUT_S
+        try:
+            self._queue.put(_STOP, timeout=_JOIN_TIMEOUT_S)
+        except queue.Full:
+            pass
+        self._thread.join(max(0.0, deadline - time.monotonic()))
+        # A stalled exporter thread still owns _phase_spans and the
+        # provider's flush: emitting overflow or phases alongside it would
+        # race, so only the root span is ended before shutdown.
+        stalled = self._thread.is_alive()
+        if stalled:
+            print(
+                "Warning: OTLP live export thread did not finish; some rule spans may be lost",
+                file=sys.stderr,
+            )
+        with self._lock:
+            overflow, self._overflow = self._overflow, []
+        if overflow and not stalled:
+            for i in range(0, len(overflow), self._batch_size):
+                self._emit_batch(overflow[i : i + self._batch_size])
+            print(
+                f"Warning: OTLP live export queue overflowed; {len(overflow)} rule span(s) "
+                "were shipped at end of build instead (raise --otel-stream-queue-size)",
+                file=sys.stderr,
+            )
+
+        timer.finish()
+        root_end_s = timer._root.end_s if timer._root.end_s is not None else timer._root.start_s
+        try:
+            self._root_span.set_attribute("ct.otel.stream.emitted", self.emitted)
+            self._root_span.set_attribute("ct.otel.stream.dropped", len(overflow))
+            _set_root_attributes(self._root_span, timer, args=self._args)
+            if not stalled:
+                self._end_phases(timer._root, self._root_ctx)
+        finally:
+            try:
+                self._root_span.end(end_time=_to_wall_ns(root_end_s, self._offset))
+            except Exception as exc:
+                print(f"Warning: OTLP export failed to end root span: {exc}", file=sys.stderr)
+            _flush_and_shutdown(self._provider)
+        return self.trace_id
+
+
+def start_live_export(timer: BuildTimer, args, *, _processor=None) -> LiveSpanExporter | None:
+    """Start streaming *timer*'s rule spans via OTLP.
+
+    Returns ``None`` when timing is disabled.  The queue bound comes from
+    ``args.otel_stream_queue_size``.  Raises ``RuntimeError`` if the
+    optional ``otel`` extra isn't installed.  ``_processor`` is the same
+    test seam as ``export_buildtimer``'s.
+    """
+    if not timer.enabled:
+        return None
+    queue_size = getattr(args, "otel_stream_queue_size", None) or DEFAULT_QUEUE_SIZE
+    return LiveSpanExporter(timer, args, queue_size=queue_size, _processor=_processor)
@@ -0,0 +1,220 @@
+"""Tests for the live rule-span exporter in compiletools.otel.streaming."""
+
+from __future__ import annotations
+
+import threading
+import time
+import types
+
+import pytest
+
+# importorskip the SDK, not the bare namespace package -- see test_traces.py.
+pytest.importorskip("opentelemetry.sdk")
+
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import (
+    InMemorySpanExporter,
+)
+
+from compiletools.build_timer import BuildTimer
+from compiletools.otel.streaming import LiveSpanExporter, start_live_export
+
+# ----------------------------------------------------------------- test helpers
+
+
+@pytest.fixture(autouse=True)
+def _quiet_resource(monkeypatch):
+    monkeypatch.setattr("compiletools.otel._connection.get_git_commit_sha", lambda cwd=None: "")
+    monkeypatch.setattr(
+        "compiletools.otel._connection._invocation_id_from_diag_dir",
+        lambda args: "",
+    )
+
+
+def _make_args(**overrides):
+    defaults = dict(
+        otel_service_name=None,
+        otel_endpoint=None,
+        otel_resource_attr=[],
+        otel_protocol="grpc",
+        otel_headers=None,
+        otel_insecure=None,
+        otel_stream_queue_size=None,
+        variant="gcc.debug",
+        backend="shake",
+        diagnostics_dir=None,
+        bindir=None,
+    )
+    defaults.update(overrides)
+    return types.SimpleNamespace(**defaults)
+
+
+def _record(timer: BuildTimer, name: str, offset_s: float) -> None:
+    base = timer._root.start_s
+    timer.record_rule(
+        rule_type="compile",
+        target=f"obj/{name}.o",
+        source=f"src/{name}.cpp",
+        elapsed_s=0.25,
+        start_s=base + offset_s,
+        end_s=base + offset_s + 0.25,
+        metadata={"cas.hit": False},
+    )
+
+
+def _wait_for(predicate, timeout_s: float = 5.0) -> bool:
+    deadline = time.monotonic() + timeout_s
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return predicate()
+
+
+class _GatedProcessor(SimpleSpanProcessor):
+    """Holds the exporter thread inside force_flush until released."""
+
+    def __init__(self, exporter):
+        super().__init__(exporter)
+        self.entered = threading.Event()
+        self.release = threading.Event()
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        self.entered.set()
+        self.release.wait(5)
+        return super().force_flush(timeout_millis)
+
+
+# ----------------------------------------------------------------- streaming
+
+
+class TestLiveExport:
+    def test_rule_spans_ship_before_close(self):
+        timer = BuildTimer(enabled=True)
+        sink = InMemorySpanExporter()
+        stream = LiveSpanExporter(timer, _make_args(), batch_delay_s=0.0, _processor=SimpleSpanProcessor(sink))
+        try:
+            with timer.phase("build_execution"):
+                _record(timer, "foo", 1.0)
+                assert _wait_for(lambda: len(sink.get_finished_spans()) == 1)
+            names = [s.name for s in sink.get_finished_spans()]
+            # Only the rule: root and phase spans are still open.
+            assert names == ["compile.src/foo.cpp"]
+        finally:
+            stream.close()
+
+    def test_close_completes_the_tree(self):
+        timer = BuildTimer(enabled=True)
+        sink = InMemorySpanExporter()
+        stream = LiveSpanExporter(timer, _make_args(), _processor=SimpleSpanProcessor(sink))
+        with timer.phase("build_graph"):
+            pass
+        with timer.phase("build_execution"):
+            _record(timer, "foo", 1.0)
+            _record(timer, "bar", 1.5)
+        trace_id = stream.close()
+
+        spans = sink.get_finished_spans()
+        by_name = {s.name: s for s in spans}
+        root = by_name["compiletools.build"]
+        build_exec = by_name["phase.build_execution"]
+        # A phase that recorded no rules is still emitted at close.
+        assert "phase.build_graph" in by_name
+        assert build_exec.parent.span_id == root.context.span_id
+        for name in ("compile.src/foo.cpp", "compile.src/bar.cpp"):
+            assert by_name[name].parent.span_id == build_exec.context.span_id
+            assert by_name[name].attributes["ct.target"].startswith("obj/")
+            assert by_name[name].attributes["cas.hit"] is False
+        assert {s.context.trace_id for s in spans} == {root.context.trace_id}
+        assert trace_id == format(root.context.trace_id, "032x")
+        assert root.attributes["ct.otel.stream.emitted"] == 2
+        assert root.attributes["ct.otel.stream.dropped"] == 0
+
+    def test_root_metadata_set_after_the_build_lands_on_root(self):
+        timer = BuildTimer(enabled=True)
+        sink = InMemorySpanExporter()
+        stream = LiveSpanExporter(timer, _make_args(), _processor=SimpleSpanProcessor(sink))
+        with timer.phase("build_execution"):
+            _record(timer, "foo", 1.0)
+        timer.finish()
+        timer.set_root_metadata({"ct.build.tu_total": 1, "ct.build.cas_hits": 0})
+        stream.close()
+
+        root = next(s for s in sink.get_finished_spans() if s.name == "compiletools.build")
+        assert root.attributes["ct.build.tu_total"] == 1
+        assert root.attributes["ct.build.cas_hits"] == 0
+
+    def test_overflow_is_counted_and_shipped_at_close(self, capsys):
+        timer = BuildTimer(enabled=True)
+        sink = InMemorySpanExporter()
+        processor = _GatedProcessor(sink)
+        stream = LiveSpanExporter(timer, _make_args(), queue_size=1, batch_size=1, _processor=processor)
+        with timer.phase("build_execution"):
+            _record(timer, "a", 1.0)
+            # The exporter thread now holds rule "a" and is stuck flushing:
+            # "b" fills the one-slot queue, "c" and "d" overflow.
+            assert processor.entered.wait(5)
+            for i, name in enumerate(("b", "c", "d")):
+                _record(timer, name, 2.0 + i)
+            assert stream.dropped == 2
+        processor.release.set()
+        stream.close()
+
+        by_name = {s.name: s for s in sink.get_finished_spans()}
+        assert {f"compile.src/{n}.cpp" for n in "abcd"} <= set(by_name)
+        root = by_name["compiletools.build"]
+        assert root.attributes["ct.otel.stream.dropped"] == 2
+        assert root.attributes["ct.otel.stream.emitted"] == 4
+        assert "queue overflowed; 2 rule span(s)" in capsys.readouterr().err
+
+    def test_close_with_a_stalled_thread_only_ends_the_root(self, monkeypatch, capsys):
+        monkeypatch.setattr("compiletools.otel.streaming._JOIN_TIMEOUT_S", 0.05)
+        timer = BuildTimer(enabled=True)
+        sink = InMemorySpanExporter()
+        processor = _GatedProcessor(sink)
+        stream = LiveSpanExporter(timer, _make_args(), queue_size=1, batch_size=1, _processor=processor)
+        with timer.phase("build_execution"):
+            _record(timer, "a", 1.0)
+            assert processor.entered.wait(5)
+            _record(timer, "b", 2.0)
+            _record(timer, "c", 3.0)
+        # Release the exporter thread only once close() has given up on it.
+        releaser = threading.Timer(0.5, processor.release.set)
+        releaser.start()
+        try:
+            stream.close()
+        finally:
+            releaser.join()
+
+        by_name = {s.name: s for s in sink.get_finished_spans()}
+        assert by_name["compiletools.build"].attributes["ct.otel.stream.dropped"] == 1
+        assert "phase.build_execution" not in by_name
+        assert "compile.src/c.cpp" not in by_name
+        err = capsys.readouterr().err
+        assert "did not finish" in err
+        assert "queue overflowed" not in err
+
+    def test_close_is_idempotent_and_detaches(self):
+        timer = BuildTimer(enabled=True)
+        sink = InMemorySpanExporter()
+        stream = LiveSpanExporter(timer, _make_args(), _processor=SimpleSpanProcessor(sink))
+        first = stream.close()
+        assert stream.close() == first
+        _record(timer, "late", 3.0)
+        assert not any(s.name == "compile.src/late.cpp" for s in sink.get_finished_spans())
+
+    def test_start_live_export_disabled_timer(self):
+        assert start_live_export(BuildTimer(enabled=False), _make_args()) is None
+
+    def test_start_live_export_uses_the_queue_size_option(self):
+        timer = BuildTimer(enabled=True)
+        stream = start_live_export(
+            timer,
+            _make_args(otel_stream_queue_size=7),
+            _processor=SimpleSpanProcessor(InMemorySpanExporter()),
+        )
+        assert stream is not None
+        try:
+            assert stream._queue.maxsize == 7
+        finally:
+            stream.close()
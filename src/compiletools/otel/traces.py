@@ -52,6 +52,46 @@ def _rule_span_name(event: TimingEvent) -> str:
     return f"{event.category}.{event.name}"
 
 
+def _event_span_name(event: TimingEvent) -> str:
+    """Span name for a phase or rule event."""
+    if event.category == "phase":
+        return f"phase.{event.name}"
+    return _rule_span_name(event)
+
+
+def _event_end_s(event: TimingEvent) -> float:
+    """Monotonic end of *event*; open events end at ``start_s + elapsed_s``."""
+    return event.end_s if event.end_s is not None else event.start_s + event.elapsed_s
+
+
+def _set_event_attributes(span, event: TimingEvent, *, args=None) -> None:
+    """Set the ``ct.*`` identity attributes and lift ``event.metadata``."""
+    if event.category != "phase":
+        span.set_attribute("ct.rule_type", event.category)
+    if event.target:
+        span.set_attribute("ct.target", event.target)
+    if event.source:
+        span.set_attribute("ct.source", event.source)
+
+    # Lift TimingEvent.metadata onto span attributes.  Producer-side
+    # opt-in: only keys the recorder explicitly set land here, so
+    # there's no allow-list to maintain.  The try/except keeps a
+    # misbehaving producer (a value the SDK can't serialize — dict,
+    # set, datetime, ...) from killing the whole span: the offending
+    # attribute is dropped and the rest of the span still exports.
+    for key, value in event.metadata.items():
+        if value is None:
+            continue
+        try:
+            span.set_attribute(key, value)
+        except (TypeError, ValueError) as exc:
+            # One bad attribute should not poison the whole export.
+            # Surface it at verbose>=1 so a producer wiring bug is
+            # findable without scraping the collector.
+            if getattr(args, "verbose", 0) >= 1:
+                print(f"otel: dropped span attr {key!r}: {exc}", file=sys.stderr)
+
+
 def _emit_event(tracer, event: TimingEvent, parent_ctx, mono_to_wall_offset: float, *, args=None) -> None:
     """Recursively emit OTel spans for a TimingEvent subtree.
 
@@ -66,41 +106,13 @@ def _emit_event(tracer, event: TimingEvent, parent_ctx, mono_to_wall_offset: flo
     if event.category != "phase" and event.start_s == 0.0:
         return
 
-    if event.category == "phase":
-        name = f"phase.{event.name}"
-    else:
-        name = _rule_span_name(event)
-
+    name = _event_span_name(event)
     start_ns = _to_wall_ns(event.start_s, mono_to_wall_offset)
-    end_s = event.end_s if event.end_s is not None else event.start_s + event.elapsed_s
-    end_ns = _to_wall_ns(end_s, mono_to_wall_offset)
+    end_ns = _to_wall_ns(_event_end_s(event), mono_to_wall_offset)
 
     span = tracer.start_span(name, context=parent_ctx, start_time=start_ns)
     try:
-        if event.category != "phase":
-            span.set_attribute("ct.rule_type", event.category)
-        if event.target:
-            span.set_attribute("ct.target", event.target)
-        if event.source:
-            span.set_attribute("ct.source", event.source)
-
-        # Lift TimingEvent.metadata onto span attributes.  Producer-side
-        # opt-in: only keys the recorder explicitly set land here, so
-        # there's no allow-list to maintain.  The try/except keeps a
-        # misbehaving producer (a value the SDK can't serialize — dict,
-        # set, datetime, ...) from killing the whole span: the offending
-        # attribute is dropped and the rest of the span still exports.
-        for key, value in event.metadata.items():
-            if value is None:
-                continue
-            try:
-                span.set_attribute(key, value)
-            except (TypeError, ValueError) as exc:
-                # One bad attribute should not poison the whole export.
-                # Surface it at verbose>=1 so a producer wiring bug is
-                # findable without scraping the collector.
-                if getattr(args, "verbose", 0) >= 1:
-                    print(f"otel: dropped span attr {key!r}: {exc}", file=sys.stderr)
+        _set_event_attributes(span, event, args=args)
 
         if event.children:
             child_ctx = trace.set_span_in_context(span, parent_ctx)
@@ -113,6 +125,55 @@ def _emit_event(tracer, event: TimingEvent, parent_ctx, mono_to_wall_offset: flo
         span.end(end_time=end_ns)
 
 
+def _set_root_attributes(root_span, timer: BuildTimer, *, args=None) -> None:
+    """Lift the root TimingEvent's metadata onto the root build span.
+
+    Producers attach ccache headline numbers and cross-layer cache
+    aggregates there (``BuildTimer.set_root_metadata``).  Same
+    try/except shape as the per-rule lift -- a single mis-typed value
+    must not poison the whole export.
+    """
+    for key, value in (timer._root.metadata or {}).items():
+        if value is None:
+            continue
+        try:
+            root_span.set_attribute(key, value)
+        except (TypeError, ValueError) as exc:
+            if getattr(args, "verbose", 0) >= 1:
+                print(f"otel: dropped root span attr {key!r}: {exc}", file=sys.stderr)
+
+
+def _flush_and_shutdown(provider) -> None:
+    """Flush *provider*'s span processors, then shut it down."""
+    # provider.shutdown() force-flushes internally, but call force_flush
+    # first as a nominal latency hint. NOTE: the SDK does NOT propagate
+    # this timeout to the underlying exporter network call, so the real
+    # latency bound is _DEFAULT_EXPORT_REQUEST_TIMEOUT_SECONDS per request,
+    # multiplied by the exporter's internal retry count. shutdown() always
+    # runs so the BatchSpanProcessor daemon thread is joined.
+    flush_start = time.monotonic()
+    try:
+        flushed = provider.force_flush(timeout_millis=5000)
+    except Exception as exc:
+        flushed = False
+        print(f"Warning: OTLP export flush raised: {exc}", file=sys.stderr)
+    if not flushed:
+        print(
+            "Warning: OTLP export timed out flushing spans; some spans may be lost "
+            "(with retries, total flush can exceed the 5s nominal budget)",
+            file=sys.stderr,
+        )
+    elif time.monotonic() - flush_start > 2.0:
+        print(
+            f"Warning: OTLP export took {time.monotonic() - flush_start:.1f}s to flush",
+            file=sys.stderr,
+        )
+    try:
+        provider.shutdown()
+    except Exception as exc:
+        print(f"Warning: OTLP export shutdown raised: {exc}", file=sys.stderr)
+
+
 def export_buildtimer(timer: BuildTimer, args, *, _processor=None) -> str | None:
     """Export a finished BuildTimer's span tree via OTLP.
 
@@ -173,20 +234,9 @@ def export_buildtimer(timer: BuildTimer, args, *, _processor=None) -> str | None
     except Exception:
         root_trace_id = None
     try:
-        # Lift any metadata producers attached to the root TimingEvent
-        # (ccache headline numbers and cross-layer cache aggregates).
-        # Same try/except shape as the per-rule lift -- a single
-        # mis-typed value must not poison the whole export. Run before
-        # child emission so the root span is fully populated even if a
-        # child emission later raises.
-        for key, value in (timer._root.metadata or {}).items():
-            if value is None:
-                continue
-            try:
-                root_span.set_attribute(key, value)
-            except (TypeError, ValueError) as exc:
-                if getattr(args, "verbose", 0) >= 1:
-                    print(f"otel: dropped root span attr {key!r}: {exc}", file=sys.stderr)
+        # Run before child emission so the root span is fully populated
+        # even if a child emission later raises.
+        _set_root_attributes(root_span, timer, args=args)
         try:
             root_ctx = trace.set_span_in_context(root_span)
             for child in timer._root.children:
@@ -201,31 +251,5 @@ def export_buildtimer(timer: BuildTimer, args, *, _processor=None) -> str | None
             except Exception as exc:
                 print(f"Warning: OTLP export failed to end root span: {exc}", file=sys.stderr)
     finally:
-        # provider.shutdown() force-flushes internally, but call force_flush
-        # first as a nominal latency hint. NOTE: the SDK does NOT propagate
-        # this timeout to the underlying exporter network call, so the real
-        # latency bound is _DEFAULT_EXPORT_REQUEST_TIMEOUT_SECONDS per request,
-        # multiplied by the exporter's internal retry count. shutdown() always
-        # runs so the BatchSpanProcessor daemon thread is joined.
-        flush_start = time.monotonic()
-        try:
-            flushed = provider.force_flush(timeout_millis=5000)
-        except Exception as exc:
-            flushed = False
-            print(f"Warning: OTLP export flush raised: {exc}", file=sys.stderr)
-        if not flushed:
-            print(
-                "Warning: OTLP export timed out flushing spans; some spans may be lost "
-                "(with retries, total flush can exceed the 5s nominal budget)",
-                file=sys.stderr,
-            )
-        elif time.monotonic() - flush_start > 2.0:
-            print(
-                f"Warning: OTLP export took {time.monotonic() - flush_start:.1f}s to flush",
-                file=sys.stderr,
-            )
-        try:
-            provider.shutdown()
-        except Exception as exc:
-            print(f"Warning: OTLP export shutdown raised: {exc}", file=sys.stderr)
+        _flush_and_shutdown(provider)
     return root_trace_id
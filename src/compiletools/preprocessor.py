@@ -16,7 +16,12 @@ class PreProcessor:
     def add_arguments(cap):
         compiletools.apptools.add_common_arguments(cap)
 
-    def process(self, realpath, extraargs, redirect_stderr_to_stdout=False):
+    def command(self, realpath, extraargs):
+        """The preprocessor argv for *realpath* (see :meth:`process`).
+
+        Split out so batch callers (``CppHeaderDeps.prefetch``) can run many
+        of these concurrently with their own error handling.
+        """
         # args.CPP is an exe-name string (outside the BuildState); the cpp
         # flag tokens come from the stashed state. Never .split() a raw
         # string that may be shlex.join'd -- quoted tokens would become
@@ -55,6 +60,10 @@ class PreProcessor:
             cmd.extend(["-include", realpath, "-x", "c++", "/dev/null"])
         else:
             cmd.append(realpath)
+        return cmd
+
+    def process(self, realpath, extraargs, redirect_stderr_to_stdout=False):
+        cmd = self.command(realpath, extraargs)
 
         if self.args.verbose >= 3:
             print(" ".join(cmd))
@@ -0,0 +1,153 @@
+"""Sharded test execution for ``ct-cake --shard-tests``.
+
+A large gtest or Catch2 executable is one test rule, and so one process,
+however many cores are idle while it runs -- it becomes the tail of
+``runtests``. With sharding on, ``BuildBackend._plan_test_rules`` splits such
+an executable into several test rules, each running a slice of its cases.
+
+Durations are learned, not guessed. Every framework test already writes a
+JUnit XML report (``--test-xml-dir``); after the build the per-suite times
+are folded into a sidecar next to the rule-cost history. An executable is
+sharded only once its history says it runs longer than one shard's budget,
+so the first build of a new test is never split.
+
+* **gtest** shards by test suite through ``--gtest_filter``. Suites are
+  bin-packed onto shards longest-first (LPT), which is what keeps the
+  slowest shard -- and with it ``runtests`` -- close to the total divided by
+  the shard count. Shard 0 runs every suite *not* given to another shard, so
+  a suite added since the history was recorded still runs.
+* **Catch2 v3** has native ``--shard-count`` / ``--shard-index``. Catch2
+  decides which cases go where, so only the shard count is learned. Catch2 v2
+  has no such flags and is never sharded, nor is doctest.
+
+Learned times are quantised to powers of two before they decide anything,
+so run-to-run noise does not move suites between shards: the partition is
+part of each shard's success-marker name, and a new partition reruns every
+shard of that executable.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import math
+import xml.etree.ElementTree as ET
+
+from compiletools.unity import quantize_cost
+
+DURATIONS_FILE = ".ct-test-durations.json"
+
+# Catch2 v3 headers. The v2 single header (``catch.hpp``) also detects as
+# Catch2 but predates the shard flags.
+_CATCH2_V3_HEADERS = ("catch2/catch_all.hpp", "catch2/catch_test_macros.hpp")
+
+
+def parse_junit_durations(xml_path: str) -> dict[str, float]:
+    """``{suite: seconds}`` summed over the ``<testcase>`` elements of one
+    JUnit report, keyed on ``classname``. Unreadable or malformed -> ``{}``."""
+    try:
+        root = ET.parse(xml_path).getroot()
+    except (OSError, ET.ParseError):
+        return {}
+    suites: dict[str, float] = {}
+    for case in root.iter("testcase"):
+        suite = case.get("classname") or case.get("name") or ""
+        try:
+            seconds = float(case.get("time") or 0.0)
+        except ValueError:
+            continue
+        suites[suite] = suites.get(suite, 0.0) + seconds
+    return suites
+
+
+def load_durations(path: str) -> dict[str, dict[str, float]]:
+    """Load the sidecar: ``{test source realpath: {suite: seconds}}``.
+    Missing or corrupt -> empty dict, never raises."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict):
+        return {}
+    out: dict[str, dict[str, float]] = {}
+    for source, suites in data.items():
+        if not isinstance(suites, dict):
+            continue
+        out[str(source)] = {
+            str(s): float(t) for s, t in suites.items() if isinstance(t, (int, float)) and not isinstance(t, bool)
+        }
+    return out
+
+
+def save_durations(path: str, durations: dict[str, dict[str, float]]) -> None:
+    """Atomically write the sidecar. Best-effort: swallows OSError/ValueError."""
+    try:
+        from compiletools.filesystem_utils import atomic_output_file
+
+        with atomic_output_file(path, mode="w", encoding="utf-8", force_mode=0o666) as f:
+            json.dump(durations, f, sort_keys=True)
+    except (OSError, ValueError):
+        pass
+
+
+def _quantize_duration(seconds: float) -> float:
+    """``quantize_cost`` for a measured suite duration. gtest reports
+    ``time="0"`` for instant suites; those cost nothing, whereas
+    ``quantize_cost`` treats a non-positive cost as unknown and charges a
+    full second -- twenty instant suites would then look like 20s and get
+    sharded for no reason."""
+    if not seconds > 0 or not math.isfinite(seconds):
+        return 0.0
+    return quantize_cost(seconds)
+
+
+def pack_suites(suites: dict[str, float], count: int) -> list[list[str]]:
+    """Longest-processing-time-first bin packing of *suites* onto *count*
+    shards. Ties break on suite name and lowest shard index, so the result
+    is a pure function of the (quantised) input."""
+    bins: list[list[str]] = [[] for _ in range(count)]
+    loads = [0.0] * count
+    for suite in sorted(suites, key=lambda s: (-suites[s], s)):
+        i = loads.index(min(loads))
+        bins[i].append(suite)
+        loads[i] += suites[suite]
+    return [sorted(b) for b in bins]
+
+
+def plan(
+    framework_id: str,
+    headers: list[str],
+    suites: dict[str, float],
+    *,
+    max_shards: int,
+    shard_seconds: float,
+) -> list[list[str]] | None:
+    """The extra argv for each shard of one test executable, or ``None``
+    when it should run unsharded (unsupported framework, no history, or too
+    short to be worth splitting)."""
+    if not suites or max_shards < 2 or shard_seconds <= 0:
+        return None
+    quantised = {s: _quantize_duration(t) for s, t in suites.items()}
+    count = min(max_shards, math.ceil(sum(quantised.values()) / shard_seconds))
+    if framework_id == "gtest":
+        count = min(count, len(quantised))
+        if count < 2:
+            return None
+        bins = pack_suites(quantised, count)
+        rest = [s for b in bins[1:] for s in b]
+        shards = [["--gtest_filter=-" + ":".join(f"{s}.*" for s in rest)]]
+        shards.extend(["--gtest_filter=" + ":".join(f"{s}.*" for s in b)] for b in bins[1:])
+        return shards
+    if framework_id == "catch2" and any(marker in h for h in headers for marker in _CATCH2_V3_HEADERS):
+        if count < 2:
+            return None
+        return [["--shard-count", str(count), "--shard-index", str(i)] for i in range(count)]
+    return None
+
+
+def plan_key(shards: list[list[str]]) -> str:
+    """Short digest of a shard plan, embedded in each shard's success marker
+    so a changed partition reruns every shard instead of trusting stamps
+    earned under the old one."""
+    return hashlib.sha256(json.dumps(shards).encode()).hexdigest()[:8]
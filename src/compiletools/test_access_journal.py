@@ -0,0 +1,102 @@
+"""Tests for the per-pool access journal and its folded last-use index."""
+
+from __future__ import annotations
+
+import os
+import time
+
+from compiletools import access_journal
+from compiletools.access_journal import AccessIndex, record_uses
+from compiletools.build_graph import BuildGraph, BuildRule, RuleType
+from compiletools.testhelper import make_backend_args, make_mock_hunter, make_stub_backend_class
+
+
+def _entry(pool, name, *, age_seconds, size=100):
+    bucket = os.path.join(pool, name[:2])
+    os.makedirs(bucket, exist_ok=True)
+    path = os.path.join(bucket, name)
+    with open(path, "wb") as f:
+        f.write(b"x" * size)
+    old = time.time() - age_seconds
+    os.utime(path, (old, old))
+    return path
+
+
+def _dir_entry(path):
+    with os.scandir(os.path.dirname(path)) as it:
+        return next(e for e in it if e.path == path)
+
+
+def test_folded_use_outranks_mtime_and_known_entries_are_not_statted(tmp_path):
+    pool = str(tmp_path / "pool")
+    path = _entry(pool, "aa_obj.o", age_seconds=10 * 86400)
+    assert not access_journal.is_journaled(pool)
+    now = time.time()
+    assert record_uses(pool, "obj", [path, "/elsewhere/bb/x.o"], now=now) == 1
+    assert access_journal.is_journaled(pool)
+
+    index = AccessIndex(pool, "obj")
+    assert index.fold() == 1
+    recency, size = index.mtime_size(_dir_entry(path))
+    assert (int(recency), size, index.stats_taken) == (int(now), 100, 1)
+    index.save()
+    assert os.listdir(access_journal.journal_dir(pool)) == [access_journal.INDEX_FILENAME]
+
+    warm = AccessIndex(pool, "obj")
+    assert warm.mtime_size(_dir_entry(path)) == (int(now), 100)
+    assert warm.stats_taken == 0
+
+
+def test_removed_and_vanished_entries_drop_out(tmp_path):
+    pool = str(tmp_path / "pool")
+    kept = _entry(pool, "aa_kept.o", age_seconds=60)
+    gone = _entry(pool, "aa_gone.o", age_seconds=60)
+    index = AccessIndex(pool, "obj")
+    for path in (kept, gone):
+        index.mtime_size(_dir_entry(path))
+    index.forget(gone)
+    os.makedirs(access_journal.journal_dir(pool))
+    index.save()
+
+    reloaded = AccessIndex(pool, "obj")
+    reloaded.mtime_size(_dir_entry(kept))
+    assert reloaded.stats_taken == 0
+    assert AccessIndex(pool, "exe")._entries == {}, "an index is only read back for its own kind"
+
+
+def test_journaling_build_records_uses_without_touching_mtimes(tmp_path):
+    args = make_backend_args(str(tmp_path), access_journal=True)
+    obj = _entry(args.cas_objdir, "ab_foo.o", age_seconds=5 * 86400)
+    exe = _entry(args.cas_exedir, "cd_foo.exe", age_seconds=5 * 86400)
+    before = (os.path.getmtime(obj), os.path.getmtime(exe))
+
+    graph = BuildGraph()
+    graph.add_rule(BuildRule(output=obj, inputs=["foo.cpp"], command=["g++"], rule_type=RuleType.COMPILE))
+    graph.add_rule(BuildRule(output="bin/foo", inputs=[exe], command=["ct-cas-publish"], rule_type=RuleType.SYMLINK))
+    backend = make_stub_backend_class()(args=args, hunter=make_mock_hunter())
+    backend._freshen_published_cas_entries(graph)
+
+    assert (os.path.getmtime(obj), os.path.getmtime(exe)) == before
+    for pool, kind in ((args.cas_objdir, "obj"), (args.cas_exedir, "exe")):
+        index = AccessIndex(pool, kind)
+        assert index.fold() == 1
+        assert index.records_folded == 1
+
+
+def test_build_without_the_flag_journals_into_a_journaled_pool(tmp_path):
+    args = make_backend_args(str(tmp_path))
+    obj = _entry(args.cas_objdir, "ab_foo.o", age_seconds=5 * 86400)
+    exe = _entry(args.cas_exedir, "cd_foo.exe", age_seconds=5 * 86400)
+    os.makedirs(access_journal.journal_dir(args.cas_objdir))
+
+    graph = BuildGraph()
+    graph.add_rule(BuildRule(output=obj, inputs=["foo.cpp"], command=["g++"], rule_type=RuleType.COMPILE))
+    graph.add_rule(BuildRule(output="bin/foo", inputs=[exe], command=["ct-cas-publish"], rule_type=RuleType.SYMLINK))
+    backend = make_stub_backend_class()(args=args, hunter=make_mock_hunter())
+    backend._freshen_published_cas_entries(graph)
+
+    index = AccessIndex(args.cas_objdir, "obj")
+    assert index.fold() == 1
+    assert index.records_folded == 1
+    assert not access_journal.is_journaled(args.cas_exedir), "an unjournaled pool is not switched over"
+    assert time.time() - os.path.getmtime(exe) < 60, "the unjournaled pool is still freshened"
@@ -0,0 +1,241 @@
+"""Tests for the pluggable compile action cache (no compiler needed).
+
+The "compiler" in the execute_compile_rule tests is a ``sh -c`` stub that
+writes a marker into the ``-o`` path atomic_compile appends, so the fetch /
+upload wiring is exercised without a toolchain.
+"""
+
+from __future__ import annotations
+
+import http.server
+import os
+import threading
+from types import SimpleNamespace
+from typing import ClassVar
+
+import pytest
+
+import compiletools.action_cache as ac
+from compiletools.backend_locking import wrap_compile_with_lock
+from compiletools.locking import execute_compile_rule
+
+_OBJ_NAME = "main_0123456789ab_0123456789abcd_0123456789abcdef.o"
+
+
+@pytest.fixture(autouse=True)
+def _fresh_cache_memo(monkeypatch):
+    """open_action_cache memoises per spec; isolate every test."""
+    monkeypatch.delenv(ac.ACTION_CACHE_ENV, raising=False)
+    monkeypatch.delenv(ac.ACTION_CACHE_UPLOAD_ENV, raising=False)
+    ac.open_action_cache.cache_clear()
+    yield
+    ac.open_action_cache.cache_clear()
+
+
+def _obj_target(root, variant="gcc.debug"):
+    """A cas-objdir object path whose bucket dir exists (the backend's mkdir
+    rule creates it before any compile runs)."""
+    bucket = os.path.join(str(root), "cas-objdir", variant, "01")
+    os.makedirs(bucket, exist_ok=True)
+    return os.path.join(bucket, _OBJ_NAME)
+
+
+def _stub_compile_cmd(marker: str, target: str) -> list[str]:
+    # atomic_compile re-appends ``-o <tmp>``: $1 is "-o", $2 the temp path.
+    return ["sh", "-c", f'printf {marker} > "$2"', "sh", "-o", target]
+
+
+class _StoreHandler(http.server.BaseHTTPRequestHandler):
+    store: ClassVar[dict[str, bytes]] = {}
+
+    def do_GET(self):
+        body = self.store.get(self.path)
+        if body is None:
+            self.send_response(404)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_PUT(self):
+        length = int(self.headers["Content-Length"])
+        self.store[self.path] = self.rfile.read(length)
+        self.send_response(201)
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def http_cache_url():
+    _StoreHandler.store = {}
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _StoreHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}/cache"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+# --------------------------------------------------------------- keys
+
+
+def test_action_key_independent_of_workspace_prefix(tmp_path):
+    assert ac.action_key(_obj_target(tmp_path / "a")) == ac.action_key(_obj_target(tmp_path / "b"))
+
+
+def test_action_key_separates_variants(tmp_path):
+    assert ac.action_key(_obj_target(tmp_path, "gcc.debug")) != ac.action_key(_obj_target(tmp_path, "gcc.release"))
+
+
+def test_open_action_cache_dispatches_on_spec(tmp_path):
+    assert ac.open_action_cache(None) is None
+    assert ac.open_action_cache("") is None
+    assert isinstance(ac.open_action_cache("http://cache.example:8080"), ac.HttpActionCache)
+    local = ac.open_action_cache(f"file://{tmp_path}")
+    assert isinstance(local, ac.LocalDirActionCache)
+    assert local.root == str(tmp_path)
+
+
+def test_configured_spec_ignores_non_string_attrs(monkeypatch):
+    from unittest.mock import MagicMock
+
+    assert ac.configured_spec(MagicMock()) is None
+    monkeypatch.setenv(ac.ACTION_CACHE_ENV, "/srv/ac")
+    assert ac.configured_spec(SimpleNamespace()) == "/srv/ac"
+    assert ac.configured_spec(SimpleNamespace(action_cache="/cli/ac")) == "/cli/ac"
+
+
+# --------------------------------------------------------------- stores
+
+
+def test_local_dir_round_trip(tmp_path):
+    cache = ac.LocalDirActionCache(str(tmp_path / "ac"))
+    src = tmp_path / "src.o"
+    src.write_bytes(b"object-bytes")
+    dest = tmp_path / "dest.o"
+
+    assert cache.fetch("ab" * 32, str(dest)) is False
+    assert not dest.exists()
+
+    cache.store("ab" * 32, str(src))
+    assert cache.fetch("ab" * 32, str(dest)) is True
+    assert dest.read_bytes() == b"object-bytes"
+
+
+def test_http_round_trip(tmp_path, http_cache_url):
+    cache = ac.HttpActionCache(http_cache_url)
+    src = tmp_path / "src.o"
+    src.write_bytes(b"remote-object")
+    dest = tmp_path / "dest.o"
+
+    assert cache.fetch("cd" * 32, str(dest)) is False
+    cache.store("cd" * 32, str(src))
+    assert _StoreHandler.store == {f"/cache/ac/{'cd' * 32}": b"remote-object"}
+    assert cache.fetch("cd" * 32, str(dest)) is True
+    assert dest.read_bytes() == b"remote-object"
+
+
+def test_http_unreachable_degrades_to_miss_and_disables(tmp_path):
+    # Port 9 (discard) on loopback is closed in any sane test environment.
+    cache = ac.HttpActionCache("http://127.0.0.1:9", timeout=1.0)
+    dest = tmp_path / "dest.o"
+    assert cache.fetch("ef" * 32, str(dest)) is False
+    assert cache._disabled is True
+    assert not dest.exists()
+
+
+# --------------------------------------------------------------- compile wiring
+
+
+def test_execute_compile_rule_fetches_instead_of_compiling(tmp_path):
+    cache_dir = tmp_path / "ac"
+    target = _obj_target(tmp_path)
+    seed = tmp_path / "seed.o"
+    seed.write_bytes(b"from-cache")
+    ac.LocalDirActionCache(str(cache_dir)).store(ac.action_key(target), str(seed))
+
+    args = SimpleNamespace(file_locking=False, action_cache=str(cache_dir), action_cache_upload=True)
+    # The stub would write "compiled"; a hit must never run it.
+    hit = execute_compile_rule(target, _stub_compile_cmd("compiled", target), args, skip_if_exists=True)
+
+    assert hit is True
+    with open(target, "rb") as f:
+        assert f.read() == b"from-cache"
+
+
+def test_execute_compile_rule_uploads_after_compile(tmp_path):
+    cache_dir = tmp_path / "ac"
+    target = _obj_target(tmp_path)
+    args = SimpleNamespace(file_locking=False, action_cache=str(cache_dir), action_cache_upload=True)
+
+    hit = execute_compile_rule(target, _stub_compile_cmd("compiled", target), args, skip_if_exists=True)
+
+    assert hit is False
+    key = ac.action_key(target)
+    with open(cache_dir / key[:2] / key, "rb") as f:
+        assert f.read() == b"compiled"
+
+
+def test_execute_compile_rule_respects_no_upload(tmp_path):
+    cache_dir = tmp_path / "ac"
+    target = _obj_target(tmp_path)
+    args = SimpleNamespace(file_locking=False, action_cache=str(cache_dir), action_cache_upload=False)
+
+    execute_compile_rule(target, _stub_compile_cmd("compiled", target), args, skip_if_exists=True)
+
+    assert os.path.exists(target)
+    assert not cache_dir.exists()
+
+
+def test_non_cas_compile_bypasses_cache(tmp_path):
+    """skip_if_exists=False means the output is not content-addressed (the
+    trace backend's verify-failed branch); its path is not a valid key."""
+    cache_dir = tmp_path / "ac"
+    target = _obj_target(tmp_path)
+    args = SimpleNamespace(file_locking=False, action_cache=str(cache_dir), action_cache_upload=True)
+
+    execute_compile_rule(target, _stub_compile_cmd("compiled", target), args, skip_if_exists=False)
+
+    assert not cache_dir.exists()
+
+
+# --------------------------------------------------------------- recipe wiring
+
+
+def _lock_args(**extra):
+    return SimpleNamespace(
+        file_locking=True,
+        sleep_interval_lockdir=None,
+        sleep_interval_cifs=0.2,
+        sleep_interval_flock_fallback=0.1,
+        lock_warn_interval=60,
+        lock_cross_host_timeout=600,
+        **extra,
+    )
+
+
+def test_recipe_routes_through_lock_helper_with_cache_env(tmp_path):
+    spec = str(tmp_path / "ac")
+    cmd = wrap_compile_with_lock("gcc -c a.c", "a.o", _lock_args(action_cache=spec, action_cache_upload=False), "ext4")
+
+    assert "CT_LOCK_TIMEOUT=600" in cmd
+    assert f"{ac.ACTION_CACHE_ENV}={spec}" in cmd
+    assert f"{ac.ACTION_CACHE_UPLOAD_ENV}=0" in cmd
+    assert "ct-lock-helper compile --target=a.o" in cmd
+    assert not cmd.startswith("flock ")
+
+
+def test_recipe_without_cache_keeps_flock_fast_path(monkeypatch):
+    import compiletools.backend_locking as bl
+
+    monkeypatch.setattr(bl, "_native_flock_available", lambda: True)
+    cmd = wrap_compile_with_lock("gcc -c a.c", "a.o", _lock_args(), "ext4")
+
+    assert "; else flock a.o.lock sh -c " in cmd
+    assert ac.ACTION_CACHE_ENV not in cmd
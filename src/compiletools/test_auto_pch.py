@@ -0,0 +1,48 @@
+"""Tests for the --suggest-pch / --auto-pch candidate analysis."""
+
+from types import SimpleNamespace
+
+import compiletools.auto_pch as auto_pch
+
+
+def _analysis(*directives, includes=()):
+    return SimpleNamespace(
+        directives=[SimpleNamespace(directive_type=t, line_num=n) for t, n in directives],
+        includes=list(includes),
+    )
+
+
+def _include(spelling, line_num, *, is_system=False, is_commented=False):
+    return {"filename": spelling, "line_num": line_num, "is_system": is_system, "is_commented": is_commented}
+
+
+def test_leading_include_requires_include_as_first_directive():
+    assert auto_pch.leading_include(_analysis(("include", 2), includes=[_include("a.h", 2)])) == ("a.h", False)
+    guarded = _analysis(("define", 0), ("include", 1), includes=[_include("a.h", 1)])
+    assert auto_pch.leading_include(guarded) is None
+    assert auto_pch.leading_include(_analysis()) is None
+
+
+def test_leading_include_skips_commented_spelling():
+    result = _analysis(("include", 3), includes=[_include("old.h", 3, is_commented=True)])
+    assert auto_pch.leading_include(result) is None
+
+
+def test_rank_orders_by_saving_and_drops_single_consumers():
+    consumers = {
+        "/h/big.h": ["/s/b.cpp", "/s/a.cpp"],
+        "/h/small.h": ["/s/c.cpp", "/s/d.cpp", "/s/e.cpp"],
+        "/h/solo.h": ["/s/f.cpp"],
+    }
+    sizes = {"/h/big.h": 10_000, "/h/small.h": 1_000, "/h/solo.h": 50_000}
+    ranked = auto_pch.rank(consumers, sizes)
+    assert [s.header for s in ranked] == ["/h/big.h", "/h/small.h"]
+    assert ranked[0].consumers == ("/s/a.cpp", "/s/b.cpp")
+    assert ranked[1].saved_bytes == 2_000
+
+
+def test_format_report_mentions_every_header():
+    report = auto_pch.format_report([auto_pch.PchSuggestion("/h/big.h", ("/a.cpp", "/b.cpp"), 4096)])
+    assert "/h/big.h" in report
+    assert "--auto-pch" in report
+    assert "No precompiled-header candidates" in auto_pch.format_report([])
@@ -3243,6 +3243,48 @@ class TestPublishedCasEntryFreshening:
         assert observed == {False: (True, True), True: (False, False)}
 
 
+def _publish_rule(cas_path, user_path):
+    return BuildRule(
+        output=user_path,
+        inputs=[cas_path],
+        command=["ct-cas-publish", "--cas-path", cas_path, "--user-path", user_path],
+        rule_type="symlink",
+        order_only_deps=[os.path.dirname(user_path)],
+    )
+
+
+class TestPublishBatches:
+    """Make and ninja fold the publishes of one directory into one recipe."""
+
+    def test_leaf_publishes_sharing_a_directory_batch(self):
+        graph = BuildGraph()
+        for name in ("b", "a"):
+            graph.add_rule(_publish_rule(f"cas/{name}.exe", f"bin/{name}"))
+        graph.add_rule(_publish_rule("cas/other.exe", "bin/tools/other"))
+
+        batches = BuildBackend._publish_batches(graph)
+
+        assert [r.output for r in batches["bin/a"]] == ["bin/a", "bin/b"]
+        assert batches["bin/b"] is batches["bin/a"]
+        assert "bin/tools/other" not in batches
+        merged = BuildBackend._batched_publish_rule(batches["bin/a"])
+        assert merged.command == ["ct-cas-publish", "--batch", "cas/a.exe", "bin/a", "", "cas/b.exe", "bin/b", ""]
+        assert merged.inputs == ["cas/a.exe", "cas/b.exe"]
+        assert merged.order_only_deps == ["bin"]
+
+    def test_a_published_library_a_link_reads_stays_on_its_own(self):
+        """Batching it with the exe linked against it would make the batch
+        depend on itself."""
+        graph = BuildGraph()
+        graph.add_rule(_publish_rule("cas/libfoo.a", "bin/libfoo.a"))
+        graph.add_rule(
+            BuildRule(output="cas/main.exe", inputs=["main.o", "bin/libfoo.a"], command=["g++"], rule_type="link")
+        )
+        graph.add_rule(_publish_rule("cas/main.exe", "bin/main"))
+
+        assert BuildBackend._publish_batches(graph) == {}
+
+
 class TestLinkOrderCorrectness:
     """Test that link rules produce correctly ordered -l flags
     when different source files contribute different LDFLAGS."""
@@ -4048,3 +4090,167 @@ class TestEmptyBindirModuleMapper:
         backend._write_gcc_module_mapper()
 
         assert (tmp_path / ".module-mapper.txt").read_text().startswith("M ")
+
+
+class TestUnityBuild:
+    """``--unity`` batches compatible TUs behind one generated source."""
+
+    @staticmethod
+    def _analysis(defines=()):
+        directives = [SimpleNamespace(directive_type="define") for _ in defines]
+        return SimpleNamespace(
+            module_exports=(),
+            module_implements=(),
+            module_imports=(),
+            module_header_imports=(),
+            directives=directives,
+        )
+
+    def _backend(self, tmp_path, sources, *, defining=(), per_file_magicflags=None, **overrides):
+        overrides = {"unity": True, "unity_batch_cost": 30.0, **overrides}
+        args = make_backend_args(tmp_path, filename=[sources[0]], **overrides)
+        hunter = make_mock_hunter(sources=sources, per_file_magicflags=per_file_magicflags or {})
+        hunter._file_analysis_result = MagicMock(
+            side_effect=lambda f: self._analysis(defines=("X",) if f in defining else ())
+        )
+        backend = make_stub_backend_class()(args=args, hunter=hunter)
+        backend.namer = make_mock_namer(args)
+        return backend
+
+    @staticmethod
+    def _compile_rules(graph):
+        return [r for r in graph.rules if r.rule_type == "compile"]
+
+    def test_compatible_sources_share_one_object(self, tmp_path):
+        sources = ["/src/a.cpp", "/src/b.cpp", "/src/main.cpp"]
+        graph = self._backend(tmp_path, sources).build_graph()
+
+        (rule,) = self._compile_rules(graph)
+        unity_src = _cmd(rule)[_cmd(rule).index("-c") + 1]
+        with open(unity_src) as f:
+            text = f.read()
+        assert all(f'#include "{s}"' in text for s in sources)
+        assert set(sources) <= set(rule.inputs)
+        (link,) = [r for r in graph.rules if r.rule_type == "link"]
+        assert rule.output in link.inputs
+        assert os.path.basename(rule.output).startswith("unity_")
+
+    def test_tu_with_own_define_falls_back_to_per_file(self, tmp_path):
+        sources = ["/src/a.cpp", "/src/b.cpp", "/src/main.cpp"]
+        graph = self._backend(tmp_path, sources, defining={"/src/b.cpp"}).build_graph()
+
+        rules = self._compile_rules(graph)
+        assert len(rules) == 2
+        assert "/src/b.cpp" in {r.inputs[0] for r in rules}
+
+    @pytest.mark.parametrize(
+        "local",
+        [
+            "static int helper() { return 1; }\n",
+            "const int kSize = 4;\n",
+            "using Index = int;\n",
+            "struct Impl { int x; };\n",
+        ],
+    )
+    def test_tus_with_file_local_names_are_not_batched(self, tmp_path, local):
+        # Each TU's own file-local name would be redefined in one unity TU.
+        sources = []
+        for name in ("a", "b", "main"):
+            path = tmp_path / f"{name}.cpp"
+            helper = local if name != "main" else ""
+            path.write_text(f"{helper}int {name}_fn() {{ return 0; }}\n")
+            sources.append(str(path))
+        graph = self._backend(tmp_path, sources).build_graph()
+
+        rules = self._compile_rules(graph)
+        assert sorted(r.inputs[0] for r in rules) == sorted(sources)
+        assert not any(os.path.basename(r.output).startswith("unity_") for r in rules)
+
+    def test_differing_magic_flags_are_not_batched(self, tmp_path):
+        sources = ["/src/a.cpp", "/src/b.cpp"]
+        flags = {"/src/b.cpp": {sz.Str("CXXFLAGS"): [sz.Str("-DB_ONLY")]}}
+        graph = self._backend(tmp_path, sources, per_file_magicflags=flags).build_graph()
+
+        assert sorted(r.inputs[0] for r in self._compile_rules(graph)) == sources
+
+    def test_batches_respect_cost_cap(self, tmp_path):
+        sources = [f"/src/s{i}.cpp" for i in range(4)]
+        # Missing sources cost the 2s cold-start base each.
+        graph = self._backend(tmp_path, sources, unity_batch_cost=4.0).build_graph()
+
+        rules = self._compile_rules(graph)
+        assert len(rules) == 2
+        assert {os.path.basename(r.output)[:6] for r in rules} == {"unity_"}
+
+    def test_unity_object_is_stable_across_plans(self, tmp_path):
+        sources = ["/src/a.cpp", "/src/main.cpp"]
+        first = self._compile_rules(self._backend(tmp_path, sources).build_graph())
+        second = self._compile_rules(self._backend(tmp_path, sources).build_graph())
+        assert [r.output for r in first] == [r.output for r in second]
+
+    def test_off_by_default(self, tmp_path):
+        sources = ["/src/a.cpp", "/src/main.cpp"]
+        graph = self._backend(tmp_path, sources, unity=False).build_graph()
+        assert len(self._compile_rules(graph)) == 2
+
+
+class TestAutoPch:
+    """``--auto-pch`` precompiles the header that several TUs include first."""
+
+    def _backend(self, tmp_path, *, tu_flags=None, **overrides):
+        src = tmp_path / "src"
+        src.mkdir(exist_ok=True)
+        header = src / "common.h"
+        header.write_text("#pragma once\nint common();\n")
+        sources = [str(src / n) for n in ("a.cpp", "b.cpp", "main.cpp")]
+        for s in sources:
+            with open(s, "w") as f:
+                f.write('#include "common.h"\n')
+        no_modules = dict(module_exports=(), module_implements=(), module_imports=(), module_header_imports=())
+
+        def _analysis(path):
+            if path == str(header):
+                return SimpleNamespace(include_guard=sz.Str("pragma_once"), **no_modules)
+            return SimpleNamespace(
+                directives=[SimpleNamespace(directive_type="include", line_num=0)],
+                includes=[{"filename": "common.h", "line_num": 0, "is_system": False, "is_commented": False}],
+                **no_modules,
+            )
+
+        overrides = {"auto_pch": True, **overrides}
+        args = make_backend_args(tmp_path, filename=[sources[-1]], **overrides)
+        hunter = make_mock_hunter(sources=sources, per_file_magicflags=tu_flags or {})
+        hunter.header_dependencies = MagicMock(side_effect=lambda f: [] if f == str(header) else [str(header)])
+        hunter._file_analysis_result = MagicMock(side_effect=_analysis)
+        backend = make_stub_backend_class()(args=args, hunter=hunter)
+        backend.namer = make_mock_namer(args)
+        return backend, str(header), sources
+
+    def test_shared_leading_header_is_precompiled_and_injected(self, tmp_path):
+        backend, header, sources = self._backend(tmp_path)
+        graph = backend.build_graph()
+
+        (gch_rule,) = [r for r in graph.rules if r.output.endswith(".gch")]
+        assert header in gch_rule.inputs
+        for source in sources:
+            (rule,) = [r for r in graph.rules if r.rule_type == "compile" and r.inputs[0] == source]
+            assert gch_rule.output in rule.inputs
+            assert "-include" in _cmd(rule)
+        assert [s.header for s in backend.pch_suggestions] == [header]
+
+    def test_tu_with_different_magic_flags_is_left_alone(self, tmp_path):
+        backend, _header, sources = self._backend(
+            tmp_path, tu_flags={str(tmp_path / "src" / "a.cpp"): {sz.Str("CXXFLAGS"): [sz.Str("-DOTHER")]}}
+        )
+        graph = backend.build_graph()
+
+        (a_rule,) = [r for r in graph.rules if r.rule_type == "compile" and r.inputs[0] == sources[0]]
+        assert "-include" not in _cmd(a_rule)
+        assert backend.pch_suggestions[0].consumers == tuple(sorted(sources[1:]))
+
+    def test_suggest_only_does_not_change_the_graph(self, tmp_path):
+        backend, header, _ = self._backend(tmp_path, auto_pch=False, suggest_pch=True)
+        graph = backend.build_graph()
+
+        assert not [r for r in graph.rules if r.output.endswith(".gch")]
+        assert [s.header for s in backend.pch_suggestions] == [header]
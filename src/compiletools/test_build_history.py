@@ -0,0 +1,154 @@
+"""Tests for the append-only build history store."""
+
+from __future__ import annotations
+
+import sqlite3
+import types
+
+import pytest
+
+from compiletools import build_history
+from compiletools.build_timer import BuildTimer
+
+_LINK_OBJ = "obj/ab/foo_0123456789ab_0123456789abcd_0123456789abcdef.o"
+
+
+def _make_timer(
+    *,
+    foo_s: float = 1.0,
+    foo_layer: str | None = "other",
+    bar_s: float = 0.5,
+    variant: str = "gcc.release",
+    backend: str = "shake",
+) -> BuildTimer:
+    timer = BuildTimer(enabled=True, variant=variant, backend=backend)
+    with timer.phase("build_execution"):
+        metadata = {"ct.rule.cache_layer": foo_layer} if foo_layer else None
+        timer.record_rule("compile", "obj/foo.o", "src/foo.cpp", foo_s, metadata=metadata)
+        timer.record_rule("compile", "obj/bar.o", "src/bar.cpp", bar_s, metadata={"cas.hit": True})
+        timer.record_rule("link", _LINK_OBJ, "", 0.25)
+    timer.set_root_metadata(
+        {
+            "ct.build.cas_avoided_count": 1,
+            "ct.build.ccache_avoided_count": 0,
+            "ct.build.recompiled_count": 1,
+            "ct.build.compile_avoided_rate": 0.5,
+        }
+    )
+    return timer
+
+
+def _record(path, *timers) -> list[int]:
+    return [build_history.record_build(path, timer, invocation_id=f"inv-{i}") for i, timer in enumerate(timers)]
+
+
+class TestPaths:
+    def test_auto_uses_the_diagnostics_root(self, tmp_path):
+        args = types.SimpleNamespace(diagnostics_dir=str(tmp_path / "diag"), bindir="bin")
+        assert build_history.resolve_history_path("auto", args) == str(tmp_path / "diag" / "build-history.sqlite")
+
+    def test_auto_falls_back_to_bindir(self):
+        args = types.SimpleNamespace(diagnostics_dir=None, bindir="bin")
+        assert build_history.default_history_path(args) == "bin/diagnostics/build-history.sqlite"
+
+    def test_unset_flag_resolves_to_none(self):
+        assert build_history.resolve_history_path(None, types.SimpleNamespace()) is None
+
+    def test_no_root_raises(self):
+        with pytest.raises(RuntimeError):
+            build_history.default_history_path(types.SimpleNamespace(diagnostics_dir=None, bindir=None))
+
+
+class TestRecord:
+    def test_build_and_rules_are_appended(self, tmp_path):
+        path = str(tmp_path / "nested" / "history.sqlite")
+        timer = _make_timer()
+        timer.set_root_metadata({"ct.ccache.hit_rate": 0.75})
+        first, second = _record(path, timer, _make_timer())
+        assert second > first
+
+        conn = build_history.connect(path)
+        try:
+            builds = build_history.recent_builds(conn)
+            rules = conn.execute(
+                "SELECT rule_type, key, cache_layer FROM rules WHERE build_id = ? ORDER BY rowid", (first,)
+            ).fetchall()
+        finally:
+            conn.close()
+        assert [b.id for b in builds] == [first, second]
+        assert builds[0].invocation_id == "inv-0"
+        assert (builds[0].variant, builds[0].backend, builds[0].rule_count) == ("gcc.release", "shake", 3)
+        assert builds[0].compile_avoided_rate == 0.5
+        assert builds[0].ccache_hit_rate == 0.75
+        assert builds[1].ccache_hit_rate is None
+        assert rules == [
+            ("compile", "src/foo.cpp", "other"),
+            ("compile", "src/bar.cpp", "cas"),
+            ("link", "obj/foo.o", "other"),
+        ]
+
+    def test_newer_schema_is_refused(self, tmp_path):
+        path = str(tmp_path / "history.sqlite")
+        conn = sqlite3.connect(path)
+        conn.execute("PRAGMA user_version = 99")
+        conn.close()
+        with pytest.raises(ValueError, match="unsupported build history version 99"):
+            build_history.connect(path)
+
+
+class TestQueries:
+    def test_recent_builds_filters_and_limits(self, tmp_path):
+        path = str(tmp_path / "history.sqlite")
+        ids = _record(path, _make_timer(), _make_timer(variant="gcc.debug"), _make_timer(), _make_timer())
+        conn = build_history.connect(path)
+        try:
+            assert [b.id for b in build_history.recent_builds(conn, limit=2)] == ids[2:]
+            assert [b.id for b in build_history.recent_builds(conn, variant="gcc.debug")] == [ids[1]]
+            assert build_history.recent_builds(conn, backend="ninja") == []
+        finally:
+            conn.close()
+
+    def test_rule_type_trends(self, tmp_path):
+        path = str(tmp_path / "history.sqlite")
+        _record(path, _make_timer(foo_s=1.0), _make_timer(foo_s=2.0), _make_timer(foo_s=3.0))
+        conn = build_history.connect(path)
+        try:
+            trends = build_history.rule_type_trends(conn, build_history.recent_builds(conn))
+        finally:
+            conn.close()
+        by_type = {t.rule_type: t for t in trends}
+        assert by_type["compile"].count == 2
+        assert by_type["compile"].latest_s == pytest.approx(3.5)
+        assert by_type["compile"].baseline_s == pytest.approx(2.0)
+        assert by_type["link"].delta_s == pytest.approx(0.0)
+        assert trends[0].rule_type == "compile"
+
+    def test_regressions_compare_like_cache_layers(self, tmp_path):
+        path = str(tmp_path / "history.sqlite")
+        # foo was a CAS hit twice and is now compiled: no like-for-like
+        # baseline, so it is not a regression. bar got slower on the
+        # same (cas) layer and is.
+        _record(
+            path,
+            _make_timer(foo_s=0.01, foo_layer="cas"),
+            _make_timer(foo_s=0.01, foo_layer="cas"),
+            _make_timer(foo_s=5.0, foo_layer="other", bar_s=1.5),
+        )
+        conn = build_history.connect(path)
+        try:
+            regressions = build_history.rule_regressions(conn, build_history.recent_builds(conn))
+        finally:
+            conn.close()
+        assert [(r.key, r.cache_layer, r.samples) for r in regressions] == [("src/bar.cpp", "cas", 2)]
+        assert regressions[0].delta_s == pytest.approx(1.0)
+
+    def test_single_build_has_no_regressions(self, tmp_path):
+        path = str(tmp_path / "history.sqlite")
+        _record(path, _make_timer())
+        conn = build_history.connect(path)
+        try:
+            builds = build_history.recent_builds(conn)
+            assert build_history.rule_regressions(conn, builds) == []
+            assert build_history.rule_type_trends(conn, builds)[0].baseline_s is None
+        finally:
+            conn.close()
@@ -931,6 +931,43 @@ class TestRecordRuleMetadata:
         assert ev.metadata == {"cas.hit": True, "cas.kind": "obj"}
 
 
+class TestRuleListeners:
+    """``add_rule_listener`` sees every recorded rule with its phase chain."""
+
+    def test_listener_receives_event_and_phase_chain(self):
+        timer = BuildTimer(enabled=True)
+        seen = []
+        timer.add_rule_listener(lambda event, parents: seen.append((event, parents)))
+        with timer.phase("build_execution"), timer.phase("compile"):
+            timer.record_rule("compile", "obj/foo.o", "src/foo.cpp", 0.5)
+        assert len(seen) == 1
+        event, parents = seen[0]
+        assert event.target == "obj/foo.o"
+        assert [p.name for p in parents] == ["total", "build_execution", "compile"]
+        assert parents[-1].children == [event]
+
+    def test_removed_listener_is_not_called(self):
+        timer = BuildTimer(enabled=True)
+        seen = []
+
+        def listener(event, parents):
+            seen.append(event)
+
+        timer.add_rule_listener(listener)
+        timer.record_rule("compile", "a.o", "a.cpp", 0.1)
+        timer.remove_rule_listener(listener)
+        timer.remove_rule_listener(listener)
+        timer.record_rule("compile", "b.o", "b.cpp", 0.1)
+        assert [e.target for e in seen] == ["a.o"]
+
+    def test_disabled_timer_never_calls_listeners(self):
+        timer = BuildTimer(enabled=False)
+        seen = []
+        timer.add_rule_listener(lambda event, parents: seen.append(event))
+        timer.record_rule("compile", "a.o", "a.cpp", 0.1)
+        assert seen == []
+
+
 # ---------------------------------------------------------------- outcomes log
 
 
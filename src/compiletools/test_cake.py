@@ -486,6 +486,45 @@ class TestCake(BaseCompileToolsTestCase):
 
             assert "platform_main" in actual_exes
 
+    @uth.requires_functional_compiler
+    def test_variants_build_each_variant_on_shared_analysis(self):
+        """--variants builds every listed variant in one process; the forks
+        share the content-hash analysis layer but not the macro-keyed one."""
+        with uth.TempDirContext():
+            self._tmpdir = os.getcwd()
+            shutil.copy2(uth.example_file("simple/helloworld_cpp.cpp"), self._tmpdir)
+            uth.create_temp_config(self._tmpdir, filename="va.conf")
+            uth.create_temp_config(self._tmpdir, filename="vb.conf", extralines=['CXXFLAGS="-O1"'])
+            uth.create_temp_ct_conf(tempdir=self._tmpdir, defaultvariant="va")
+
+            forks = []
+            original = BuildContext.fork_variant
+
+            def recording_fork(context):
+                forks.append(original(context))
+                return forks[-1]
+
+            uth.reset()
+            with patch.object(BuildContext, "fork_variant", recording_fork):
+                result = compiletools.cake.main(["--exemarkers=main", "--testmarkers=unittest.hpp", "--variants=va,vb"])
+
+            assert result == 0
+            assert len(forks) == 2
+            assert forks[0].analyze_file_cache is forks[1].analyze_file_cache
+            assert forks[0].analyze_file_cache
+            assert forks[0].file_hashes is forks[1].file_hashes
+            assert forks[0].variant_preprocessing_cache is not forks[1].variant_preprocessing_cache
+            built = {
+                os.path.relpath(root, self._tmpdir)
+                for root, _dirs, files in os.walk(self._tmpdir)
+                if "helloworld_cpp" in files
+            }
+            assert {os.path.join("bin", "va"), os.path.join("bin", "vb")} <= built
+
+    def test_variant_argv_replaces_variant_selection(self):
+        argv = ["--variant", "x", "--variants=a,b", "-v", "--variant=y", "main.cpp"]
+        assert compiletools.cake._variant_argv(argv, "b") == ["-v", "main.cpp", "--variant=b"]
+
     def test_main_nothing_to_do(self):
         """Test that main() returns 0 when there's nothing to do."""
         with self._tmpdir_with_config():
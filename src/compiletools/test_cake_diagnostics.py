@@ -208,6 +208,121 @@ def test_otel_export_failure_does_not_fail_build(monkeypatch, tmp_path, capsys):
     assert "OTLP export failed: boom" in captured.err
 
 
+def test_otel_stream_closes_the_live_exporter_instead_of_batch_export(monkeypatch, tmp_path, capsys):
+    """``--otel-stream`` starts the live exporter before the build and the
+    post-build pipeline closes it; the end-of-build tree walk never runs."""
+    argv = [
+        "--bindir",
+        str(tmp_path / "bin"),
+        "--cas-objdir",
+        str(tmp_path / "obj"),
+        "--otel-export",
+        "--otel-stream",
+        "irrelevant.cpp",
+    ]
+    args = _build_args(argv)
+    compiletools.apptools.validate_otel_timing_pair(args)
+
+    def _stub_createctobjs(self):
+        self.hunter = object()
+
+    monkeypatch.setattr(compiletools.cake.Cake, "_createctobjs", _stub_createctobjs)
+    monkeypatch.setattr(compiletools.cake.Cake, "_call_backend", lambda self: None)
+
+    import compiletools.otel as oe
+
+    calls = []
+
+    class _FakeStream:
+        def close(self):
+            calls.append("close")
+
+    def _start(timer, args):
+        calls.append("start")
+        return _FakeStream()
+
+    def _batch(timer, args):
+        raise AssertionError("export_buildtimer must not run with --otel-stream")
+
+    monkeypatch.setattr(oe, "start_live_export", _start)
+    monkeypatch.setattr(oe, "export_buildtimer", _batch)
+
+    compiletools.cake.Cake(args).process()
+
+    assert calls == ["start", "close"]
+    assert "OTLP export failed" not in capsys.readouterr().err
+
+
+def test_otel_stream_falls_back_to_batch_export_off_shake(monkeypatch, tmp_path):
+    """make/ninja only record rules from their logs after the build, so
+    ``--otel-stream`` would stream nothing live: the end-of-build export runs."""
+    argv = [
+        "--backend",
+        "make",
+        "--bindir",
+        str(tmp_path / "bin"),
+        "--cas-objdir",
+        str(tmp_path / "obj"),
+        "--otel-export",
+        "--otel-stream",
+        "irrelevant.cpp",
+    ]
+    args = _build_args(argv)
+    compiletools.apptools.validate_otel_timing_pair(args)
+
+    def _stub_createctobjs(self):
+        self.hunter = object()
+
+    monkeypatch.setattr(compiletools.cake.Cake, "_createctobjs", _stub_createctobjs)
+    monkeypatch.setattr(compiletools.cake.Cake, "_call_backend", lambda self: None)
+
+    import compiletools.otel as oe
+
+    calls = []
+
+    def _start(timer, args):
+        raise AssertionError("start_live_export must not run off shake")
+
+    monkeypatch.setattr(oe, "start_live_export", _start)
+    monkeypatch.setattr(oe, "export_buildtimer", lambda timer, args: calls.append("batch"))
+
+    compiletools.cake.Cake(args).process()
+
+    assert calls == ["batch"]
+
+
+def test_build_history_records_the_build_and_implies_timing(monkeypatch, tmp_path):
+    """``--build-history`` (no value) turns timing on and appends the build
+    to build-history.sqlite in the diagnostics root, beside -- not inside
+    -- the per-invocation directory."""
+    from compiletools import build_history
+
+    bindir = tmp_path / "bin"
+    argv = ["--build-history", "--bindir", str(bindir), "--cas-objdir", str(tmp_path / "obj"), "irrelevant.cpp"]
+    args = _build_args(argv)
+    assert args.build_history == "auto"
+    assert args.timing is False
+
+    def _stub_createctobjs(self):
+        self.hunter = object()
+
+    monkeypatch.setattr(compiletools.cake.Cake, "_createctobjs", _stub_createctobjs)
+    monkeypatch.setattr(compiletools.cake.Cake, "_call_backend", lambda self: None)
+
+    cake = compiletools.cake.Cake(args)
+    assert cake.context.timer is not None and cake.context.timer.enabled
+    cake.process()
+
+    path = bindir / "diagnostics" / "build-history.sqlite"
+    conn = build_history.connect(str(path))
+    try:
+        builds = build_history.recent_builds(conn)
+    finally:
+        conn.close()
+    assert [b.invocation_id for b in builds] == [compiletools.diagnostics.invocation_id()]
+    assert builds[0].compile_avoided_rate == 0.0
+
+
 def test_otel_export_with_no_timing_hard_errors(tmp_path):
     """``--otel-export --no-timing`` is internally contradictory and
     must hard-error at validate time, not silently warn and continue.
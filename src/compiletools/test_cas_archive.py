@@ -0,0 +1,94 @@
+"""Tests for ``ct-cas-archive``, the incremental static-library archiver."""
+
+from __future__ import annotations
+
+import os
+import shutil
+import subprocess
+
+import pytest
+
+import compiletools.cas_archive
+from compiletools.cas_archive import archive, archive_members, plan_update
+
+pytestmark = pytest.mark.skipif(shutil.which("ar") is None, reason="needs binutils ar")
+
+
+def _members(tmp_path, names):
+    paths = []
+    for name in names:
+        path = tmp_path / "objs" / name
+        path.parent.mkdir(exist_ok=True)
+        path.write_text(f"payload of {name}\n")
+        paths.append(str(path))
+    return paths
+
+
+class TestPlanUpdate:
+    def test_small_library_is_rebuilt(self):
+        assert plan_update(["a.o"], ["/x/a.o", "/x/b.o"], min_members=3) is None
+
+    def test_drops_stale_and_adds_new_members(self):
+        plan = plan_update(["a.o", "b.o", "c.o"], ["/x/a.o", "/x/c.o", "/x/d.o"], min_members=3)
+        assert plan == (["b.o"], [(None, ["/x/d.o"])])
+
+    def test_new_members_go_before_the_kept_member_that_follows_them(self):
+        plan = plan_update(["a.o", "c.o", "e.o"], ["/x/a.o", "/x/b.o", "/x/c.o", "/x/d.o", "/x/e.o"], min_members=3)
+        assert plan == ([], [("c.o", ["/x/b.o"]), ("e.o", ["/x/d.o"])])
+
+    def test_reordered_members_are_rebuilt(self):
+        assert plan_update(["a.o", "b.o", "c.o"], ["/x/b.o", "/x/a.o", "/x/c.o"], min_members=3) is None
+
+    def test_scattered_insertions_are_rebuilt(self, monkeypatch):
+        monkeypatch.setattr(compiletools.cas_archive, "MAX_INSERTIONS", 1)
+        assert (
+            plan_update(["a.o", "c.o", "e.o"], ["/x/a.o", "/x/b.o", "/x/c.o", "/x/d.o", "/x/e.o"], min_members=3)
+            is None
+        )
+
+    def test_low_reuse_is_rebuilt(self):
+        assert plan_update(["a.o", "b.o"], ["/x/c.o", "/x/d.o", "/x/e.o"], min_members=3) is None
+
+    def test_duplicate_basenames_are_rebuilt(self):
+        assert plan_update(["a.o", "b.o"], ["/x/a.o", "/y/a.o", "/x/b.o"], min_members=3) is None
+
+
+class TestArchive:
+    def test_without_base_builds_from_scratch(self, tmp_path):
+        objects = _members(tmp_path, ["a.o", "b.o"])
+        out = str(tmp_path / "lib.a")
+        assert archive("ar", out, objects, base=str(tmp_path / "missing.a")) is False
+        assert archive_members("ar", out) == ["a.o", "b.o"]
+
+    def test_updates_a_copy_of_the_previous_archive(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(compiletools.cas_archive, "MIN_MEMBERS", 3)
+        old = _members(tmp_path, ["a.o", "b.o", "c.o", "d.o"])
+        base = str(tmp_path / "published.a")
+        archive("ar", base, old)
+        before = (tmp_path / "published.a").read_bytes()
+
+        new = [
+            *_members(tmp_path, ["0.o"]),
+            *old[:2],
+            *_members(tmp_path, ["c2.o"]),
+            old[3],
+            *_members(tmp_path, ["e.o"]),
+        ]
+        out = str(tmp_path / "cas.a")
+        assert archive("ar", out, new, base=base) is True
+        assert archive_members("ar", out) == ["0.o", "a.o", "b.o", "c2.o", "d.o", "e.o"]
+        fresh = str(tmp_path / "fresh.a")
+        assert archive("ar", fresh, new) is False
+        assert (tmp_path / "cas.a").read_bytes() == (tmp_path / "fresh.a").read_bytes()
+        printed = subprocess.run(["ar", "p", out, "e.o"], capture_output=True, text=True, check=True).stdout
+        assert printed == "payload of e.o\n"
+        assert (tmp_path / "published.a").read_bytes() == before
+
+    def test_main_writes_the_output(self, tmp_path):
+        objects = _members(tmp_path, ["a.o"])
+        out = tmp_path / "lib.a"
+        argv = compiletools.cas_archive.archive_argv("ar", str(out), objects, str(tmp_path / "none.a"))
+        assert argv[0] == "ct-cas-archive"
+        assert compiletools.cas_archive.main(argv[1:]) == 0
+        assert os.path.exists(out)
+        assert archive_members("ar", str(out)) == ["a.o"]
@@ -26,7 +26,13 @@ import compiletools.cas_publish
 import compiletools.filesystem_utils
 import compiletools.locking
 import compiletools.trim_cache
-from compiletools.cas_publish import EXIT_CONCURRENT_TRIM, ConcurrentTrimError, freshen_cas_entry, publish
+from compiletools.cas_publish import (
+    EXIT_CONCURRENT_TRIM,
+    ConcurrentTrimError,
+    freshen_cas_entries,
+    freshen_cas_entry,
+    publish,
+)
 
 
 def _make_cas_entry(tmp_path, name="payload"):
@@ -111,6 +117,11 @@ class TestPublishAtomicityVsConcurrency:
     reason="platform lacks os.link (e.g. Termux/Android); the EXDEV branch can't be exercised",
 )
 class TestPublishExdevFallback:
+    @pytest.fixture(autouse=True)
+    def _no_reflink(self, monkeypatch):
+        # These pin the symlink fallback; a tmpdir on btrfs/XFS would clone.
+        monkeypatch.setattr(compiletools.filesystem_utils, "reflink_supported", lambda _directory: False)
+
     def test_exdev_falls_back_to_symlink(self, cas, user, monkeypatch):
         """I2: cross-filesystem EXDEV from os.link must fall back to symlink."""
         original_link = os.link
@@ -168,6 +179,53 @@ class TestPublishExdevFallback:
         )
 
 
+def _fake_reflink(clones):
+    """A ``filesystem_utils.reflink`` stand-in: a full copy, recorded."""
+
+    def reflink(src, dst):
+        shutil.copy2(src, dst)
+        clones.append((src, dst))
+
+    return reflink
+
+
+@pytest.mark.skipif(not hasattr(os, "link"), reason="platform lacks os.link; the link errors can't be injected")
+class TestPublishReflinkFallback:
+    @pytest.fixture(autouse=True)
+    def _reflink(self, monkeypatch):
+        self.clones = []
+        monkeypatch.setattr(compiletools.filesystem_utils, "reflink_supported", lambda _directory: True)
+        monkeypatch.setattr(compiletools.filesystem_utils, "reflink", _fake_reflink(self.clones))
+
+    @pytest.mark.parametrize("link_errno", [errno.EXDEV, errno.EPERM])
+    def test_refused_hardlink_publishes_a_clone(self, cas, user, monkeypatch, link_errno):
+        """A clone instead of a symlink: the published path survives a later
+        trim of the entry, because it is an inode of its own."""
+
+        def fake_link(src, dst, *, src_dir_fd=None, dst_dir_fd=None, follow_symlinks=True):
+            raise OSError(link_errno, os.strerror(link_errno))
+
+        monkeypatch.setattr(os, "link", fake_link)
+        publish(str(cas), str(user))
+
+        assert len(self.clones) == 1 and self.clones[0][0] == str(cas)
+        assert not user.is_symlink()
+        assert user.read_bytes() == cas.read_bytes()
+        os.unlink(str(cas))
+        assert user.exists()
+
+    def test_eperm_without_a_clone_still_surfaces(self, cas, user, monkeypatch):
+        def fake_link(src, dst, *, src_dir_fd=None, dst_dir_fd=None, follow_symlinks=True):
+            raise OSError(errno.EPERM, "Operation not permitted")
+
+        monkeypatch.setattr(os, "link", fake_link)
+        monkeypatch.setattr(compiletools.filesystem_utils, "reflink_supported", lambda _directory: False)
+        with pytest.raises(OSError) as excinfo:
+            publish(str(cas), str(user))
+        assert excinfo.value.errno == errno.EPERM
+        assert not os.path.lexists(str(user))
+
+
 class TestSidecarManifest:
     def test_manifest_written_with_source_realpath(self, cas, user):
         """C4 sidecar: trim_exedir reads <cas>.manifest to bucket entries
@@ -620,6 +678,57 @@ class TestCasEntryFreshening:
 
         assert os.stat(str(cas)).st_mtime == original_mtime
 
+    def test_freshen_cas_entries_skips_recently_used_entries(self, tmp_path):
+        """The backends' no-op-build pass hands over an age cutoff; only the
+        entries older than it are bumped."""
+        cold = _make_cas_entry(tmp_path, "cold")
+        warm = _make_cas_entry(tmp_path, "warm")
+        stale = time.time() - 45 * 86400
+        os.utime(str(cold), (stale, stale))
+        recent = time.time() - 60
+        os.utime(str(warm), (recent, recent))
+
+        freshen_cas_entries([str(cold), str(warm), str(tmp_path / "gone")], older_than=time.time() - 3600)
+
+        assert time.time() - os.stat(str(cold)).st_mtime < 60
+        assert os.stat(str(warm)).st_mtime == pytest.approx(recent)
+
+
+class TestBatchPublish:
+    def test_batch_publishes_every_entry(self, tmp_path):
+        first, second = _make_cas_entry(tmp_path, "a"), _make_cas_entry(tmp_path, "b")
+        argv = compiletools.cas_publish.batch_argv(
+            [(str(first), str(tmp_path / "bin" / "a"), "/src/a.cpp"), (str(second), str(tmp_path / "bin" / "b"), None)]
+        )
+
+        assert compiletools.cas_publish.main(argv[1:]) == 0
+
+        assert os.path.samefile(tmp_path / "bin" / "a", first)
+        assert os.path.samefile(tmp_path / "bin" / "b", second)
+        assert json.loads((tmp_path / "cas" / "a.manifest").read_text()) == {"source_realpath": "/src/a.cpp"}
+        assert not (tmp_path / "cas" / "b.manifest").exists()
+
+    def test_a_trimmed_entry_does_not_stop_its_siblings(self, tmp_path, capsys):
+        present = _make_cas_entry(tmp_path, "present")
+        missing = str(tmp_path / "cas" / "trimmed")
+        argv = ["--batch", missing, str(tmp_path / "bin" / "x"), "", str(present), str(tmp_path / "bin" / "y"), ""]
+
+        assert compiletools.cas_publish.main(argv) == EXIT_CONCURRENT_TRIM
+
+        assert os.path.samefile(tmp_path / "bin" / "y", present)
+        assert missing in capsys.readouterr().err
+
+    def test_batch_rejects_a_partial_triple(self, tmp_path):
+        with pytest.raises(SystemExit):
+            compiletools.cas_publish.main(["--batch", "cas", "user"])
+
+    def test_parse_publish_command_reads_both_forms(self):
+        single = ["ct-cas-publish", "--cas-path", "c", "--user-path", "u", "--source-realpath", "s"]
+        assert compiletools.cas_publish.parse_publish_command(single) == [("c", "u", "s")]
+        batched = compiletools.cas_publish.batch_argv([("c1", "u1", None), ("c2", "u2", "s2")])
+        assert compiletools.cas_publish.parse_publish_command(batched) == [("c1", "u1", None), ("c2", "u2", "s2")]
+        assert compiletools.cas_publish.parse_publish_command(["ln", "-s", "a", "b"]) is None
+
 
 def _patch_filelock_raising(monkeypatch, err, message):
     """Make every ``FileLock`` acquisition fail with ``OSError(err, message)``."""
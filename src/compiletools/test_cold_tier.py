@@ -0,0 +1,76 @@
+"""Tests for the compressed cold tier and its rehydration on the miss path."""
+
+from __future__ import annotations
+
+import os
+import time
+
+from compiletools import cold_tier
+from compiletools.locking import rehydrate_cold_entry
+
+
+def _entry(tmp_path, name="foo_abc.o", payload=b"debug-info " * 4096, *, age_seconds=0):
+    path = str(tmp_path / name)
+    with open(path, "wb") as f:
+        f.write(payload)
+    os.chmod(path, 0o644)
+    if age_seconds:
+        old = time.time() - age_seconds
+        os.utime(path, (old, old))
+    return path
+
+
+def _demote(path):
+    sibling = cold_tier.compress(path, os.stat(path))
+    assert sibling is not None
+    os.remove(path)
+    return sibling
+
+
+def test_names_round_trip():
+    assert cold_tier.raw_path("b/foo.o.zst") == "b/foo.o"
+    assert cold_tier.raw_path("b/libx.a.gz") == "b/libx.a"
+    assert cold_tier.raw_path("b/foo.o") == "b/foo.o"
+    assert cold_tier.is_cold("foo.o.gz") and not cold_tier.is_cold("foo.o")
+    assert cold_tier.is_demotable("libx.a") and not cold_tier.is_demotable("prog.exe")
+
+
+def test_compress_keeps_age_and_mode_and_rehydrates_byte_identical(tmp_path):
+    path = _entry(tmp_path, age_seconds=10 * 86400)
+    with open(path, "rb") as f:
+        original = f.read()
+    mtime = os.stat(path).st_mtime
+
+    sibling = _demote(path)
+    assert sibling == path + cold_tier.readable_suffixes()[0]
+    assert os.path.getsize(sibling) < len(original)
+    assert int(os.stat(sibling).st_mtime) == int(mtime)
+    assert cold_tier.find_cold(path) == sibling
+
+    assert rehydrate_cold_entry(None, path) is True
+    with open(path, "rb") as f:
+        assert f.read() == original
+    assert os.stat(path).st_mode & 0o777 == 0o644
+    assert not os.path.exists(sibling)
+    assert sorted(os.listdir(tmp_path)) == ["foo_abc.o"]
+
+
+def test_incompressible_entry_stays_raw(tmp_path):
+    path = _entry(tmp_path, payload=os.urandom(4096))
+    assert cold_tier.compress(path, os.stat(path)) is None
+    assert os.listdir(tmp_path) == ["foo_abc.o"]
+
+
+def test_no_sibling_is_a_plain_miss(tmp_path):
+    assert rehydrate_cold_entry(None, str(tmp_path / "foo_abc.o")) is False
+
+
+def test_corrupt_sibling_costs_a_rebuild_not_the_build(tmp_path, capsys):
+    target = str(tmp_path / "foo_abc.o")
+    with open(target + cold_tier.readable_suffixes()[0], "wb") as f:
+        f.write(b"not a compressed stream")
+
+    assert rehydrate_cold_entry(None, target) is False
+    assert not os.path.exists(target)
+    assert not any(name.endswith(".tmp") for name in os.listdir(tmp_path))
+    assert "cannot rehydrate" in capsys.readouterr().err
@@ -1895,3 +1895,102 @@ class TestStrictPkgConfigCarveOuts:
 
         with pytest.raises(compiletools.apptools_pkgconfig.PkgConfigError):
             creator.create_compilation_database()
+
+
+class TestIncrementalCompilationDatabase:
+    """``--compilation-database-incremental`` / ``--compilation-database-fragments``."""
+
+    def test_streamed_output_matches_json_dumps(self, tmp_path):
+        cdb = compiletools.compilation_database
+        entries = [
+            {"directory": "/w", "file": "/w/a.cpp", "arguments": ["g++", '-DX="1"', "-c", "/w/a.cpp"]},
+            {"directory": "/w", "file": "/w/bé.c", "arguments": ["gcc", "-c", "/w/bé.c"]},
+        ]
+        for subset in (entries, entries[:1], []):
+            path = str(tmp_path / "out.json")
+            cdb._write_streamed(path, (cdb._render_entry(e) for e in subset))
+            with open(path, encoding="utf-8") as f:
+                assert f.read() == json.dumps(subset, indent=2, ensure_ascii=False)
+
+    @staticmethod
+    def _run(temp_config_name, realpaths, *extra):
+        with uth.ParserContext():
+            compiletools.compilation_database.main(
+                [
+                    "--config=" + temp_config_name,
+                    "--compilation-database-incremental",
+                    "--compilation-database-output=compile_commands.json",
+                    *extra,
+                ]
+                + realpaths
+            )
+
+    @uth.requires_functional_compiler
+    def test_unchanged_rerun_reuses_entries_and_skips_write(self):
+        with _temp_dir_with_config() as temp_config_name:
+            realpaths = [uth.example_file(f) for f in ["simple/helloworld_cpp.cpp", "simple/helloworld_c.c"]]
+            with uth.ParserContext():
+                compiletools.compilation_database.main(
+                    ["--config=" + temp_config_name, "--compilation-database-output=full.json"] + realpaths
+                )
+            self._run(temp_config_name, realpaths)
+            with open("full.json") as f, open("compile_commands.json") as g:
+                assert f.read() == g.read()
+            index_path = compiletools.compilation_database.index_pathname("compile_commands.json")
+            with open(index_path) as f:
+                index = json.load(f)
+            assert {compiletools.wrappedos.realpath(p) for p in realpaths} == set(index["entries"])
+            assert all(record["key"] for record in index["entries"].values())
+
+            first = os.stat("compile_commands.json")
+            time.sleep(0.05)
+            rebuilt = []
+            original = compiletools.compilation_database.CompilationDatabaseCreator._create_command_object
+
+            def counting(creator, source_file):
+                rebuilt.append(source_file)
+                return original(creator, source_file)
+
+            compiletools.compilation_database.CompilationDatabaseCreator._create_command_object = counting
+            try:
+                self._run(temp_config_name, realpaths)
+            finally:
+                compiletools.compilation_database.CompilationDatabaseCreator._create_command_object = original
+            assert rebuilt == []
+            second = os.stat("compile_commands.json")
+            assert (second.st_ino, second.st_mtime_ns) == (first.st_ino, first.st_mtime_ns)
+
+    @uth.requires_functional_compiler
+    def test_database_rewritten_behind_the_index_is_reread(self):
+        with _temp_dir_with_config() as temp_config_name:
+            cpp = uth.example_file("simple/helloworld_cpp.cpp")
+            self._run(temp_config_name, [cpp])
+            foreign = {"directory": "/elsewhere", "file": "/elsewhere/other.cpp", "arguments": ["g++", "-c"]}
+            with open("compile_commands.json") as f:
+                commands = json.load(f)
+            with open("compile_commands.json", "w") as f:
+                json.dump([foreign, *commands], f)
+
+            self._run(temp_config_name, [cpp])
+
+            with open("compile_commands.json") as f:
+                commands = json.load(f)
+            assert commands[0] == foreign
+            assert [c["file"] for c in commands[1:]] == [compiletools.wrappedos.realpath(cpp)]
+
+    @uth.requires_functional_compiler
+    def test_fragments_mirror_source_directories(self):
+        with _temp_dir_with_config() as temp_config_name:
+            realpaths = [uth.example_file(f) for f in ["simple/helloworld_cpp.cpp", "factory/test_factory.cpp"]]
+            self._run(temp_config_name, realpaths, "--compilation-database-fragments=frag")
+
+            fragments = sorted(os.path.join(root, name) for root, _dirs, files in os.walk("frag") for name in files)
+            assert len(fragments) == 2
+            by_dir = {}
+            for path in fragments:
+                with open(path) as f:
+                    for cmd in json.load(f):
+                        by_dir.setdefault(os.path.dirname(cmd["file"]), set()).add(path)
+            assert all(len(paths) == 1 for paths in by_dir.values())
+            with open("compile_commands.json") as f:
+                assert {c["file"] for c in json.load(f)} >= {compiletools.wrappedos.realpath(p) for p in realpaths}
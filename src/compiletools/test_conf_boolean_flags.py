@@ -131,12 +131,14 @@ _EXPECTED_FLAG_ARGUMENT_NAMES = frozenset(
         "no-fetch",
         "otel-export",
         "otel-metrics-as-spans",
+        "otel-stream",
         "scope-diagnostics",
         "separate-flags-CPP-CXX",
         "serialise-tests",
         "shorten",
         "shuffle",
         "status",
+        "suggest-pch",
         "suppress-fd-warnings",
         "suppress-filesystem-warnings",
         "timing",
@@ -148,13 +150,22 @@ _EXPECTED_FLAG_ARGUMENT_NAMES = frozenset(
 # The names those value-converting call sites register.
 _EXPECTED_BOOLEAN_ARGUMENT_NAMES = frozenset(
     {
+        "access-journal",
+        "action-cache-upload",
         "all",
         "allow-magic-source-in-header",
+        "auto-pch",
+        "compilation-database-incremental",
         "configname",
         "file-locking",
+        "include-cache",
+        "incremental-archive",
         "preprocess",
         "repoonly",
+        "shard-tests",
         "shorten",
+        "test-impact",
+        "unity",
         "use-mtime",
     }
 )
@@ -0,0 +1,189 @@
+"""Tests for the on-disk memo of parseargs resolutions (``CT_CONFIG_MEMO``)."""
+
+from __future__ import annotations
+
+import os
+import sys
+
+import pytest
+
+import compiletools.apptools as apptools
+import compiletools.config_memo as config_memo
+import compiletools.testhelper as uth
+from compiletools.build_apply import get_build_state
+from compiletools.build_context import BuildContext
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    """A one-conf project as the cwd, with the memo enabled and a counter of
+    full resolutions."""
+    root = tmp_path / "proj"
+    root.mkdir()
+    (root / "ct.conf").write_text("variant = blank\nCXXFLAGS = -O1\n")
+    store = tmp_path / "memo"
+    monkeypatch.chdir(root)
+    monkeypatch.setenv(config_memo.CONFIG_MEMO_ENV, str(store))
+    monkeypatch.setattr("compiletools.git_utils.find_git_root", lambda filename=None: str(root))
+
+    resolutions = []
+    real_resolve = apptools._resolve_args
+
+    def counting_resolve(*a, **kw):
+        resolutions.append(a[1])
+        # Stands in for the notes a real resolution prints.
+        print("ct: note: resolving", file=sys.stderr)
+        return real_resolve(*a, **kw)
+
+    monkeypatch.setattr(apptools, "_resolve_args", counting_resolve)
+    uth.reset()
+    yield root, store, resolutions
+    uth.reset()
+
+
+def _parse(argv, *, targets=False):
+    uth.reset()
+    cap = apptools.create_parser("config memo test", argv=argv)
+    apptools.add_common_arguments(cap, argv=argv)
+    if targets:
+        apptools.add_target_arguments_ex(cap)
+    with uth.ParserContext():
+        context = BuildContext()
+        return apptools.parseargs(cap, argv, context=context), cap, context
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        ("", None),
+        ("0", None),
+        ("off", None),
+        ("1", "default"),
+        ("yes", "default"),
+        ("/srv/memo", "/srv/memo"),
+    ],
+)
+def test_memo_dir_reads_the_environment(monkeypatch, value, expected):
+    monkeypatch.setenv(config_memo.CONFIG_MEMO_ENV, value)
+    result = config_memo.memo_dir()
+    if expected == "default":
+        assert result is not None and result.endswith(os.path.join("ct", "config-memo"))
+    else:
+        assert result == expected
+
+
+def test_disabled_memo_always_resolves(project, monkeypatch):
+    _root, store, resolutions = project
+    monkeypatch.delenv(config_memo.CONFIG_MEMO_ENV)
+    _parse([])
+    _parse([])
+    assert len(resolutions) == 2
+    assert not store.exists()
+
+
+def test_identical_invocation_reuses_the_resolution(project):
+    _root, store, resolutions = project
+    first, _, _ = _parse([])
+    second, cap, context = _parse([])
+
+    assert len(resolutions) == 1
+    assert get_build_state(second) == get_build_state(first)
+    assert second.CXXFLAGS == first.CXXFLAGS
+    assert second._parser is cap
+    assert second._context is context
+    assert second._argv == []
+    assert len(os.listdir(store)) == 1
+    assert os.stat(store).st_mode & 0o777 == 0o700
+
+
+def test_different_argv_is_a_different_entry(project):
+    _root, store, resolutions = project
+    _parse([])
+    args, _, _ = _parse(["--CXXFLAGS=-O3"])
+    assert len(resolutions) == 2
+    assert args.CXXFLAGS == "-O3"
+    assert len(os.listdir(store)) == 2
+
+
+def test_edited_conf_file_invalidates(project):
+    root, _store, resolutions = project
+    _parse([])
+    conf = root / "ct.conf"
+    conf.write_text("variant = blank\nCXXFLAGS = -O2 -g\n")
+    args, _, _ = _parse([])
+    assert len(resolutions) == 2
+    assert args.CXXFLAGS == "-O2 -g"
+    # The refreshed entry is reused again.
+    _parse([])
+    assert len(resolutions) == 2
+
+
+def test_new_target_layer_invalidates(project):
+    root, _store, resolutions = project
+    sub = root / "sub"
+    sub.mkdir()
+    (sub / "main.cpp").write_text("int main() {}\n")
+    argv = ["sub/main.cpp"]
+    _parse(argv, targets=True)
+    _parse(argv, targets=True)
+    assert len(resolutions) == 1
+
+    (sub / "ct.conf").write_text("CXXFLAGS = -Os\n")
+    args, _, _ = _parse(argv, targets=True)
+    assert len(resolutions) == 2
+    assert args.CXXFLAGS == "-Os"
+
+
+def test_changed_compiler_binary_invalidates(project, tmp_path, monkeypatch):
+    _root, _store, resolutions = project
+    bindir = tmp_path / "bin"
+    bindir.mkdir()
+    real = apptools.get_functional_cxx_compiler() or "g++"
+    wrapper = bindir / "my-cxx"
+    wrapper.write_text(f'#!/bin/sh\nexec {real} "$@"\n')
+    wrapper.chmod(0o755)
+    monkeypatch.setenv("PATH", f"{bindir}{os.pathsep}{os.environ['PATH']}")
+    argv = ["--CXX=my-cxx"]
+    _parse(argv)
+    _parse(argv)
+    assert len(resolutions) == 1
+
+    wrapper.write_text(f'#!/bin/sh\n# upgraded\nexec {real} "$@"\n')
+    _parse(argv)
+    assert len(resolutions) == 2
+
+
+def test_command_sourced_values_are_not_memoized(project):
+    _root, store, resolutions = project
+    argv = ["--project-version-cmd=echo 1.2.3"]
+    _parse(argv, targets=True)
+    _parse(argv, targets=True)
+    assert len(resolutions) == 2
+    assert not store.exists() or not os.listdir(store)
+
+
+def test_shared_memo_directory_is_not_trusted(project):
+    _root, store, resolutions = project
+    _parse([])
+    os.chmod(store, 0o777)
+    _parse([])
+    assert len(resolutions) == 2
+
+
+def test_corrupt_entry_is_a_miss(project):
+    _root, store, resolutions = project
+    _parse([])
+    (entry,) = os.listdir(store)
+    (store / entry).write_bytes(b"not a pickle")
+    args, _, _ = _parse([])
+    assert len(resolutions) == 2
+    assert args.CXXFLAGS == "-O1"
+
+
+def test_recorded_output_is_replayed(project, capsys):
+    _root, _store, resolutions = project
+    _parse([])
+    assert "ct: note: resolving" in capsys.readouterr().err
+    _parse([])
+    assert len(resolutions) == 1
+    assert "ct: note: resolving" in capsys.readouterr().err
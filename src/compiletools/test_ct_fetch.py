@@ -147,6 +147,39 @@ def test_main_default_clones_and_summarizes(monkeypatch, capsys) -> None:
         assert clone in out
 
 
+@requires_functional_compiler
+def test_main_git_mirror_dir_shares_one_mirror_across_workspaces(monkeypatch) -> None:
+    """Two externals dirs (two worktrees) fetched with the same
+    --git-mirror-dir: one mirror, and the second clone needs no remote."""
+    with tempfile.TemporaryDirectory() as root:
+        ext = _make_bare_with_files(root, "extlib", {"include/extlib.h": "#pragma once\nint extfn();\n"})
+        mirrors = os.path.join(root, "mirrors")
+        main_repo = _make_main_repo(
+            root,
+            f'//#GIT={ext["url"]}@master\n#include "extlib.h"\nint main() {{ return extfn(); }}\n',
+        )
+        monkeypatch.chdir(main_repo)
+        _neutralise_git(monkeypatch)
+
+        def _fetch_into(name: str) -> str:
+            externals_dir = os.path.join(root, name)
+            os.makedirs(externals_dir)
+            argv = ["main.cpp", "--externals-dir", externals_dir, "--git-mirror-dir", mirrors, "--file-locking"]
+            assert fetch.main(_pinned_argv(main_repo, argv)) == 0
+            uth.reset()
+            return os.path.join(externals_dir, "extlib")
+
+        first = _fetch_into("ws1")
+        os.rename(ext["bare"], ext["bare"] + ".offline")
+        second = _fetch_into("ws2")
+
+        assert os.path.isfile(os.path.join(second, "include", "extlib.h"))
+        assert _git(second, "rev-parse", "HEAD") == _git(first, "rev-parse", "HEAD") == ext["sha"]
+        assert [name for name in os.listdir(mirrors) if name.endswith(".git")] == [
+            os.path.basename(fetch._mirror_path(mirrors, fetch.GitExternal("extlib", ext["url"], "master")))
+        ]
+
+
 @requires_functional_compiler
 def test_main_keyboardinterrupt_exits_cleanly(monkeypatch, capsys) -> None:
     """A Ctrl-C/SIGTERM during the parallel-clone window surfaces as a
@@ -38,6 +38,7 @@ REPO_ROOT = Path(__file__).resolve().parent.parent.parent
 # ``--version`` (cheap and useful for diagnostics) but NOT the rest.
 PINNED_CLI_TOOLS: frozenset[str] = frozenset(
     {
+        "ct-cas-archive",
         "ct-cas-publish",
         "ct-lock-helper",
     }
@@ -153,6 +153,7 @@ def _make_backend(tmpdir, **arg_overrides):
     backend.namer = uth.make_mock_namer(args)
     backend.context = BuildContext()
     backend._anchor_root = ""
+    backend._unity_object_for = {}
     return backend
 
 
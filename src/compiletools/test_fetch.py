@@ -430,6 +430,87 @@ def test_resolve_clone_when_missing_with_branch() -> None:
         assert os.path.isfile(os.path.join(res.path, "feat.txt"))
 
 
+# ---------------------------------------------------------------------------
+# Shared bare mirror (--git-mirror-dir)
+# ---------------------------------------------------------------------------
+
+
+def _alternates(path: str) -> str:
+    return _read_file(os.path.join(path, ".git", "objects", "info", "alternates")).strip()
+
+
+def test_mirror_clone_shares_objects_and_keeps_the_declared_origin() -> None:
+    with tempfile.TemporaryDirectory() as root:
+        origin = _make_bare_origin(root)
+        ext = GitExternal(name="mylib", url=origin["url"], ref="v1")
+        mirrors = os.path.join(root, "mirrors")
+        mirror = fetch._ensure_mirror(ext, mirrors, None, ttl=3600, refresh=False, verbose=0)
+        assert mirror is not None and mirror.startswith(mirrors + os.sep)
+        assert _git(mirror, "config", "gc.pruneExpire") == "never"
+
+        res = resolve_external(ext, externals_dir=os.path.join(root, "ws1"), mirror=mirror)
+        assert res.on_disk_ref == origin["c1"]
+        assert _alternates(res.path) == os.path.join(mirror, "objects")
+        assert _git(res.path, "remote", "get-url", "origin") == origin["url"]
+
+
+def test_mirror_serves_a_second_workspace_without_the_remote() -> None:
+    with tempfile.TemporaryDirectory() as root:
+        origin = _make_bare_origin(root)
+        ext = GitExternal(name="mylib", url=origin["url"], ref="feature")
+        mirrors = os.path.join(root, "mirrors")
+        fetch._ensure_mirror(ext, mirrors, None, ttl=3600, refresh=False, verbose=0)
+
+        # Within the TTL the mirror is not refreshed, so a vanished remote
+        # does not matter to the next workspace.
+        shutil.move(origin["bare"], origin["bare"] + ".gone")
+        mirror = fetch._ensure_mirror(ext, mirrors, None, ttl=3600, refresh=False, verbose=0)
+        res = resolve_external(ext, externals_dir=os.path.join(root, "ws2"), mirror=mirror)
+        assert res.on_disk_ref == origin["cf"]
+
+
+def test_mirror_refreshes_only_once_the_ttl_has_passed() -> None:
+    with tempfile.TemporaryDirectory() as root:
+        origin = _make_bare_origin(root)
+        ext = GitExternal(name="mylib", url=origin["url"], ref=None)
+        mirrors = os.path.join(root, "mirrors")
+        mirror = fetch._ensure_mirror(ext, mirrors, None, ttl=3600, refresh=False, verbose=0)
+        advanced = _advance_branch(origin, "master", "three\n")
+
+        fetch._ensure_mirror(ext, mirrors, None, ttl=3600, refresh=False, verbose=0)
+        assert _git(mirror, "rev-parse", "refs/heads/master") == origin["c2"]
+
+        stamp = os.path.join(mirror, fetch._MIRROR_STAMP)
+        old = time.time() - 7200
+        os.utime(stamp, (old, old))
+        fetch._ensure_mirror(ext, mirrors, None, ttl=3600, refresh=False, verbose=0)
+        assert _git(mirror, "rev-parse", "refs/heads/master") == advanced
+
+
+def test_mirror_refreshes_early_for_a_ref_it_lacks() -> None:
+    with tempfile.TemporaryDirectory() as root:
+        origin = _make_bare_origin(root)
+        mirrors = os.path.join(root, "mirrors")
+        fetch._ensure_mirror(
+            GitExternal("mylib", origin["url"], None), mirrors, None, ttl=3600, refresh=False, verbose=0
+        )
+        advanced = _advance_branch(origin, "master", "three\n")
+
+        ext = GitExternal(name="mylib", url=origin["url"], ref=advanced)
+        mirror = fetch._ensure_mirror(ext, mirrors, None, ttl=3600, refresh=False, verbose=0)
+        res = resolve_external(ext, externals_dir=os.path.join(root, "ws"), mirror=mirror)
+        assert res.on_disk_ref == advanced
+
+
+def test_unreachable_mirror_url_falls_back_to_a_direct_clone(capsys: pytest.CaptureFixture) -> None:
+    with tempfile.TemporaryDirectory() as root:
+        ext = GitExternal(name="nope", url="file://" + os.path.join(root, "missing.git"), ref=None)
+        mirrors = os.path.join(root, "mirrors")
+        assert fetch._ensure_mirror(ext, mirrors, None, ttl=3600, refresh=False, verbose=0) is None
+        assert "git mirror unavailable" in capsys.readouterr().err
+        assert os.listdir(mirrors) == []
+
+
 # ---------------------------------------------------------------------------
 # Present + at-ref → no network (verified by deleting the remote first)
 # ---------------------------------------------------------------------------
@@ -992,6 +992,96 @@ class TestAnalyzeFileMarkerCommentAware:
         assert result.marker_type == MarkerType.EXE
 
 
+class TestAnalyzeFiles:
+    """analyze_files warms the cache with exactly what analyze_file would store."""
+
+    @staticmethod
+    def _context():
+        ctx = BuildContext()
+        args = SimpleNamespace(
+            max_read_size=0,
+            verbose=0,
+            exemarkers=["main("],
+            testmarkers=["unit_test.hpp"],
+            librarymarkers=[],
+            use_mmap=True,
+            force_mmap=False,
+            suppress_fd_warnings=True,
+            suppress_filesystem_warnings=True,
+        )
+        set_analyzer_args(args, ctx)
+        return ctx
+
+    def test_process_pool_matches_serial_analysis(self, tmp_path, monkeypatch):
+        import compiletools.file_analyzer as fa
+        from compiletools.global_hash_registry import get_file_hash
+
+        paths = []
+        for i in range(12):
+            path = tmp_path / f"f{i}.cpp"
+            body = "int main() { return 0; }\n" if i % 3 == 0 else f"int f{i}() {{ return {i}; }}\n"
+            path.write_text(f'#include "h{i}.hpp"\n#define X{i} {i}\n' + body)
+            paths.append(str(path))
+
+        monkeypatch.setattr(fa, "_PARALLEL_ANALYSIS_MIN_FILES", 4)
+        monkeypatch.setattr(fa, "_MIN_FILES_PER_WORKER", 2)
+        parallel = self._context()
+        hashes = [get_file_hash(p, parallel) for p in paths]
+        # Workers import their own copy of the module, so only an in-process
+        # fallback reaches this spy.
+        serial_calls = []
+        monkeypatch.setattr(fa, "analyze_file", lambda h, ctx: serial_calls.append(h))
+        fa.analyze_files(hashes, parallel, max_workers=2)
+        assert serial_calls == []
+
+        serial = self._context()
+        for p in paths:
+            analyze_file(get_file_hash(p, serial), serial)
+
+        assert list(parallel.analyze_file_cache) == list(serial.analyze_file_cache)
+        for h in hashes:
+            got, want = parallel.analyze_file_cache[h], serial.analyze_file_cache[h]
+            assert got.marker_type == want.marker_type
+            assert got.includes == want.includes
+            assert got.defines == want.defines
+            assert got.line_byte_offsets == want.line_byte_offsets
+
+    def test_a_failing_pool_falls_back_to_serial_analysis(self, tmp_path, monkeypatch):
+        from multiprocessing.reduction import ForkingPickler
+
+        import compiletools.file_analyzer as fa
+        from compiletools.global_hash_registry import get_file_hash
+
+        paths = []
+        for i in range(8):
+            path = tmp_path / f"f{i}.cpp"
+            path.write_text(f"int f{i}() {{ return {i}; }}\n")
+            paths.append(str(path))
+
+        monkeypatch.setattr(fa, "_PARALLEL_ANALYSIS_MIN_FILES", 4)
+        monkeypatch.setattr(fa, "_MIN_FILES_PER_WORKER", 2)
+        # A lambda cannot be pickled over to a worker, so every chunk fails.
+        monkeypatch.setattr(fa, "_analyze_chunk", lambda *a: [])
+        ctx = self._context()
+        hashes = [get_file_hash(p, ctx) for p in paths]
+        fa.analyze_files(hashes, ctx, max_workers=2)
+
+        assert list(ctx.analyze_file_cache) == hashes
+        assert sz.Str not in ForkingPickler._extra_reducers, "the Str reducer stays out of the building process"
+
+    def test_cached_entries_are_kept(self, tmp_path):
+        import compiletools.file_analyzer as fa
+        from compiletools.global_hash_registry import get_file_hash
+
+        path = tmp_path / "a.cpp"
+        path.write_text("int main() {}\n")
+        ctx = self._context()
+        content_hash = get_file_hash(str(path), ctx)
+        first = analyze_file(content_hash, ctx)
+        fa.analyze_files([content_hash, content_hash], ctx)
+        assert ctx.analyze_file_cache[content_hash] is first
+
+
 class TestGetDirectiveLineNumbers:
     """Test FileAnalysisResult.get_directive_line_numbers method."""
 
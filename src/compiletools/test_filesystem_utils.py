@@ -1,6 +1,7 @@
 """Tests for filesystem_utils module."""
 
 import builtins
+import errno
 import glob
 import os
 import stat
@@ -10,15 +11,20 @@ from pathlib import Path
 
 import pytest
 
+import compiletools.filesystem_utils
 from compiletools.filesystem_utils import (
+    atomic_copy,
     atomic_output_file,
     atomic_write,
     atomic_write_if_changed,
+    copy_file,
+    get_copy_strategy,
     get_filesystem_type,
     get_lock_strategy,
     get_lockdir_sleep_interval,
     match_mountpoint,
     parse_mount_lines,
+    reflink_supported,
     safe_read_text_file,
     should_parallelize_scan,
     supports_mmap_safely,
@@ -125,6 +131,109 @@ def test_supports_mmap_safely(fstype, expected):
     assert supports_mmap_safely(fstype) is expected
 
 
+@pytest.mark.parametrize(
+    ("fstype", "expected"),
+    [
+        pytest.param("btrfs", "reflink", id="btrfs"),
+        pytest.param("XFS", "reflink", id="xfs-uppercase"),
+        pytest.param("bcachefs", "reflink", id="bcachefs"),
+        pytest.param("ocfs2", "reflink", id="ocfs2"),
+        pytest.param("zfs", "reflink", id="zfs"),
+        pytest.param("ext4", "copy", id="ext4"),
+        pytest.param("tmpfs", "copy", id="tmpfs"),
+        pytest.param("nfs4", "copy", id="nfs4"),
+        pytest.param("unknown", "copy", id="unknown"),
+    ],
+)
+def test_get_copy_strategy(fstype, expected):
+    assert get_copy_strategy(fstype) == expected
+
+
+@pytest.fixture
+def reflink_probes(monkeypatch):
+    """An empty per-filesystem probe cache, restored afterwards."""
+    monkeypatch.setattr(compiletools.filesystem_utils, "_reflink_probes", {})
+
+
+def test_reflink_probe_runs_once_per_filesystem(tmp_path, monkeypatch, reflink_probes):
+    probes = []
+    monkeypatch.setattr(compiletools.filesystem_utils, "get_filesystem_type", lambda _path: "btrfs")
+    monkeypatch.setattr(compiletools.filesystem_utils, "_probe_reflink", lambda d: probes.append(d) or True)
+    (tmp_path / "a").mkdir()
+    (tmp_path / "b").mkdir()
+
+    assert reflink_supported(str(tmp_path / "a")) is True
+    assert reflink_supported(str(tmp_path / "b")) is True
+    assert probes == [str(tmp_path / "a")]
+
+
+def test_reflink_is_never_probed_on_a_non_cow_filesystem(tmp_path, monkeypatch, reflink_probes):
+    monkeypatch.setattr(compiletools.filesystem_utils, "get_filesystem_type", lambda _path: "ext4")
+    monkeypatch.setattr(compiletools.filesystem_utils, "_probe_reflink", lambda _d: pytest.fail("probed ext4"))
+    assert reflink_supported(str(tmp_path)) is False
+
+
+def test_unwritable_probe_directory_is_not_cached(tmp_path, monkeypatch, reflink_probes):
+    monkeypatch.setattr(compiletools.filesystem_utils, "get_filesystem_type", lambda _path: "btrfs")
+    monkeypatch.setattr(compiletools.filesystem_utils, "_probe_reflink", lambda _d: None)
+    assert reflink_supported(str(tmp_path)) is False
+    assert compiletools.filesystem_utils._reflink_probes == {}
+
+
+def test_copy_file_falls_back_to_a_full_copy_when_the_clone_fails(tmp_path, monkeypatch):
+    def refuse(src, dst):
+        raise OSError(errno.EXDEV, "Invalid cross-device link")
+
+    monkeypatch.setattr(compiletools.filesystem_utils, "reflink_supported", lambda _directory: True)
+    monkeypatch.setattr(compiletools.filesystem_utils, "reflink", refuse)
+    src = tmp_path / "src"
+    src.write_bytes(b"payload")
+    os.chmod(src, 0o750)
+
+    copy_file(str(src), str(tmp_path / "dst"))
+
+    assert (tmp_path / "dst").read_bytes() == b"payload"
+    assert stat.S_IMODE((tmp_path / "dst").stat().st_mode) == 0o750
+
+
+def test_atomic_copy_prefer_reflink_clones_instead_of_hardlinking(tmp_path, monkeypatch):
+    clones = []
+
+    def fake_reflink(src, dst):
+        with open(src, "rb") as f_in, open(dst, "xb") as f_out:
+            f_out.write(f_in.read())
+        clones.append(dst)
+
+    monkeypatch.setattr(compiletools.filesystem_utils, "reflink_supported", lambda _directory: True)
+    monkeypatch.setattr(compiletools.filesystem_utils, "reflink", fake_reflink)
+    src = tmp_path / "built"
+    src.write_bytes(b"exe")
+
+    atomic_copy(str(src), str(tmp_path / "linked"))
+    atomic_copy(str(src), str(tmp_path / "cloned"), prefer_reflink=True)
+
+    assert os.path.samefile(src, tmp_path / "linked")
+    assert not os.path.samefile(src, tmp_path / "cloned")
+    assert (tmp_path / "cloned").read_bytes() == b"exe"
+    assert len(clones) == 1
+
+
+def test_probe_leaves_no_scratch_files(tmp_path):
+    assert compiletools.filesystem_utils._probe_reflink(str(tmp_path)) in (True, False)
+    assert os.listdir(tmp_path) == []
+
+
+def test_real_reflink_round_trip(tmp_path, reflink_probes):
+    """End to end on the host's tmp filesystem; skipped where it cannot clone."""
+    if not reflink_supported(str(tmp_path)):
+        pytest.skip(f"{get_filesystem_type(str(tmp_path))} cannot reflink")
+    src = tmp_path / "src"
+    src.write_bytes(b"x" * 65536)
+    compiletools.filesystem_utils.reflink(str(src), str(tmp_path / "clone"))
+    assert (tmp_path / "clone").read_bytes() == src.read_bytes()
+    assert not os.path.samefile(src, tmp_path / "clone")
+
+
 @pytest.mark.parametrize(
     ("fstype", "expected"),
     [
@@ -87,6 +87,38 @@ def test_batch_hash_objects_empty():
     assert gsr.batch_hash_objects([]) == {}
 
 
+def _git_hash_object(repo, name):
+    out = subprocess.run(["git", "hash-object", name], cwd=repo, check=True, capture_output=True, text=True)
+    return out.stdout.strip()
+
+
+def test_blob_sha_matches_git_including_mmap_path(tmp_git_repo, monkeypatch):
+    (tmp_git_repo / "small.h").write_bytes(b"int x;\n")
+    (tmp_git_repo / "big.h").write_bytes(b"// generated\n" * 4096)
+    (tmp_git_repo / "empty.h").write_bytes(b"")
+    monkeypatch.setattr(gsr, "_MMAP_THRESHOLD", 1024)
+    for name in ("small.h", "big.h", "empty.h"):
+        assert gsr.blob_sha(tmp_git_repo / name) == _git_hash_object(tmp_git_repo, name)
+
+
+def test_batch_hash_objects_defers_converted_files_to_git(tmp_git_repo, monkeypatch):
+    """A file under a conversion attribute (here ``ident``) hashes differently
+    in git than as raw bytes; batch_hash_objects must still return git's SHA."""
+    (tmp_git_repo / ".gitattributes").write_text("*.idh ident\n")
+    (tmp_git_repo / "stamped.idh").write_text("// $Id: 0123456789abcdef $\n")
+    (tmp_git_repo / "plain.h").write_text("int plain;\n")
+    hashed_in_process = []
+    real_hash_blobs = gsr.hash_blobs
+    monkeypatch.setattr(gsr, "hash_blobs", lambda paths: hashed_in_process.extend(paths) or real_hash_blobs(paths))
+
+    paths = [tmp_git_repo / "stamped.idh", tmp_git_repo / "plain.h"]
+    result = gsr.batch_hash_objects(paths)
+
+    assert result == {p: _git_hash_object(tmp_git_repo, p.name) for p in paths}
+    assert result[paths[0]] != gsr.blob_sha(paths[0])
+    assert hashed_in_process == [tmp_git_repo / "plain.h"]
+
+
 def test_main_tracked_only(tmp_git_repo, capsys):
     """main() prints tracked file hashes."""
     import sys
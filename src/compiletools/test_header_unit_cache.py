@@ -0,0 +1,78 @@
+"""Tests for the persistent gcc header-unit resolution cache."""
+
+from __future__ import annotations
+
+import os
+
+import compiletools.wrappedos
+from compiletools import backend_cxx_modules as bcm
+from compiletools import header_unit_cache
+from compiletools.header_unit_cache import HeaderUnitResolutionCache
+from compiletools.testhelper import make_backend_args, make_mock_hunter, make_stub_backend_class
+
+
+def _header(tmp_path, name="vector"):
+    path = tmp_path / "sys" / name
+    path.parent.mkdir(exist_ok=True)
+    path.write_text("// system header\n")
+    return str(path)
+
+
+def test_key_covers_compiler_std_flags_and_token():
+    base = header_unit_cache.key("g++|1|2", "-std=c++20", ("-isystem", "/a"), "<vector>")
+    assert base == header_unit_cache.key("g++|1|2", "-std=c++20", ("-isystem", "/a"), "<vector>")
+    assert base != header_unit_cache.key("g++|1|3", "-std=c++20", ("-isystem", "/a"), "<vector>")
+    assert base != header_unit_cache.key("g++|1|2", "-std=c++23", ("-isystem", "/a"), "<vector>")
+    assert base != header_unit_cache.key("g++|1|2", "-std=c++20", ("-isystem", "/b"), "<vector>")
+    assert base != header_unit_cache.key("g++|1|2", "-std=c++20", ("-isystem", "/a"), "<string>")
+
+
+def test_round_trip_and_vanished_header(tmp_path):
+    header = _header(tmp_path)
+    path = str(tmp_path / "cache.json")
+    store = HeaderUnitResolutionCache(path)
+    assert store.lookup("k") is None
+    store.record("k", [header])
+    store.record("failed", [])
+    store.save()
+
+    reloaded = HeaderUnitResolutionCache(path)
+    assert reloaded.lookup("k") == [header]
+    assert reloaded.lookup("failed") is None
+    assert (reloaded.hits, reloaded.misses) == (1, 1)
+
+    os.unlink(header)
+    compiletools.wrappedos.clear_cache()
+    assert HeaderUnitResolutionCache(path).lookup("k") is None
+
+
+def test_corrupt_sidecar_is_empty(tmp_path):
+    path = tmp_path / "cache.json"
+    path.write_text("{not json")
+    assert HeaderUnitResolutionCache(str(path)).lookup("k") is None
+
+
+def test_warm_backend_skips_the_compiler_probe(tmp_path, monkeypatch):
+    header = _header(tmp_path)
+    probes = []
+
+    def probe(cxx, token, std_flag="-std=c++20", include_flags=()):
+        probes.append(token)
+        return [header]
+
+    monkeypatch.setattr(bcm, "_resolve_system_header_abs_paths", probe)
+    monkeypatch.setattr("compiletools.build_backend._resolve_system_header_abs_paths", probe)
+
+    def backend():
+        args = make_backend_args(str(tmp_path))
+        os.makedirs(args.cas_objdir, exist_ok=True)
+        return make_stub_backend_class()(args=args, hunter=make_mock_hunter())
+
+    cold = backend()
+    assert cold._resolve_header_unit_paths("<vector>", "-std=c++20", ()) == [header]
+    cold._save_header_unit_resolutions()
+
+    warm = backend()
+    assert warm._resolve_header_unit_paths("<vector>", "-std=c++20", ()) == [header]
+    assert probes == ["<vector>"]
+    assert (warm._header_unit_resolutions.hits, warm._header_unit_resolutions.misses) == (1, 0)
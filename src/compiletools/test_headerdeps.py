@@ -658,6 +658,32 @@ class TestHeaderDepsUnitTests(tb.BaseCompileToolsTestCase):
             f"header in space-containing extra include dir not resolved; got {deps}"
         )
 
+    def test_parse_mm_output_handles_continuations_and_escaped_spaces(self):
+        out = "a.o: /src/a.cpp /inc/b.h \\\n /has\\ space/c.h\n"
+        assert compiletools.headerdeps.parse_mm_output(out) == ["/src/a.cpp", "/inc/b.h", "/has space/c.h"]
+        assert compiletools.headerdeps.parse_mm_output("") == []
+
+    @uth.requires_functional_compiler
+    def test_cpp_prefetch_serves_process_without_forking(self, tmp_path, monkeypatch):
+        (tmp_path / "shared.hpp").write_text("#pragma once\n")
+        sources = []
+        for name in ("one", "two", "three"):
+            src = tmp_path / f"{name}.cpp"
+            src.write_text(f'#include "shared.hpp"\nint {name}() {{ return 0; }}\n')
+            sources.append(str(src))
+
+        ctx = BuildContext()
+        deps_object = compiletools.headerdeps.CppHeaderDeps(self._make_args(), context=ctx)
+        deps_object.prefetch(sources)
+        assert len(ctx.cpp_deps_cache) == 3
+
+        def _no_fork(*args, **kwargs):
+            raise AssertionError("process() forked despite a prefetched result")
+
+        monkeypatch.setattr(deps_object.preprocessor, "process", _no_fork)
+        for src in sources:
+            assert deps_object.process(src, frozenset()) == [str(tmp_path / "shared.hpp")]
+
     def test_direct_clear_instance_cache(self):
         """Test DirectHeaderDeps.clear_instance_cache."""
         args = self._make_args()
@@ -5,6 +5,7 @@ import pytest
 
 import compiletools.apptools
 import compiletools.apptools_pkgconfig as pkgconfig
+import compiletools.file_analyzer
 import compiletools.headerdeps
 import compiletools.hunter
 import compiletools.magicflags
@@ -302,6 +303,59 @@ class TestHunterHuntSource:
         hntr.huntsource()
         assert "old.cpp" not in hntr._hunted_sources
 
+    def test_huntsource_prewarms_every_reachable_file(self, hunter_factory, monkeypatch):
+        """The reachable headers are analyzed before the walk, and the walk
+        finds the same sources it finds from a cold cache."""
+        from compiletools.global_hash_registry import get_file_hash
+
+        monkeypatch.setattr(compiletools.file_analyzer, "_PARALLEL_ANALYSIS_MIN_FILES", 1)
+
+        realpath = uth.example_file("factory/test_factory.cpp")
+        cold, cold_args = hunter_factory()
+        cold_args.filename = [realpath]
+        cold.huntsource()
+        headers = cold.header_dependencies(realpath)
+        assert headers
+
+        hntr, args = hunter_factory()
+        args.filename = [realpath]
+        hntr._prewarm_analysis([realpath])
+        for header in headers:
+            assert get_file_hash(header, hntr.context) in hntr.context.analyze_file_cache
+        hntr.huntsource()
+        assert hntr._hunted_sources == cold._hunted_sources
+
+    def test_prewarm_skips_levels_too_small_for_the_pool(self, hunter_factory):
+        hntr, _args = hunter_factory()
+        hntr._prewarm_analysis([uth.example_file("factory/test_factory.cpp")])
+        assert not hntr.context.analyze_file_cache
+
+    def test_prewarm_resolutions_are_not_persisted(self, hunter_factory, monkeypatch):
+        """Prewarm ignores conditionals, so its answers stay out of the
+        persistent include cache."""
+
+        class _Store:
+            def __init__(self):
+                self.recorded = []
+
+            def lookup(self, cwd, include):
+                return False, None
+
+            def record(self, cwd, include, resolved, watched):
+                self.recorded.append(include)
+
+        monkeypatch.setattr(compiletools.file_analyzer, "_PARALLEL_ANALYSIS_MIN_FILES", 1)
+        realpath = uth.example_file("factory/test_factory.cpp")
+        hntr, args = hunter_factory()
+        args.filename = [realpath]
+        store = hntr.headerdeps._include_store = _Store()
+        hntr._prewarm_analysis([realpath])
+        assert hntr.context.analyze_file_cache
+        assert store.recorded == []
+        # The walk's own resolutions are still recorded.
+        hntr.huntsource()
+        assert store.recorded
+
     def test_gettestsources_no_tests(self, hunter_factory):
         """Test gettestsources with no test sources (lines 316-332)."""
         hntr, _args = hunter_factory()
@@ -0,0 +1,164 @@
+"""Tests for the persistent #include resolution cache."""
+
+from __future__ import annotations
+
+import dataclasses
+import os
+
+import configargparse
+import pytest
+
+import compiletools.apptools
+import compiletools.headerdeps
+import compiletools.include_cache as ic
+import compiletools.wrappedos
+from compiletools.build_context import BuildContext
+
+
+@pytest.fixture(autouse=True)
+def _no_racy_window(monkeypatch):
+    """Files created by a test are always "racily" new; shrink the window so
+    the snapshot trusts anything modified before the cache was constructed."""
+    monkeypatch.setattr(ic, "_RACY_WINDOW_NS", 0)
+    compiletools.wrappedos.clear_cache()
+    yield
+    compiletools.wrappedos.clear_cache()
+
+
+def _touch_later(path):
+    """Bump *path*'s mtime past anything a snapshot taken now recorded, and
+    drop the stat memo the way a prebuild script or fetch round does."""
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 5_000_000_000))
+    compiletools.wrappedos.clear_cache()
+
+
+def test_fingerprint_depends_on_search_order():
+    assert ic.fingerprint(["/a", "/b"]) != ic.fingerprint(["/b", "/a"])
+
+
+def test_watch_dirs_climbs_to_nearest_existing_ancestor(tmp_path):
+    trial = tmp_path / "missing" / "deeper" / "x.h"
+    assert ic.watch_dirs(str(trial)) == [
+        str(tmp_path / "missing" / "deeper"),
+        str(tmp_path / "missing"),
+        str(tmp_path),
+    ]
+
+
+def test_round_trip_and_invalidation_on_new_file(tmp_path):
+    inc = tmp_path / "inc"
+    inc.mkdir()
+    sidecar = str(tmp_path / "cache.json")
+
+    store = ic.IncludeResolutionCache(sidecar)
+    store.record("/src", "vector", None, [str(inc)])
+    store.save()
+
+    warm = ic.IncludeResolutionCache(sidecar)
+    assert warm.lookup("/src", "vector") == (True, None)
+    assert warm.lookup("/src", "other") == (False, None)
+
+    (inc / "vector").write_text("")
+    _touch_later(inc)
+    assert ic.IncludeResolutionCache(sidecar).lookup("/src", "vector") == (False, None)
+
+
+def test_stale_slot_is_not_revalidated_by_a_newer_record(tmp_path):
+    inc = tmp_path / "inc"
+    inc.mkdir()
+    sidecar = str(tmp_path / "cache.json")
+    store = ic.IncludeResolutionCache(sidecar)
+    store.record("/src", "a.h", None, [str(inc)])
+    store.save()
+
+    (inc / "a.h").write_text("")
+    _touch_later(inc)
+    fresh = ic.IncludeResolutionCache(sidecar)
+    fresh.record("/src", "b.h", None, [str(inc)])
+    assert fresh.lookup("/src", "a.h") == (False, None)
+    fresh.save()
+    assert ic.IncludeResolutionCache(sidecar).lookup("/src", "a.h") == (False, None)
+
+
+def test_racy_directories_are_not_persisted(tmp_path, monkeypatch):
+    monkeypatch.setattr(ic, "_RACY_WINDOW_NS", 60_000_000_000)
+    store = ic.IncludeResolutionCache(str(tmp_path / "cache.json"))
+    store.record("/src", "x.h", None, [str(tmp_path)])
+    store.save()
+    assert not (tmp_path / "cache.json").exists()
+
+
+def test_corrupt_sidecar_reads_as_empty(tmp_path):
+    sidecar = tmp_path / "cache.json"
+    sidecar.write_text('{"version": 1, "dirs": ["/a"], "mtimes": [], "entries": {}}')
+    assert ic.IncludeResolutionCache(str(sidecar)).lookup("/src", "x.h") == (False, None)
+
+
+# --------------------------------------------------------------- DirectHeaderDeps wiring
+
+
+def _direct_deps(tmp_path, *include_dirs, include_cache=True):
+    cap = configargparse.ArgumentParser(
+        conflict_handler="resolve",
+        args_for_setting_config_path=["-c", "--config"],
+        ignore_unknown_config_file_keys=True,
+    )
+    compiletools.headerdeps.add_arguments(cap)
+    argv = ["-q", "--CPPFLAGS=" + " ".join(f"-I{d}" for d in include_dirs)]
+    if not include_cache:
+        argv.append("--no-include-cache")
+    ctx = BuildContext()
+    args = compiletools.apptools.parseargs(cap, argv, context=ctx)
+    state = args._build_state
+    cas_objdir = str(tmp_path / "cas-objdir")
+    args._build_state = dataclasses.replace(state, names=dataclasses.replace(state.names, cas_objdir=cas_objdir))
+    return compiletools.headerdeps.DirectHeaderDeps(args, context=ctx), ctx
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    for var in compiletools.headerdeps.INCLUDE_PATH_ENV_VARS:
+        monkeypatch.delenv(var, raising=False)
+    first, second, src = tmp_path / "first", tmp_path / "second", tmp_path / "src"
+    for d in (first, second, src):
+        d.mkdir()
+    (second / "dep.h").write_text("#pragma once\n")
+    (src / "main.cpp").write_text('#include "dep.h"\n#include <vector>\nint main() { return 0; }\n')
+    return first, second, src
+
+
+def test_warm_instance_is_served_from_sidecar(tmp_path, project):
+    first, second, src = project
+    cold, ctx = _direct_deps(tmp_path, first, second)
+    assert cold.process(str(src / "main.cpp"), frozenset()) == [str(second / "dep.h")]
+    compiletools.headerdeps.save_include_caches(ctx)
+    (store,) = ctx.include_resolution_caches.values()
+    assert os.path.dirname(store.path) == str(tmp_path / "cas-objdir")
+
+    compiletools.wrappedos.clear_cache()
+    warm, warm_ctx = _direct_deps(tmp_path, first, second)
+    assert warm.process(str(src / "main.cpp"), frozenset()) == [str(second / "dep.h")]
+    (warm_store,) = warm_ctx.include_resolution_caches.values()
+    assert (warm_store.hits, warm_store.misses) == (2, 0)
+
+
+def test_shadowing_header_in_earlier_dir_invalidates(tmp_path, project):
+    first, second, src = project
+    cold, ctx = _direct_deps(tmp_path, first, second)
+    cold.process(str(src / "main.cpp"), frozenset())
+    compiletools.headerdeps.save_include_caches(ctx)
+
+    (first / "dep.h").write_text("#pragma once\n")
+    _touch_later(first)
+    warm, _ = _direct_deps(tmp_path, first, second)
+    assert warm.process(str(src / "main.cpp"), frozenset()) == [str(first / "dep.h")]
+
+
+def test_no_include_cache_disables_persistence(tmp_path, project):
+    first, second, src = project
+    deps, ctx = _direct_deps(tmp_path, first, second, include_cache=False)
+    deps.process(str(src / "main.cpp"), frozenset())
+    compiletools.headerdeps.save_include_caches(ctx)
+    assert ctx.include_resolution_caches == {}
+    assert not (tmp_path / "cas-objdir").exists()
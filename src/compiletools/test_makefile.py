@@ -3,6 +3,7 @@
 import contextlib
 import io
 import os
+import re
 import shutil
 import subprocess
 import time
@@ -253,9 +254,12 @@ class TestMakefileBackendFileLocking:
             backend._write_makefile(graph, buf)
         content = buf.getvalue()
 
-        # Native flock binary used instead of ct-lock-helper
+        # Native flock binary used instead of ct-lock-helper, which only runs
+        # for an object with a cold-tier sibling to restore.
         assert "flock " in content
-        assert "ct-lock-helper" not in content
+        for line in content.splitlines():
+            if "ct-lock-helper" in line:
+                assert re.search(r"^\s*if \[ -e .*; then .*ct-lock-helper compile .*; else flock ", line), line
 
     def test_compile_with_flock_strategy_fallback(self):
         """Falls back to ct-lock-helper when native flock binary is unavailable."""
@@ -387,6 +391,24 @@ class TestWrapLinkWithLock:
         assert result == "flock bin/foo.lock g++ -o bin/foo obj/foo.o"
         assert "ct-lock-helper" not in result
 
+    def test_static_archive_with_flock_diverts_cold_entries_to_helper(self):
+        """A demoted ``.a`` is restored by ct-lock-helper, not re-archived."""
+        args = _make_args(
+            file_locking=True,
+            sleep_interval_flock_fallback=0.03,
+            lock_warn_interval=30,
+            lock_cross_host_timeout=600,
+        )
+        with (
+            patch("compiletools.filesystem_utils.get_lock_strategy", return_value="flock"),
+            patch("compiletools.backend_locking._native_flock_available", return_value=True),
+            patch("compiletools.cold_tier.readable_suffixes", return_value=(".gz",)),
+        ):
+            result = wrap_link_with_lock("ar rcs -o lib/libfoo.a obj/foo.o", "lib/libfoo.a", args, "ext4")
+        assert result.startswith("if [ -e lib/libfoo.a.gz ]; then ")
+        assert "ct-lock-helper link --target=lib/libfoo.a --strategy=flock" in result
+        assert result.endswith("; else flock lib/libfoo.a.lock ar rcs -o lib/libfoo.a obj/foo.o; fi")
+
     def test_wraps_link_with_flock_fallback(self):
         """Falls back to ct-lock-helper when native flock is unavailable."""
 
@@ -1067,6 +1067,51 @@ class TestMakefileConcurrency:
                     assert rc in range(256), f"iter {iteration}: {exe} did not run cleanly"
 
 
+class TestMakefileColdTier:
+    """A ``ct-trim-cache --compress-cold`` demoted object comes back from its
+    compressed sibling on the native-flock recipe path instead of being
+    recompiled."""
+
+    @uth.requires_functional_compiler
+    @pytest.mark.skipif(sys.platform == "win32", reason="POSIX-only")
+    def test_demoted_object_is_rehydrated_not_recompiled(self, tmp_path, monkeypatch):
+        import compiletools.cold_tier
+
+        if shutil.which("flock") is None or shutil.which("ct-lock-helper") is None:
+            pytest.skip("needs flock(1) and ct-lock-helper on PATH")
+        monkeypatch.chdir(tmp_path)
+        src = tmp_path / "prog.cpp"
+        src.write_text("// ct-exemarker\nint answer() { return 42; }\nint main() { return answer() - 42; }\n")
+
+        with uth.TempConfigContext(tempdir=str(tmp_path)) as cfg:
+            with uth.ParserContext():
+                compiletools.makefile_backend.main(["--config=" + cfg, "--file-locking=true", str(src)])
+            (makefile,) = [f for f in os.listdir(".") if f.startswith("Makefile")]
+            with open(makefile) as f:
+                if "flock " not in f.read():
+                    pytest.skip("lock strategy here does not use the native flock recipe")
+            subprocess.run(["make", "-f", makefile], check=True, capture_output=True)
+
+            (obj,) = [os.path.join(dp, f) for dp, _d, fs in os.walk(tmp_path) for f in fs if f.endswith(".o")]
+            with open(obj, "rb") as f:
+                original = f.read()
+            st = os.stat(obj)
+            sibling = compiletools.cold_tier.compress(obj, st)
+            assert sibling is not None
+            os.unlink(obj)
+            # Break the source without making it newer than the link: a
+            # recompile now fails, so only a rehydrate can succeed.
+            src.write_text("this is not C++\n")
+            os.utime(src, ns=(st.st_atime_ns, st.st_mtime_ns - 10_000_000_000))
+
+            result = subprocess.run(["make", "-f", makefile], capture_output=True, text=True)
+
+        assert result.returncode == 0, result.stdout + result.stderr
+        with open(obj, "rb") as f:
+            assert f.read() == original
+        assert not os.path.exists(sibling)
+
+
 class TestMakeRunsTestsInBuildPhase:
     """MakefileBackend.execute("build") runs test ``.result`` rules
     natively (via the ``all`` phony), so make's ``-j`` scheduler fires each
@@ -1441,3 +1486,38 @@ class TestFreshenedEntryStaysUpToDate:
         # there genuinely is some.
         os.unlink(tmp_path / user_rel)
         assert self._make_is_up_to_date(tmp_path, user_rel) == 1
+
+
+@pytest.mark.skipif(tool_version("make") < (4, 3), reason="grouped targets need GNU Make 4.3")
+class TestBatchedPublish:
+    """Publishes sharing a directory run as one ``ct-cas-publish --batch``."""
+
+    def test_one_recipe_publishes_the_whole_directory(self, tmp_path):
+        graph = BuildGraph()
+        for name in ("a", "b"):
+            cas_rel, user_rel = f"cas-exe/{name}.exe", f"bin/{name}"
+            graph.add_rule(
+                BuildRule(
+                    output=user_rel,
+                    inputs=[cas_rel],
+                    command=["ct-cas-publish", "--cas-path", cas_rel, "--user-path", user_rel],
+                    rule_type="symlink",
+                    order_only_deps=["bin"],
+                )
+            )
+            (tmp_path / "cas-exe").mkdir(exist_ok=True)
+            (tmp_path / cas_rel).write_bytes(b"\x7fELF " + name.encode())
+        hunter = MagicMock()
+        hunter.getsources = MagicMock(return_value=[])
+        backend = MakefileBackend(args=_default_makefile_args(use_mtime=False), hunter=hunter)
+        makefile = _write_makefile(backend, graph, tmp_path)
+
+        assert makefile.read_text().count("ct-cas-publish --batch") == 1
+        (tmp_path / "bin").mkdir()
+        built = subprocess.run(
+            ["make", "-f", "Makefile", "bin/a", "bin/b"], cwd=str(tmp_path), capture_output=True, text=True
+        )
+        assert built.returncode == 0, built.stderr
+        assert built.stdout.count("ct-cas-publish") == 1, built.stdout
+        for name in ("a", "b"):
+            assert os.path.samefile(tmp_path / "bin" / name, tmp_path / "cas-exe" / f"{name}.exe")
@@ -612,6 +612,7 @@ def test_create_link_rule_returns_cas_link_plus_publish_pair(tmp_path):
     backend.namer = uth.make_mock_namer(args)
     backend.context = BuildContext()
     backend._anchor_root = ""
+    backend._unity_object_for = {}
 
     rules = backend._create_link_rule("/src/main.cpp")
     assert len(rules) == 2, f"expected [link, symlink], got {[r.rule_type for r in rules]}"
@@ -683,6 +684,7 @@ def test_create_link_rule_legacy_shape_when_backend_self_manages_exe(tmp_path):
     backend.namer = uth.make_mock_namer(args)
     backend.context = BuildContext()
     backend._anchor_root = ""
+    backend._unity_object_for = {}
 
     rules = backend._create_link_rule("/src/main.cpp")
     assert len(rules) == 1, f"legacy shape should be a single rule, got {len(rules)}"
@@ -726,6 +728,7 @@ def _make_minimal_link_backend(tmpdir, *, sources=None, env=None):
     backend.namer = uth.make_mock_namer(args)
     backend.context = BuildContext()
     backend._anchor_root = ""
+    backend._unity_object_for = {}
     return backend
 
 
@@ -895,3 +898,19 @@ def test_static_lib_key_changes_with_ar_identity(monkeypatch, tmp_path):
     assert rules1[0].output != rules2[0].output, (
         "AR identity must participate in the static-library cache key — binutils version determines archive format"
     )
+
+
+def test_incremental_archive_keeps_the_static_lib_key(monkeypatch, tmp_path):
+    """--incremental-archive changes the recipe, never the CAS path."""
+    backend = _make_minimal_link_backend(str(tmp_path), sources=["/src/lib.cpp"])
+    backend.args.static = ["/src/lib.cpp"]
+    full = backend._create_static_library_rule()
+
+    monkeypatch.setattr(backend.args, "incremental_archive", True, raising=False)
+    incremental = backend._create_static_library_rule()
+
+    assert incremental[0].output == full[0].output
+    assert incremental[0].inputs == full[0].inputs
+    assert incremental[0].command[0] == "ct-cas-archive"
+    assert incremental[0].command[incremental[0].command.index("-o") + 1] == full[0].output
+    assert incremental[0].command[incremental[0].command.index("--base") + 1] == incremental[1].output
@@ -16,6 +16,7 @@ from unittest import mock
 import pytest
 
 import compiletools.apptools
+import compiletools.cas_publish
 import compiletools.headerdeps
 import compiletools.hunter
 import compiletools.magicflags
@@ -51,6 +52,10 @@ def _make_bare_shake_backend(tmp_path, *, cas_subdir=None, context=None):
     backend.args.cas_objdir = str(cas_path)
     uth.stub_build_state(backend.args, cas_objdir=str(cas_path))
     backend.context = context if context is not None else BuildContext()
+    # State __init__ would have set that execute() reads.
+    backend._test_xml_by_source = {}
+    backend._test_durations_cache = None
+    backend._test_impact_pending = {}
     return backend
 
 
@@ -1272,6 +1277,31 @@ class TestSymlinkPublishShortCircuit:
             assert executed == [user_path]
             assert os.path.samefile(cas_path, user_path)
 
+    def test_publish_runs_in_process(self, monkeypatch, tmp_path):
+        """A due publish calls ``cas_publish.publish`` on a worker thread
+        rather than spawning one ``ct-cas-publish`` process per artefact."""
+        td = tmp_path
+        os.makedirs(td / "cas-exe" / "aa", exist_ok=True)
+        cas_path = str(td / "cas-exe" / "aa" / "foo_abc.exe")
+        user_path = str(td / "bin" / "foo")
+        (td / "cas-exe" / "aa" / "foo_abc.exe").write_bytes(b"\x7fELF cached executable")
+        graph = self._make_symlink_graph(cas_path, user_path)
+
+        with ShakeBackendTestContext(graph) as (backend, _):
+            monkeypatch.chdir(tmp_path)
+            with mock.patch("compiletools.trace_backend.execute_link_rule_async") as mock_spawn:
+                backend.execute("build")
+                mock_spawn.assert_not_called()
+            assert os.path.samefile(cas_path, user_path)
+
+    def test_in_process_trim_loss_keeps_the_subprocess_exit_code(self, tmp_path):
+        cmd = ["ct-cas-publish", "--cas-path", str(tmp_path / "gone"), "--user-path", str(tmp_path / "bin" / "foo")]
+        entries = compiletools.cas_publish.parse_publish_command(cmd)
+
+        with pytest.raises(subprocess.CalledProcessError) as excinfo:
+            ShakeBackend._publish_in_process(entries, cmd)
+        assert excinfo.value.returncode == compiletools.cas_publish.EXIT_CONCURRENT_TRIM
+
 
 # ---------------------------------------------------------------------------
 # Content-addressable link/library short-circuit
@@ -0,0 +1,103 @@
+"""Tests for learned-duration test sharding (``ct-cake --shard-tests``)."""
+
+from __future__ import annotations
+
+import json
+import os
+
+import compiletools.shard_tests as st
+from compiletools.testhelper import make_backend_args, make_mock_hunter, make_mock_namer, make_stub_backend_class
+
+_GTEST = ["/usr/include/gtest/gtest.h"]
+
+
+def test_parse_junit_sums_cases_per_suite(tmp_path):
+    report = tmp_path / "r.xml"
+    report.write_text(
+        '<testsuites><testsuite name="A">'
+        '<testcase classname="A" name="x" time="1.5"/><testcase classname="A" name="y" time="0.5"/>'
+        '</testsuite><testsuite name="B"><testcase classname="B" name="z" time="3"/></testsuite></testsuites>'
+    )
+    assert st.parse_junit_durations(str(report)) == {"A": 2.0, "B": 3.0}
+    assert st.parse_junit_durations(str(tmp_path / "missing.xml")) == {}
+
+
+def test_pack_suites_is_longest_first():
+    assert st.pack_suites({"a": 8.0, "b": 4.0, "c": 4.0, "d": 2.0}, 2) == [["a", "d"], ["b", "c"]]
+
+
+def test_gtest_plan_routes_unassigned_suites_to_shard_zero():
+    shards = st.plan("gtest", _GTEST, {"A": 16, "B": 16, "C": 8}, max_shards=3, shard_seconds=10)
+    assert shards == [["--gtest_filter=-B.*:C.*"], ["--gtest_filter=B.*"], ["--gtest_filter=C.*"]]
+
+
+def test_short_or_unsupported_tests_stay_whole():
+    assert st.plan("gtest", _GTEST, {"A": 3, "B": 3}, max_shards=8, shard_seconds=10) is None
+    assert st.plan("gtest", _GTEST, {"A": 60}, max_shards=8, shard_seconds=10) is None
+    assert st.plan("doctest", [], {"A": 60, "B": 60}, max_shards=8, shard_seconds=10) is None
+    v2 = ["/inc/catch2/catch.hpp"]
+    assert st.plan("catch2", v2, {"exe.global": 64}, max_shards=8, shard_seconds=10) is None
+    v3 = ["/inc/catch2/catch_all.hpp"]
+    assert st.plan("catch2", v3, {"exe.global": 64}, max_shards=4, shard_seconds=10)[3] == [
+        "--shard-count",
+        "4",
+        "--shard-index",
+        "3",
+    ]
+
+
+def test_instant_suites_do_not_add_up_to_a_shard():
+    # gtest writes time="0" for suites that finish within its resolution.
+    instant = {f"S{i}": 0.0 for i in range(20)}
+    assert st.plan("gtest", _GTEST, instant, max_shards=8, shard_seconds=10) is None
+    # ...and they ride along free next to a genuinely long suite.
+    shards = st.plan("gtest", _GTEST, {"Slow": 16, "Slower": 16, **instant}, max_shards=8, shard_seconds=10)
+    assert shards is not None and len(shards) == 4
+
+
+def _backend(tmp_path, source, history):
+    args = make_backend_args(
+        str(tmp_path),
+        tests=[source],
+        test_xml_dir=str(tmp_path / "xml"),
+        variant="gcc.debug",
+        shard_tests=True,
+        test_shard_seconds=10.0,
+        parallel=4,
+    )
+    os.makedirs(args.cas_objdir, exist_ok=True)
+    with open(os.path.join(args.cas_objdir, st.DURATIONS_FILE), "w") as f:
+        json.dump(history, f)
+    hunter = make_mock_hunter(sources=[source], headers=_GTEST)
+    backend = make_stub_backend_class()(args=args, hunter=hunter)
+    backend.namer = make_mock_namer(args)
+    return backend
+
+
+def test_learned_long_test_is_split_into_shard_rules(tmp_path):
+    source = "/src/test_big.cpp"
+    backend = _backend(tmp_path, source, {source: {"A": 16, "B": 16, "C": 8, "D": 8}})
+    graph = backend.build_graph()
+
+    tests = [r for r in graph.rules if r.rule_type == "test"]
+    assert len(tests) == 4
+    assert all(".shard" in r.output and r.output.endswith("of4.xml") for r in tests)
+    assert len({r.success_marker for r in tests}) == 4
+    assert sorted(graph.get_rule("runtests").inputs) == sorted(r.output for r in tests)
+    filters = sorted(next(a for a in r.command if a.startswith("--gtest_filter=")) for r in tests)
+    assert filters == ["--gtest_filter=-B.*:C.*:D.*", "--gtest_filter=B.*", "--gtest_filter=C.*", "--gtest_filter=D.*"]
+
+
+def test_reports_are_folded_into_the_history(tmp_path):
+    source = "/src/test_small.cpp"
+    backend = _backend(tmp_path, source, {})
+    graph = backend.build_graph()
+    (rule,) = [r for r in graph.rules if r.rule_type == "test"]
+    os.makedirs(os.path.dirname(rule.output), exist_ok=True)
+    with open(rule.output, "w") as f:
+        f.write('<testsuites><testsuite><testcase classname="S" name="t" time="2.5"/></testsuite></testsuites>')
+
+    backend._record_test_durations()
+
+    saved = st.load_durations(os.path.join(backend.args.cas_objdir, st.DURATIONS_FILE))
+    assert saved == {source: {"S": 2.5}}
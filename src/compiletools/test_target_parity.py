@@ -32,6 +32,7 @@ from pathlib import Path
 import pytest
 
 import compiletools.cake
+import compiletools.cas_publish
 import compiletools.findtargets
 import compiletools.makefile_backend
 import compiletools.testhelper as uth
@@ -152,12 +153,21 @@ def _relative(root, path):
 # Reading ct-cake: the generated Makefile
 # ---------------------------------------------------------------------------
 
-_PUBLISH = re.compile(r"ct-cas-publish --cas-path (\S+) --user-path \S+ --source-realpath (\S+)")
 _ARCHIVE = re.compile(r"^\tar -\S+ (\S+)", re.MULTILINE)
 _SHARED = re.compile(r"-shared -o (\S+)")
 _RUNTESTS = re.compile(r"^runtests:(.*)$", re.MULTILINE)
 
 
+def _published_sources(text):
+    """``(cas_path, source_realpath)`` for every entry a publish recipe
+    publishes, whether one per recipe or several under ``--batch``."""
+    for line in text.splitlines():
+        if line.startswith("\tct-cas-publish "):
+            for cas_path, _user_path, source in compiletools.cas_publish.parse_publish_command(shlex.split(line)) or []:
+                if source:
+                    yield cas_path, source
+
+
 def parse_cake_makefile(root, text):
     """Bucket -> set of source paths, read from the Makefile text alone.
 
@@ -175,7 +185,7 @@ def parse_cake_makefile(root, text):
     results = set(runtests_line.group(1).split()) if runtests_line else set()
 
     found = {bucket: set() for bucket in BUCKETS}
-    for cas_path, source in _PUBLISH.findall(text):
+    for cas_path, source in _published_sources(text):
         if cas_path in archives:
             bucket = STATIC
         elif cas_path in shared:
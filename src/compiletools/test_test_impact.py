@@ -0,0 +1,64 @@
+"""Tests for ``ct-cake --test-impact`` test selection."""
+
+from __future__ import annotations
+
+import os
+
+from compiletools.testhelper import make_backend_args, make_mock_hunter, make_mock_namer, make_stub_backend_class
+
+_SOURCE = "/src/test_widget.cpp"
+
+
+def _backend(tmp_path, **overrides):
+    args = make_backend_args(str(tmp_path), tests=[_SOURCE], variant="gcc.debug", test_impact=True, **overrides)
+    os.makedirs(args.cas_objdir, exist_ok=True)
+    hunter = make_mock_hunter(sources=[_SOURCE, "/src/widget.cpp"], headers=["/src/widget.h"])
+    backend = make_stub_backend_class()(args=args, hunter=hunter)
+    backend.namer = make_mock_namer(args)
+    return backend
+
+
+def _test_rules(graph):
+    return [r for r in graph.rules if r.rule_type == "test"]
+
+
+def _pass(backend, graph):
+    for rule in _test_rules(graph):
+        marker = rule.success_marker or rule.output
+        os.makedirs(os.path.dirname(marker), exist_ok=True)
+        with open(marker, "w"):
+            pass
+    backend._record_test_impact()
+
+
+def test_passing_test_is_skipped_until_an_input_changes(tmp_path):
+    backend = _backend(tmp_path)
+    graph = backend.build_graph()
+    assert len(_test_rules(graph)) == 1
+    _pass(backend, graph)
+
+    again = _backend(tmp_path)
+    graph = again.build_graph()
+    assert _test_rules(graph) == []
+    assert graph.get_rule("runtests").inputs == []
+
+    changed = _backend(tmp_path)
+    object_pathname = changed.namer.object_pathname
+    changed.namer.object_pathname = lambda f, m, d: object_pathname(f, m, d).replace(".o", "_edited.o")
+    assert len(_test_rules(changed.build_graph())) == 1
+
+
+def test_failing_test_is_not_recorded(tmp_path):
+    backend = _backend(tmp_path)
+    backend.build_graph()
+    backend._record_test_impact()
+
+    assert len(_test_rules(_backend(tmp_path).build_graph())) == 1
+
+
+def test_link_flags_are_part_of_the_fingerprint(tmp_path):
+    backend = _backend(tmp_path)
+    _pass(backend, backend.build_graph())
+
+    relinked = _backend(tmp_path, LDFLAGS="-Wl,--as-needed")
+    assert len(_test_rules(relinked.build_graph())) == 1
@@ -0,0 +1,143 @@
+"""Tests for the binary timing log format."""
+
+from __future__ import annotations
+
+import math
+
+import pytest
+
+from compiletools import timing_log
+from compiletools.build_timer import BuildTimer
+
+
+def _make_timer() -> BuildTimer:
+    timer = BuildTimer(enabled=True, variant="gcc.release", backend="shake")
+    base = timer._root.start_s
+    with timer.phase("build_graph"):
+        pass
+    with timer.phase("build_execution"):
+        timer.record_rule(
+            "compile",
+            "obj/foo.o",
+            "src/foo.cpp",
+            0.5,
+            start_s=base + 1.0,
+            end_s=base + 1.5,
+            metadata={"cas.hit": True, "cas.kind": "obj"},
+        )
+        timer.record_rule("compile", "obj/bar.o", "src/bär.cpp", 0.25, start_s=base + 1.5, end_s=base + 1.75)
+        timer.record_rule("link", "bin/app", "", 0.1, start_s=base + 1.75, end_s=base + 1.85)
+    timer.set_root_metadata({"ct.build.tu_total": 2})
+    timer.finish()
+    return timer
+
+
+class TestRoundTrip:
+    def test_tree_matches_the_json_form(self, tmp_path):
+        timer = _make_timer()
+        path = str(tmp_path / "timing.bin")
+        timer.to_binary(path)
+
+        loaded = BuildTimer.from_binary(path)
+        expected = timer.to_dict()
+        actual = loaded.to_dict()
+        assert actual["phases"] == expected["phases"]
+        assert actual["metadata"] == {"ct.build.tu_total": 2}
+        assert (actual["variant"], actual["backend"]) == ("gcc.release", "shake")
+        assert loaded.total_elapsed_s == pytest.approx(timer.total_elapsed_s)
+
+    def test_chrome_trace_matches(self, tmp_path):
+        timer = _make_timer()
+        path = str(tmp_path / "timing.bin")
+        timer.to_binary(path)
+        assert BuildTimer.from_binary(path).to_chrome_trace() == timer.to_chrome_trace()
+
+    def test_load_sniffs_the_format(self, tmp_path):
+        timer = _make_timer()
+        binary = str(tmp_path / "timing.bin")
+        text = str(tmp_path / "timing.json")
+        timer.to_binary(binary)
+        timer.to_json(text)
+        assert timing_log.is_timing_log(binary)
+        assert not timing_log.is_timing_log(text)
+        # JSON rounds to microseconds, so compare the shape rather than floats.
+        for loaded in (BuildTimer.load(binary), BuildTimer.load(text)):
+            assert [(p.name, [r.target for r in p.children]) for p in loaded.phases] == [
+                ("build_graph", []),
+                ("build_execution", ["obj/foo.o", "obj/bar.o", "bin/app"]),
+            ]
+        assert type(BuildTimer.load(text)._root) is not type(BuildTimer.load(binary)._root)
+
+    def test_loaded_timer_is_read_only(self, tmp_path):
+        path = str(tmp_path / "timing.bin")
+        _make_timer().to_binary(path)
+        loaded = BuildTimer.from_binary(path)
+        with pytest.raises(RuntimeError, match="read-only"):
+            loaded.record_rule("compile", "x.o", "x.cpp", 0.1)
+
+
+class TestLazyEvents:
+    def test_children_decode_on_first_access(self, tmp_path):
+        path = str(tmp_path / "timing.bin")
+        _make_timer().to_binary(path)
+        log = timing_log.TimingLog(path)
+        root = log.event(0)
+        assert root._children is None
+        phases = root.children
+        assert [p.name for p in phases] == ["build_graph", "build_execution"]
+        assert phases[1]._children is None
+        assert [r.target for r in phases[1].children] == ["obj/foo.o", "obj/bar.o", "bin/app"]
+
+    def test_metadata_is_a_fresh_mutable_dict(self, tmp_path):
+        path = str(tmp_path / "timing.bin")
+        _make_timer().to_binary(path)
+        loaded = BuildTimer.from_binary(path)
+        loaded.merge_rule_outcomes({"obj/bar.o": {"cas.hit": False}})
+        rules = loaded.phases[1].children
+        assert rules[0].metadata == {"cas.hit": True, "cas.kind": "obj"}
+        assert rules[1].metadata == {"cas.hit": False}
+        assert rules[2].metadata == {}
+
+    def test_shared_strings_are_interned(self, tmp_path):
+        timer = BuildTimer(enabled=True)
+        with timer.phase("build_execution"):
+            for i in range(50):
+                timer.record_rule("compile", f"obj/{i}.o", f"src/{i}.cpp", 0.1, start_s=1.0, metadata={"cas.hit": True})
+        path = str(tmp_path / "timing.bin")
+        timer.to_binary(path)
+        log = timing_log.TimingLog(path)
+        assert len({log.metadata[i] for i in range(1, len(log))} - {0}) == 1
+        assert len({log.category[i] for i in range(2, len(log))}) == 1
+
+    def test_open_end_round_trips_as_none(self, tmp_path):
+        timer = BuildTimer(enabled=True)
+        with timer.phase("build_execution"):
+            timer.record_rule("compile", "a.o", "a.cpp", 0.1, start_s=1.0, end_s=1.1)
+        timer._root.children[0].children[0].end_s = None
+        path = str(tmp_path / "timing.bin")
+        timer.to_binary(path)
+        log = timing_log.TimingLog(path)
+        assert math.isnan(log.end_s[2])
+        assert log.event(2).end_s is None
+
+
+class TestInvalidFiles:
+    def test_empty_file(self, tmp_path):
+        path = tmp_path / "timing.bin"
+        path.write_bytes(b"")
+        with pytest.raises(ValueError, match="not a ct timing log"):
+            timing_log.TimingLog(str(path))
+
+    def test_wrong_magic(self, tmp_path):
+        path = tmp_path / "timing.bin"
+        path.write_bytes(b"{}" * 64)
+        with pytest.raises(ValueError, match="not a ct timing log"):
+            timing_log.TimingLog(str(path))
+
+    def test_truncated_columns(self, tmp_path):
+        path = tmp_path / "timing.bin"
+        _make_timer().to_binary(str(path))
+        data = path.read_bytes()
+        path.write_bytes(data[: len(data) // 2])
+        with pytest.raises(ValueError, match="truncated"):
+            timing_log.TimingLog(str(path))
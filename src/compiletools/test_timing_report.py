@@ -32,6 +32,18 @@ class TestFindTimingFile:
     def test_auto_detect_none_when_missing(self):
         assert _find_timing_file(None) is None
 
+    def test_auto_detect_cwd_binary(self, tmp_path):
+        (tmp_path / "timing.bin").write_bytes(b"CTTIMING")
+        assert _find_timing_file(None) == "timing.bin"
+
+    def test_auto_detect_diagnostics_binary(self, tmp_path):
+        """An invocation run with --timing-format=binary leaves timing.bin."""
+        invocation = tmp_path / "bin" / "diagnostics" / "20260506T120000-100"
+        invocation.mkdir(parents=True)
+        (invocation / "timing.bin").write_bytes(b"CTTIMING")
+        result = _find_timing_file(None, bindir=str(tmp_path / "bin"))
+        assert result == str(invocation / "timing.bin")
+
     def test_auto_detect_bindir_diagnostics_newest(self, tmp_path):
         """With the new diagnostics-dir layout, look up the newest invocation
         subdir under <bindir>/diagnostics/ by lex sort and return its
@@ -183,6 +195,52 @@ class TestChromeTraceExport:
         assert rc == 1
 
 
+class TestConvert:
+    def _timer(self):
+        timer = BuildTimer(enabled=True, variant="gcc.debug", backend="ninja")
+        with timer.phase("build_execution"):
+            timer.record_rule("compile", "a.o", "a.cpp", 1.5, start_s=1.0, end_s=2.5, metadata={"cas.hit": True})
+        return timer
+
+    def test_json_to_binary_and_back(self, tmp_path):
+        source = str(tmp_path / "timing.json")
+        binary = str(tmp_path / "timing.bin")
+        again = str(tmp_path / "again.json")
+        self._timer().to_json(source)
+
+        assert main(["--convert", binary, source]) == 0
+        assert main(["--convert", again, binary]) == 0
+
+        with open(source) as f:
+            before = json.load(f)
+        with open(again) as f:
+            after = json.load(f)
+        rule_before = before["phases"][0]["rules"][0]
+        rule_after = after["phases"][0]["rules"][0]
+        assert rule_after["target"] == rule_before["target"] == "a.o"
+        assert rule_after["metadata"] == {"cas.hit": True}
+        assert rule_after["start_s"] == pytest.approx(rule_before["start_s"])
+        assert after["variant"] == "gcc.debug"
+
+    def test_binary_feeds_summary_and_chrome_trace(self, tmp_path):
+        binary = str(tmp_path / "timing.bin")
+        trace = str(tmp_path / "trace.json")
+        self._timer().to_binary(binary)
+
+        assert main(["--summary", binary]) == 0
+        assert main(["--chrome-trace", trace, binary]) == 0
+        with open(trace) as f:
+            names = [e["name"] for e in json.load(f)["traceEvents"]]
+        assert "a.cpp" in names
+
+    def test_compare_mixes_formats(self, tmp_path):
+        before = str(tmp_path / "before.json")
+        after = str(tmp_path / "after.bin")
+        self._timer().to_json(before)
+        self._timer().to_binary(after)
+        assert main(["--compare", before, after]) == 0
+
+
 class TestComparison:
     def _write_timer(self, tmp_path, name, phases):
         timer = BuildTimer(enabled=True, variant="gcc.debug", backend="make")
@@ -257,6 +315,45 @@ class TestComparison:
         assert main(["--compare", path, path]) == 0
 
 
+class TestTrend:
+    @staticmethod
+    def _record(path, foo_s, *, variant="gcc.debug"):
+        from compiletools import build_history
+
+        timer = BuildTimer(enabled=True, variant=variant, backend="make")
+        with timer.phase("build_execution"):
+            timer.record_rule("compile", "foo.o", "src/foo.cpp", foo_s)
+            timer.record_rule("link", "app", "", 0.5)
+        build_history.record_build(path, timer)
+
+    def test_trend_reports_rule_regressions(self, tmp_path, capfd, monkeypatch):
+        monkeypatch.setenv("COLUMNS", "200")
+        path = str(tmp_path / "history.sqlite")
+        for foo_s in (1.0, 1.0, 3.0):
+            self._record(path, foo_s)
+        # A newer build of another variant must not pollute the window.
+        self._record(path, 9.0, variant="gcc.release")
+        assert main(["--trend", "--build-history", path]) == 0
+        rendered = capfd.readouterr().err
+        assert "Build History: gcc.release / make (last 1 builds)" in rendered, rendered
+        assert "No per-rule regressions" in rendered, rendered
+
+        self._record(path, 4.0)
+        assert main(["--trend", "--build-history", path]) == 0
+        rendered = capfd.readouterr().err
+        assert "(last 4 builds)" in rendered, rendered
+        assert "foo.o" in rendered, rendered
+        assert "+2.33" in rendered, rendered
+
+    def test_trend_defaults_to_diagnostics_root(self, tmp_path):
+        diag = tmp_path / "diag"
+        self._record(str(diag / "build-history.sqlite"), 1.0)
+        assert main(["--trend", "--diagnostics-dir", str(diag)]) == 0
+
+    def test_trend_without_history(self, tmp_path):
+        assert main(["--trend", "--build-history", str(tmp_path / "missing.sqlite")]) == 1
+
+
 class TestResolveAndLoad:
     def test_returns_timer_and_loaded_path(self, tmp_path):
         """``_resolve_and_load`` must return both the timer and the path it
@@ -8,6 +8,8 @@ import pytest
 
 from compiletools.build_timer import BuildTimer, TimingEvent
 from compiletools.timing_timeline import (
+    DENSITY_GLYPHS,
+    LaneIndex,
     _coalesce,
     _format_short,
     _format_time,
@@ -86,6 +88,80 @@ class TestPackLanes:
         # Both run at non-overlapping times, share lane 0.
         assert result == [0, 0]
 
+    def test_matches_linear_first_fit(self):
+        # The heap sweep must reproduce the plain first-fit scan exactly,
+        # including lane reuse order and touching (end == start) rules.
+        events = []
+        for i in range(500):
+            # Deterministic scatter: quarter-second grid, many ties.
+            start = (i * 37 % 200) / 4
+            events.append(TimingEvent(name=str(i), category="compile", start_s=start, end_s=start + (i * 13 % 12) / 4))
+        lanes_end: list[float] = []
+        expected = [0] * len(events)
+        for i in sorted(range(len(events)), key=lambda i: events[i].start_s):
+            e = events[i]
+            lane = next((j for j, le in enumerate(lanes_end) if le <= e.start_s + 1e-9), len(lanes_end))
+            if lane == len(lanes_end):
+                lanes_end.append(e.end_s)
+            else:
+                lanes_end[lane] = e.end_s
+            expected[i] = lane
+        assert pack_lanes(events) == expected
+
+
+def _indexed(*spans, category="compile"):
+    events = [TimingEvent(name=f"e{i}", category=category, start_s=s, end_s=e) for i, (s, e) in enumerate(spans)]
+    events.sort(key=lambda e: e.start_s)
+    lanes = pack_lanes(events)
+    return events, lanes, LaneIndex(events, lanes, max(lanes) + 1)
+
+
+class TestLaneIndex:
+    def test_members_follow_lanes(self):
+        _events, _lanes, index = _indexed((0.0, 2.0), (0.5, 1.0), (1.5, 2.5))
+        assert index.members == [[0], [1, 2]]
+
+    def test_visible_window(self):
+        _events, _lanes, index = _indexed((0.0, 1.0), (1.0, 2.0), (3.0, 4.0), (5.0, 6.0))
+        assert index.visible(0, 1.5, 3.5) == [1, 2]
+        assert index.visible(0, 2.1, 2.9) == []
+        assert index.visible(0, -1.0, 0.0) == [0]
+        assert index.visible(0, 6.5, 9.0) == []
+
+    def test_busy_s_is_cumulative(self):
+        _events, _lanes, index = _indexed((0.0, 1.0), (2.0, 4.0))
+        assert index.busy_s(0, -1.0) == 0.0
+        assert index.busy_s(0, 0.5) == pytest.approx(0.5)
+        assert index.busy_s(0, 1.5) == pytest.approx(1.0)
+        assert index.busy_s(0, 3.0) == pytest.approx(2.0)
+        assert index.busy_s(0, 10.0) == pytest.approx(3.0)
+
+    def test_density_bins(self):
+        _events, _lanes, index = _indexed((0.0, 1.0), (2.0, 2.5), (3.25, 3.5))
+        bins = index.density(0, 0.0, 1.0, 5)
+        assert [round(frac, 2) for frac, _ in bins] == [1.0, 0.0, 0.5, 0.25, 0.0]
+        assert [i for _, i in bins] == [0, -1, 1, 2, -1]
+
+    def test_hit_prefers_containing_then_nearest(self):
+        _events, _lanes, index = _indexed((0.0, 1.0), (2.0, 3.0), (6.0, 7.0))
+        assert index.hit(0, 2.5) == 1
+        assert index.hit(0, 1.2) == 0
+        assert index.hit(0, 4.9) == 2
+        assert index.hit(0, -5.0) == 0
+
+    def test_nearest_start(self):
+        _events, _lanes, index = _indexed((0.0, 1.0), (2.0, 3.0), (6.0, 7.0))
+        assert index.nearest_start(0, 2.4) == 1
+        assert index.nearest_start(0, 5.0) == 2
+        assert index.nearest_start(0, 100.0) == 2
+
+    def test_empty_lane_queries(self):
+        index = LaneIndex([], [], 1)
+        assert index.visible(0, 0.0, 1.0) == []
+        assert index.busy_s(0, 1.0) == 0.0
+        assert index.hit(0, 1.0) == -1
+        assert index.nearest_start(0, 1.0) == -1
+
 
 class TestPickTickInterval:
     def test_zero_duration(self):
@@ -300,6 +376,51 @@ class TestTimelineScreen:
         _run_async(go)
 
 
+class TestLevelOfDetail:
+    def test_crowded_lane_draws_density_until_zoomed_in(self):
+        pytest.importorskip("textual")
+        from textual.app import App
+
+        from compiletools.timing_timeline import HEADER_ROWS, TimelineCanvas, TimelineScreen
+
+        # 2000 back-to-back rules in one lane: far more than the columns.
+        timer = BuildTimer(enabled=True, variant="gcc.debug", backend="ninja")
+        base = timer._root.start_s
+        with timer.phase("build_execution"):
+            for i in range(2000):
+                timer.record_rule(
+                    "compile",
+                    f"{i}.o",
+                    f"{i}.cpp",
+                    elapsed_s=0.01,
+                    start_s=base + i * 0.01,
+                    end_s=base + (i + 1) * 0.01,
+                )
+        timer.finish()
+
+        class _Host(App):
+            def on_mount(self):
+                self.push_screen(TimelineScreen(timer))
+
+        async def go():
+            app = _Host()
+            async with app.run_test(size=(120, 30)) as pilot:
+                await pilot.pause()
+                canvas = app.screen.query_one(TimelineCanvas)
+                assert canvas.num_lanes == 1
+                text = canvas.render_line(HEADER_ROWS).text
+                assert DENSITY_GLYPHS[-1] in text
+                assert ".cpp" not in text
+                # Zoom right in: few enough rules in view for labelled boxes.
+                canvas.seconds_per_col = 0.001
+                canvas.origin_s = canvas.t_start
+                text = canvas.render_line(HEADER_ROWS).text
+                assert not set(text) & set(DENSITY_GLYPHS)
+                assert "0.cpp" in text
+
+        _run_async(go)
+
+
 class TestEmptyTimer:
     def test_screen_handles_empty_timer(self):
         """A timer with no rules should still mount without crashing."""
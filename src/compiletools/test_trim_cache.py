@@ -11,7 +11,7 @@ import types
 
 import pytest
 
-from compiletools import trim_cache
+from compiletools import access_journal, cold_tier, trim_cache
 from compiletools.trim_cache import (
     CacheTrimmer,
     _ca_sibling_real_entry,
@@ -5072,6 +5072,26 @@ class TestEnforceBudgetObj:
         assert stats["budget_unmet_bytes"] == 1024
         assert os.path.exists(cur1) and os.path.exists(cur2)
 
+    def test_journaled_pool_ranks_by_last_recorded_use(self, objdir, monkeypatch):
+        # The oldest object by mtime was used by a journaling build an hour
+        # ago, so the middle one is the least recently used and goes first.
+        # The second scan of the same pool must not stat anything.
+        used = _touch_obj(objdir, "foo", "111111111111", age_seconds=3 * 86400, size=1024)
+        lru = _touch_obj(objdir, "foo", "222222222222", age_seconds=2 * 86400, size=1024)
+        new = _touch_obj(objdir, "foo", "333333333333", age_seconds=1 * 86400, size=1024)
+        access_journal.record_uses(objdir, "obj", [used], now=time.time() - 3600)
+
+        trimmer = CacheTrimmer(_make_args(max_size_bytes=2048, keep_count=3))
+        stats = trimmer.trim_objdir(objdir, set())
+        monkeypatch.setattr(trim_cache, "_entry_mtime_size", lambda entry: pytest.fail(f"statted {entry.path}"))
+        trimmer.enforce_budget(objdir, stats, kind="obj", current_hashes=set())
+        trimmer.save_access_indexes()
+
+        assert stats["budget_removed"] == 1
+        assert not os.path.exists(lru)
+        assert os.path.exists(used) and os.path.exists(new)
+        assert os.listdir(access_journal.journal_dir(objdir)) == [access_journal.INDEX_FILENAME]
+
     def test_evicts_noncurrent_first_keeps_current(self, objdir):
         # One current (protected) + two non-current, 1024 each = 3072.
         # Budget 1024 → evict both non-current (oldest first), keep current,
@@ -5366,6 +5386,186 @@ class TestMaxSizeCLI:
         assert not os.path.exists(new), "budget eviction goes below keep_count for rebuildables"
 
 
+# ── --compress-cold: compressed cold tier ─────────────────────────────────
+
+
+def _cold_stats():
+    return {"cold_demoted": 0, "cold_bytes_saved": 0}
+
+
+class TestCompressCold:
+    """``compress_cold``: old, unprotected obj/archive entries become compressed siblings."""
+
+    def test_demotes_old_noncurrent_objects_only(self, objdir):
+        cold = _touch_obj(objdir, "foo", "111111111111", age_seconds=10 * 86400, size=8192)
+        young = _touch_obj(objdir, "foo", "222222222222", age_seconds=86400, size=8192)
+        cur = _touch_obj(objdir, "bar", "cccccccccccc", age_seconds=10 * 86400, size=8192)
+        stats = _cold_stats()
+
+        CacheTrimmer(_make_args(compress_cold=7)).compress_cold(
+            objdir, stats, kind="obj", current_hashes={"cccccccccccc"}
+        )
+
+        sibling = cold_tier.find_cold(cold)
+        assert sibling is not None and not os.path.exists(cold)
+        assert os.path.exists(young) and os.path.exists(cur)
+        assert stats["cold_demoted"] == 1
+        assert stats["cold_bytes_saved"] == 8192 - os.path.getsize(sibling)
+
+    def test_dry_run_and_default_compress_nothing(self, objdir):
+        cold = _touch_obj(objdir, "foo", "111111111111", age_seconds=10 * 86400, size=8192)
+        stats = _cold_stats()
+
+        CacheTrimmer(_make_args(compress_cold=7, dry_run=True)).compress_cold(objdir, stats, kind="obj")
+        CacheTrimmer(_make_args()).compress_cold(objdir, stats, kind="obj")
+
+        assert stats == {"cold_demoted": 1, "cold_bytes_saved": 0}
+        assert os.listdir(os.path.dirname(cold)) == [os.path.basename(cold)]
+
+    def test_hard_linked_archive_and_executables_stay_raw(self, tmp_path):
+        exedir = str(tmp_path / "exe")
+        lone = _touch_cas_lib(exedir, "libone.a_" + "1" * 64, age_seconds=10 * 86400, size=8192)
+        linked = _touch_cas_lib(exedir, "libtwo.a_" + "2" * 64, age_seconds=10 * 86400, size=8192)
+        os.link(linked, str(tmp_path / "libtwo.a"))
+        exe = _touch_exe(exedir, "prog", "3" * 64, age_seconds=10 * 86400, size=8192)
+        stats = _cold_stats()
+
+        CacheTrimmer(_make_args(compress_cold=7)).compress_cold(exedir, stats, kind="exe")
+
+        assert cold_tier.find_cold(lone) is not None and not os.path.exists(lone)
+        assert os.path.exists(linked) and os.path.exists(exe)
+        assert stats["cold_demoted"] == 1
+
+    def test_demoted_object_still_ranks_as_its_basename(self, objdir):
+        # The sibling is the older of two non-current entries for one
+        # basename, so keep-count 1 removes it like the raw object it was.
+        old = _touch_obj(objdir, "foo", "111111111111", age_seconds=10 * 86400, size=8192)
+        new = _touch_obj(objdir, "foo", "222222222222", age_seconds=86400, size=8192)
+        CacheTrimmer(_make_args(compress_cold=7)).compress_cold(objdir, _cold_stats(), kind="obj")
+        sibling = cold_tier.find_cold(old)
+
+        CacheTrimmer(_make_args(keep_count=1)).trim_objdir(objdir, set())
+
+        assert not os.path.exists(sibling)
+        assert os.path.exists(new)
+
+    def test_cli_rejects_nonpositive_days(self, capsys):
+        assert main(["--compress-cold=0"]) == 1
+        assert "--compress-cold" in capsys.readouterr().err
+
+
+# ── --watch: watermark daemon ───────────────────────────────────────────────
+
+
+def _fake_statvfs(pool, other_bytes):
+    """A 10 KiB volume in 1 KiB blocks holding *pool*'s 1 KiB objects plus *other_bytes*."""
+
+    def statvfs(path):
+        used = other_bytes + 1024 * sum(n.endswith(".o") for _root, _dirs, names in os.walk(pool) for n in names)
+        return types.SimpleNamespace(f_blocks=10, f_frsize=1024, f_bavail=10 - used // 1024)
+
+    return statvfs
+
+
+class TestWatch:
+    """``trim_cache.watch``: statvfs-gated eviction from the high to the low watermark."""
+
+    def _args(self, **overrides):
+        defaults = {"watch": True, "watch_ops_per_second": 0, "watch_interval": 60, "high_watermark": 90.0}
+        defaults.update(overrides)
+        return _make_args(low_watermark=80.0, **defaults)
+
+    def test_over_high_watermark_evicts_oldest_down_to_low(self, tmp_path):
+        # 90% of a 10 KiB volume used, low watermark 80% -> 1 KiB to free.
+        # The oldest entry is current and protected, so the oldest non-current
+        # object goes and nothing else does; the second cycle finds the volume
+        # below the high watermark again.
+        objdir = str(tmp_path / "obj")
+        cur = _touch_obj(objdir, "foo", "cccccccccccc", age_seconds=9 * 86400)
+        oldest = _touch_obj(objdir, "foo", "111111111111", age_seconds=5 * 86400)
+        newer = _touch_obj(objdir, "foo", "222222222222", age_seconds=2 * 86400)
+        sleeps, out = [], io.StringIO()
+
+        rc = trim_cache.watch(
+            self._args(),
+            lambda: [(objdir, "obj")],
+            current_hashes_fn=lambda: {"cccccccccccc"},
+            cycles=2,
+            sleep=sleeps.append,
+            statvfs=_fake_statvfs(objdir, 6 * 1024),
+            stream=out,
+        )
+
+        assert rc == 0
+        assert not os.path.exists(oldest)
+        assert os.path.exists(cur) and os.path.exists(newer)
+        assert sleeps == [60]
+        assert "evicted 1 entries" in out.getvalue()
+
+    def test_below_high_watermark_scans_nothing(self, tmp_path):
+        objdir = str(tmp_path / "obj")
+        old = _touch_obj(objdir, "foo", "111111111111", age_seconds=30 * 86400)
+
+        trim_cache.watch(
+            self._args(),
+            lambda: [(objdir, "obj")],
+            current_hashes_fn=lambda: pytest.fail("no episode below the high watermark"),
+            cycles=1,
+            statvfs=_fake_statvfs(objdir, 7 * 1024),
+            stream=io.StringIO(),
+        )
+
+        assert os.path.exists(old)
+
+    def test_failed_episode_does_not_stop_the_daemon(self, tmp_path, capsys):
+        # The first episode blows up; the daemon logs it, sleeps, and the
+        # second cycle's episode evicts as normal.
+        objdir = str(tmp_path / "obj")
+        _touch_obj(objdir, "foo", "cccccccccccc", age_seconds=9 * 86400)
+        oldest = _touch_obj(objdir, "foo", "111111111111", age_seconds=5 * 86400)
+        _touch_obj(objdir, "foo", "222222222222", age_seconds=2 * 86400)
+        calls, sleeps = [], []
+
+        def current_hashes():
+            calls.append(1)
+            if len(calls) == 1:
+                raise RuntimeError("index vanished")
+            return {"cccccccccccc"}
+
+        rc = trim_cache.watch(
+            self._args(),
+            lambda: [(objdir, "obj")],
+            current_hashes_fn=current_hashes,
+            cycles=2,
+            sleep=sleeps.append,
+            statvfs=_fake_statvfs(objdir, 6 * 1024),
+            stream=io.StringIO(),
+        )
+
+        assert rc == 0
+        assert sleeps == [60]
+        assert len(calls) == 2
+        assert not os.path.exists(oldest)
+        assert f"Error trimming {objdir}: index vanished" in capsys.readouterr().err
+
+    def test_rate_limiter_sleeps_past_the_burst(self):
+        clock, sleeps = [100.0], []
+        pace = trim_cache._RateLimiter(10, clock=lambda: clock[0], sleep=sleeps.append)
+        pace.charge(10)  # one second's worth: within the burst allowance
+        assert sleeps == []
+        pace.charge(5)
+        assert sleeps == [pytest.approx(0.5)]
+        trim_cache._RateLimiter(None, clock=lambda: pytest.fail("unpaced"), sleep=sleeps.append).charge(100)
+
+    @pytest.mark.parametrize(
+        "extra",
+        [["--dry-run"], ["--max-size=1G"], ["--low-watermark=90", "--high-watermark=80"]],
+    )
+    def test_cli_rejects_conflicting_options(self, extra, capsys):
+        assert main(["--watch", *extra]) == 1
+        assert "--watch" in capsys.readouterr().err
+
+
 # ── --all-variants: whole-pool sweep ────────────────────────────────────────
 
 
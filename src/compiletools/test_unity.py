@@ -0,0 +1,64 @@
+"""Tests for the pure --unity batching helpers."""
+
+import pytest
+
+import compiletools.unity as unity
+
+
+def test_quantize_cost_absorbs_timing_noise():
+    assert unity.quantize_cost(3.7) == unity.quantize_cost(4.4) == 4.0
+    assert unity.quantize_cost(0.0) == 1.0
+
+
+def test_batch_by_cost_keeps_order_and_isolates_oversized_members():
+    members = [("a", 2.0), ("b", 2.0), ("huge", 64.0), ("c", 2.0), ("d", 2.0), ("e", 2.0)]
+    assert unity.batch_by_cost(members, 4.0) == [["a", "b"], ["huge"], ["c", "d"], ["e"]]
+
+
+def test_object_name_ignores_workspace_prefix():
+    flags = ["g++", "-O2"]
+    a = unity.unity_object_pathname("/cas", ["/ws1/obj/ab/x_1.o", "/ws1/obj/cd/y_2.o"], flags)
+    b = unity.unity_object_pathname("/cas", ["/ws2/obj/ab/x_1.o", "/ws2/obj/cd/y_2.o"], flags)
+    assert a == b
+    assert a != unity.unity_object_pathname("/cas", ["/ws1/obj/ab/x_1.o"], flags)
+
+
+def test_write_unity_source_is_content_addressed(tmp_path):
+    text = unity.unity_source_text(["/src/a.cpp", "/src/b.cpp"])
+    path = unity.unity_source_pathname(str(tmp_path), text)
+    unity.write_unity_source(path, text)
+    unity.write_unity_source(path, text)
+    with open(path) as f:
+        assert f.read() == text
+    assert path != unity.unity_source_pathname(str(tmp_path), unity.unity_source_text(["/src/a.cpp"]))
+
+
+@pytest.mark.parametrize(
+    ("text", "reason"),
+    [
+        (b"static int helper() { return 1; }\n", "namespace-scope static"),
+        (b"namespace outer::inner { static int n; }\n", "namespace-scope static"),
+        (b'extern "C" { static int n; }\n', "namespace-scope static"),
+        (b"namespace { int helper() { return 1; } }\n", "anonymous namespace"),
+        (b"using namespace std;\n", "namespace-scope using-directive"),
+        (b"struct Foo::Impl { static int n; };\nint f() { static int c; using namespace std; return c; }\n", None),
+        (b'// static int x;\nconst char* s = "static";\n#define S static\nstatic_assert(true);\n', None),
+        (b"namespace named { int f(); }\n", None),
+        (b"const int kSize = 4;\n", "namespace-scope constant"),
+        (b"namespace n { constexpr double kPi = 3.14; }\n", "namespace-scope constant"),
+        (b"constexpr int sq(int x) { return x * x; }\n", "namespace-scope constant"),
+        (b"const int table[] = {1, 2};\n", "namespace-scope constant"),
+        (b"char* const p = 0;\n", "namespace-scope constant"),
+        (b"const std::vector<const char*> names;\n", "namespace-scope constant"),
+        (b"typedef int Index;\n", "namespace-scope alias"),
+        (b"using Index = int;\n", "namespace-scope alias"),
+        (b"using std::string;\n", "namespace-scope using-declaration"),
+        (b"struct Impl { int x; };\n", "namespace-scope type definition"),
+        (b"enum class Mode : int { A, B };\n", "namespace-scope type definition"),
+        (b"extern const int kShared = 4;\nstruct Foo::Impl { int x; };\nstruct Fwd;\n", None),
+        (b"int f(const char* s);\nconst char* name() { return 0; }\nint Foo::get() const { return 1; }\n", None),
+        (b"int f() { const int n = 1; struct L { int x; }; using T = int; typedef int U; return n; }\n", None),
+    ],
+)
+def test_internal_linkage_only_flags_namespace_scope(text, reason):
+    assert unity.internal_linkage(text) == reason
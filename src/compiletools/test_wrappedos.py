@@ -0,0 +1,68 @@
+"""Tests for the directory-listing index behind ``wrappedos.isfile_listed``."""
+
+import os
+
+import pytest
+
+import compiletools.wrappedos as wrappedos
+
+
+@pytest.fixture(autouse=True)
+def _fresh_caches(monkeypatch):
+    monkeypatch.setattr(wrappedos, "_listing_index", {})
+    wrappedos.clear_cache()
+    yield
+    wrappedos.clear_cache()
+
+
+def _age(path, seconds=60):
+    """Push *path*'s mtime out of the racy window."""
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns - seconds * 1_000_000_000))
+
+
+def test_isfile_listed_matches_isfile(tmp_path):
+    (tmp_path / "a.h").write_text("")
+    (tmp_path / "sub").mkdir()
+    os.symlink(tmp_path / "a.h", tmp_path / "link.h")
+    os.symlink(tmp_path / "nowhere.h", tmp_path / "dangling.h")
+
+    for name in ("a.h", "sub", "link.h", "dangling.h", "missing.h", "sub/x.h", "nodir/x.h", "sub/.."):
+        path = str(tmp_path / name)
+        assert wrappedos.isfile_listed(path) == os.path.isfile(path), name
+
+
+def test_one_scandir_per_directory(tmp_path, monkeypatch):
+    (tmp_path / "a.h").write_text("")
+    calls = []
+    real_scandir = os.scandir
+    monkeypatch.setattr(os, "scandir", lambda p: calls.append(p) or real_scandir(p))
+
+    assert not wrappedos.isfile_listed(str(tmp_path / "vector"))
+    assert not wrappedos.isfile_listed(str(tmp_path / "string"))
+    assert wrappedos.isfile_listed(str(tmp_path / "a.h"))
+    assert calls == [str(tmp_path)]
+
+
+def test_listing_survives_clear_cache_until_mtime_moves(tmp_path, monkeypatch):
+    (tmp_path / "a.h").write_text("")
+    _age(tmp_path)
+    assert wrappedos.dir_files(str(tmp_path)) == frozenset({"a.h"})
+
+    calls = []
+    real_scandir = os.scandir
+    monkeypatch.setattr(os, "scandir", lambda p: calls.append(p) or real_scandir(p))
+    wrappedos.clear_cache()
+    assert wrappedos.dir_files(str(tmp_path)) == frozenset({"a.h"})
+    assert calls == []
+
+    (tmp_path / "b.h").write_text("")
+    wrappedos.clear_cache()
+    assert wrappedos.dir_files(str(tmp_path)) == frozenset({"a.h", "b.h"})
+    assert calls == [str(tmp_path)]
+
+
+def test_racy_listing_is_not_kept(tmp_path):
+    (tmp_path / "a.h").write_text("")
+    wrappedos.dir_files(str(tmp_path))
+    assert str(tmp_path) not in wrappedos._listing_index
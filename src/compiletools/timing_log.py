@@ -0,0 +1,322 @@
+"""Compact binary timing log: a columnar, mmap-loadable BuildTimer snapshot.
+
+``timing.json`` is indented JSON, and loading it materialises every
+``TimingEvent`` up front -- for a 200k-rule build that is hundreds of MB
+and several seconds, twice over in ``ct-timing-report --compare``. The
+binary log stores the same tree as flat columns instead:
+
+* events in depth-first pre-order, event 0 being the root;
+* ``start_s`` / ``end_s`` as float64 columns (NaN for a still-open end);
+* ``subtree_end`` (one past the last descendant's index), which is all
+  the structure a pre-order layout needs to enumerate children;
+* ``name`` / ``category`` / ``target`` / ``source`` / ``metadata`` as
+  uint32 indices into an interned UTF-8 string table -- metadata dicts are
+  stored as compact JSON, so the handful of distinct ``cas.*`` shapes a
+  build produces are stored once.
+
+The header carries a small JSON blob with the ``to_dict`` top-level
+fields (version, timestamp, variant, backend). :class:`TimingLog` maps
+the file and casts the columns in place, so loading costs one ``mmap``
+regardless of size; :func:`load` wraps the root in a
+:class:`BuildTimer` whose events are only decoded when a caller walks
+into them. JSON (``BuildTimer.to_json``) and Chrome trace
+(``BuildTimer.to_chrome_trace``) remain available from a loaded log.
+
+Layout (all sections 8-byte aligned; columns in the byte order named by
+the header flags)::
+
+    header       <8sHHIQQQQ  magic, version, flags, reserved,
+                              meta_len, n_events, n_strings, blob_len
+    meta         meta_len bytes of JSON
+    start_s      float64[n_events]
+    end_s        float64[n_events]
+    str_offsets  uint64[n_strings + 1]
+    subtree_end  uint32[n_events]
+    name         uint32[n_events]
+    category     uint32[n_events]
+    target       uint32[n_events]
+    source       uint32[n_events]
+    metadata     uint32[n_events]   (0 = no metadata)
+    strings      blob_len bytes of UTF-8
+"""
+
+from __future__ import annotations
+
+import array
+import datetime
+import json
+import math
+import mmap
+import struct
+import sys
+from typing import TYPE_CHECKING, Any
+
+from compiletools.build_timer import BuildTimer, TimingEvent
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+BINARY_TIMING_FILENAME = "timing.bin"
+
+MAGIC = b"CTTIMING"
+_LOG_VERSION = 1
+_FLAG_BIG_ENDIAN = 0x1
+
+_HEADER = struct.Struct("<8sHHIQQQQ")
+
+# Column type codes; checked at import so the on-disk widths are fixed.
+_F64 = "d"
+_U64 = "Q"
+_U32 = "I"
+assert array.array(_F64).itemsize == 8
+assert array.array(_U64).itemsize == 8
+assert array.array(_U32).itemsize == 4
+
+_METADATA_ENCODER = json.JSONEncoder(separators=(",", ":"), sort_keys=True)
+
+_INDEX_COLUMNS = ("subtree_end", "name", "category", "target", "source", "metadata")
+
+
+def _pad(n: int) -> int:
+    return -n % 8
+
+
+def is_timing_log(path: str) -> bool:
+    """True when *path* starts with the binary timing log magic."""
+    try:
+        with open(path, "rb") as f:
+            return f.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+
+# ------------------------------------------------------------------ writing
+
+
+class _StringTable:
+    """Interning string table; index 0 is always the empty string."""
+
+    def __init__(self) -> None:
+        self._index: dict[str, int] = {"": 0}
+        self.offsets = array.array(_U64, [0, 0])
+        self.blob = bytearray()
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def add(self, text: str) -> int:
+        index = self._index.get(text)
+        if index is None:
+            index = len(self._index)
+            self._index[text] = index
+            self.blob += text.encode("utf-8")
+            self.offsets.append(len(self.blob))
+        return index
+
+
+def _preorder(root: TimingEvent) -> tuple[list[TimingEvent], list[int]]:
+    """Flatten *root* into pre-order with each event's ``subtree_end``."""
+    order: list[TimingEvent] = []
+    ends: list[int] = []
+    stack: list[tuple[TimingEvent, int | None]] = [(root, None)]
+    while stack:
+        event, index = stack.pop()
+        if index is not None:
+            ends[index] = len(order)
+            continue
+        index = len(order)
+        order.append(event)
+        ends.append(0)
+        stack.append((event, index))
+        stack.extend((child, None) for child in reversed(event.children))
+    return order, ends
+
+
+def write(timer: BuildTimer, path: str) -> None:
+    """Write *timer* to *path* as a binary timing log (atomically)."""
+    from compiletools.filesystem_utils import atomic_output_file
+
+    timer.finish()
+    root = timer._root
+    events, ends = _preorder(root)
+    strings = _StringTable()
+    start = array.array(_F64)
+    end = array.array(_F64)
+    columns = {name: array.array(_U32) for name in _INDEX_COLUMNS}
+    columns["subtree_end"].extend(ends)
+    for event in events:
+        start.append(event.start_s)
+        end.append(math.nan if event.end_s is None else event.end_s)
+        columns["name"].append(strings.add(event.name))
+        columns["category"].append(strings.add(event.category))
+        columns["target"].append(strings.add(event.target))
+        columns["source"].append(strings.add(event.source))
+        columns["metadata"].append(strings.add(_METADATA_ENCODER.encode(event.metadata)) if event.metadata else 0)
+
+    meta = json.dumps(
+        {
+            "version": _LOG_VERSION,
+            "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "variant": timer.variant,
+            "backend": timer.backend,
+        },
+        separators=(",", ":"),
+    ).encode("utf-8")
+    flags = _FLAG_BIG_ENDIAN if sys.byteorder == "big" else 0
+    header = _HEADER.pack(MAGIC, _LOG_VERSION, flags, 0, len(meta), len(events), len(strings), len(strings.blob))
+
+    with atomic_output_file(path, mode="wb") as f:
+        f.write(header)
+        f.write(meta + b"\0" * _pad(len(meta)))
+        for column in (start, end, strings.offsets):
+            f.write(column.tobytes())
+        for name in _INDEX_COLUMNS:
+            data = columns[name].tobytes()
+            f.write(data + b"\0" * _pad(len(data)))
+        f.write(bytes(strings.blob))
+
+
+# ------------------------------------------------------------------ reading
+
+
+class TimingLog:
+    """Read-only columnar view over a binary timing log.
+
+    The file is memory-mapped and each column is a zero-copy
+    ``memoryview`` cast over the mapping (or a byte-swapped copy when the
+    log was written on a machine of the other endianness). Strings are
+    decoded on first use and cached.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        with open(path, "rb") as f:
+            try:
+                buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                # Empty file: mmap refuses a zero-length mapping.
+                buf = b""
+        if len(buf) < _HEADER.size:
+            raise ValueError(f"{path}: not a ct timing log (truncated header)")
+        magic, version, flags, _reserved, meta_len, n_events, n_strings, blob_len = _HEADER.unpack_from(buf, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path}: not a ct timing log")
+        if version != _LOG_VERSION:
+            raise ValueError(f"{path}: unsupported timing log version {version} (expected {_LOG_VERSION})")
+        if n_events == 0:
+            raise ValueError(f"{path}: timing log has no root event")
+        native = bool(flags & _FLAG_BIG_ENDIAN) == (sys.byteorder == "big")
+
+        offset = _HEADER.size
+        self.meta: dict[str, Any] = json.loads(bytes(buf[offset : offset + meta_len]).decode("utf-8"))
+        offset += meta_len + _pad(meta_len)
+
+        view = memoryview(buf)
+
+        def column(code: str, count: int):
+            nonlocal offset
+            size = array.array(code).itemsize * count
+            if offset + size > len(buf):
+                raise ValueError(f"{path}: timing log is truncated")
+            raw = view[offset : offset + size]
+            offset += size + _pad(size)
+            if native:
+                return raw.cast(code)
+            swapped = array.array(code)
+            swapped.frombytes(raw)
+            swapped.byteswap()
+            return swapped
+
+        self.start_s = column(_F64, n_events)
+        self.end_s = column(_F64, n_events)
+        self._str_offsets = column(_U64, n_strings + 1)
+        self.subtree_end = column(_U32, n_events)
+        self.name = column(_U32, n_events)
+        self.category = column(_U32, n_events)
+        self.target = column(_U32, n_events)
+        self.source = column(_U32, n_events)
+        self.metadata = column(_U32, n_events)
+        if offset + blob_len > len(buf):
+            raise ValueError(f"{path}: timing log is truncated")
+        self._blob = view[offset : offset + blob_len]
+        self._strings: list[str | None] = [None] * n_strings
+        self._buf = buf
+
+    def __len__(self) -> int:
+        return len(self.start_s)
+
+    def string(self, index: int) -> str:
+        text = self._strings[index]
+        if text is None:
+            text = bytes(self._blob[self._str_offsets[index] : self._str_offsets[index + 1]]).decode("utf-8")
+            self._strings[index] = text
+        return text
+
+    def child_indices(self, index: int) -> Iterator[int]:
+        """Indices of *index*'s direct children, in recorded order."""
+        child = index + 1
+        stop = self.subtree_end[index]
+        while child < stop:
+            yield child
+            child = self.subtree_end[child]
+
+    def event(self, index: int) -> TimingEvent:
+        """The event at *index*; its children and metadata decode lazily."""
+        return _LazyTimingEvent(self, index)
+
+    def to_timer(self) -> BuildTimer:
+        """A read-only :class:`BuildTimer` over this log (see ``BuildTimer.from_dict``)."""
+        timer = BuildTimer(enabled=True, variant=self.meta.get("variant", ""), backend=self.meta.get("backend", ""))
+        timer._root = self.event(0)
+        timer._phase_stack = [timer._root]
+        timer._loaded = True
+        return timer
+
+
+class _LazyTimingEvent(TimingEvent):
+    """A :class:`TimingEvent` backed by one row of a :class:`TimingLog`.
+
+    Scalar fields are decoded at construction; ``children`` and
+    ``metadata`` on first access. Both stay assignable, so callers that
+    annotate a loaded tree (``merge_rule_outcomes``) behave as on an
+    eagerly built one.
+    """
+
+    def __init__(self, log: TimingLog, index: int) -> None:
+        end_s = log.end_s[index]
+        self._log = log
+        self._index = index
+        self._children: list[TimingEvent] | None = None
+        self._metadata: dict[str, Any] | None = None
+        self.name = log.string(log.name[index])
+        self.category = log.string(log.category[index])
+        self.start_s = log.start_s[index]
+        self.end_s = None if math.isnan(end_s) else end_s
+        self.target = log.string(log.target[index])
+        self.source = log.string(log.source[index])
+
+    @property  # pyright: ignore[reportIncompatibleVariableOverride]
+    def children(self) -> list[TimingEvent]:
+        if self._children is None:
+            self._children = [self._log.event(i) for i in self._log.child_indices(self._index)]
+        return self._children
+
+    @children.setter
+    def children(self, value: list[TimingEvent]) -> None:
+        self._children = value
+
+    @property  # pyright: ignore[reportIncompatibleVariableOverride]
+    def metadata(self) -> dict[str, Any]:
+        if self._metadata is None:
+            index = self._log.metadata[self._index]
+            self._metadata = json.loads(self._log.string(index)) if index else {}
+        return self._metadata
+
+    @metadata.setter
+    def metadata(self, value: dict[str, Any]) -> None:
+        self._metadata = value
+
+
+def load(path: str) -> BuildTimer:
+    """Load a binary timing log as a read-only :class:`BuildTimer`."""
+    return TimingLog(path).to_timer()
@@ -7,18 +7,25 @@ Usage::
     ct-timing-report --summary                # print Rich table
     ct-timing-report --compare a.json b.json  # diff two runs
     ct-timing-report --chrome-trace out.json   # export for Perfetto
+    ct-timing-report --convert timing.bin     # JSON <-> binary timing log
+    ct-timing-report --trend                  # regressions across builds
 """
 
 from __future__ import annotations
 
 import json
 import os
+import sqlite3
 import sys
 
 import compiletools.apptools
 import compiletools.configutils
 from compiletools.build_timer import BuildTimer
 from compiletools.diagnostics import INVOCATION_ID_RE
+from compiletools.timing_log import BINARY_TIMING_FILENAME
+
+# Names ct-cake writes (--timing-format json / binary), in lookup order.
+_TIMING_FILENAMES = ("timing.json", BINARY_TIMING_FILENAME)
 
 # ------------------------------------------------------------------ CLI
 
@@ -43,7 +50,7 @@ def main(argv=None) -> int:
         help=(
             "Parent directory for per-invocation diagnostic artifacts. "
             "When set, ct-timing-report looks for the newest "
-            "<diagnostics-dir>/<invocation-id>/timing.json. Defaults to "
+            "<diagnostics-dir>/<invocation-id>/timing.json (or timing.bin). Defaults to "
             "<bindir>/diagnostics/. Also settable via the DIAGNOSTICS_DIR "
             "environment variable or 'diagnostics-dir = <path>' in any "
             "ct.conf file."
@@ -53,7 +60,7 @@ def main(argv=None) -> int:
         "timing_file",
         nargs="?",
         default=None,
-        help="Path to timing.json (default: auto-detect in cwd / diagnostics-dir / bindir)",
+        help=("Path to timing.json or a binary timing.bin (default: auto-detect in cwd / diagnostics-dir / bindir)"),
     )
     parser.add_argument(
         "--summary",
@@ -71,10 +78,45 @@ def main(argv=None) -> int:
         metavar="OUTPUT",
         help="Export Chrome Trace JSON for Perfetto (https://ui.perfetto.dev/)",
     )
+    parser.add_argument(
+        "--convert",
+        metavar="OUTPUT",
+        help=(
+            "Write the timing data to OUTPUT: JSON when OUTPUT ends in .json, the compact binary timing log otherwise"
+        ),
+    )
+    parser.add_argument(
+        "--trend",
+        action="store_true",
+        help=(
+            "Show build-over-build trends and per-rule regressions from the "
+            "ct-cake --build-history store instead of a single timing file"
+        ),
+    )
+    parser.add_argument(
+        "--build-history",
+        metavar="PATH",
+        default=None,
+        help=(
+            "Build history store read by --trend (default: build-history.sqlite "
+            "in <diagnostics-dir>, or <bindir>/diagnostics/)"
+        ),
+    )
+    parser.add_argument(
+        "--trend-builds",
+        type=int,
+        default=20,
+        metavar="N",
+        help="Number of most recent builds --trend considers (default: %(default)s)",
+    )
     args = parser.parse_args(argv)
 
+    if args.trend:
+        return _run_trend(args)
     if args.chrome_trace:
         return _export_chrome_trace(args)
+    if args.convert:
+        return _convert(args)
     if args.compare:
         return _run_comparison(args)
     if args.summary:
@@ -86,14 +128,15 @@ def main(argv=None) -> int:
 
 
 def _newest_invocation_timing(diagnostics_dir: str) -> str | None:
-    """Return ``<diagnostics_dir>/<newest-invocation>/timing.json`` or None.
+    """Return the newest invocation's timing file, or None.
 
     The "newest invocation" is the entry in ``diagnostics_dir`` whose name
     matches ``INVOCATION_ID_RE`` (the ``YYYYMMDDTHHMMSS-PID`` format from
     ``diagnostics.invocation_id()``) with the greatest ``(timestamp, pid)``
     key. Non-matching entries (stray files, tmp dirs, etc.) are ignored.
     Returns None if the dir doesn't exist, has no matching entries, or the
-    newest entry has no timing.json yet.
+    newest entry has no timing file yet. ``timing.json`` wins over
+    ``timing.bin`` when an invocation somehow has both.
     """
     if not os.path.isdir(diagnostics_dir):
         return None
@@ -115,8 +158,11 @@ def _newest_invocation_timing(diagnostics_dir: str) -> str | None:
         return (ts, int(pid))
 
     invocations.sort(key=_key)
-    candidate = os.path.join(diagnostics_dir, invocations[-1], "timing.json")
-    return candidate if os.path.exists(candidate) else None
+    for name in _TIMING_FILENAMES:
+        candidate = os.path.join(diagnostics_dir, invocations[-1], name)
+        if os.path.exists(candidate):
+            return candidate
+    return None
 
 
 def _find_timing_file(
@@ -129,8 +175,8 @@ def _find_timing_file(
 
     Search order:
       1. Explicit ``path`` argument (if given).
-      2. ``./timing.json`` in cwd.
-      3. Newest ``<diagnostics-dir>/<invocation-id>/timing.json``. If
+      2. ``./timing.json``, then ``./timing.bin``, in cwd.
+      3. Newest ``<diagnostics-dir>/<invocation-id>/timing.{json,bin}``. If
          ``diagnostics_dir`` is provided, use it directly; otherwise
          derive ``<bindir>/diagnostics/`` if ``bindir`` is provided.
 
@@ -139,8 +185,9 @@ def _find_timing_file(
     """
     if path:
         return path
-    if os.path.exists("timing.json"):
-        return "timing.json"
+    for name in _TIMING_FILENAMES:
+        if os.path.exists(name):
+            return name
     diag_dir = diagnostics_dir
     if diag_dir is None and bindir:
         diag_dir = os.path.join(bindir, "diagnostics")
@@ -172,7 +219,7 @@ def _resolve_and_load(args) -> tuple[BuildTimer | None, str | None]:
     if not os.path.exists(path):
         print(f"File not found: {path}", file=sys.stderr)
         return None, None
-    return BuildTimer.from_json(path), path
+    return BuildTimer.load(path), path
 
 
 # -------------------------------------------------------- summary mode
@@ -202,6 +249,21 @@ def _export_chrome_trace(args) -> int:
     return 0
 
 
+# ----------------------------------------------------------- conversion
+
+
+def _convert(args) -> int:
+    timer, _ = _resolve_and_load(args)
+    if timer is None:
+        return 1
+    if args.convert.endswith(".json"):
+        timer.to_json(args.convert)
+    else:
+        timer.to_binary(args.convert)
+    print(f"Timing data written to {args.convert}")
+    return 0
+
+
 # -------------------------------------------------------- comparison mode
 
 
@@ -233,8 +295,8 @@ def _run_comparison(args) -> int:
             print(f"File not found: {p}", file=sys.stderr)
             return 1
 
-    before = BuildTimer.from_json(before_path)
-    after = BuildTimer.from_json(after_path)
+    before = BuildTimer.load(before_path)
+    after = BuildTimer.load(after_path)
 
     try:
         from rich.console import Console
@@ -313,6 +375,127 @@ def _run_comparison(args) -> int:
     return 0
 
 
+# ------------------------------------------------------------- trend mode
+
+
+def _format_rate(rate: float | None) -> str:
+    return "—" if rate is None else f"{rate * 100:.0f}%"
+
+
+def _run_trend(args) -> int:
+    """Render the ``--build-history`` store: per-build summary, then the
+    newest build's rule-type totals and slowest-growing rules against the
+    earlier builds of the same variant and backend.
+    """
+    from compiletools import build_history
+
+    path = args.build_history or build_history.default_history_path(args)
+    if not os.path.exists(path):
+        print(f"No build history at {path}. Run ct-cake --build-history first.", file=sys.stderr)
+        return 1
+
+    try:
+        from rich.console import Console
+        from rich.table import Table
+    except ImportError:
+        print("rich is required for trend mode.", file=sys.stderr)
+        return 1
+
+    try:
+        conn = build_history.connect(path)
+    except (ValueError, OSError, sqlite3.Error) as exc:
+        print(f"Cannot read build history: {exc}", file=sys.stderr)
+        return 1
+    try:
+        newest = build_history.recent_builds(conn, limit=1)
+        if not newest:
+            print(f"Build history at {path} is empty.", file=sys.stderr)
+            return 1
+        latest = newest[0]
+        builds = build_history.recent_builds(
+            conn, limit=max(args.trend_builds, 1), variant=latest.variant, backend=latest.backend
+        )
+        type_trends = build_history.rule_type_trends(conn, builds)
+        regressions = build_history.rule_regressions(conn, builds)
+    finally:
+        conn.close()
+
+    console = Console(stderr=True)
+
+    table = Table(title=f"Build History: {latest.variant or '-'} / {latest.backend or '-'} (last {len(builds)} builds)")
+    table.add_column("Recorded (UTC)", style="cyan", no_wrap=True)
+    table.add_column("Total (s)", justify="right")
+    table.add_column("Rules", justify="right")
+    table.add_column("CAS", justify="right")
+    table.add_column("ccache", justify="right")
+    table.add_column("Recompiled", justify="right")
+    table.add_column("Avoided", justify="right")
+    table.add_column("ccache hit", justify="right")
+    previous_total: float | None = None
+    for build in builds:
+        delta = 0.0 if previous_total is None else build.total_s - previous_total
+        total_style = "green" if delta < 0 else ("red" if delta > 0 else "")
+        previous_total = build.total_s
+        table.add_row(
+            build.recorded_at.replace("T", " ").split("+")[0],
+            _styled(f"{build.total_s:.2f}", total_style),
+            str(build.rule_count),
+            "—" if build.cas_avoided is None else str(build.cas_avoided),
+            "—" if build.ccache_avoided is None else str(build.ccache_avoided),
+            "—" if build.recompiled is None else str(build.recompiled),
+            _format_rate(build.compile_avoided_rate),
+            _format_rate(build.ccache_hit_rate),
+        )
+    console.print(table)
+
+    table = Table(title="Rule Types: newest build vs mean of earlier builds")
+    table.add_column("Rule type", style="cyan", no_wrap=True)
+    table.add_column("Count", justify="right")
+    table.add_column("Baseline (s)", justify="right")
+    table.add_column("Latest (s)", justify="right")
+    table.add_column("Delta", justify="right")
+    table.add_column("Change", justify="right")
+    for trend in type_trends:
+        baseline = trend.baseline_s or 0.0
+        style = "green" if trend.delta_s < 0 else ("red" if trend.delta_s > 0 else "")
+        table.add_row(
+            trend.rule_type,
+            str(trend.count),
+            "—" if trend.baseline_s is None else f"{trend.baseline_s:.2f}",
+            f"{trend.latest_s:.2f}",
+            _styled(f"{trend.delta_s:+.2f}", style),
+            _styled(_format_pct(baseline, trend.delta_s), style),
+        )
+    console.print(table)
+
+    if not regressions:
+        console.print("No per-rule regressions against earlier builds.")
+        return 0
+    table = Table(title="Rule Regressions: newest build vs same rule, type and cache layer")
+    table.add_column("Rule", style="cyan", no_wrap=True)
+    table.add_column("Type")
+    table.add_column("Cache layer")
+    table.add_column("Baseline (s)", justify="right")
+    table.add_column("Latest (s)", justify="right")
+    table.add_column("Delta", justify="right")
+    table.add_column("Change", justify="right")
+    table.add_column("Samples", justify="right")
+    for regression in regressions:
+        label = regression.target or regression.key
+        table.add_row(
+            os.path.basename(label) if "/" in label else label,
+            regression.rule_type,
+            regression.cache_layer,
+            f"{regression.baseline_s:.2f}",
+            f"{regression.latest_s:.2f}",
+            _styled(f"{regression.delta_s:+.2f}", "red"),
+            _styled(_format_pct(regression.baseline_s, regression.delta_s), "red"),
+            str(regression.samples),
+        )
+    console.print(table)
+    return 0
+
+
 # -------------------------------------------------------------- TUI mode
 
 
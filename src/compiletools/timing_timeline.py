@@ -9,19 +9,26 @@ Push from the tree view with ``v``; return with ``escape`` or ``t``.
 
 Architecture
 ------------
-* Pure helpers (``flatten_events``, ``pack_lanes``, ``pick_tick_interval``)
-  are unit-tested independently of any UI.
+* Pure helpers (``flatten_events``, ``pack_lanes``, ``pick_tick_interval``,
+  ``LaneIndex``) are unit-tested independently of any UI.
 * ``TimelineCanvas`` is a custom Textual widget that overrides
   ``render_line`` to draw one Strip per row using the rich
   Segment/Style API.  Reactive state (origin, zoom, selection, lane
   scroll) drives refreshes.
+* Lanes are packed and indexed once, when the canvas is built.  A frame
+  then costs O(visible columns), not O(rules): each lane row bisects
+  the ``LaneIndex`` for the rules in view, and a lane with more rules
+  in view than it has room to draw switches to a binned density strip
+  (level of detail) computed from the index's cumulative busy time.
 * ``TimelineScreen`` composes the canvas with a status panel.
 """
 
 from __future__ import annotations
 
+import heapq
 import math
 import os
+from bisect import bisect_left, bisect_right
 from typing import TYPE_CHECKING, ClassVar
 
 from rich.segment import Segment
@@ -63,6 +70,14 @@ CATEGORY_PALETTE: dict[str, tuple[str, str]] = {
 LANE_LABEL_WIDTH = 4  # leftmost gutter "  0│"
 HEADER_ROWS = 4  # axis labels, ticks, phase band, separator
 
+# Level of detail: a lane whose in-view rules would get fewer than this
+# many columns each on average is drawn as a density strip instead of
+# individual boxes -- below two columns a box has no room for a label
+# and neighbouring boxes merge into noise anyway.
+LOD_COLS_PER_RULE = 2
+# Busy fraction of a column, quantised: (0, .25) (.25, .5) (.5, .75) (.75, 1].
+DENSITY_GLYPHS = ("░", "▒", "▓", "█")
+
 
 # ----------------------------------------------------------- format helpers
 
@@ -144,29 +159,157 @@ def pack_lanes(events: list[TimingEvent]) -> list[int]:
     share a lane iff one ends at-or-before the other starts (with a
     1ns epsilon to absorb float noise).  Lane 0 is the first to be
     filled, so the visual flows top-down by earliest start.
+
+    O(n log lanes): busy lanes sit in a heap keyed by end time and are
+    moved to a heap of free lane numbers once the sweep passes their
+    end.  Because starts only increase, a freed lane stays free until
+    reused, so taking the lowest free number is exactly first-fit.
     """
     if not events:
         return []
     result = [0] * len(events)
-    lanes_end: list[float] = []
+    busy: list[tuple[float, int]] = []  # (end_s, lane)
+    free: list[int] = []
+    num_lanes = 0
     order = sorted(range(len(events)), key=lambda i: events[i].start_s)
     for i in order:
         e = events[i]
         end_s = e.end_s if e.end_s is not None else e.start_s
-        chosen: int | None = None
-        for j, le in enumerate(lanes_end):
-            if le <= e.start_s + 1e-9:
-                chosen = j
-                break
-        if chosen is None:
-            chosen = len(lanes_end)
-            lanes_end.append(end_s)
+        while busy and busy[0][0] <= e.start_s + 1e-9:
+            heapq.heappush(free, heapq.heappop(busy)[1])
+        if free:
+            chosen = heapq.heappop(free)
         else:
-            lanes_end[chosen] = end_s
+            chosen = num_lanes
+            num_lanes += 1
+        heapq.heappush(busy, (end_s, chosen))
         result[i] = chosen
     return result
 
 
+class LaneIndex:
+    """Per-lane interval index over packed events.
+
+    Built once from ``events`` (sorted by start, as the canvas keeps
+    them) and their ``pack_lanes`` assignment.  Each lane holds its
+    members' starts, a running maximum of their ends, and the
+    cumulative busy time before each member -- sorted arrays, so every
+    query is a bisect:
+
+    * ``visible`` -- the members overlapping a time window;
+    * ``busy_s`` -- total busy time in ``[lane start, t]``, which makes
+      the busy fraction of any bin two lookups (``density``);
+    * ``hit`` / ``nearest_start`` -- click and lane-hop selection.
+
+    Members of one lane never overlap (beyond ``pack_lanes``' epsilon),
+    which is what makes the running maximum and busy time exact.
+    """
+
+    def __init__(self, events: list[TimingEvent], lanes: list[int], num_lanes: int) -> None:
+        self.events = events
+        self.members: list[list[int]] = [[] for _ in range(num_lanes)]
+        for i, lane in enumerate(lanes):
+            self.members[lane].append(i)
+        self._starts: list[list[float]] = []
+        self._ends: list[list[float]] = []
+        self._max_ends: list[list[float]] = []
+        self._busy_before: list[list[float]] = []
+        for members in self.members:
+            starts: list[float] = []
+            ends: list[float] = []
+            max_ends: list[float] = []
+            busy_before: list[float] = []
+            max_end = -math.inf
+            busy = 0.0
+            for i in members:
+                e = events[i]
+                end_s = e.end_s if e.end_s is not None else e.start_s
+                starts.append(e.start_s)
+                ends.append(end_s)
+                max_end = max(max_end, end_s)
+                max_ends.append(max_end)
+                busy_before.append(busy)
+                busy += max(0.0, end_s - e.start_s)
+            self._starts.append(starts)
+            self._ends.append(ends)
+            self._max_ends.append(max_ends)
+            self._busy_before.append(busy_before)
+
+    def _end(self, i: int) -> float:
+        e = self.events[i]
+        return e.end_s if e.end_s is not None else e.start_s
+
+    def _busy_at(self, lane: int, k: int, t: float) -> float:
+        """``busy_s`` given ``k``, the last member starting at-or-before ``t``."""
+        if k < 0:
+            return 0.0
+        start_s = self._starts[lane][k]
+        return self._busy_before[lane][k] + min(max(0.0, t - start_s), max(0.0, self._ends[lane][k] - start_s))
+
+    def visible(self, lane: int, t0: float, t1: float) -> list[int]:
+        """Event indices in ``lane`` overlapping ``[t0, t1]``, by start."""
+        lo = bisect_left(self._max_ends[lane], t0)
+        hi = bisect_right(self._starts[lane], t1)
+        return self.members[lane][lo:hi]
+
+    def busy_s(self, lane: int, t: float) -> float:
+        """Seconds ``lane`` spent running rules up to time ``t``."""
+        return self._busy_at(lane, bisect_right(self._starts[lane], t) - 1, t)
+
+    def density(self, lane: int, origin_s: float, seconds_per_col: float, cols: int) -> list[tuple[float, int]]:
+        """Per-column ``(busy fraction, representative event)`` for ``lane``.
+
+        The representative is the last rule to start before the column
+        ends (-1 when the column is idle); the canvas colours the bin
+        by its category.
+        """
+        if seconds_per_col <= 0:
+            return [(0.0, -1)] * cols
+        starts = self._starts[lane]
+        ends = self._ends[lane]
+        busy_before = self._busy_before[lane]
+        members = self.members[lane]
+        out: list[tuple[float, int]] = []
+        left = self.busy_s(lane, origin_s)
+        for x in range(cols):
+            t1 = origin_s + (x + 1) * seconds_per_col
+            # One bisect per column: the same k gives the busy time at the
+            # column's right edge and its representative rule.  Inlined
+            # _busy_at -- this loop runs for every column of every
+            # crowded lane on every frame.
+            k = bisect_right(starts, t1) - 1
+            if k < 0:
+                out.append((0.0, -1))
+                continue
+            start_s = starts[k]
+            right = busy_before[k] + min(max(0.0, t1 - start_s), max(0.0, ends[k] - start_s))
+            frac = (right - left) / seconds_per_col
+            out.append((min(frac, 1.0), members[k] if frac > 0 else -1))
+            left = right
+        return out
+
+    def hit(self, lane: int, t: float) -> int:
+        """The event in ``lane`` containing ``t``, else the nearest one (-1 if empty)."""
+        members = self.members[lane]
+        if not members:
+            return -1
+        k = bisect_right(self._starts[lane], t) - 1
+        candidates = [members[j] for j in (k - 1, k, k + 1) if 0 <= j < len(members)]
+        for i in candidates:
+            if self.events[i].start_s <= t <= self._end(i):
+                return i
+        return min(candidates, key=lambda i: min(abs(self.events[i].start_s - t), abs(self._end(i) - t)))
+
+    def nearest_start(self, lane: int, t: float) -> int:
+        """The event in ``lane`` whose start is closest to ``t`` (-1 if empty)."""
+        members = self.members[lane]
+        k = bisect_left(self._starts[lane], t)
+        candidates = [members[j] for j in (k - 1, k) if 0 <= j < len(members)]
+        if not candidates:
+            return -1
+        return min(candidates, key=lambda i: abs(self.events[i].start_s - t))
+
+
 # Nice tick intervals: at most ~target_ticks visible across the viewport.
 _NICE_INTERVALS = (
     0.001,
@@ -313,6 +456,7 @@ class TimelineCanvas(Widget, can_focus=True):
         self.events.sort(key=lambda e: e.start_s)
         self.lanes = pack_lanes(self.events)
         self.num_lanes = (max(self.lanes) + 1) if self.lanes else 0
+        self.index = LaneIndex(self.events, self.lanes, self.num_lanes)
         # Use the actual first/last event timestamps as the absolute axis
         # bounds rather than the BuildTimer root: phase wrappers sometimes
         # extend slightly past the last rule (root.finish() runs after the
@@ -422,15 +566,7 @@ class TimelineCanvas(Widget, can_focus=True):
             if 0 <= target_lane < self.num_lanes:
                 # Pick the event in target_lane whose start is closest
                 # to the current selection's start time.
-                best_idx = -1
-                best_d = float("inf")
-                for i in range(len(self.events)):
-                    if self.lanes[i] != target_lane:
-                        continue
-                    d = abs(self.events[i].start_s - cur.start_s)
-                    if d < best_d:
-                        best_d = d
-                        best_idx = i
+                best_idx = self.index.nearest_start(target_lane, cur.start_s)
                 if best_idx >= 0:
                     self.selected_idx = best_idx
         self._ensure_visible()
@@ -482,21 +618,9 @@ class TimelineCanvas(Widget, can_focus=True):
         col = x - LANE_LABEL_WIDTH
         t = self.origin_s + col * self.seconds_per_col
         # Hit-test: pick the event in this lane that contains t, or
-        # nearest by start time if none does (so clicks on gutters still
+        # the nearest one if none does (so clicks on gutters still
         # select the closest box).
-        best = -1
-        best_d = float("inf")
-        for i, e in enumerate(self.events):
-            if self.lanes[i] != lane:
-                continue
-            end_s = e.end_s if e.end_s is not None else e.start_s
-            if e.start_s <= t <= end_s:
-                best = i
-                break
-            d = min(abs(e.start_s - t), abs(end_s - t))
-            if d < best_d:
-                best_d = d
-                best = i
+        best = self.index.hit(lane, t)
         if best >= 0:
             self.selected_idx = best
 
@@ -634,10 +758,50 @@ class TimelineCanvas(Widget, can_focus=True):
 
     def _render_lane(self, lane_idx: int) -> Strip:
         avail = self._avail()
-        cells: list[tuple[Style, str]] = [(Style(bgcolor=DEFAULT_BG), " ") for _ in range(avail)]
-        for i, e in enumerate(self.events):
-            if self.lanes[i] != lane_idx:
+        # One column of slack either side so rules that round into the
+        # edge columns are still drawn (and get their clip chevrons).
+        in_view = self.index.visible(
+            lane_idx,
+            self.origin_s - self.seconds_per_col,
+            self.origin_s + (avail + 1) * self.seconds_per_col,
+        )
+        if len(in_view) * LOD_COLS_PER_RULE > avail:
+            cells = self._density_cells(lane_idx, avail)
+        else:
+            cells = self._box_cells(in_view, avail)
+        # Lane gutter label
+        lane_text = f"{lane_idx:>2d}│ "[:LANE_LABEL_WIDTH]
+        lane_text = lane_text.ljust(LANE_LABEL_WIDTH)
+        gutter = Segment(lane_text, Style(color=LANE_LABEL_FG, bgcolor=DEFAULT_BG))
+        return Strip([gutter] + _coalesce(cells))
+
+    def _density_cells(self, lane_idx: int, avail: int) -> list[tuple[Style, str]]:
+        """Level-of-detail lane: one shaded glyph per column.
+
+        Glyph weight is the fraction of the column the lane spent busy;
+        colour is the category of the rule that last started in it.  The
+        selection, if it is in this lane, is marked at its start column.
+        """
+        blank = (Style(bgcolor=DEFAULT_BG), " ")
+        cells: list[tuple[Style, str]] = []
+        for frac, i in self.index.density(lane_idx, self.origin_s, self.seconds_per_col, avail):
+            if i < 0:
+                cells.append(blank)
                 continue
+            bg, _ = CATEGORY_PALETTE.get(self.events[i].category, CATEGORY_PALETTE["other"])
+            glyph = DENSITY_GLYPHS[min(len(DENSITY_GLYPHS) - 1, int(frac * len(DENSITY_GLYPHS)))]
+            cells.append((Style(color=bg, bgcolor=DEFAULT_BG), glyph))
+        if 0 <= self.selected_idx < len(self.events) and self.lanes[self.selected_idx] == lane_idx:
+            col = round(s_to_col(self.events[self.selected_idx].start_s, self.origin_s, self.seconds_per_col))
+            if 0 <= col < avail:
+                cells[col] = (Style(color=SELECT_FG, bgcolor=DEFAULT_BG, bold=True), "┃")
+        return cells
+
+    def _box_cells(self, in_view: list[int], avail: int) -> list[tuple[Style, str]]:
+        """Full-detail lane: one labelled box per rule."""
+        cells: list[tuple[Style, str]] = [(Style(bgcolor=DEFAULT_BG), " ") for _ in range(avail)]
+        for i in in_view:
+            e = self.events[i]
             cs = s_to_col(e.start_s, self.origin_s, self.seconds_per_col)
             end_s = e.end_s if e.end_s is not None else e.start_s
             ce = s_to_col(end_s, self.origin_s, self.seconds_per_col)
@@ -682,11 +846,7 @@ class TimelineCanvas(Widget, can_focus=True):
             if is_sel and inner_w >= 2:
                 cells[cs_i] = (Style(bgcolor=bg, color=SELECT_FG, bold=True), "┃")
                 cells[ce_i - 1] = (Style(bgcolor=bg, color=SELECT_FG, bold=True), "┃")
-        # Lane gutter label
-        lane_text = f"{lane_idx:>2d}│ "[:LANE_LABEL_WIDTH]
-        lane_text = lane_text.ljust(LANE_LABEL_WIDTH)
-        gutter = Segment(lane_text, Style(color=LANE_LABEL_FG, bgcolor=DEFAULT_BG))
-        return Strip([gutter] + _coalesce(cells))
+        return cells
 
 
 # ---------------------------------------------------------------- screen
@@ -39,6 +39,7 @@ import time
 from dataclasses import asdict, dataclass
 
 import compiletools.apptools
+import compiletools.cas_publish
 import compiletools.filesystem_utils
 import compiletools.git_utils
 import compiletools.wrappedos
@@ -378,6 +379,7 @@ class ShakeBackend(BuildBackend):
                 rule_cost.save_cost_history(cost_path, history, prefer=set(self._observed_costs))
             except Exception:
                 pass
+            self._record_test_history()
 
         # Re-deliver the aborting signal now that traces/costs are saved and
         # every child is reaped, so the process reports a conventional
@@ -671,6 +673,8 @@ class ShakeBackend(BuildBackend):
             # their own cas path; the downstream publish-as-symlink rule
             # materialises bin/<name>.
             cas_hit = execute_link_rule(target, flat_cmd, self.args, skip_if_exists=True)
+        elif (entries := self._publish_entries(rule, flat_cmd)) is not None:
+            self._publish_in_process(entries, flat_cmd)
         else:
             execute_link_rule(target, flat_cmd, self.args)
 
@@ -717,6 +721,11 @@ class ShakeBackend(BuildBackend):
                 on_spawn=self._track_child_spawn,
                 on_reap=self._track_child_reap,
             )
+        elif (entries := self._publish_entries(rule, flat_cmd)) is not None:
+            # In-process publish on the default executor's thread pool: no
+            # interpreter start-up per artefact, and the event loop keeps
+            # scheduling while the link/rename round-trips are in flight.
+            await asyncio.get_running_loop().run_in_executor(None, self._publish_in_process, entries, flat_cmd)
         else:
             await execute_link_rule_async(
                 target,
@@ -728,6 +737,29 @@ class ShakeBackend(BuildBackend):
 
         self._record_rule_timing(rule, target, cas_hit, start, queued_at)
 
+    @staticmethod
+    def _publish_entries(rule: BuildRule, flat_cmd: list[str]) -> list[tuple[str, str, str | None]] | None:
+        """The entries a ``ct-cas-publish`` SYMLINK rule publishes, or ``None``
+        for any other rule (which then runs as a subprocess)."""
+        if rule.rule_type != RuleType.SYMLINK:
+            return None
+        return compiletools.cas_publish.parse_publish_command(flat_cmd)
+
+    @staticmethod
+    def _publish_in_process(entries: list[tuple[str, str, str | None]], flat_cmd: list[str]) -> None:
+        """Run ``cas_publish.publish`` for *entries* in this process.
+
+        Failures surface exactly as the ``ct-cas-publish`` subprocess did: the
+        same stderr line and a ``CalledProcessError`` carrying the exit code
+        ``cas_publish.main`` would have returned."""
+        failures = compiletools.cas_publish.publish_batch(entries, max_workers=1)
+        if not failures:
+            return
+        for user_path, e in failures:
+            print(f"ct-cas-publish: {user_path}: {e}", file=sys.stderr)
+        trimmed = all(isinstance(e, compiletools.cas_publish.ConcurrentTrimError) for _, e in failures)
+        raise subprocess.CalledProcessError(compiletools.cas_publish.EXIT_CONCURRENT_TRIM if trimmed else 1, flat_cmd)
+
     def _record_rule_timing(
         self, rule: BuildRule, target: str, cas_hit: bool | None, start: float, queued_at: float | None
     ) -> None:
@@ -48,6 +48,8 @@ try:
 except ImportError:
     fcntl = None
 
+import compiletools.access_journal
+import compiletools.cold_tier
 import compiletools.filesystem_utils
 import compiletools.lock_utils
 
@@ -281,13 +283,38 @@ class _RetryItem:
             # bytes_freed (small, ignore failure). The ``.result`` sidecar is
             # the per-CAS-entry test-success marker touched by the in-build
             # test rules in CAS-only mode.
+            # A cold-tier sibling's sidecars are its raw entry's.
+            entry = compiletools.cold_tier.raw_path(self.path)
             for sidecar_suffix in (".manifest", ".result"):
                 try:
-                    os.remove(self.path + sidecar_suffix)
+                    os.remove(entry + sidecar_suffix)
                 except OSError:
                     pass
 
 
+class _RateLimiter:
+    """Pace metadata operations to at most ``ops_per_second`` on average.
+
+    ``charge(n)`` books ``n`` operations and sleeps when the caller is more
+    than a one-second burst ahead of the rate. ``None`` disables pacing (the
+    batch trim, which should finish as fast as the filesystem allows).
+    """
+
+    def __init__(self, ops_per_second, *, clock=time.monotonic, sleep=time.sleep):
+        self.ops_per_second = ops_per_second
+        self._clock = clock
+        self._sleep = sleep
+        self._due = 0.0
+
+    def charge(self, ops=1):
+        if not self.ops_per_second or ops <= 0:
+            return
+        now = self._clock()
+        self._due = max(self._due, now - 1.0) + ops / self.ops_per_second
+        if self._due > now:
+            self._sleep(self._due - now)
+
+
 def _entry_mtime_size(entry):
     """Return ``(st_mtime, st_size)`` for a ``DirEntry``, or ``None`` if it
     vanished / is unreadable mid-scan.
@@ -325,6 +352,15 @@ def _enumerate_pool_dirs(root, name_re=None):
         return [e for e in it if e.is_dir(follow_symlinks=False) and (name_re is None or name_re.match(e.name))]
 
 
+def _has_other_links(path):
+    """True when *path* has a second hard link, or cannot be statted (treated
+    as in use: a budget pass must never evict what it cannot inspect)."""
+    try:
+        return os.stat(path).st_nlink > 1
+    except OSError:
+        return True
+
+
 def _split_exe_leaf_name(name):
     """Parse a cas-exedir leaf filename ``<basename>_<linkkey><suffix>``.
 
@@ -396,7 +432,7 @@ def _map_scan(units, scan_one, workers):
         return list(executor.map(scan_one, units))
 
 
-def _scan_one_object_bucket(bucket_path, current_hashes):
+def _scan_one_object_bucket(bucket_path, current_hashes, index=None):
     """Scan one 2-hex object bucket (runs in a worker thread).
 
     Returns ``(current_counts, noncurrent, scanned)`` where:
@@ -412,6 +448,10 @@ def _scan_one_object_bucket(bucket_path, current_hashes):
 
     ``.lockdir`` siblings are skipped (lock subsystem's, not ours). A bucket
     that vanishes / is unreadable mid-scan contributes nothing — best-effort.
+
+    ``index`` is the pool's ``access_journal.AccessIndex`` on a journaled
+    pool: non-current objects it already knows are not statted either, and
+    their mtime is replaced by their last recorded use.
     """
     current_counts = {}
     noncurrent = {}
@@ -421,17 +461,22 @@ def _scan_one_object_bucket(bucket_path, current_hashes):
             for entry in bucket_entries:
                 if entry.name.endswith(".lockdir"):
                     continue
-                if not entry.name.endswith(".o"):
+                # A compressed cold-tier sibling is ranked as the object it
+                # stands for, under its own (compressed) size.
+                name = compiletools.cold_tier.raw_path(entry.name)
+                if not name.endswith(".o"):
                     continue
-                parsed = parse_object_filename(entry.name)
+                parsed = parse_object_filename(name)
                 if parsed is None:
                     continue
                 scanned += 1
                 basename, file_hash, _dep_hash, _macro_hash = parsed
                 if file_hash in current_hashes:
                     current_counts[basename] = current_counts.get(basename, 0) + 1
+                    if index is not None:
+                        index.saw(entry.path)
                     continue
-                ms = _entry_mtime_size(entry)
+                ms = _entry_mtime_size(entry) if index is None else index.mtime_size(entry)
                 if ms is None:
                     continue
                 noncurrent.setdefault(basename, []).append((entry.path, ms[0], ms[1]))
@@ -490,7 +535,7 @@ def _scan_one_exe_bucket(bucket_entry):
     for leaf in inner:
         if not leaf.is_file():
             continue
-        parsed = _split_exe_leaf_name(leaf.name)
+        parsed = _split_exe_leaf_name(compiletools.cold_tier.raw_path(leaf.name))
         if parsed is None:
             continue
         basename, _link_key, matched_suffix = parsed
@@ -499,7 +544,7 @@ def _scan_one_exe_bucket(bucket_entry):
         except OSError:
             continue
         bucket_id = basename
-        manifest = _load_exe_manifest(leaf.path)
+        manifest = _load_exe_manifest(compiletools.cold_tier.raw_path(leaf.path))
         if manifest is not None:
             src = manifest.get("source_realpath")
             if isinstance(src, str) and src:
@@ -563,6 +608,12 @@ class CacheTrimmer:
         # pre-fix shake. Off by default — see _reclaim_ca_siblings for why it
         # cannot be part of the default trim path.
         self.purge_ca_siblings = getattr(args, "purge_ca_siblings", False)
+        # --compress-cold DAYS: demote cold obj/archive entries to compressed
+        # siblings (compress_cold). None leaves every entry raw.
+        compress_cold_days = getattr(args, "compress_cold", None)
+        self.compress_cold_seconds = (
+            compress_cold_days * 86400 if isinstance(compress_cold_days, (int, float)) else None
+        )
         # Scan parallelism is sourced from --parallel / -j (jobs.py), which
         # already honours CPU affinity, cgroups, and slurm allocations. A
         # caller that never plumbed it (or passed 0/None) stays serial.
@@ -574,6 +625,44 @@ class CacheTrimmer:
         # attempt are queued here and retried once in retry_failed() after all
         # caches have been trimmed. See _RetryItem for field semantics.
         self._retry: list[_RetryItem] = []
+        # --watch paces its metadata I/O (bucket listings, stats, removals) so
+        # a background trim cannot starve the builds sharing the filesystem.
+        watching = getattr(args, "watch", False) is True
+        self._pace = _RateLimiter(getattr(args, "watch_ops_per_second", None) if watching else None)
+        # Folded access journals, one per journaled obj/exe pool, loaded on
+        # first use and written back by save_access_indexes().
+        self._access_indexes: dict[str, compiletools.access_journal.AccessIndex | None] = {}
+
+    def _access_index(self, cache_dir, kind):
+        """The pool's folded ``AccessIndex``, or ``None`` when no build has
+        journaled into it (recency is then the entry mtime, as always)."""
+        if cache_dir not in self._access_indexes:
+            index = None
+            if compiletools.access_journal.is_journaled(cache_dir):
+                index = compiletools.access_journal.AccessIndex(cache_dir, kind)
+                segments = index.fold()
+                if self.verbose >= 1:
+                    print(
+                        f"  Access journal: folded {index.records_folded} records from {segments} segments",
+                        file=self._human,
+                    )
+            self._access_indexes[cache_dir] = index
+        return self._access_indexes[cache_dir]
+
+    def _forget_removed(self, path):
+        """Drop a removed entry from its pool's access index, if any."""
+        for index in self._access_indexes.values():
+            if index is not None:
+                index.forget(path)
+
+    def save_access_indexes(self):
+        """Persist every folded access index and delete the consumed journal
+        segments. Skipped under ``--dry-run``, which must not touch disk."""
+        if self.dry_run:
+            return
+        for index in self._access_indexes.values():
+            if index is not None:
+                index.save()
 
     def _workers_for(self, path):
         """Worker-thread count for scanning ``path``.
@@ -602,6 +691,7 @@ class CacheTrimmer:
         """
         if item.attempt():
             item.credit_success()
+            self._forget_removed(item.path)
             return True
         if self.verbose >= 1:
             print(f"  Failed to remove {fail_noun}{item.path} (will retry)", file=self._human)
@@ -618,7 +708,9 @@ class CacheTrimmer:
         Note on ``max_age``: "aged" means "old since written" (mtime), NOT
         "old since last accessed" (atime). A heavily-used cache entry from
         months ago will still be evicted because we cannot rely on atime
-        (most production filesystems mount with ``noatime``).
+        (most production filesystems mount with ``noatime``). The exception is
+        a pool builds journal into (``--access-journal``): there "aged" means
+        "not used by a journaling build since", see ``access_journal``.
 
         Args:
             objdir: Path to the object CAS.
@@ -645,6 +737,8 @@ class CacheTrimmer:
             "budget_removed": 0,
             "budget_bytes_freed": 0,
             "budget_unmet_bytes": 0,
+            "cold_demoted": 0,
+            "cold_bytes_saved": 0,
         }
 
         if not os.path.isdir(objdir):
@@ -695,8 +789,9 @@ class CacheTrimmer:
         """
         bucket_paths = [e.path for e in _enumerate_pool_dirs(objdir, _OBJ_BUCKET_RE)]
 
+        index = self._access_index(objdir, "obj")
         workers = self._workers_for(objdir)
-        results = _map_scan(bucket_paths, lambda b: _scan_one_object_bucket(b, current_hashes), workers)
+        results = _map_scan(bucket_paths, lambda b: _scan_one_object_bucket(b, current_hashes, index), workers)
 
         # Merge partial results in the calling thread (no cross-thread locking).
         groups = {}  # basename -> {"current": int, "noncurrent": [(path, mtime, size)]}
@@ -1190,6 +1285,8 @@ class CacheTrimmer:
             "budget_removed": 0,
             "budget_bytes_freed": 0,
             "budget_unmet_bytes": 0,
+            "cold_demoted": 0,
+            "cold_bytes_saved": 0,
             "ca_siblings_removed": 0,
             "ca_siblings_skipped_warm": 0,
         }
@@ -1213,8 +1310,13 @@ class CacheTrimmer:
         workers = self._workers_for(exedir)
         results = _map_scan(bucket_dirs, _scan_one_exe_bucket, workers)
 
+        # On a journaled pool an entry's age is its last recorded use, not
+        # the mtime a build would otherwise have had to keep bumping.
+        index = self._access_index(exedir, "exe")
         for recs in results:
             for path, bucket_key, mtime, size, nlink in recs:
+                if index is not None:
+                    mtime = index.recency(path, mtime, size)
                 entry_info[path] = (bucket_key, mtime, size, nlink)
                 stats["total_scanned"] += 1
 
@@ -1315,6 +1417,7 @@ class CacheTrimmer:
         for item in self._retry:
             if item.attempt():
                 item.credit_success()
+                self._forget_removed(item.path)
                 # Reconcile budget_unmet_bytes: a failed budget removal was
                 # conservatively left in the unmet tally.  On retry success the
                 # bytes are gone, so reduce the unmet counter by the entry's
@@ -1543,8 +1646,10 @@ class CacheTrimmer:
                 continue
 
             primary = entry.path[: -len(suffix)]
-            if os.path.exists(primary):
-                continue  # artefact still cached — keep its sidecar
+            if os.path.exists(primary) or any(
+                os.path.exists(primary + cold) for cold in compiletools.cold_tier.COLD_SUFFIXES
+            ):
+                continue  # artefact still cached (raw or demoted) — keep its sidecar
 
             try:
                 st = entry.stat(follow_symlinks=False)
@@ -1793,6 +1898,12 @@ class CacheTrimmer:
         * ``pch`` / ``pcm`` — each ``cmd_hash`` directory as a whole unit (newest
           leaf mtime, total dir size).
 
+        On a journaled obj/exe pool (``access_journal``) the re-scan is a
+        directory listing: known entries take their size and last use from
+        the folded index and are not statted. An exe's hard-link protection is
+        then checked only for the candidates actually reached, just before
+        eviction, rather than for every entry in the pool.
+
         Args:
             cache_dir: The resolved CAS directory for this pool.
             stats: The per-cache stats dict (mutated in place: ``budget_removed``,
@@ -1807,14 +1918,7 @@ class CacheTrimmer:
         if not os.path.isdir(cache_dir):
             return
 
-        if kind == "obj":
-            units = self._budget_scan_obj(cache_dir, current_hashes or set())
-        elif kind == "exe":
-            units = self._budget_scan_exe(cache_dir)
-        elif kind in ("pch", "pcm"):
-            units = self._budget_scan_cmd_hash_dirs(cache_dir, kind)
-        else:  # pragma: no cover - guarded by the caller's fixed kind set
-            raise ValueError(f"enforce_budget: unknown kind {kind!r}")
+        units = self._budget_units(cache_dir, kind, current_hashes)
 
         # total includes BOTH protected and non-protected units — the budget is
         # a statement about the whole pool, and protected bytes count against it
@@ -1829,41 +1933,12 @@ class CacheTrimmer:
             (u for u in units if not u[3]),
             key=lambda u: u[1],
         )
-        for path, _mtime, size, _protected in candidates:
+        for path, _mtime, size, protected in candidates:
             if total <= self.max_size_bytes:
                 break
-            is_dir = kind in ("pch", "pcm")
-            cleanup_sidecars = kind == "exe"
-            unlink_kwargs = {"skip_if_nlink_above": 1} if kind == "exe" else {}
-
-            if self.verbose >= 1:
-                action = "Would remove (budget)" if self.dry_run else "Removing (budget)"
-                print(f"  {action}: {path} ({_format_bytes(size)})", file=self._human)
-
-            if self.dry_run:
-                # Count would-be removals and subtract from the running total so
-                # the unmet calc reflects what a real run would reclaim, but
-                # touch nothing on disk and never populate the retry list.
-                stats["budget_removed"] += 1
-                stats["budget_bytes_freed"] += size
-                total -= size
-                continue
-
-            # unmet_key: on retry success, budget_unmet_bytes must be
-            # decremented by this entry's size — a successfully-retried budget
-            # eviction was conservatively left in the unmet tally at queue time.
-            item = _RetryItem(
-                path=path,
-                is_dir=is_dir,
-                size=size,
-                stats=stats,
-                removed_key="budget_removed",
-                bytes_key="budget_bytes_freed",
-                unmet_key="budget_unmet_bytes",
-                unlink_kwargs=unlink_kwargs,
-                cleanup_sidecars=cleanup_sidecars,
-            )
-            if self._remove_or_queue_retry(item):
+            if protected is None and _has_other_links(path):
+                continue  # journaled exe scan: published after all
+            if self._evict_budget_unit(path, size, kind, stats):
                 total -= size
             # else: do NOT decrement total — for the unmet calc we
             # conservatively assume the entry stays (it may be reclaimed on
@@ -1871,12 +1946,136 @@ class CacheTrimmer:
 
         stats["budget_unmet_bytes"] = max(0, total - self.max_size_bytes)
 
-    def _budget_scan_obj(self, objdir, current_hashes):
+    def compress_cold(self, cache_dir, stats, *, kind, current_hashes=None):
+        """Demote cold entries to compressed siblings (``--compress-cold DAYS``).
+
+        Runs after the normal trim and before ``enforce_budget``, so the budget
+        counts the demoted entries at their compressed size. An entry is cold
+        when it is non-current (objects) or has no other hard link (archives)
+        — the ``enforce_budget`` protection rules — and its recency is older
+        than ``self.compress_cold_seconds``. Only ``.o`` and ``.a`` entries
+        are demoted (``cold_tier.DEMOTABLE_SUFFIXES``).
+
+        Each demotion runs under the entry's build lock (``_safe_locked_demote``):
+        a peer compiling or rehydrating the same name is never raced, and the
+        next build that needs the entry restores it from the sibling. No-op
+        without ``--compress-cold``. Honours ``self.dry_run`` (counts the
+        candidates, compresses nothing). Accumulates ``cold_demoted`` and
+        ``cold_bytes_saved`` into ``stats``.
+        """
+        if self.compress_cold_seconds is None or kind not in ("obj", "exe"):
+            return
+        if not os.path.isdir(cache_dir):
+            return
+        cutoff = time.time() - self.compress_cold_seconds
+        for path, mtime, _size, protected in self._budget_units(cache_dir, kind, current_hashes):
+            if protected or mtime >= cutoff:
+                continue
+            if compiletools.cold_tier.is_cold(path) or not compiletools.cold_tier.is_demotable(path):
+                continue
+            self._pace.charge()
+            if self.dry_run:
+                if self.verbose >= 1:
+                    print(f"  Would compress (cold): {path}", file=self._human)
+                stats["cold_demoted"] += 1
+                continue
+            saved = _safe_locked_demote(path)
+            if saved is None:
+                continue
+            if self.verbose >= 1:
+                print(f"  Compressed (cold): {path} ({_format_bytes(saved)} saved)", file=self._human)
+            self._forget_removed(path)
+            stats["cold_demoted"] += 1
+            stats["cold_bytes_saved"] += saved
+
+    def _budget_units(self, cache_dir, kind, current_hashes):
+        """``[(path, mtime, size, protected), ...]`` for one pool, by kind."""
+        if kind == "obj":
+            return self._budget_scan_obj(cache_dir, current_hashes or set(), self._access_index(cache_dir, "obj"))
+        if kind == "exe":
+            return self._budget_scan_exe(cache_dir, self._access_index(cache_dir, "exe"))
+        if kind in ("pch", "pcm"):
+            return self._budget_scan_cmd_hash_dirs(cache_dir, kind)
+        raise ValueError(f"enforce_budget: unknown kind {kind!r}")  # pragma: no cover - fixed kind set
+
+    def _evict_budget_unit(self, path, size, kind, stats):
+        """Evict one budget unit, lock-safe. True when its bytes may be counted
+        as reclaimed: removed now, or (dry-run) would be. A failed removal is
+        queued for ``retry_failed`` and returns False."""
+        self._pace.charge()
+        if self.verbose >= 1:
+            action = "Would remove (budget)" if self.dry_run else "Removing (budget)"
+            print(f"  {action}: {path} ({_format_bytes(size)})", file=self._human)
+
+        if self.dry_run:
+            # Count would-be removals so the unmet calc reflects what a real
+            # run would reclaim, but touch nothing on disk and never populate
+            # the retry list.
+            stats["budget_removed"] += 1
+            stats["budget_bytes_freed"] += size
+            return True
+
+        # unmet_key: on retry success, budget_unmet_bytes must be
+        # decremented by this entry's size — a successfully-retried budget
+        # eviction was conservatively left in the unmet tally at queue time.
+        item = _RetryItem(
+            path=path,
+            is_dir=kind in ("pch", "pcm"),
+            size=size,
+            stats=stats,
+            removed_key="budget_removed",
+            bytes_key="budget_bytes_freed",
+            unmet_key="budget_unmet_bytes",
+            unlink_kwargs={"skip_if_nlink_above": 1} if kind == "exe" else {},
+            cleanup_sidecars=kind == "exe",
+        )
+        return self._remove_or_queue_retry(item)
+
+    def free_bytes(self, pools, bytes_to_free, *, current_hashes=None):
+        """Evict the least recently used non-protected units across *pools*
+        until *bytes_to_free* bytes are reclaimed (the ``--watch`` episode).
+
+        ``pools`` is a list of ``(cache_dir, kind)`` sharing one volume. Units
+        from every pool are merged and ranked together, oldest first, so the
+        coldest bytes go whichever pool holds them. Protection is exactly the
+        ``enforce_budget`` rule set. The reclaimed bytes are counted from the
+        scan's sizes rather than re-read from ``statvfs``, which on a network
+        filesystem can lag the unlinks by seconds.
+
+        Returns ``(freed, {cache_dir: stats})``; each stats dict carries the
+        budget counters plus ``failed``.
+        """
+        per_pool: dict[str, dict] = {}
+        candidates = []
+        for cache_dir, kind in pools:
+            if not os.path.isdir(cache_dir):
+                continue
+            stats = per_pool.setdefault(
+                cache_dir,
+                {"bytes_freed": 0, "budget_removed": 0, "budget_bytes_freed": 0, "budget_unmet_bytes": 0, "failed": 0},
+            )
+            for path, mtime, size, protected in self._budget_units(cache_dir, kind, current_hashes):
+                if not protected:
+                    candidates.append((mtime, path, size, protected, kind, stats))
+        candidates.sort(key=lambda c: c[0])
+
+        freed = 0
+        for _mtime, path, size, protected, kind, stats in candidates:
+            if freed >= bytes_to_free:
+                break
+            if protected is None and _has_other_links(path):
+                continue
+            if self._evict_budget_unit(path, size, kind, stats):
+                freed += size
+        return freed, per_pool
+
+    def _budget_scan_obj(self, objdir, current_hashes, index=None):
         """Re-scan ``objdir`` for the budget pass: one record per parseable ``.o``.
 
         Returns ``[(path, mtime, size, protected), ...]`` where ``protected`` is
         ``True`` when the object's ``file_hash`` is in ``current_hashes``. Skips
         ``.lockdir`` / lock sidecars and orphan temps (matching the trim scan).
+        With an access ``index``, known objects are not statted.
         """
         units: list[tuple[str, float, int, bool]] = []
         try:
@@ -1889,7 +2088,7 @@ class CacheTrimmer:
             except OSError:
                 continue
             for entry in inner:
-                name = entry.name
+                name = compiletools.cold_tier.raw_path(entry.name)
                 if not name.endswith(".o"):
                     continue
                 if _COMPILETOOLS_TMP_RE.search(name) or name.endswith(_PUBLISH_TMP_SUFFIX):
@@ -1898,19 +2097,22 @@ class CacheTrimmer:
                 if parsed is None:
                     continue
                 _basename, file_hash, _dep_hash, _macro_hash = parsed
-                ms = _entry_mtime_size(entry)
+                ms = _entry_mtime_size(entry) if index is None else index.mtime_size(entry)
                 if ms is None:
                     continue
                 units.append((entry.path, ms[0], ms[1], file_hash in current_hashes))
+            self._pace.charge(1 + (len(inner) if index is None else 0))
         return units
 
-    def _budget_scan_exe(self, exedir):
+    def _budget_scan_exe(self, exedir, index=None):
         """Re-scan ``exedir`` for the budget pass: one record per CAS artefact.
 
         Returns ``[(path, mtime, size, protected), ...]`` where ``protected`` is
         ``True`` when ``st_nlink > 1`` (a published / hard-linked reference is
         still live). Non-artefact files (lock sidecars, ``.manifest``/``.result``)
-        are skipped via the suffix match.
+        are skipped via the suffix match. With an access ``index`` nothing is
+        statted for a known entry, so ``protected`` is ``None`` (unknown) and
+        ``enforce_budget`` checks it per candidate.
         """
         units: list[tuple[str, float, int, bool]] = []
         try:
@@ -1925,13 +2127,19 @@ class CacheTrimmer:
             for entry in inner:
                 if not entry.is_file():
                     continue
-                if not entry.name.endswith(_CAS_EXE_SUFFIXES):
+                if not compiletools.cold_tier.raw_path(entry.name).endswith(_CAS_EXE_SUFFIXES):
+                    continue
+                if index is not None:
+                    ms = index.mtime_size(entry)
+                    if ms is not None:
+                        units.append((entry.path, ms[0], ms[1], None))
                     continue
                 try:
                     st = entry.stat()
                 except OSError:
                     continue
                 units.append((entry.path, st.st_mtime, st.st_size, st.st_nlink > 1))
+            self._pace.charge(1 + (len(inner) if index is None else 0))
         return units
 
     def _budget_scan_cmd_hash_dirs(self, cache_dir, kind):
@@ -1972,12 +2180,22 @@ class CacheTrimmer:
                 ms = _entry_mtime_size(entry)
                 newest = ms[0] if ms is not None else 0.0
             units.append((entry.path, newest, total_size, False))
+            self._pace.charge(2)
         return units
 
     # ------------------------------------------------------------------
     # Summary
     # ------------------------------------------------------------------
 
+    def _print_cold_lines(self, cache_stats):
+        """Print the ``--compress-cold`` line for one cache (no-op when nothing
+        was demoted)."""
+        if cache_stats.get("cold_demoted"):
+            cold_str = f"    Compressed cold: {cache_stats['cold_demoted']}"
+            if cache_stats["cold_bytes_saved"]:
+                cold_str += f" ({_format_bytes(cache_stats['cold_bytes_saved'])} saved)"
+            print(cold_str, file=self._human)
+
     def _print_budget_lines(self, cache_stats):
         """Print the ``--max-size`` budget lines for one cache (no-op when no
         budget eviction occurred and the budget was met).
@@ -2050,6 +2268,7 @@ class CacheTrimmer:
                 print(orphan_str, file=self._human)
             self._print_orphan_sidecar_lines(objdir_stats)
             self._print_empty_bucket_lines(objdir_stats)
+            self._print_cold_lines(objdir_stats)
             self._print_budget_lines(objdir_stats)
 
         if pchdir_stats is not None:
@@ -2124,6 +2343,7 @@ class CacheTrimmer:
                 )
             self._print_orphan_sidecar_lines(exedir_stats)
             self._print_empty_bucket_lines(exedir_stats)
+            self._print_cold_lines(exedir_stats)
             self._print_budget_lines(exedir_stats)
 
         # The summary line aggregates whatever was actually scanned.
@@ -2317,6 +2537,49 @@ def _default_lock_args():
     )
 
 
+def _safe_locked_demote(path):
+    """Replace the CAS entry *path* by its compressed cold-tier sibling.
+
+    Holds the entry's build lock throughout, like ``_safe_locked_unlink``, and
+    refuses (returns ``None``) when the lock cannot be taken. Under the lock
+    the entry is re-statted: one that vanished, or gained a hard link (a peer
+    published it since the scan), is left alone. The raw entry is removed only
+    once the sibling is complete. Returns the bytes saved, or ``None`` when
+    nothing was demoted (including an entry that does not compress).
+    """
+    from compiletools.locking import FileLock
+
+    try:
+        with FileLock(path, _default_lock_args()):
+            try:
+                st = os.stat(path)
+            except OSError:
+                return None
+            if st.st_nlink > 1:
+                return None
+            sibling = compiletools.cold_tier.compress(path, st)
+            if sibling is None:
+                return None
+            try:
+                os.remove(path)
+            except OSError:
+                # Both copies stay; the next build uses the raw one and the
+                # next trim demotes again. Drop our sibling so the pool is
+                # not charged twice for one entry.
+                with contextlib.suppress(OSError):
+                    os.remove(sibling)
+                return None
+            try:
+                return st.st_size - os.path.getsize(sibling)  # NOT wrappedos: just written
+            except OSError:
+                return 0
+    except OSError as exc:
+        # Lock unavailable, or the sibling could not be written (quota, a
+        # read-only pool): the entry simply stays raw.
+        print(f"  Not compressing {path}: {exc}", file=sys.stderr)
+        return None
+
+
 def _safe_locked_unlink(path, *, skip_if_nlink_above=None, require_same_inode_as=None):
     """Unlink path after acquiring the build lock for it.
 
@@ -2350,7 +2613,9 @@ def _safe_locked_unlink(path, *, skip_if_nlink_above=None, require_same_inode_as
 
     lock_args = _default_lock_args()
     try:
-        with FileLock(path, lock_args):
+        # A cold-tier sibling is guarded by its raw entry's lock, the one
+        # rehydrate_cold_entry holds while it decodes the sibling.
+        with FileLock(compiletools.cold_tier.raw_path(path), lock_args):
             if require_same_inode_as is not None:
                 try:
                     if not os.path.samefile(path, require_same_inode_as):
@@ -3420,7 +3685,7 @@ def trim_one_variant(
     """Run the normal four-cache trim for ONE variant's cell directories.
 
     Builds a fresh ``CacheTrimmer`` and runs each enabled cache's
-    ``trim_*`` + ``reclaim_orphan_temps`` + ``enforce_budget`` +
+    ``trim_*`` + ``reclaim_orphan_temps`` + ``compress_cold`` (obj/exe) + ``enforce_budget`` +
     ``reclaim_orphan_sidecars``, then ``retry_failed`` once.
     ``reclaim_orphan_sidecars`` runs last so it also reaps the lock/manifest/
     result sidecars of artefacts the budget pass just evicted — one mechanism
@@ -3450,6 +3715,7 @@ def trim_one_variant(
             print(f"Trimming object directory: {cas_objdir}", file=trimmer._human)
         s = trimmer.trim_objdir(cas_objdir, current_hashes)
         trimmer.reclaim_orphan_temps(cas_objdir, s)
+        trimmer.compress_cold(cas_objdir, s, kind="obj", current_hashes=current_hashes)
         trimmer.enforce_budget(cas_objdir, s, kind="obj", current_hashes=current_hashes)
         trimmer.reclaim_orphan_sidecars(cas_objdir, s)
         if s["total_scanned"] == 0:
@@ -3486,6 +3752,7 @@ def trim_one_variant(
             print(f"Trimming executable cache: {cas_exedir}", file=trimmer._human)
         s = trimmer.trim_exedir(cas_exedir)
         trimmer.reclaim_orphan_temps(cas_exedir, s)
+        trimmer.compress_cold(cas_exedir, s, kind="exe")
         trimmer.enforce_budget(cas_exedir, s, kind="exe")
         trimmer.reclaim_orphan_sidecars(cas_exedir, s)
         if s["total_scanned"] == 0:
@@ -3516,10 +3783,98 @@ def trim_one_variant(
         trimmer._reap_empty_buckets(cas_objdir, stats["objdir"])
     if do_exedir:
         trimmer._reap_empty_buckets(cas_exedir, stats["exedir"])
+    trimmer.save_access_indexes()
 
     return {"trimmer": trimmer, **stats}
 
 
+def volume_usage(path, statvfs=os.statvfs):
+    """``(used_bytes, total_bytes)`` of the filesystem holding *path*.
+
+    Counted as an unprivileged builder sees it: root-reserved blocks are
+    "used", because a build that cannot write past them fails all the same.
+    """
+    st = statvfs(path)
+    total = st.f_blocks * st.f_frsize
+    return total - st.f_bavail * st.f_frsize, total
+
+
+def watch(args, pools_fn, *, current_hashes_fn, cycles=None, sleep=time.sleep, statvfs=os.statvfs, stream=None):
+    """Run ``ct-trim-cache --watch``: keep each cache volume below its high
+    watermark, evicting down to the low one.
+
+    Every ``args.watch_interval`` seconds the pools from ``pools_fn()`` (a
+    list of ``(cache_dir, kind)``, re-read each cycle so ``--all-variants``
+    picks up new cells) are grouped by volume and each volume is checked with
+    one ``statvfs``. That is the whole steady-state cost. Only a volume at or
+    above ``args.high_watermark`` percent full starts an eviction episode: a
+    fresh ``CacheTrimmer`` re-scans that volume's pools and evicts the least
+    recently used rebuildable units (``CacheTrimmer.free_bytes``) until usage
+    would be at ``args.low_watermark``. The gap between the two marks keeps
+    the daemon from waking for every few megabytes a build writes.
+
+    Peer safety is the batch trim's: the same protection rules, lock-safe
+    removal and one retry pass. The metadata I/O of an episode is paced to
+    ``args.watch_ops_per_second``. ``current_hashes_fn`` is called once per
+    episode touching an object pool, so a long-running daemon protects the
+    checkout's current objects as of that episode rather than as of startup.
+    An episode that raises is reported on stderr and retried next interval.
+
+    ``cycles`` bounds the loop (``None``: run until interrupted). Returns 0.
+    """
+    stream = stream if stream is not None else sys.stdout
+    high = args.high_watermark / 100
+    low = args.low_watermark / 100
+    cycle = 0
+    while cycles is None or cycle < cycles:
+        cycle += 1
+        volumes: dict[int, list] = {}
+        for cache_dir, kind in pools_fn():
+            try:
+                dev = os.stat(cache_dir).st_dev
+            except OSError:
+                continue  # not created yet; nothing to trim
+            volumes.setdefault(dev, []).append((cache_dir, kind))
+        for pools in volumes.values():
+            try:
+                used, total = volume_usage(pools[0][0], statvfs)
+            except OSError:
+                continue
+            if total and used >= high * total:
+                # A daemon must outlive a bad episode (a pool vanishing
+                # mid-scan, an unreadable index): report it and retry on
+                # the next interval.
+                try:
+                    _watch_episode(args, pools, used, total, low, current_hashes_fn, stream)
+                except Exception as exc:
+                    print(f"Error trimming {pools[0][0]}: {exc}", file=sys.stderr)
+        if cycles is None or cycle < cycles:
+            sleep(args.watch_interval)
+    return 0
+
+
+def _watch_episode(args, pools, used, total, low, current_hashes_fn, stream):
+    """One eviction episode of ``watch`` for the pools on one volume."""
+    need = used - int(low * total)
+    trimmer = CacheTrimmer(args)
+    current_hashes = current_hashes_fn() if any(kind == "obj" for _dir, kind in pools) else set()
+    freed, per_pool = trimmer.free_bytes(pools, need, current_hashes=current_hashes)
+    trimmer.retry_failed()
+    trimmer.save_access_indexes()
+    removed = sum(stats["budget_removed"] for stats in per_pool.values())
+    print(
+        f"{pools[0][0]}: volume {used / total:.1%} full (high watermark {args.high_watermark:g}%): "
+        f"evicted {removed} entries, {_format_bytes(freed)} of {_format_bytes(need)}",
+        file=stream,
+    )
+    if freed < need:
+        print(
+            f"  low watermark {args.low_watermark:g}% not reached: the remaining entries are "
+            "protected (current objects, published artefacts) or in use by a peer",
+            file=stream,
+        )
+
+
 def _format_bytes(size_bytes):
     """Render a byte count in B / KB / MB / GB.
 
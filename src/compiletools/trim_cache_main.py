@@ -89,6 +89,22 @@ def add_arguments(cap):
             "(budget_unmet_bytes) but never violated. Default: no budget."
         ),
     )
+    cap.add_argument(
+        "--compress-cold",
+        type=float,
+        default=None,
+        metavar="DAYS",
+        help=(
+            "Demote cold cas-objdir objects and cas-exedir static archives "
+            "(non-current / not hard-linked, and not used for DAYS days) to a "
+            "compressed sibling (<entry>.zst with a zstd binding, else <entry>.gz) "
+            "instead of keeping them raw. A build that needs one again "
+            "decompresses it back in place under the entry lock before it "
+            "would compile or archive, so the pool holds several times more "
+            "distinct entries in the same --max-size. Runs before the budget "
+            "pass. Default: off."
+        ),
+    )
     cap.add_argument(
         "--cas-objdir-only",
         action="store_true",
@@ -246,6 +262,132 @@ def add_arguments(cap):
             "will be evicted down to --keep-count per basename."
         ),
     )
+    cap.add_argument(
+        "--watch",
+        action="store_true",
+        default=False,
+        help=(
+            "Run as a background daemon instead of a one-shot trim: every "
+            "--watch-interval seconds check the free space of each cache volume "
+            "(one statvfs per volume) and, once usage reaches --high-watermark, "
+            "evict the least recently used rebuildable entries across the selected "
+            "pools until usage is back at --low-watermark. Protection and "
+            "lock-safety are those of --max-size (current objects and artefacts "
+            "still published into a bin tree are never evicted). Metadata I/O is "
+            "paced to --watch-ops-per-second. Combines with --all-variants and the "
+            "--cas-*-only / --cas-*-skip selection flags; not with --dry-run, "
+            "--json, --max-size, --purge-ca-siblings or the pool-level modes. "
+            "Runs until interrupted."
+        ),
+    )
+    cap.add_argument(
+        "--high-watermark",
+        type=float,
+        default=90.0,
+        metavar="PERCENT",
+        help="--watch: volume usage (percent) that starts an eviction episode (default: 90)",
+    )
+    cap.add_argument(
+        "--low-watermark",
+        type=float,
+        default=80.0,
+        metavar="PERCENT",
+        help="--watch: volume usage (percent) an eviction episode evicts down to (default: 80)",
+    )
+    cap.add_argument(
+        "--watch-interval",
+        type=float,
+        default=60.0,
+        metavar="SECONDS",
+        help="--watch: seconds between volume checks (default: 60)",
+    )
+    cap.add_argument(
+        "--watch-ops-per-second",
+        type=float,
+        default=200.0,
+        metavar="N",
+        help=(
+            "--watch: cap on the metadata operations (bucket listings, stats, "
+            "unlinks) an eviction episode issues per second, so the daemon cannot "
+            "starve the builds sharing a GPFS/NFS/Lustre metadata server "
+            "(default: 200; 0 disables pacing)"
+        ),
+    )
+
+
+def _resolvable_cell_dirs(args):
+    """``{variant: {section: <pool>/<variant>}}`` for every RESOLVABLE cell
+    of the active caches (the ``--all-variants`` sweep set)."""
+    caches = compiletools.trim_cache._active_cache_sections(args)
+    per_variant_dirs: dict = {}  # vname -> {section: <pool>/<vname>}
+    enumerated: dict[tuple[str, str], list] = {}  # (pool, kind) -> cell records
+    for section, kind, cas_dir, active in caches:
+        if not active or not cas_dir:
+            continue
+        try:
+            pool = compiletools.trim_cache.cell_pool_root(cas_dir, args.variant)
+        except ValueError as exc:
+            print(
+                f"warning: skipping {section} for --all-variants: {exc}",
+                file=sys.stderr,
+            )
+            continue
+        key = (pool, kind)
+        if key not in enumerated:
+            enumerated[key] = compiletools.trim_cache.enumerate_cells(pool, kind)
+        for cell in enumerated[key]:
+            if cell["label"] != compiletools.trim_cache._CELL_RESOLVABLE:
+                continue
+            per_variant_dirs.setdefault(cell["name"], {})[section] = os.path.join(pool, cell["name"])
+    return per_variant_dirs
+
+
+def _load_current_hashes(args, stream):
+    """The checkout's current file hashes, which protect current objects."""
+    from compiletools.build_context import BuildContext
+    from compiletools.global_hash_registry import load_hashes
+
+    context = BuildContext()
+    load_hashes(verbose=args.verbose, context=context)
+    current_hashes = compiletools.trim_cache.build_current_hash_set(context)
+    if args.verbose >= 1:
+        print(f"Loaded {len(current_hashes)} current file hashes from git", file=stream)
+    return current_hashes
+
+
+_SECTION_KINDS = {"objdir": "obj", "pchdir": "pch", "pcmdir": "pcm", "exedir": "exe"}
+
+
+def _watch(args, selected):
+    """``--watch``: hand the selected pools to ``trim_cache.watch``.
+
+    With ``--all-variants`` the cells are re-enumerated every cycle, so a
+    variant first built after the daemon started is watched too.
+    """
+
+    def pools():
+        if args.all_variants:
+            cells = _resolvable_cell_dirs(args).values()
+        else:
+            cells = [{section: getattr(args, f"cas_{section}") for section in _SECTION_KINDS}]
+        return [
+            (cell[section], _SECTION_KINDS[section])
+            for cell in cells
+            for section in _SECTION_KINDS
+            if selected[section] and cell.get(section)
+        ]
+
+    print(
+        f"ct-trim-cache: watching (high {args.high_watermark:g}%, low {args.low_watermark:g}%, "
+        f"every {args.watch_interval:g}s)",
+        file=sys.stdout,
+    )
+    try:
+        return compiletools.trim_cache.watch(
+            args, pools, current_hashes_fn=lambda: _load_current_hashes(args, sys.stdout)
+        )
+    except KeyboardInterrupt:
+        return 0
 
 
 def main(argv=None):
@@ -283,6 +425,12 @@ def main(argv=None):
         else:
             args.max_size_bytes = None
 
+        if args.compress_cold is not None and args.compress_cold <= 0:
+            print(
+                f"Error: --compress-cold must be a positive number of days; got {args.compress_cold:g}", file=sys.stderr
+            )
+            return 1
+
         only_flags = sum(
             bool(getattr(args, name))
             for name in ("cas_objdir_only", "cas_pchdir_only", "cas_pcmdir_only", "cas_exedir_only")
@@ -378,6 +526,39 @@ def main(argv=None):
                 )
                 return 1
 
+        # --watch is a long-running daemon whose whole job is removal against
+        # the volume's free space, so the one-shot reporting and budget knobs
+        # have no meaning there; reject them rather than silently ignore them.
+        if args.watch:
+            clashing = [
+                flag
+                for flag, on in (
+                    ("--dry-run", args.dry_run),
+                    ("--json", args.json),
+                    ("--max-size", args.max_size is not None),
+                    ("--compress-cold", args.compress_cold is not None),
+                    ("--purge-ca-siblings", args.purge_ca_siblings),
+                    ("--list-resolvable / --list-unresolvable / --purge-unresolvable", pool_modes),
+                )
+                if on
+            ]
+            if clashing:
+                print(f"Error: --watch cannot be combined with {', '.join(clashing)}", file=sys.stderr)
+                return 1
+            if not 0 <= args.low_watermark < args.high_watermark <= 100:
+                print(
+                    f"Error: --watch needs 0 <= --low-watermark < --high-watermark <= 100; "
+                    f"got {args.low_watermark:g} and {args.high_watermark:g}",
+                    file=sys.stderr,
+                )
+                return 1
+            if args.watch_interval <= 0 or args.watch_ops_per_second < 0:
+                print(
+                    "Error: --watch-interval must be > 0 and --watch-ops-per-second >= 0",
+                    file=sys.stderr,
+                )
+                return 1
+
         # --list-resolvable is a standalone READ-ONLY mode: print the active
         # cell names and return without touching the normal trim path.
         if args.list_resolvable:
@@ -439,33 +620,15 @@ def main(argv=None):
             )
             return 1
 
+        if args.watch:
+            return _watch(args, {"objdir": do_objdir, "pchdir": do_pchdir, "pcmdir": do_pcmdir, "exedir": do_exedir})
+
         # --all-variants: sweep every RESOLVABLE cell in the pool, not just the
         # single --variant cell. Per-cell errors are isolated (one bad cell is
         # reported, other cells still run). current_hashes is loaded once and
         # reused across all cells (it is variant-independent).
         if args.all_variants:
-            caches = compiletools.trim_cache._active_cache_sections(args)
-            variant = args.variant
-            per_variant_dirs: dict = {}  # vname -> {section: <pool>/<vname>}
-            enumerated: dict[tuple[str, str], list] = {}  # (pool, kind) -> cell records
-            for section, kind, cas_dir, active in caches:
-                if not active or not cas_dir:
-                    continue
-                try:
-                    pool = compiletools.trim_cache.cell_pool_root(cas_dir, variant)
-                except ValueError as exc:
-                    print(
-                        f"warning: skipping {section} for --all-variants: {exc}",
-                        file=sys.stderr,
-                    )
-                    continue
-                key = (pool, kind)
-                if key not in enumerated:
-                    enumerated[key] = compiletools.trim_cache.enumerate_cells(pool, kind)
-                for cell in enumerated[key]:
-                    if cell["label"] != compiletools.trim_cache._CELL_RESOLVABLE:
-                        continue
-                    per_variant_dirs.setdefault(cell["name"], {})[section] = os.path.join(pool, cell["name"])
+            per_variant_dirs = _resolvable_cell_dirs(args)
 
             current_hashes_av: set = set()
             stream = sys.stderr if args.json else sys.stdout
@@ -474,17 +637,7 @@ def main(argv=None):
             # pch/pcm-only pool) — per_variant_dirs being non-empty alone
             # doesn't imply any objdir work.
             if do_objdir and any("objdir" in dirs for dirs in per_variant_dirs.values()):
-                from compiletools.build_context import BuildContext
-                from compiletools.global_hash_registry import load_hashes
-
-                context = BuildContext()
-                load_hashes(verbose=args.verbose, context=context)
-                current_hashes_av = compiletools.trim_cache.build_current_hash_set(context)
-                if args.verbose >= 1:
-                    print(
-                        f"Loaded {len(current_hashes_av)} current file hashes from git",
-                        file=stream,
-                    )
+                current_hashes_av = _load_current_hashes(args, stream)
 
             agg: dict = {"schema": 1, "mode": "all-variants", "variants": [], "errors": []}
             any_failed_av = False
@@ -540,16 +693,7 @@ def main(argv=None):
         # manifests / hard-link refcounts / bucketing instead.
         current_hashes = set()
         if do_objdir:
-            from compiletools.build_context import BuildContext
-            from compiletools.global_hash_registry import load_hashes
-
-            context = BuildContext()
-            load_hashes(verbose=args.verbose, context=context)
-            current_hashes = compiletools.trim_cache.build_current_hash_set(context)
-
-            if args.verbose >= 1:
-                _human = sys.stderr if args.json else sys.stdout
-                print(f"Loaded {len(current_hashes)} current file hashes from git", file=_human)
+            current_hashes = _load_current_hashes(args, sys.stderr if args.json else sys.stdout)
 
         res = compiletools.trim_cache.trim_one_variant(
             args,
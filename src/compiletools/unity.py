@@ -0,0 +1,206 @@
+"""Unity (jumbo) build batching for ``ct-cake --unity``.
+
+A unity build compiles several translation units as one: a generated
+``unity_<hash>.cpp`` ``#include``\\ s each member source, so headers shared by
+the members are parsed and instantiated once per batch instead of once per
+TU. ``BuildBackend._plan_compile_rules`` decides *which* TUs may share a batch
+(see ``BuildBackend._unity_candidate_key``); this module holds the pure parts
+-- cost quantisation, the greedy batch split, the internal-linkage scan that
+keeps clashing TUs out of a batch, and the content-addressed names of the
+generated source and its object.
+
+Batch membership is part of the unity object's cache key, so it must be
+stable across runs: learned costs are quantised to powers of two before they
+decide where one batch ends, and members are ordered by path, never by cost.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import math
+import os
+import re
+
+UNITY_SUBDIR = "unity"
+UNITY_BASENAME = "unity"
+
+
+def quantize_cost(cost: float) -> float:
+    """Round *cost* to the nearest power of two. Run-to-run timing noise in
+    the learned cost history then almost never moves a batch boundary (which
+    would re-key, and so recompile, every batch after it)."""
+    if cost <= 0 or not math.isfinite(cost):
+        return 1.0
+    return 2.0 ** round(math.log2(cost))
+
+
+def batch_by_cost(members: list[tuple[str, float]], cap: float) -> list[list[str]]:
+    """Split ``(source, cost)`` pairs into consecutive batches whose summed
+    cost stays within *cap*. Input order is kept; a member whose own cost
+    exceeds *cap* gets a batch to itself."""
+    batches: list[list[str]] = []
+    current: list[str] = []
+    total = 0.0
+    for source, cost in members:
+        if current and total + cost > cap:
+            batches.append(current)
+            current, total = [], 0.0
+        current.append(source)
+        total += cost
+    if current:
+        batches.append(current)
+    return batches
+
+
+# Tokens that change scope or end a statement, plus the keywords that clash
+# once TUs share one: ``static``, ``using`` (directives, declarations and
+# aliases) and ``typedef``.
+_SCOPE_TOKENS = re.compile(rb"[{};]|\bstatic\b|\busing\b(?:\s+namespace\b)?|\btypedef\b")
+# What precedes a ``{`` that opens a namespace-like scope (blanked literals
+# leave ``extern "C" {`` as ``extern     {``).
+_NAMESPACE_HEADER = re.compile(rb"(?:\bnamespace(?:\s+[\w:]+)?|\bextern)\s*$")
+_ANONYMOUS_NAMESPACE = re.compile(rb"\bnamespace\s*$")
+_ALIAS_DECLARATION = re.compile(rb"\s*\w+\s*=")
+# A class-key followed by the (first) name it introduces; a ``::`` after the
+# name means the definition belongs to another scope (``struct Foo::Impl``).
+_TYPE_DEFINITION = re.compile(rb"\b(?:struct|class|union|enum)(?:\s+(?:struct|class))?\s+\w+(\s*::)?")
+_CONSTEXPR = re.compile(rb"\bconstexpr\b")
+_CONST = re.compile(rb"\bconst\b")
+_EXTERN = re.compile(rb"\bextern\b")
+_TEMPLATE_ARGUMENTS = re.compile(rb"<[^<>]*>")
+_DIRECTIVE_LINE = re.compile(rb"^[ \t]*#(?:[^\n]*\\\n)*[^\n]*", re.MULTILINE)
+
+
+def _namespace_scope_clash(statement: bytes, opens_scope: bool) -> str | None:
+    """Why a namespace-scope *statement* (the text up to a ``;``, or up to the
+    ``{`` that opens its body when *opens_scope*) would be redefined by a
+    neighbour declaring the same name, or ``None``."""
+    if _EXTERN.search(statement):
+        return None
+    if _CONSTEXPR.search(statement):
+        return "namespace-scope constant"
+    declarator = statement.split(b"=", 1)[0]
+    if b"(" not in declarator:
+        # Only a top-level ``const`` gives internal linkage: drop template
+        # arguments, then look past the last pointer (``const char* p`` is
+        # an external pointer to const, ``char* const p`` is a constant).
+        while True:
+            stripped = _TEMPLATE_ARGUMENTS.sub(b" ", declarator)
+            if stripped == declarator:
+                break
+            declarator = stripped
+        if _CONST.search(declarator.rsplit(b"*", 1)[-1]):
+            return "namespace-scope constant"
+    if opens_scope and b"(" not in statement and b"=" not in statement:
+        definition = _TYPE_DEFINITION.search(statement)
+        if definition and not definition.group(1):
+            return "namespace-scope type definition"
+    return None
+
+
+def internal_linkage(text: bytes) -> str | None:
+    """Why *text* cannot share a unity TU with other sources, or ``None``.
+
+    Names with internal linkage are private to a TU only while it is its own
+    TU: two members that each define ``static int helper()`` or put a
+    ``helper`` in an anonymous namespace redefine it once concatenated, and
+    a namespace-scope ``using namespace`` leaks into every later member. The
+    same goes for other file-local names a neighbour may reuse: ``const`` and
+    ``constexpr`` constants (internal linkage by default), ``typedef`` and
+    ``using`` aliases, using-declarations and class, struct, union or enum
+    definitions. Any of these at namespace scope, or any anonymous
+    namespace, disqualifies the file; ``extern`` declarations, out-of-scope
+    definitions such as ``struct Foo::Impl`` and anything inside a class or
+    function body are ignored. Comments, literals and preprocessor lines are
+    blanked first. Over-approximating only costs a TU its batch.
+    """
+    from stringzilla import Str
+
+    from compiletools.file_analyzer import find_comment_and_literal_spans
+
+    blanked = bytearray(text)
+    comment_spans, literal_spans = find_comment_and_literal_spans(Str(text))
+    for start, end in (*comment_spans, *literal_spans):
+        blanked[start:end] = re.sub(rb"[^\n]", b" ", blanked[start:end])
+    code = _DIRECTIVE_LINE.sub(lambda m: b" " * len(m.group()), bytes(blanked))
+
+    namespace_scopes: list[bool] = []  # per open brace: namespace-like?
+    statement_start = 0
+    for match in _SCOPE_TOKENS.finditer(code):
+        token = match.group()
+        at_namespace_scope = all(namespace_scopes)
+        if token == b"{":
+            header = code[statement_start : match.start()]
+            if _ANONYMOUS_NAMESPACE.search(header):
+                return "anonymous namespace"
+            is_namespace = bool(_NAMESPACE_HEADER.search(header))
+            if at_namespace_scope and not is_namespace:
+                reason = _namespace_scope_clash(header, opens_scope=True)
+                if reason:
+                    return reason
+            namespace_scopes.append(is_namespace)
+            statement_start = match.end()
+        elif token in (b"}", b";"):
+            if token == b";" and at_namespace_scope:
+                reason = _namespace_scope_clash(code[statement_start : match.start()], opens_scope=False)
+                if reason:
+                    return reason
+            if token == b"}" and namespace_scopes:
+                namespace_scopes.pop()
+            statement_start = match.end()
+        elif at_namespace_scope:
+            if token == b"static":
+                return "namespace-scope static"
+            if token == b"typedef":
+                return "namespace-scope alias"
+            if token != b"using":
+                return "namespace-scope using-directive"
+            if _ALIAS_DECLARATION.match(code, match.end()):
+                return "namespace-scope alias"
+            return "namespace-scope using-declaration"
+    return None
+
+
+def unity_source_text(members: list[str]) -> str:
+    """The generated translation unit: one absolute ``#include`` per member.
+    Quoted includes inside each member still resolve relative to the member's
+    own directory, so no extra ``-I`` is needed."""
+    lines = ["// Generated by ct-cake --unity. Do not edit.\n"]
+    lines.extend(f'#include "{os.path.abspath(m)}"\n' for m in members)
+    return "".join(lines)
+
+
+def unity_source_pathname(cas_objdir: str, text: str, ext: str = ".cpp") -> str:
+    """``<cas_objdir>/unity/<h[:2]>/unity_<h16><ext>`` keyed on *text*. The
+    text embeds absolute member paths, so two workspaces never share (and
+    never overwrite) one another's generated file."""
+    digest = hashlib.sha256(text.encode()).hexdigest()
+    return os.path.join(cas_objdir, UNITY_SUBDIR, digest[:2], f"{UNITY_BASENAME}_{digest[:16]}{ext}")
+
+
+def write_unity_source(path: str, text: str) -> None:
+    """Materialise the generated source unless it already exists. The name is
+    a content hash, so an existing file already holds *text*."""
+    if os.path.exists(path):  # NOT wrappedos: created during this build
+        return
+    from compiletools.filesystem_utils import atomic_output_file
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with atomic_output_file(path, mode="w", encoding="utf-8", force_mode=0o666) as f:
+        f.write(text)
+
+
+def unity_object_pathname(cas_objdir: str, member_objects: list[str], flag_key: list[str]) -> str:
+    """CAS object path for a batch, in the per-TU object layout
+    (``<objdir>/<h[:2]>/unity_<h12>_<h14>_<h16>.o``) so trim and rule-cost
+    tooling treat it like any other object.
+
+    Keyed on the members' own object basenames -- which already encode each
+    member's file, dependency and macro-state hashes -- plus the batch's
+    canonicalised compile flags. Absolute paths stay out of the key, so
+    workspaces on the same commit share unity objects.
+    """
+    payload = "\0".join([*(os.path.basename(o) for o in member_objects), "\x1f", *flag_key])
+    digest = hashlib.sha256(payload.encode()).hexdigest()
+    name = f"{UNITY_BASENAME}_{digest[:12]}_{digest[12:26]}_{digest[26:42]}.o"
+    return os.path.join(cas_objdir, digest[:2], name)
@@ -8,6 +8,7 @@ Optimized for speed over memory - uses separate caches to avoid conversions.
 
 import functools
 import os
+import time
 from typing import Union
 
 import stringzilla as sz
@@ -76,6 +77,67 @@ def normpath(path: str) -> str:
     return os.path.normpath(path)
 
 
+@functools.cache
+def mtime_ns(path: str) -> int:
+    """Cached ``st_mtime_ns`` of *path*; -1 when it does not exist."""
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return -1
+
+
+# Directory listings outlive clear_cache(): a listing is reused after one stat
+# of its directory shows the mtime it was scanned at, since creating, removing
+# or renaming an entry is exactly what bumps a directory's mtime. Listings of
+# directories modified within _LISTING_RACY_NS of the scan are not kept (a
+# change in the same mtime tick would go unnoticed).
+_listing_index: dict[str, tuple[int, frozenset[str]]] = {}
+_LISTING_RACY_NS = 2_000_000_000
+
+
+@functools.cache
+def dir_files(path: str) -> frozenset[str] | None:
+    """Names of the regular files (symlinks followed) directly inside *path*.
+
+    An empty set when *path* cannot be stat'ed (missing, or a parent is
+    not searchable -- either way no file under it is reachable), so a
+    probe under a missing directory needs no further stat. None when
+    *path* cannot be listed (not a directory, or searchable but
+    unreadable); callers fall back to a direct probe.
+    """
+    mtime = mtime_ns(path)
+    if mtime < 0:
+        return frozenset()
+    known = _listing_index.get(path)
+    if known is not None and known[0] == mtime:
+        return known[1]
+    try:
+        with os.scandir(path) as entries:
+            names = frozenset(e.name for e in entries if e.is_file())
+    except OSError:
+        return None
+    if mtime < time.time_ns() - _LISTING_RACY_NS:
+        _listing_index[path] = (mtime, names)
+    return names
+
+
+@functools.cache
+def isfile_listed(path: str) -> bool:
+    """``isfile`` answered from the parent directory's cached listing.
+
+    For include resolution, where most probes miss: with N search dirs a miss
+    costs one ``scandir`` per directory for the whole build instead of one
+    failed ``stat`` per (header, directory) pair.
+    """
+    parent, name = os.path.split(path)
+    if name in ("", ".", ".."):
+        return isfile(path)
+    files = dir_files(parent or ".")
+    if files is None:
+        return isfile(path)
+    return name in files
+
+
 # StringZilla API - cached directly, leverages shared Python str caches
 @functools.cache
 def realpath_sz(path: sz.Str) -> sz.Str:
@@ -107,6 +169,12 @@ def isfile_sz(path: sz.Str) -> bool:
     return isfile(path.decode("utf-8"))
 
 
+@functools.cache
+def isfile_listed_sz(path: sz.Str) -> bool:
+    """Cached isfile_listed for StringZilla - leverages shared cache."""
+    return isfile_listed(path.decode("utf-8"))
+
+
 @functools.cache
 def isdir_sz(path: sz.Str) -> bool:
     """Cached isdir for StringZilla - leverages shared cache."""